@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark Bender expression parsing and evaluation.
+
+Reports expressions/sec for uncached parsing of plain paths and of
+function-call expressions, and for a realistic mixed workload in which
+expressions repeat across steps and files and are served from the cache.
+Evaluation compares compiling on every call with reusing the cached
+compiled closure, and per-element with columnar MAP/FILTER over a large
+array. Completion latency is measured per keystroke with 10k known paths.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add src to Python path
+src_path = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_path))
+
+from moveworks_wizard.bender import columnar
+from moveworks_wizard.bender.completion import BenderCompleter
+from moveworks_wizard.bender.evaluator import compile_expression, make_scope
+from moveworks_wizard.bender.parser import parse_expression
+
+
+def _rate(label, expressions, parse):
+    start = time.perf_counter()
+    for expression in expressions:
+        parse(expression)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {len(expressions) / elapsed:>12,.0f} expr/sec")
+
+
+def main():
+    count = 100_000
+    paths = [f"data.response_{i}.items[0].value" for i in range(count)]
+    calls = [f"CONCAT(data.user_{i}.first_name, ' ', data.user_{i}.last_name.$TRIM())" for i in range(count)]
+    mixed = [f"$INTEGER(data.ticket_{i % 2000}.priority) + 1 == {i % 5}" for i in range(count)]
+
+    uncached = parse_expression.__wrapped__
+    _rate("uncached paths", paths, uncached)
+    _rate("uncached function calls", calls, uncached)
+
+    parse_expression.cache_clear()
+    _rate("mixed workload (LRU cache)", mixed, parse_expression)
+    print(parse_expression.cache_info())
+
+    scope = make_scope(None, {"data": {"users": [{"name": f"user {i}", "age": i % 90} for i in range(100)]}})
+    expression = "MAP(FILTER(data.users, 'u.age > 30'), 'u.name.$UPPERCASE()')"
+    repeats = [expression] * 2_000
+
+    def recompile(text):
+        parse_expression.cache_clear()
+        compile_expression.__wrapped__(text)(scope)
+
+    _rate("evaluate, compiled per call", repeats, recompile)
+    _rate("evaluate, cached closure", repeats, lambda text: compile_expression(text)(scope))
+
+    _columnar_benchmark()
+    _completion_benchmark()
+
+
+def _columnar_benchmark(count=200_000):
+    records = [{"id": i, "price": i % 500 / 4, "quantity": i % 9, "status": ("open", "closed")[i % 2]}
+               for i in range(count)]
+    scope = make_scope(None, {"data": {"records": records}})
+    expressions = {
+        "MAP arithmetic": "MAP(data.records, 'r.price * r.quantity')",
+        "FILTER predicate": "FILTER(data.records, 'r.quantity > 4 and r.status == \"open\"')",
+    }
+    backend = "numpy" if columnar.np is not None else "array/list"
+    print(f"\nMAP/FILTER over {count:,} records (columnar backend: {backend})")
+
+    threshold = columnar.COLUMNAR_MIN_ITEMS
+    for label, expression in expressions.items():
+        compiled = compile_expression(expression)
+        timings = {}
+        for mode, minimum in (("per-element", count + 1), ("columnar", threshold)):
+            columnar.COLUMNAR_MIN_ITEMS = minimum
+            start = time.perf_counter()
+            compiled(scope)
+            timings[mode] = time.perf_counter() - start
+        columnar.COLUMNAR_MIN_ITEMS = threshold
+        print(f"{label:<20} per-element {timings['per-element'] * 1000:8.1f} ms   "
+              f"columnar {timings['columnar'] * 1000:8.1f} ms   "
+              f"({timings['per-element'] / timings['columnar']:.1f}x)")
+
+
+def _completion_benchmark(rows=100, fields=100):
+    completer = BenderCompleter()
+    completer.add_paths(f"data.response.rows[{i}].field_{j}" for i in range(rows) for j in range(fields))
+    typed = "CONCAT(data.response.rows[42].field_7"
+    print(f"\nCompletion with {completer.path_count:,} known paths")
+
+    worst = 0.0
+    start = time.perf_counter()
+    for cursor in range(1, len(typed) + 1):
+        keystroke = time.perf_counter()
+        completer.complete(typed[:cursor], limit=20)
+        worst = max(worst, time.perf_counter() - keystroke)
+    average = (time.perf_counter() - start) / len(typed)
+    print(f"{'per keystroke':<20} average {average * 1000:8.3f} ms   worst {worst * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
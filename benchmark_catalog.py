@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Benchmark catalog loading and CLI startup against catalog size.
+
+Generates synthetic catalog extensions of increasing size and reports the
+wall time of ``moveworks-wizard --help`` with each of them on
+$MOVEWORKS_WIZARD_CATALOG_PATH, which should stay flat, followed by the
+cost of the first lookup (loading the precompiled indexes), of a lookup
+without an index (parsing the data file) and of materializing every
+action. Per-call latencies of search, category lookups and registration
+are measured on a 5,000-action catalog. Finally, a directory of definition
+files is loaded cold, from its parsed-file cache and refreshed after one
+file changed.
+"""
+
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to Python path
+src_path = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_path))
+
+from moveworks_wizard.catalog.builtin_actions import BuiltinAction, BuiltinActionCatalog, default_catalog_files
+from moveworks_wizard.catalog.catalog_index import compile_index, index_path
+from moveworks_wizard.catalog.providers import DirectoryProvider
+
+
+SIZES = (0, 10_000, 100_000)
+
+HELP_COMMAND = ("import sys; sys.path.insert(0, sys.argv[1]); "
+                "from moveworks_wizard.wizard.cli import cli; cli(['--help'])")
+
+
+def _write_catalog(directory: Path, count: int) -> Path:
+    path = directory / f"extension_{count}.json"
+    actions = [{
+        "name": f"acme.action_{i}",
+        "description": f"Synthetic action number {i} for the catalog benchmark",
+        "category": f"Category {i % 40}",
+        "parameters": [{"name": "record_id", "type": "string", "required": True,
+                        "description": "Record to act on", "example": "data.record_id"}],
+        "example_usage": "Benchmark only",
+    } for i in range(count)]
+    path.write_text(json.dumps(actions, indent=2))
+    compile_index(path)
+    return path
+
+
+WORDS = ["user", "ticket", "laptop", "password", "access", "report", "invoice", "approval", "vpn", "printer",
+         "mailbox", "license", "badge", "device", "payroll", "expense", "calendar", "meeting", "server", "backup"]
+VERBS = ["create", "update", "delete", "reset", "grant", "revoke", "sync", "export", "notify", "lookup"]
+
+
+def _search_catalog(directory: Path, count: int) -> Path:
+    rng = random.Random(3)
+    path = directory / f"search_{count}.json"
+    actions = []
+    for i in range(count):
+        verb, noun, other = rng.choice(VERBS), rng.choice(WORDS), rng.choice(WORDS)
+        actions.append({
+            "name": f"acme.{verb}_{noun}_{i}",
+            "description": f"{verb.title()} a {noun} record and attach the related {other}",
+            "category": f"{noun.title()} Operations",
+            "parameters": [{"name": f"{noun}_id", "type": "string", "required": True, "description": "Record"}],
+        })
+    path.write_text(json.dumps(actions, indent=2))
+    compile_index(path)
+    return path
+
+
+def _per_call(label, function, repeat=2_000):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"  {label:<40} {elapsed * 1e6:>9.1f} µs  ({len(result)} results)")
+
+
+def _lookup_benchmark(directory: Path, count=5_000):
+    catalog = BuiltinActionCatalog([_search_catalog(directory, count)])
+    _, build = _timed(lambda: catalog.search_actions("x"))
+    print(f"\n{count:,}-action catalog, indexes built in {build:.1f} ms:")
+    _per_call("search_actions('acme.reset_vpn')", lambda: catalog.search_actions("acme.reset_vpn"))
+    _per_call("search_actions('reset vpn')", lambda: catalog.search_actions("reset vpn"))
+    _per_call("search_actions('mailb')", lambda: catalog.search_actions("mailb"))
+    _per_call("get_actions_by_category('Vpn Operations')",
+              lambda: catalog.get_actions_by_category("Vpn Operations"))
+    _per_call("get_all_categories()", catalog.get_all_categories)
+
+    added = 1_000
+    start = time.perf_counter()
+    for i in range(added):
+        catalog.add_action(BuiltinAction(f"acme.extra_{i}", "Reset a vpn token", "Vpn Operations", []))
+    elapsed = (time.perf_counter() - start) / added
+    print(f"  {'add_action (indexes updated)':<40} {elapsed * 1e6:>9.1f} µs")
+
+
+def _directory_benchmark(directory: Path, files=1_000, per_file=10):
+    root = directory / "definitions"
+    root.mkdir()
+    for number in range(files):
+        actions = [{"name": f"org.action_{number}_{i}", "description": "Tenant action",
+                    "category": f"Team {number % 25}", "parameters": []} for i in range(per_file)]
+        (root / f"team_{number}.json").write_text(json.dumps(actions))
+    cache = directory / "cache"
+
+    def load():
+        catalog = BuiltinActionCatalog(providers=[DirectoryProvider(root, cache_dir=cache)])
+        return catalog, catalog.get_all_categories()
+
+    (catalog, _), cold = _timed(load)
+    _, warm = _timed(load)
+    _, unchanged = _timed(catalog.refresh)
+    changed = root / "team_7.json"
+    changed.write_text(json.dumps([{"name": "org.renamed", "description": "Renamed", "category": "Team 0",
+                                    "parameters": []}]))
+    stat = changed.stat()
+    os.utime(changed, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    names, one_file = _timed(catalog.refresh)
+    print(f"\n{files:,} definition files ({files * per_file:,} actions): cold load {cold:.1f} ms, "
+          f"cached {warm:.1f} ms, refresh unchanged {unchanged:.1f} ms, "
+          f"after one file changed {one_file:.1f} ms ({len(names)} actions re-indexed)")
+
+
+def _help_time(extension, runs=5):
+    env = dict(os.environ)
+    if extension is not None:
+        env["MOVEWORKS_WIZARD_CATALOG_PATH"] = str(extension)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", HELP_COMMAND, str(src_path)], env=env,
+                       check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def _timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        extensions = {count: _write_catalog(directory, count) if count else None for count in SIZES}
+
+        for count, extension in extensions.items():
+            print(f"--help with {count:>7,} extra actions  {_help_time(extension) * 1000:>8.1f} ms")
+
+        print()
+        for count, extension in extensions.items():
+            if extension is None:
+                continue
+            files = default_catalog_files() + [extension]
+            catalog = BuiltinActionCatalog(files)
+            _, first = _timed(lambda: catalog.get_action(f"acme.action_{count // 2}"))
+            _, names = _timed(catalog.get_action_names)
+
+            index_path(extension).rename(directory / "moved.idx")
+            _, unindexed = _timed(lambda: BuiltinActionCatalog(files).get_action("acme.action_1"))
+            (directory / "moved.idx").rename(index_path(extension))
+
+            actions, everything = _timed(catalog.get_all_actions)
+            print(f"{count:>7,} actions: first lookup {first:.1f} ms (without index {unindexed:.1f} ms), "
+                  f"names {names:.1f} ms, materialize all {everything:.1f} ms ({len(actions):,})")
+
+        _lookup_benchmark(directory)
+        _directory_benchmark(directory)
+
+
+if __name__ == "__main__":
+    main()
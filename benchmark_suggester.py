@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark keyword scanning and action suggestion over a ticket backlog.
+
+Scans 10k synthetic ticket descriptions against all keyword tables of the
+action suggester, once with one substring test per keyword (the former
+approach) and once with the compiled KeywordMatcher, then reports the
+end-to-end suggest_actions() throughput, in-process and with the
+process pool behind ``suggest --batch``.
+"""
+
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add src to Python path
+src_path = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_path))
+
+from moveworks_wizard.ai.action_suggester import TEMPLATE_CATEGORY_KEYWORDS, ActionSuggester
+from moveworks_wizard.ai.batch_suggest import suggest_batch
+
+
+SUBJECTS = ["new employee", "user account", "printer", "vpn access", "laptop", "expense report",
+            "security incident", "support ticket", "manager approval", "payroll data", "webhook"]
+VERBS = ["onboard", "notify the team about", "grant access to", "escalate", "approve", "generate",
+         "reset", "revoke permissions for", "sync", "review", "close"]
+FILLER = ["asap", "for the sales department", "before friday", "after the outage", "as discussed",
+          "in the EMEA region", "per policy", "for new hires", "thanks", "urgent please"]
+
+
+def _descriptions(count, seed=7):
+    rng = random.Random(seed)
+    return [f"Please {rng.choice(VERBS)} the {rng.choice(SUBJECTS)} {rng.choice(FILLER)} "
+            f"and {rng.choice(VERBS)} {rng.choice(SUBJECTS)} {rng.choice(FILLER)}"
+            for _ in range(count)]
+
+
+def _rate(label, descriptions, function):
+    start = time.perf_counter()
+    for description in descriptions:
+        function(description)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {len(descriptions) / elapsed:>12,.0f} descriptions/sec")
+
+
+def main(count=10_000):
+    suggester = ActionSuggester()
+    descriptions = [description.lower() for description in _descriptions(count)]
+    tables = list(suggester._keywords.values())
+    tables += [dict.fromkeys(info["keywords"], 1.0) for info in suggester._patterns.values()]
+    tables += [dict.fromkeys(keywords, 1.0) for keywords in TEMPLATE_CATEGORY_KEYWORDS.values()]
+
+    def substring_scan(description):
+        scores = []
+        for keywords in tables:
+            scores.append(sum(weight for keyword, weight in keywords.items() if keyword in description))
+        return scores
+
+    print(f"{sum(map(len, tables))} keywords in {len(tables)} tables, {count:,} descriptions")
+    _rate("substring test per keyword", descriptions, substring_scan)
+    _rate("compiled keyword matcher", descriptions, suggester.match_keywords)
+
+    suggester.suggest_actions("warm up the search indexes")
+    _rate("suggest_actions end to end", descriptions, suggester.suggest_actions)
+
+    records = [(i, description, None) for i, description in enumerate(descriptions)]
+    workers = os.cpu_count() or 1
+    start = time.perf_counter()
+    results = sum(1 for _ in suggest_batch(records, max_workers=workers))
+    elapsed = time.perf_counter() - start
+    print(f"{f'batch, {workers} workers':<32} {results / elapsed:>12,.0f} descriptions/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -68,6 +68,9 @@ setup(
         "gui": [
             "customtkinter>=5.0.0",
         ],
+        "fast": [
+            "numpy>=1.21.0",
+        ],
         "all": [
             "pytest>=7.0.0",
             "pytest-cov>=4.0.0", 
@@ -75,6 +78,7 @@ setup(
             "flake8>=6.0.0",
             "mypy>=1.0.0",
             "customtkinter>=5.0.0",
+            "numpy>=1.21.0",
         ]
     },
     
@@ -125,6 +129,8 @@ setup(
         "moveworks_wizard": [
             "templates/*.yaml",
             "catalog/*.json",
+            "catalog/*.idx",
+            "catalog/profiles/*.json",
             "docs/*.md",
         ],
     },
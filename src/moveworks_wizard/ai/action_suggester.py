@@ -5,13 +5,43 @@ This module provides intelligent suggestions for actions and workflows
 based on natural language descriptions from users.
 """
 
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, Hashable, List, Any, Optional, Tuple, Union
 from dataclasses import dataclass
+from pathlib import Path
 import re
 from enum import Enum
 
 from ..catalog.builtin_actions import builtin_catalog, BuiltinAction
 from ..templates.template_library import template_library, CompoundActionTemplate
+from .keyword_matcher import KeywordMatcher
+from .text_index import BM25Index, SearchHit
+from .vector_index import VectorIndex
+
+
+# Field weights of the action and template search indexes: names count double
+ACTION_FIELD_WEIGHTS = {"name": 2, "description": 1, "category": 1, "parameters": 1}
+TEMPLATE_FIELD_WEIGHTS = {"name": 2, "description": 1, "use_case": 1, "parameters": 1}
+
+# BM25 score at which a search match reaches a confidence of 0.5
+BM25_HALF_CONFIDENCE = 4.0
+
+# Share of the category keyword score in the confidence of a category's actions
+KEYWORD_BLEND = 0.6
+
+# Cosine similarity of n-gram vectors at which a match reaches a confidence of 0.5
+SIMILARITY_HALF_CONFIDENCE = 0.3
+
+# Keywords that make a template category relevant to a description
+TEMPLATE_CATEGORY_KEYWORDS = {
+    "User Management": ["user", "employee", "onboard", "offboard"],
+    "Security & Access": ["access", "permission", "security", "grant"],
+    "Support & Ticketing": ["ticket", "support", "incident", "escalate"],
+    "Approval Workflow": ["approve", "manager", "review", "authorize"],
+    "Data Processing": ["data", "report", "validate", "process"]
+}
+
+# Keyword scan results: {(table, group): (score, matched keywords)}
+KeywordMatches = Dict[Hashable, Tuple[float, List[str]]]
 
 
 class SuggestionType(Enum):
@@ -41,10 +71,132 @@ class ActionSuggester:
     based on user descriptions.
     """
     
-    def __init__(self):
-        """Initialize the action suggester."""
+    def __init__(self, vector_cache_dir: Optional[Union[str, Path]] = None, persist_vectors: bool = True):
+        """
+        Initialize the action suggester.
+
+        Args:
+            vector_cache_dir: Directory of persisted n-gram matrices (default: default_vector_dir())
+            persist_vectors: Whether to load and save the matrices on disk
+        """
+        self.vector_cache_dir = vector_cache_dir
+        self.persist_vectors = persist_vectors
         self._keywords = self._load_keyword_mappings()
         self._patterns = self._load_workflow_patterns()
+        # All keyword tables in one matcher, so a description is scanned once
+        self._keyword_matcher = KeywordMatcher({
+            **{("category", name): keywords for name, keywords in self._keywords.items()},
+            **{("pattern", name): dict.fromkeys(info["keywords"], 1.0) for name, info in self._patterns.items()},
+            **{("template", name): dict.fromkeys(keywords, 1.0)
+               for name, keywords in TEMPLATE_CATEGORY_KEYWORDS.items()},
+        })
+        # Search indexes are built from the catalog and library on first use
+        self._action_index: Optional[BM25Index] = None
+        self._template_index: Optional[BM25Index] = None
+        self._action_vectors: Optional[VectorIndex] = None
+        self._template_vectors: Optional[VectorIndex] = None
+    
+    @staticmethod
+    def _action_fields(action: BuiltinAction) -> Dict[str, str]:
+        return {
+            "name": action.name,
+            "description": action.description,
+            "category": action.category,
+            "parameters": " ".join(parameter.name for parameter in action.parameters),
+        }
+    
+    @staticmethod
+    def _template_fields(template_name: str, template: CompoundActionTemplate) -> Dict[str, str]:
+        return {
+            "name": f"{template_name} {template.name}",
+            "description": template.description,
+            "use_case": template.use_case,
+            "parameters": " ".join(template.input_args),
+        }
+    
+    @property
+    def action_index(self) -> BM25Index:
+        """BM25 index over the built-in action catalog, built on first use."""
+        if self._action_index is None:
+            index = BM25Index(ACTION_FIELD_WEIGHTS)
+            index.add_many((action.name, self._action_fields(action))
+                           for action in builtin_catalog.get_all_actions())
+            self._action_index = index
+        return self._action_index
+    
+    @property
+    def template_index(self) -> BM25Index:
+        """BM25 index over the template library, built on first use."""
+        if self._template_index is None:
+            index = BM25Index(TEMPLATE_FIELD_WEIGHTS)
+            index.add_many((name, self._template_fields(name, template_library.get_template(name)))
+                           for name in template_library.get_template_names())
+            self._template_index = index
+        return self._template_index
+    
+    @property
+    def action_vectors(self) -> VectorIndex:
+        """N-gram vectors of the built-in action catalog, loaded or built on first search."""
+        if self._action_vectors is None:
+            self._action_vectors = VectorIndex("actions", {
+                action.name: " ".join(self._action_fields(action).values())
+                for action in builtin_catalog.get_all_actions()
+            }, cache_dir=self.vector_cache_dir, persist=self.persist_vectors)
+        return self._action_vectors
+    
+    @property
+    def template_vectors(self) -> VectorIndex:
+        """N-gram vectors of the template library, loaded or built on first search."""
+        if self._template_vectors is None:
+            self._template_vectors = VectorIndex("templates", {
+                name: " ".join(self._template_fields(name, template_library.get_template(name)).values())
+                for name in template_library.get_template_names()
+            }, cache_dir=self.vector_cache_dir, persist=self.persist_vectors)
+        return self._template_vectors
+    
+    def add_action(self, action: BuiltinAction) -> None:
+        """Add a custom action to the catalog and to the search indexes."""
+        builtin_catalog.add_action(action)
+        fields = self._action_fields(action)
+        if self._action_index is not None:
+            self._action_index.add(action.name, fields)
+        if self._action_vectors is not None:
+            self._action_vectors.add(action.name, " ".join(fields.values()))
+    
+    def add_template(self, template_name: str, template: CompoundActionTemplate) -> None:
+        """Add a template to the library and to the search indexes."""
+        template_library.add_template(template_name, template)
+        fields = self._template_fields(template_name, template)
+        if self._template_index is not None:
+            self._template_index.add(template_name, fields)
+        if self._template_vectors is not None:
+            self._template_vectors.add(template_name, " ".join(fields.values()))
+    
+    @staticmethod
+    def _search_confidence(hit: SearchHit) -> float:
+        """Map an unbounded BM25 score to a confidence below 0.9."""
+        return min(0.9, hit.score / (hit.score + BM25_HALF_CONFIDENCE))
+    
+    @staticmethod
+    def _similarity_confidence(similarity: float) -> float:
+        """Map a cosine similarity to a confidence below 0.9."""
+        return min(0.9, similarity / (similarity + SIMILARITY_HALF_CONFIDENCE))
+    
+    def _text_confidences(self, description: str, index: BM25Index, vectors: VectorIndex,
+                          limit: int) -> Dict[str, Tuple[float, List[str]]]:
+        """
+        Score documents by how well their text matches the description.
+        
+        Returns:
+            ``{key: (confidence, matched terms)}`` for the best BM25 and
+            n-gram similarity matches, taking the higher of both confidences
+        """
+        results = {hit.key: (self._search_confidence(hit), hit.terms)
+                   for hit in index.search(description, limit=limit)}
+        for key, similarity in vectors.search(description, limit=limit):
+            confidence, terms = results.get(key, (0.0, []))
+            results[key] = (max(confidence, self._similarity_confidence(similarity)), terms)
+        return results
     
     def _load_keyword_mappings(self) -> Dict[str, Dict[str, float]]:
         """Load keyword mappings for different action types."""
@@ -152,40 +304,48 @@ class ActionSuggester:
         """
         suggestions = []
         description_lower = description.lower()
+        matches = self.match_keywords(description_lower)
         
         # Get builtin action suggestions
-        builtin_suggestions = self._suggest_builtin_actions(description_lower)
+        builtin_suggestions = self._suggest_builtin_actions(description_lower, matches)
         suggestions.extend(builtin_suggestions)
         
         # Get template suggestions
-        template_suggestions = self._suggest_templates(description_lower)
+        template_suggestions = self._suggest_templates(description_lower, matches)
         suggestions.extend(template_suggestions)
         
         # Get workflow pattern suggestions
-        pattern_suggestions = self._suggest_workflow_patterns(description_lower)
+        pattern_suggestions = self._suggest_workflow_patterns(description_lower, matches)
         suggestions.extend(pattern_suggestions)
         
         # Sort by confidence and return top suggestions
         suggestions.sort(key=lambda x: x.confidence, reverse=True)
         return suggestions[:max_suggestions]
     
-    def _suggest_builtin_actions(self, description: str) -> List[ActionSuggestion]:
+    def match_keywords(self, description: str) -> KeywordMatches:
+        """
+        Scan a description once against all keyword tables.
+        
+        Returns:
+            ``{(table, group): (score, matched keywords)}`` where table is
+            "category", "pattern" or "template"
+        """
+        return self._keyword_matcher.scan(description)
+    
+    def _suggest_builtin_actions(self, description: str,
+                                 matches: Optional[KeywordMatches] = None) -> List[ActionSuggestion]:
         """Suggest built-in actions based on description."""
         suggestions = []
+        if matches is None:
+            matches = self.match_keywords(description)
         
-        # Calculate scores for each category
-        category_scores = {}
-        for category, keywords in self._keywords.items():
-            score = 0.0
-            matched_keywords = []
-            
-            for keyword, weight in keywords.items():
-                if keyword in description:
-                    score += weight
-                    matched_keywords.append(keyword)
-            
-            if score > 0:
-                category_scores[category] = (score, matched_keywords)
+        # Rank catalog actions against the description, by terms and by n-gram similarity
+        matched = self._text_confidences(description, self.action_index, self.action_vectors, limit=20)
+        
+        # Scores of the categories whose keywords occur in the description
+        category_scores = {group: result for (table, group), result in matches.items() if table == "category"}
+        
+        suggested = set()
         
         # Get actions for top-scoring categories
         for category, (score, keywords) in category_scores.items():
@@ -206,8 +366,17 @@ class ActionSuggester:
                 
                 for cat in mapped_categories:
                     actions = builtin_catalog.get_actions_by_category(cat)
+                    # Best text matches of the category first, then catalog order
+                    actions.sort(key=lambda action: -matched.get(action.name, (0.0,))[0])
                     for action in actions[:2]:  # Top 2 actions per category
                         confidence = min(0.9, score / len(keywords))
+                        if action.name in matched:
+                            # Blend in how well the action itself matches; a text match never
+                            # ranks an action below its keyword-only peers
+                            blended = min(0.9, KEYWORD_BLEND * score / len(keywords)
+                                          + (1 - KEYWORD_BLEND) * matched[action.name][0])
+                            confidence = max(confidence, blended)
+                        suggested.add(action.name)
                         suggestions.append(ActionSuggestion(
                             suggestion_type=SuggestionType.BUILTIN_ACTION,
                             title=f"Use {action.name}",
@@ -220,18 +389,45 @@ class ActionSuggester:
                             reasoning=f"Matched keywords: {', '.join(keywords)}"
                         ))
         
+        # Strong text matches outside the keyword categories, e.g. custom actions or paraphrases
+        for name, (confidence, terms) in matched.items():
+            if name in suggested or confidence < 0.5:
+                continue
+            action = builtin_catalog.get_action(name)
+            if action is None:
+                continue
+            suggestions.append(ActionSuggestion(
+                suggestion_type=SuggestionType.BUILTIN_ACTION,
+                title=f"Use {action.name}",
+                description=action.description,
+                confidence=confidence,
+                details={
+                    "action": action,
+                    "matched_keywords": terms
+                },
+                reasoning=f"Matched terms: {', '.join(terms)}" if terms else "Similar wording to the action description"
+            ))
+        
+        # Equally confident actions in order of how well their own text matches
+        suggestions.sort(key=lambda s: (-s.confidence, -matched.get(s.details["action"].name, (0.0,))[0]))
         return suggestions
     
-    def _suggest_templates(self, description: str) -> List[ActionSuggestion]:
+    def _suggest_templates(self, description: str,
+                           matches: Optional[KeywordMatches] = None) -> List[ActionSuggestion]:
         """Suggest templates based on description."""
         suggestions = []
+        if matches is None:
+            matches = self.match_keywords(description)
         
-        # Search templates directly
-        matching_templates = template_library.search_templates(description)
-        
-        for template in matching_templates[:3]:  # Top 3 templates
-            # Calculate confidence based on keyword matches
-            confidence = self._calculate_template_confidence(description, template)
+        # Rank templates against the description; top 3 by terms and top 3 by similarity
+        matched = self._text_confidences(description, self.template_index, self.template_vectors, limit=3)
+        for name, (search_confidence, _) in matched.items():
+            template = template_library.get_template(name)
+            if template is None:
+                continue
+            # Calculate confidence based on keyword matches and search rank
+            confidence = max(self._calculate_template_confidence(description, template, matches),
+                             search_confidence)
             
             if confidence >= 0.3:  # Minimum threshold
                 suggestions.append(ActionSuggestion(
@@ -248,18 +444,15 @@ class ActionSuggester:
         
         return suggestions
     
-    def _suggest_workflow_patterns(self, description: str) -> List[ActionSuggestion]:
+    def _suggest_workflow_patterns(self, description: str,
+                                   matches: Optional[KeywordMatches] = None) -> List[ActionSuggestion]:
         """Suggest workflow patterns based on description."""
         suggestions = []
+        if matches is None:
+            matches = self.match_keywords(description)
         
         for pattern_name, pattern_info in self._patterns.items():
-            score = 0.0
-            matched_keywords = []
-            
-            for keyword in pattern_info["keywords"]:
-                if keyword in description:
-                    score += 1.0
-                    matched_keywords.append(keyword)
+            score, matched_keywords = matches.get(("pattern", pattern_name), (0.0, []))
             
             if score > 0:
                 confidence = min(0.8, score / len(pattern_info["keywords"]))
@@ -279,7 +472,8 @@ class ActionSuggester:
         
         return suggestions
     
-    def _calculate_template_confidence(self, description: str, template: CompoundActionTemplate) -> float:
+    def _calculate_template_confidence(self, description: str, template: CompoundActionTemplate,
+                                       keyword_matches: Optional[KeywordMatches] = None) -> float:
         """Calculate confidence score for a template match."""
         score = 0.0
         
@@ -292,18 +486,11 @@ class ActionSuggester:
             score += (matches / len(desc_words)) * 0.7
         
         # Check category relevance
-        category_keywords = {
-            "User Management": ["user", "employee", "onboard", "offboard"],
-            "Security & Access": ["access", "permission", "security", "grant"],
-            "Support & Ticketing": ["ticket", "support", "incident", "escalate"],
-            "Approval Workflow": ["approve", "manager", "review", "authorize"],
-            "Data Processing": ["data", "report", "validate", "process"]
-        }
-        
-        if template.category in category_keywords:
-            category_matches = sum(1 for keyword in category_keywords[template.category] 
-                                 if keyword in description)
-            score += (category_matches / len(category_keywords[template.category])) * 0.3
+        if template.category in TEMPLATE_CATEGORY_KEYWORDS:
+            if keyword_matches is None:
+                keyword_matches = self.match_keywords(description)
+            category_matches, _ = keyword_matches.get(("template", template.category), (0.0, []))
+            score += (category_matches / len(TEMPLATE_CATEGORY_KEYWORDS[template.category])) * 0.3
         
         return min(1.0, score)
 
@@ -0,0 +1,152 @@
+"""
+Batch action suggestion over files of request descriptions.
+
+Descriptions are read lazily from JSON Lines or CSV files and classified
+in chunks by a process pool. Each worker process loads the catalog,
+template library and search indexes once, when it starts, and then
+serves every chunk it receives, so startup costs are paid per worker
+rather than per description. Results are produced in input order while
+only a bounded number of chunks is in flight, so arbitrarily large files
+stream through in constant memory.
+"""
+
+import csv
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+
+DEFAULT_CHUNK_SIZE = 200
+
+# Field or column holding the description, and the optional record identifier
+DESCRIPTION_FIELD = "description"
+ID_FIELD = "id"
+
+# (id, description, error) as read from the input file
+BatchRecord = Tuple[Any, Optional[str], Optional[str]]
+
+_worker_suggester = None
+
+
+def read_descriptions(file_path: Union[str, Path], field: str = DESCRIPTION_FIELD) -> Iterator[BatchRecord]:
+    """
+    Yield (id, description, error) records from a JSON Lines or CSV file.
+
+    Files ending in ``.csv`` are read as CSV with a header row; anything
+    else as JSON Lines, where each line is either a JSON string or an
+    object with a ``field`` member. Records without an ``id`` are numbered
+    by their line (JSON Lines) or row (CSV). Records that cannot be read
+    are yielded with a description of None and an error message.
+    """
+    path = Path(file_path)
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            reader = csv.DictReader(f)
+            if reader.fieldnames and field not in reader.fieldnames:
+                raise ValueError(f"CSV file has no '{field}' column")
+            for row_number, row in enumerate(reader, 1):
+                description = row.get(field)
+                if not description or not description.strip():
+                    yield row.get(ID_FIELD) or row_number, None, f"empty '{field}'"
+                else:
+                    yield row.get(ID_FIELD) or row_number, description, None
+            return
+
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_number, None, f"invalid JSON: {e}"
+                continue
+            if isinstance(record, dict):
+                record_id, description = record.get(ID_FIELD, line_number), record.get(field)
+            else:
+                record_id, description = line_number, record
+            if not isinstance(description, str) or not description.strip():
+                yield record_id, None, f"missing '{field}' string"
+            else:
+                yield record_id, description, None
+
+
+def _init_worker() -> None:
+    """Load the catalog and build the suggester's search indexes once per worker process."""
+    global _worker_suggester
+    from .action_suggester import action_suggester
+    action_suggester.action_index
+    action_suggester.template_index
+    _worker_suggester = action_suggester
+
+
+def _suggest_record(record: BatchRecord, max_suggestions: int) -> Dict[str, Any]:
+    """Classify one record into a JSON-serializable result."""
+    record_id, description, error = record
+    if error is not None:
+        return {"id": record_id, "error": error}
+    suggestions = _worker_suggester.suggest_actions(description, max_suggestions=max_suggestions)
+    return {
+        "id": record_id,
+        "description": description,
+        "suggestions": [
+            {
+                "title": suggestion.title,
+                "type": suggestion.suggestion_type.value,
+                "confidence": round(suggestion.confidence, 4),
+                "reasoning": suggestion.reasoning,
+            }
+            for suggestion in suggestions
+        ],
+    }
+
+
+def _suggest_chunk(args: Tuple[List[BatchRecord], int]) -> List[Dict[str, Any]]:
+    """Classify a chunk of records in a worker process."""
+    records, max_suggestions = args
+    return [_suggest_record(record, max_suggestions) for record in records]
+
+
+def _chunks(records: Iterable[BatchRecord], size: int) -> Iterator[List[BatchRecord]]:
+    chunk: List[BatchRecord] = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def suggest_batch(records: Iterable[BatchRecord], max_suggestions: int = 5,
+                  max_workers: Optional[int] = None,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Classify records from read_descriptions() and yield one result per record, in order.
+
+    Args:
+        records: (id, description, error) records
+        max_suggestions: Maximum number of suggestions per description
+        max_workers: Worker process count (defaults to the CPU count);
+            1 classifies in-process
+        chunk_size: Records sent to a worker at a time
+    """
+    workers = max_workers or os.cpu_count() or 1
+    chunks = _chunks(records, chunk_size)
+    if workers <= 1:
+        _init_worker()
+        for chunk in chunks:
+            yield from _suggest_chunk((chunk, max_suggestions))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        # Keep a few chunks per worker in flight; results are yielded in submission order
+        pending: Deque = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_suggest_chunk, (chunk, max_suggestions)))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
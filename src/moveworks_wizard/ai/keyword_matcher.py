@@ -0,0 +1,98 @@
+"""
+Multi-pattern keyword matching for description scanning.
+
+All keywords of all groups (suggestion categories, workflow patterns) are
+compiled into one regular expression whose alternation is laid out as a
+trie, so a description is scanned once, in C, instead of once per
+keyword. Matches are word-boundary aware: a keyword must start a word and
+end one, optionally followed by a plural or verb inflection, so "user"
+matches "users" but "manage" does not match "manager". Keywords that
+overlap are all reported: "password reset" also yields "password".
+"""
+
+import re
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+
+# Inflections accepted after a keyword: "users", "approved", "onboarding"
+KEYWORD_SUFFIXES = ("s", "es", "d", "ed", "ing")
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Build a regex alternation for words with shared prefixes factored out."""
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: Dict[str, dict]) -> str:
+        branches = []
+        optional = "" in node
+        # Branches start with distinct characters, so their order does not matter. The
+        # optional continuation below is greedy and the caller's word-end lookahead makes
+        # it backtrack only to a keyword end, so the longest keyword at a position wins.
+        for ch in sorted(k for k in node if k):
+            branches.append(re.escape(ch) + emit(node[ch]))
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if optional:
+            return f"(?:{body})?" if len(branches) > 1 or len(body) > 1 else body + "?"
+        return body
+
+    return emit(trie)
+
+
+class KeywordMatcher:
+    """
+    Scores groups of weighted keywords against a text in a single pass.
+
+    ``groups`` maps a group key to its keywords and their weights; a
+    keyword may belong to several groups, so one matcher can serve several
+    keyword tables at once. Each keyword counts once per
+    text, however often it occurs.
+    """
+
+    def __init__(self, groups: Dict[Hashable, Dict[str, float]]):
+        self._groups: Dict[str, List[Tuple[Hashable, float]]] = {}
+        for group, keywords in groups.items():
+            for keyword, weight in keywords.items():
+                self._groups.setdefault(keyword.lower(), []).append((group, weight))
+        suffixes = "|".join(sorted(KEYWORD_SUFFIXES, key=len, reverse=True))
+        # Zero-width matches at word starts, so overlapping keywords ("new user", "user") are all found
+        self._pattern = re.compile(
+            rf"(?<![a-z0-9])(?=({_trie_pattern(self._groups)})(?:{suffixes})?(?![a-z0-9]))")
+        # The trie reports the longest keyword at a position; shorter keywords that
+        # are prefixes of it ("password" of "password reset") are checked separately
+        self._prefixes = {keyword: [keyword[:end] for end in range(1, len(keyword)) if keyword[:end] in self._groups]
+                          for keyword in self._groups}
+        self._word_end = re.compile(rf"(?:{suffixes})?(?![a-z0-9])")
+
+    @property
+    def keywords(self) -> List[str]:
+        """All keywords known to the matcher."""
+        return list(self._groups)
+
+    def find(self, text: str) -> List[str]:
+        """Return the distinct keywords found in text, in order of first occurrence."""
+        text = text.lower()
+        found: Dict[str, None] = {}
+        for match in self._pattern.finditer(text):
+            keyword = match.group(1)
+            for prefix in self._prefixes[keyword]:
+                if self._word_end.match(text, match.start() + len(prefix)):
+                    found.setdefault(prefix)
+            found.setdefault(keyword)
+        return list(found)
+
+    def scan(self, text: str) -> Dict[Hashable, Tuple[float, List[str]]]:
+        """Return ``{group: (score, matched keywords)}`` for the groups with matches."""
+        scores: Dict[Hashable, Tuple[float, List[str]]] = {}
+        for keyword in self.find(text):
+            for group, weight in self._groups.get(keyword, ()):
+                score, keywords = scores.get(group, (0.0, []))
+                keywords.append(keyword)
+                scores[group] = (score + weight, keywords)
+        return scores
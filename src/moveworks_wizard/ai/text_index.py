@@ -0,0 +1,148 @@
+"""
+Inverted index with BM25 ranking for catalog and template search.
+
+Documents are short texts (a name, a description, a use case and parameter
+names) split into normalized terms. Each term keeps a posting list of the
+documents containing it, so a query only touches the postings of its own
+terms; the cost grows with the number of matching documents, not with the
+size of the catalog. Documents can be added or replaced at any time and
+the collection statistics are updated incrementally.
+"""
+
+import heapq
+import math
+import re
+from dataclasses import dataclass
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+# BM25 term-frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+STOP_WORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "i", "in", "into", "is", "it",
+    "its", "me", "my", "need", "of", "on", "or", "our", "so", "that", "the", "their", "them", "this",
+    "to", "we", "want", "when", "with", "would", "you", "your",
+})
+
+
+def stem(word: str) -> str:
+    """Strip common English suffixes so that "notifications" matches "notification"."""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 5 and word.endswith("ing"):
+        return word[:-3]
+    if len(word) > 4 and word.endswith(("sses", "ches", "shes", "xes")):
+        return word[:-2]
+    if len(word) > 4 and word.endswith("ed") and not word.endswith("eed"):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def tokenize_text(text: str) -> List[str]:
+    """Split text into stemmed terms; identifiers such as mw.send_chat are split on punctuation."""
+    return [stem(word) for word in _WORD_RE.findall(text.lower()) if word not in STOP_WORDS]
+
+
+@dataclass
+class SearchHit:
+    """A ranked document with the query terms it matched."""
+    key: Hashable
+    score: float
+    terms: List[str]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over an inverted index of weighted text fields.
+
+    Fields are given per document with a weight; a term in a field of
+    weight 2 counts as two occurrences, which lets names outrank
+    descriptions without a separate index per field.
+    """
+
+    def __init__(self, field_weights: Optional[Dict[str, int]] = None,
+                 k1: float = BM25_K1, b: float = BM25_B):
+        self.field_weights = field_weights or {}
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._lengths: Dict[int, int] = {}
+        self._terms: Dict[int, List[str]] = {}
+        self._keys: Dict[int, Hashable] = {}
+        self._ids: Dict[Hashable, int] = {}
+        self._total_length = 0
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._ids
+
+    def add(self, key: Hashable, fields: Dict[str, str]) -> None:
+        """Index a document, replacing any earlier document with the same key."""
+        if key in self._ids:
+            self.remove(key)
+        counts: Dict[str, int] = {}
+        for field_name, text in fields.items():
+            weight = self.field_weights.get(field_name, 1)
+            for term in tokenize_text(text or ""):
+                counts[term] = counts.get(term, 0) + weight
+
+        doc_id = self._next_id
+        self._next_id += 1
+        self._ids[key] = doc_id
+        self._keys[doc_id] = key
+        self._terms[doc_id] = list(counts)
+        length = sum(counts.values())
+        self._lengths[doc_id] = length
+        self._total_length += length
+        for term, count in counts.items():
+            self._postings.setdefault(term, {})[doc_id] = count
+
+    def add_many(self, documents: Iterable[Tuple[Hashable, Dict[str, str]]]) -> None:
+        """Index several (key, fields) documents."""
+        for key, fields in documents:
+            self.add(key, fields)
+
+    def remove(self, key: Hashable) -> None:
+        """Remove a document from the index."""
+        doc_id = self._ids.pop(key)
+        del self._keys[doc_id]
+        self._total_length -= self._lengths.pop(doc_id)
+        for term in self._terms.pop(doc_id):
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+
+    def search(self, query: str, limit: int = 10) -> List[SearchHit]:
+        """Return the best matching documents for a query, best first."""
+        terms = list(dict.fromkeys(tokenize_text(query)))
+        count = len(self._ids)
+        if not terms or not count:
+            return []
+        average_length = self._total_length / count or 1.0
+        k1, b = self.k1, self.b
+        lengths = self._lengths
+
+        scores: Dict[int, float] = {}
+        matched: Dict[int, List[str]] = {}
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings.items():
+                norm = k1 * (1 - b + b * lengths[doc_id] / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (k1 + 1) / (frequency + norm)
+                matched.setdefault(doc_id, []).append(term)
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [SearchHit(self._keys[doc_id], score, matched[doc_id]) for doc_id, score in best]
@@ -0,0 +1,262 @@
+"""
+Hashed character n-gram TF-IDF vectors for similarity search.
+
+Each document (an action or template description) is split into words and
+every word into character n-grams, which are hashed into a fixed number of
+dimensions. The TF-IDF weighted, L2-normalized rows of all documents form
+one NumPy matrix, and a query is scored against every document with a
+single matrix-vector product (cosine similarity). Character n-grams match
+paraphrases and inflections that whole-word keywords miss, e.g.
+"notifications" and "notify", without any model or external service.
+
+Matrices are persisted under a digest of the document texts (the catalog
+fingerprint) and memory-mapped when loaded, so startup does not pay for
+vectorization and worker processes share the pages. A changed catalog has
+a new fingerprint and is vectorized again once; the most recently used
+matrices of each name are kept, so processes with different catalogs can
+share the cache directory. NumPy is optional: without
+it vector search is unavailable and ``available`` is False.
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import tempfile
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+from .text_index import STOP_WORDS
+
+
+# Hashed feature space and n-gram lengths; changing either changes the fingerprint
+DEFAULT_DIMENSIONS = 1 << 12
+NGRAM_SIZES = (3, 4)
+
+# Bump when the vectorization changes so persisted matrices are rebuilt
+_FORMAT_VERSION = 1
+
+# Persisted matrices kept per index name, least recently used evicted first
+MAX_PERSISTED_FINGERPRINTS = 4
+
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+
+def default_vector_dir() -> Path:
+    """Return the directory of persisted matrices, honouring $XDG_CACHE_HOME."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "moveworks-wizard" / "vectors"
+
+
+def ngram_counts(text: str, dimensions: int = DEFAULT_DIMENSIONS) -> Dict[int, int]:
+    """Return hashed character n-gram counts of text, by dimension."""
+    counts: Dict[int, int] = {}
+    for word in _WORD_RE.findall(text.lower()):
+        if word in STOP_WORDS:
+            continue
+        padded = f" {word} "
+        for size in NGRAM_SIZES:
+            for start in range(len(padded) - size + 1):
+                # crc32 rather than hash(): str hashes are randomized per process
+                dimension = zlib.crc32(padded[start:start + size].encode("utf-8")) % dimensions
+                counts[dimension] = counts.get(dimension, 0) + 1
+    return counts
+
+
+def catalog_fingerprint(documents: Dict[str, str], dimensions: int = DEFAULT_DIMENSIONS) -> str:
+    """Return a digest identifying the documents and the vectorization settings."""
+    payload = json.dumps([_FORMAT_VERSION, dimensions, NGRAM_SIZES, sorted(documents.items())])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class VectorIndex:
+    """
+    Cosine similarity over hashed n-gram TF-IDF vectors of named documents.
+
+    Documents can be added at any time; the matrix is rebuilt (or loaded
+    from disk) on the next search.
+    """
+
+    def __init__(self, name: str, documents: Optional[Dict[str, str]] = None,
+                 dimensions: int = DEFAULT_DIMENSIONS,
+                 cache_dir: Optional[Union[str, Path]] = None, persist: bool = True):
+        """
+        Args:
+            name: Name of the persisted matrix, e.g. "actions"
+            documents: Document texts by key
+            dimensions: Size of the hashed feature space
+            cache_dir: Directory of persisted matrices (default: default_vector_dir())
+            persist: Whether to load and save matrices on disk
+        """
+        self.name = name
+        self.dimensions = dimensions
+        self.cache_dir = Path(cache_dir) if cache_dir else default_vector_dir()
+        self.persist = persist
+        self._documents: Dict[str, str] = dict(documents or {})
+        self._keys: List[str] = []
+        self._matrix = None
+        self._idf = None
+        self.loaded_from_disk = False
+
+    @property
+    def available(self) -> bool:
+        """Whether vector search can be used (NumPy is installed)."""
+        return np is not None
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._documents
+
+    def add(self, key: str, text: str) -> None:
+        """Add or replace a document; the matrix is refreshed on the next search."""
+        if self._documents.get(key) != text:
+            self._documents[key] = text
+            self._matrix = None
+
+    @property
+    def fingerprint(self) -> str:
+        return catalog_fingerprint(self._documents, self.dimensions)
+
+    def _paths(self, fingerprint: str) -> Tuple[Path, Path, Path]:
+        stem = self.cache_dir / f"{self.name}-{fingerprint}"
+        return stem.with_suffix(".npy"), Path(f"{stem}.idf.npy"), stem.with_suffix(".json")
+
+    def _ensure(self) -> None:
+        """Load the matrix of the current documents from disk, or build it."""
+        if self._matrix is not None:
+            return
+        fingerprint = self.fingerprint
+        if self.persist and self._load(fingerprint):
+            self.loaded_from_disk = True
+            return
+        self.loaded_from_disk = False
+        self._build()
+        if self.persist:
+            self._save(fingerprint)
+
+    def _build(self) -> None:
+        keys = list(self._documents)
+        counts = [ngram_counts(self._documents[key], self.dimensions) for key in keys]
+        frequency = np.zeros(self.dimensions, dtype=np.float32)
+        for row in counts:
+            frequency[list(row)] += 1
+        # Smoothed inverse document frequency
+        idf = (np.log((1 + len(keys)) / (1 + frequency)) + 1).astype(np.float32)
+
+        matrix = np.zeros((len(keys), self.dimensions), dtype=np.float32)
+        for index, row in enumerate(counts):
+            if row:
+                dimensions = list(row)
+                matrix[index, dimensions] = [1 + math.log(row[d]) for d in dimensions]
+        matrix *= idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms == 0, 1, norms)
+        self._keys, self._matrix, self._idf = keys, matrix, idf
+
+    def _load(self, fingerprint: str) -> bool:
+        matrix_path, idf_path, keys_path = self._paths(fingerprint)
+        try:
+            # The keys file is written last and marks a complete entry
+            with open(keys_path, "r", encoding="utf-8") as f:
+                keys = json.load(f)
+            matrix = np.load(matrix_path, mmap_mode="r")
+            idf = np.load(idf_path)
+        except (OSError, ValueError):
+            return False
+        if matrix.shape != (len(keys), self.dimensions):
+            return False
+        self._keys, self._matrix, self._idf = keys, matrix, idf
+        try:
+            # Mark as recently used for eviction
+            os.utime(keys_path)
+        except OSError:
+            pass
+        return True
+
+    def _save(self, fingerprint: str) -> None:
+        matrix_path, idf_path, keys_path = self._paths(fingerprint)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            for path, array in ((matrix_path, self._matrix), (idf_path, self._idf)):
+                self._write_atomic(path, lambda f, array=array: np.save(f, array))
+            self._write_atomic(keys_path, lambda f: f.write(json.dumps(self._keys).encode("utf-8")))
+            self._evict()
+        except OSError:
+            pass  # A read-only cache only costs a rebuild next time
+
+    @staticmethod
+    def _write_atomic(path: Path, write: Callable[[Any], Any]) -> None:
+        """Write a file under a temporary name unique to this writer, then move it into place."""
+        fd, tmp_name = tempfile.mkstemp(prefix=f"{path.name}.", suffix=".tmp", dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp_name, path)
+        except BaseException:
+            try:
+                os.remove(tmp_name)
+            except OSError:
+                pass
+            raise
+
+    def _evict(self) -> None:
+        """Remove the matrices of this name beyond the most recently used MAX_PERSISTED_FINGERPRINTS."""
+        pattern = re.compile(rf"{re.escape(self.name)}-([0-9a-f]{{16}})(\.idf)?\.(npy|json)")
+        files: Dict[str, List[Path]] = {}
+        for path in self.cache_dir.glob(f"{self.name}-*"):
+            match = pattern.fullmatch(path.name)
+            if match:
+                files.setdefault(match.group(1), []).append(path)
+
+        def last_used(fingerprint: str) -> int:
+            # Loading touches the keys file; an entry still being written counts from its newest file
+            times = [0]
+            for path in files[fingerprint]:
+                try:
+                    times.append(path.stat().st_mtime_ns)
+                except OSError:
+                    pass
+            return max(times)
+
+        for fingerprint in sorted(files, key=last_used, reverse=True)[MAX_PERSISTED_FINGERPRINTS:]:
+            for path in files[fingerprint]:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def query_vector(self, text: str):
+        """Return the normalized TF-IDF vector of a query."""
+        self._ensure()
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        counts = ngram_counts(text, self.dimensions)
+        if counts:
+            dimensions = list(counts)
+            vector[dimensions] = [1 + math.log(counts[d]) for d in dimensions]
+            vector *= self._idf
+            norm = np.linalg.norm(vector)
+            if norm:
+                vector /= norm
+        return vector
+
+    def search(self, query: str, limit: int = 10, min_score: float = 0.0) -> List[Tuple[str, float]]:
+        """Return (key, cosine similarity) pairs of the most similar documents, best first."""
+        if not self.available or not self._documents:
+            return []
+        vector = self.query_vector(query)
+        scores = self._matrix @ vector
+        if limit < len(scores):
+            best = np.argpartition(-scores, limit)[:limit]
+        else:
+            best = np.arange(len(scores))
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(self._keys[i], float(scores[i])) for i in best if scores[i] > min_score]
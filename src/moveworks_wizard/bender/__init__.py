@@ -6,9 +6,35 @@ used in Compound Action input_args and output_mappers.
 """
 
 from .bender_assistant import BenderAssistant, BenderFunction, BenderExpression
+from .parser import BenderSyntaxError, parse_expression, to_source, tokenize
+from .evaluator import BenderEvaluationError, compile_expression, evaluate, preview_expression
+from .linter import BenderLinter, LintIssue, iter_expressions
+from .type_checker import SchemaNode, TypeChecker, check_compound_action, schema_from_suggestions
+from .simplifier import simplify_document, simplify_expression
+from .completion import BenderCompleter, Completion, CompletionResult
 
 __all__ = [
     "BenderAssistant",
     "BenderFunction", 
     "BenderExpression",
+    "BenderSyntaxError",
+    "BenderEvaluationError",
+    "parse_expression",
+    "tokenize",
+    "to_source",
+    "compile_expression",
+    "evaluate",
+    "preview_expression",
+    "BenderLinter",
+    "LintIssue",
+    "iter_expressions",
+    "SchemaNode",
+    "TypeChecker",
+    "check_compound_action",
+    "schema_from_suggestions",
+    "simplify_expression",
+    "simplify_document",
+    "BenderCompleter",
+    "Completion",
+    "CompletionResult",
 ]
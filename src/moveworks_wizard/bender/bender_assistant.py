@@ -9,6 +9,10 @@ from typing import Dict, List, Any, Optional, Union
 from dataclasses import dataclass
 from enum import Enum
 
+from .parser import (
+    BenderSyntaxError, DSL_FUNCTIONS, data_references, function_names, parse_expression
+)
+
 
 class BenderFunctionType(Enum):
     """Types of Bender functions available."""
@@ -246,31 +250,41 @@ class BenderAssistant:
         return suggestions
     
     def validate_expression(self, expression: str) -> Dict[str, Any]:
-        """Basic validation of Bender expression syntax."""
+        """
+        Validate Bender expression syntax by parsing it.
+
+        Errors carry the character offset at which parsing failed; the
+        offsets are also listed in 'error_positions'.
+        """
         errors = []
         warnings = []
-        
-        # Check for balanced parentheses
-        paren_count = expression.count('(') - expression.count(')')
-        if paren_count != 0:
-            errors.append("Unbalanced parentheses")
-        
-        # Check for known function names
-        import re
-        function_calls = re.findall(r'([A-Z_]+)\s*\(', expression)
-        for func_name in function_calls:
-            if func_name not in self._functions:
-                warnings.append(f"Unknown function: {func_name}")
-        
-        # Check for data references
-        if not re.search(r'data\.|meta_info\.', expression):
-            warnings.append("Expression doesn't reference data sources")
-        
+        error_positions = []
+        function_calls: List[str] = []
+
+        try:
+            tree = parse_expression(expression)
+        except BenderSyntaxError as e:
+            errors.append(str(e))
+            error_positions.append(e.position)
+            tree = None
+
+        if tree is not None:
+            # Check for known function names
+            function_calls = function_names(tree)
+            for func_name in function_calls:
+                if func_name.upper() not in self._functions and func_name.upper() not in DSL_FUNCTIONS:
+                    warnings.append(f"Unknown function: {func_name}")
+
+            # Check for data references
+            if not data_references(tree):
+                warnings.append("Expression doesn't reference data sources")
+
         return {
             'is_valid': len(errors) == 0,
             'errors': errors,
             'warnings': warnings,
-            'functions_used': function_calls
+            'functions_used': function_calls,
+            'error_positions': error_positions
         }
 
 
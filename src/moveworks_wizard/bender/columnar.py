@@ -0,0 +1,404 @@
+"""
+Columnar execution of Bender MAP/FILTER over large arrays.
+
+Per-item expressions built from paths, literals, comparisons, arithmetic,
+boolean operators and helper functions are evaluated on whole columns
+instead of once per element: every referenced field is projected out of
+the array of objects once into a typed column (a NumPy array when NumPy is
+installed, an ``array`` module array or a list otherwise), operators run
+over entire columns, and the result list is assembled at the end.
+
+Expressions outside that subset get no plan and are evaluated per element
+by the evaluator, as are arrays shorter than ``COLUMNAR_MIN_ITEMS``.
+"""
+
+import operator
+from array import array
+from itertools import repeat
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+from .evaluator import (
+    HELPERS, BenderEvaluationError, Scope, _arithmetic, _compare, _compile_node, _concat, _get_attribute,
+    _get_index, _helper
+)
+from .parser import (
+    Attribute, BinaryOp, Call, Index, Literal, MethodCall, Name, Node, UnaryOp, iter_nodes, parse_expression
+)
+
+
+# Arrays shorter than this are evaluated per element
+COLUMNAR_MIN_ITEMS = 1000
+
+# Integer columns beyond this magnitude are combined in Python to avoid int64 overflow
+_INT_SAFE = 2 ** 31
+
+_LOOP_FIELDS = ("index0", "index1", "key")
+
+_OPERATORS = {
+    "==": operator.eq, "!=": operator.ne, "<": operator.lt, "<=": operator.le,
+    ">": operator.gt, ">=": operator.ge, "+": operator.add, "-": operator.sub,
+    "*": operator.mul, "/": operator.truediv, "%": operator.mod,
+}
+_COMPARISONS = ("<", "<=", ">", ">=")
+
+
+class Column:
+    """Values of an expression for every item, with their common element kind."""
+    __slots__ = ("values", "kind")
+
+    def __init__(self, values: Sequence[Any], kind: str):
+        self.values = values
+        self.kind = kind  # "int", "float", "bool", "string" or "object"
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def tolist(self) -> List[Any]:
+        """Return the values as a list of plain Python objects."""
+        values = self.values
+        return values.tolist() if hasattr(values, "tolist") else list(values)
+
+
+def _kind(values: List[Any]) -> str:
+    types = set(map(type, values))
+    if len(types) != 1:
+        return "object"
+    kind = types.pop()
+    return {int: "int", float: "float", bool: "bool", str: "string"}.get(kind, "object")
+
+
+def make_column(values: List[Any]) -> Column:
+    """Build a typed column from a list of values."""
+    kind = _kind(values)
+    try:
+        if kind == "int":
+            return Column(np.array(values, dtype=np.int64) if np is not None else array("q", values), kind)
+        if kind == "float":
+            return Column(np.array(values, dtype=np.float64) if np is not None else array("d", values), kind)
+    except OverflowError:
+        return Column(values, "object")
+    if kind == "bool" and np is not None:
+        return Column(np.array(values, dtype=bool), kind)
+    return Column(values, kind)
+
+
+class _Frame:
+    """The array being evaluated, with its projected columns."""
+    __slots__ = ("items", "keys", "size", "columns")
+
+    def __init__(self, items: List[Any], keys: Optional[List[Any]]):
+        self.items = items
+        self.keys = keys
+        self.size = len(items)
+        self.columns: Dict[Tuple, Column] = {}
+
+    def project(self, segments: Tuple[Tuple[str, Any], ...]) -> Column:
+        column = self.columns.get(segments)
+        if column is None:
+            values = self.items
+            for kind, key in segments:
+                if kind == "attr":
+                    values = [_get_attribute(value, key) for value in values]
+                else:
+                    values = [_get_index(value, key) for value in values]
+            column = self.columns[segments] = make_column(list(values))
+        return column
+
+    def loop(self, field: str) -> Column:
+        key = (("loop", field),)
+        column = self.columns.get(key)
+        if column is None:
+            if field == "index0":
+                values = list(range(self.size))
+            elif field == "index1":
+                values = list(range(1, self.size + 1))
+            else:
+                values = self.keys if self.keys is not None else list(range(self.size))
+            column = self.columns[key] = make_column(list(values))
+        return column
+
+
+ColumnFunction = Callable[[Scope, _Frame], Any]
+
+
+def _iterate(value: Any, size: int):
+    return value.tolist() if isinstance(value, Column) else repeat(value, size)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _numeric(value: Any) -> bool:
+    if isinstance(value, Column):
+        return value.kind in ("int", "float")
+    return _is_number(value)
+
+
+def _magnitude(value: Any) -> float:
+    if isinstance(value, Column):
+        return float(np.abs(value.values).max()) if len(value) else 0
+    return abs(value)
+
+
+def _has_zero(value: Any) -> bool:
+    if isinstance(value, Column):
+        return bool((value.values == 0).any())
+    return value == 0
+
+
+def _truth(value: Any, size: int) -> Any:
+    """Truthiness of every element: a boolean array/list, or a scalar bool."""
+    if not isinstance(value, Column):
+        return bool(value)
+    if np is not None and value.kind == "bool":
+        return value.values
+    if np is not None and value.kind in ("int", "float"):
+        return value.values != 0
+    return [bool(v) for v in value.values]
+
+
+def _bool_column(values: Any) -> Column:
+    if np is not None:
+        return Column(np.asarray(values, dtype=bool), "bool")
+    return Column(values, "bool")
+
+
+def _logical(op: str, left: Any, right: Any, size: int) -> Any:
+    left, right = _truth(left, size), _truth(right, size)
+    if np is not None:
+        return _bool_column(np.logical_and(left, right) if op == "and" else np.logical_or(left, right))
+    left = left if isinstance(left, list) else repeat(left, size)
+    right = right if isinstance(right, list) else repeat(right, size)
+    if op == "and":
+        return _bool_column([a and b for a, b in zip(left, right)])
+    return _bool_column([a or b for a, b in zip(left, right)])
+
+
+def _vectorizable(op: str, left: Any, right: Any) -> bool:
+    """Whether NumPy gives the evaluator's result for this numeric operation."""
+    if np is None or not (_numeric(left) and _numeric(right)):
+        return False
+    if op in ("/", "%") and _has_zero(right):
+        return False  # Division by zero raises per element
+    if op in ("+", "-", "*") and all(isinstance(v, int) or getattr(v, "kind", "") == "int" for v in (left, right)):
+        return _magnitude(left) < _INT_SAFE and _magnitude(right) < _INT_SAFE
+    return True
+
+
+def _binary(op: str, left: Any, right: Any, size: int, position: int) -> Any:
+    if op in ("and", "or"):
+        return _logical(op, left, right, size)
+
+    if op in _OPERATORS and _vectorizable(op, left, right):
+        result = _OPERATORS[op](getattr(left, "values", left), getattr(right, "values", right))
+        return Column(result, "bool" if result.dtype == bool else
+                      "int" if result.dtype.kind == "i" else "float")
+
+    pairs = zip(_iterate(left, size), _iterate(right, size))
+    if op == "==":
+        return make_column([a == b for a, b in pairs])
+    if op == "!=":
+        return make_column([a != b for a, b in pairs])
+    if op in _COMPARISONS:
+        if _numeric(left) and _numeric(right):
+            function = _OPERATORS[op]
+            return make_column([function(a, b) for a, b in pairs])
+        return make_column([_compare(op, a, b) for a, b in pairs])
+    if op == "in":
+        return make_column([_contains(a, b) for a, b in pairs])
+    if op in ("+", "-", "*") and _numeric(left) and _numeric(right):
+        function = _OPERATORS[op]
+        return make_column([function(a, b) for a, b in pairs])
+    return make_column([_arithmetic(op, a, b, position) for a, b in pairs])
+
+
+def _contains(item: Any, container: Any) -> bool:
+    try:
+        return item in container if container is not None else False
+    except TypeError:
+        return False
+
+
+def _path_segments(node: Node) -> Optional[Tuple[str, Tuple[Tuple[str, Any], ...]]]:
+    """Split item.a[0].b into ("item", (("attr", "a"), ("index", 0), ("attr", "b")))."""
+    segments = []
+    while True:
+        if isinstance(node, Attribute):
+            segments.append(("attr", node.name))
+        elif isinstance(node, Index) and isinstance(node.index, Literal):
+            segments.append(("index", node.index.value))
+        elif isinstance(node, Name):
+            return node.name, tuple(reversed(segments))
+        else:
+            return None
+        node = node.target
+
+
+def _compile(node: Node, variables: frozenset) -> Optional[ColumnFunction]:
+    """Compile a per-item expression for columns, or return None if unsupported."""
+    if not any(isinstance(n, Name) and n.name in variables for n in iter_nodes(node)):
+        # No per-item reference: evaluated once against the enclosing scope
+        scalar = _compile_node(node)
+        return lambda scope, frame: scalar(scope)
+
+    path = _path_segments(node)
+    if path is not None:
+        root, segments = path
+        if root == "loop":
+            if len(segments) == 1 and segments[0][0] == "attr" and segments[0][1] in _LOOP_FIELDS:
+                field = segments[0][1]
+                return lambda scope, frame: frame.loop(field)
+            return None
+        return lambda scope, frame: frame.project(segments)
+
+    if isinstance(node, BinaryOp):
+        left, right = _compile(node.left, variables), _compile(node.right, variables)
+        if left is None or right is None:
+            return None
+        op, position = node.op, node.start
+        return lambda scope, frame: _binary(op, left(scope, frame), right(scope, frame), frame.size, position)
+
+    if isinstance(node, UnaryOp):
+        operand = _compile(node.operand, variables)
+        if operand is None:
+            return None
+        if node.op == "not":
+            return lambda scope, frame: _negate_truth(_truth(operand(scope, frame), frame.size))
+        position = node.start
+        return lambda scope, frame: _negative(operand(scope, frame), frame.size, position)
+
+    if isinstance(node, MethodCall):
+        args = [_compile(arg, variables) for arg in [node.target] + list(node.args)]
+        return _elementwise(_helper(node.name, node.start), args, node)
+
+    if isinstance(node, Call):
+        args = [_compile(arg, variables) for arg in node.args]
+        if node.name.upper() == "CONCAT" and not node.dollar:
+            return _elementwise(lambda *values: _concat(list(values)), args, node)
+        if node.dollar and node.name.upper() in HELPERS:
+            return _elementwise(_helper(node.name, node.start), args, node)
+
+    return None
+
+
+def _negate_truth(truth: Any) -> Any:
+    if isinstance(truth, list):
+        return _bool_column([not value for value in truth])
+    if np is not None and not isinstance(truth, bool):
+        return _bool_column(np.logical_not(truth))
+    return not truth
+
+
+def _negative(value: Any, size: int, position: int) -> Any:
+    if np is not None and _numeric(value) and _magnitude(value) < _INT_SAFE:
+        return Column(-value.values, value.kind)
+    result = []
+    for element in _iterate(value, size):
+        try:
+            result.append(-element)
+        except TypeError:
+            raise BenderEvaluationError(f"Cannot negate {type(element).__name__}", position)
+    return make_column(result)
+
+
+def _elementwise(helper: Callable[..., Any], args: List[Optional[ColumnFunction]], node: Node) -> Optional[ColumnFunction]:
+    """Apply a helper to every row of its (column or scalar) arguments."""
+    if any(arg is None for arg in args):
+        return None
+    name, position = node.name, node.start
+
+    def apply(scope, frame):
+        rows = zip(*[_iterate(arg(scope, frame), frame.size) for arg in args])
+        try:
+            return make_column([helper(*row) for row in rows])
+        except (TypeError, ValueError, AttributeError) as e:
+            raise BenderEvaluationError(f"{name}() failed: {e}", position)
+    return apply
+
+
+class ColumnarPlan:
+    """A per-item expression or converter compiled for whole-column evaluation."""
+    __slots__ = ("_function",)
+
+    def __init__(self, function: ColumnFunction):
+        self._function = function
+
+    def evaluate(self, scope: Scope, items: List[Any], keys: Optional[List[Any]] = None) -> Any:
+        """Return the expression's Column for ``items`` (or a scalar if it is constant)."""
+        return self._function(scope, _Frame(items, keys))
+
+    def map(self, scope: Scope, items: List[Any], keys: Optional[List[Any]] = None) -> List[Any]:
+        """Return the expression's value for every item."""
+        result = self.evaluate(scope, items, keys)
+        if isinstance(result, Column):
+            return result.tolist()
+        return [result] * len(items)
+
+    def filter(self, scope: Scope, items: List[Any], keys: Optional[List[Any]] = None) -> List[Any]:
+        """Return the items for which the expression is truthy."""
+        mask = _truth(self.evaluate(scope, items, keys), len(items))
+        if isinstance(mask, bool):
+            return list(items) if mask else []
+        if np is not None and not isinstance(mask, list):
+            return [items[i] for i in np.flatnonzero(mask).tolist()]
+        return [item for item, keep in zip(items, mask) if keep]
+
+
+def compile_columnar(node: Node, variable: Optional[str] = None) -> Optional[ColumnarPlan]:
+    """
+    Compile a per-item expression AST into a ColumnarPlan.
+
+    ``item``, ``loop`` and ``variable`` (e.g. ``user`` in
+    ``MAP(data.users, 'user.name')``) refer to the current element. Returns
+    None when the expression uses constructs without a columnar form.
+    """
+    variables = frozenset(v for v in ("item", "loop", variable) if v)
+    function = _compile(node, variables)
+    return ColumnarPlan(function) if function is not None else None
+
+
+def compile_columnar_definition(definition: Any) -> Optional[ColumnarPlan]:
+    """
+    Compile a mapper converter or condition for columns.
+
+    Expression strings and objects of them (``{"name": "item.name", ...}``)
+    are supported; objects are assembled row by row after every field's
+    column is computed.
+    """
+    function = _compile_definition(definition)
+    return ColumnarPlan(function) if function is not None else None
+
+
+def _compile_definition(definition: Any) -> Optional[ColumnFunction]:
+    if isinstance(definition, str):
+        return _compile(parse_expression(definition), frozenset(("item", "loop")))
+    if isinstance(definition, dict):
+        if len(definition) == 1 and str(next(iter(definition))).endswith("()"):
+            return None  # Nested operators are evaluated per element
+        fields = [(key, _compile_definition(value)) for key, value in definition.items()]
+        if any(function is None for _, function in fields):
+            return None
+        names = [key for key, _ in fields]
+
+        def assemble(scope, frame):
+            columns = [_iterate(function(scope, frame), frame.size) for _, function in fields]
+            return Column([dict(zip(names, row)) for row in zip(*columns)], "object")
+        return assemble
+    if isinstance(definition, (bool, int, float)) or definition is None:
+        return lambda scope, frame: definition
+    return None
+
+
+def columnar_input(values: Any) -> Optional[Tuple[List[Any], Optional[List[Any]]]]:
+    """Return (items, keys) for an array or object large enough for columnar execution."""
+    if isinstance(values, list):
+        return (values, None) if len(values) >= COLUMNAR_MIN_ITEMS else None
+    if isinstance(values, dict) and len(values) >= COLUMNAR_MIN_ITEMS:
+        return list(values.values()), list(values.keys())
+    return None
@@ -0,0 +1,283 @@
+"""
+Incremental completion of Bender expressions for editors.
+
+A BenderCompleter keeps two prefix tries: one of function names (the
+documented Bender functions, the DSL operators and the ``$HELPER``
+functions) and one of the data paths available to the expression being
+edited: ``data.<output_key>`` of earlier steps, the compound action's
+input arguments and the paths of analyzed JSON responses. Paths can be
+added at any time without rebuilding the tries.
+
+On each keystroke only the token under the cursor is scanned; the rest of
+the expression is never parsed. Path completions stop at the next segment,
+so ``data.us`` offers ``data.user`` and ``data.users`` rather than every
+path below them, and the work per keystroke depends on the number of
+completions shown, not on the number of known paths.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .parser import DATA_ROOTS, DSL_FUNCTIONS
+
+
+DEFAULT_LIMIT = 50
+
+_IDENTIFIER_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_")
+_TOKEN_CHARS = _IDENTIFIER_CHARS | frozenset("$.[]")
+_SEPARATORS = ".["
+
+
+@dataclass(frozen=True)
+class Completion:
+    """A completion candidate; ``insert`` replaces the token being edited."""
+
+    label: str
+    insert: str
+    kind: str  # "function", "method", "path" or "variable"
+    detail: str = ""
+
+
+@dataclass
+class CompletionResult:
+    """Completions for the token spanning ``text[start:end]``."""
+
+    start: int
+    end: int
+    prefix: str
+    items: List[Completion] = field(default_factory=list)
+
+    def apply(self, text: str, completion: Completion) -> Tuple[str, int]:
+        """Return the text with the token replaced and the new cursor position."""
+        new_text = text[:self.start] + completion.insert + text[self.end:]
+        cursor = self.start + len(completion.insert)
+        if completion.insert.endswith("()"):
+            cursor -= 1  # Place the cursor between the parentheses
+        return new_text, cursor
+
+
+class _TrieNode:
+    __slots__ = ("children", "value", "_order")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.value: Any = None
+        self._order: Optional[List[str]] = None
+
+    def ordered(self) -> List[str]:
+        """Child characters in sorted order, cached until the next insert."""
+        if self._order is None:
+            self._order = sorted(self.children)
+        return self._order
+
+
+class PrefixTrie:
+    """Character trie mapping words to values, walked in sorted order."""
+
+    def __init__(self, fold_case: bool = False):
+        self._root = _TrieNode()
+        self._fold_case = fold_case
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, word: str) -> bool:
+        node = self._find(word)
+        return node is not None and node.value is not None
+
+    def _key(self, word: str) -> str:
+        return word.casefold() if self._fold_case else word
+
+    def _find(self, prefix: str) -> Optional[_TrieNode]:
+        node = self._root
+        for ch in self._key(prefix):
+            node = node.children.get(ch)
+            if node is None:
+                return None
+        return node
+
+    def insert(self, word: str, value: Any) -> bool:
+        """Add or replace a word; return True if it was new."""
+        node = self._root
+        for ch in self._key(word):
+            child = node.children.get(ch)
+            if child is None:
+                child = node.children[ch] = _TrieNode()
+                node._order = None
+            node = child
+        added = node.value is None
+        node.value = (word, value)
+        self._size += added
+        return added
+
+    def complete(self, prefix: str, limit: int = DEFAULT_LIMIT,
+                 stop_at: str = "") -> Iterator[Tuple[str, Any]]:
+        """
+        Yield (word, value) pairs of words starting with prefix in sorted order.
+
+        The descent does not follow characters in ``stop_at``, so for
+        hierarchical words whose parents are words themselves only the next
+        segment is produced.
+        """
+        node = self._find(prefix)
+        if node is None or limit <= 0:
+            return
+        produced = 0
+        # Depth-first, lexicographic: children are pushed in reverse order
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current.value is not None:
+                yield current.value
+                produced += 1
+                if produced >= limit:
+                    return
+            children = current.children
+            stack.extend(children[ch] for ch in reversed(current.ordered()) if ch not in stop_at)
+
+
+def _function_entries() -> Iterator[Tuple[str, str, bool]]:
+    """Yield (name, description, dollar) for every known function."""
+    from .bender_assistant import bender_assistant
+    from .evaluator import HELPERS
+
+    documented = {function.name: function for function in bender_assistant.get_all_functions()}
+    for name in sorted(set(documented) | DSL_FUNCTIONS):
+        function = documented.get(name)
+        yield name, function.description if function else "Data Mapper function", False
+    for name in sorted(HELPERS):
+        yield name, "Helper function", True
+
+
+class BenderCompleter:
+    """
+    Completes the Bender expression token under the cursor.
+
+    Functions come from the Bender assistant, the DSL reference and the
+    evaluator's helpers; data paths are added with add_path()/add_paths()
+    or collected from a compound action with for_compound_action().
+    """
+
+    def __init__(self, variables: Iterable[str] = DATA_ROOTS):
+        """
+        Args:
+            variables: Root names in scope, e.g. data plus loop variables
+        """
+        self._functions = PrefixTrie(fold_case=True)
+        self._helpers = PrefixTrie(fold_case=True)
+        for name, description, dollar in _function_entries():
+            (self._helpers if dollar else self._functions).insert(name, description)
+        self._paths = PrefixTrie()
+        for name in variables:
+            self._paths.insert(name, ("variable", "Variable"))
+
+    @property
+    def path_count(self) -> int:
+        """Number of known paths and variables."""
+        return len(self._paths)
+
+    def add_path(self, path: str, detail: str = "") -> None:
+        """Add a data path and each of its parent paths."""
+        for index, ch in enumerate(path):
+            if ch in _SEPARATORS and index and path[:index] not in self._paths:
+                self._paths.insert(path[:index], ("path", ""))
+        self._paths.insert(path, ("path", detail))
+
+    def add_paths(self, paths: Iterable[str], detail: str = "") -> None:
+        """Add several data paths sharing a detail text."""
+        for path in paths:
+            self.add_path(path, detail)
+
+    def add_response_paths(self, output_key: str, paths: Iterable[Any]) -> None:
+        """
+        Add the paths of an analyzed JSON response stored under ``data.<output_key>``.
+
+        ``paths`` are path strings or JSONAnalyzer VariableSuggestions; wildcard
+        array paths such as ``items[*].id`` are skipped.
+        """
+        root = f"data.{output_key}"
+        for entry in paths:
+            path = getattr(entry, "path", entry)
+            if not isinstance(path, str) or "[*]" in path:
+                continue
+            detail = getattr(entry, "data_type", "") or "Response field"
+            self.add_path(root + path if path.startswith("[") else f"{root}.{path}", detail)
+
+    @classmethod
+    def for_compound_action(cls, compound_action: Any = None, before_step: Optional[int] = None,
+                            response_paths: Optional[Dict[str, Iterable[Any]]] = None) -> "BenderCompleter":
+        """
+        Build a completer for an expression of a compound action.
+
+        Args:
+            compound_action: CompoundAction whose input args and step outputs are in scope
+            before_step: Index of the step being edited; only earlier outputs are offered
+            response_paths: Analyzed response paths by output key (see add_response_paths)
+        """
+        completer = cls()
+        if compound_action is not None:
+            for name in (getattr(compound_action, "input_args", None) or {}):
+                completer.add_path(f"data.{name}", "Input argument")
+            steps = list(getattr(compound_action, "steps", None) or [])
+            for step in steps[:before_step]:
+                output_key = getattr(step, "output_key", None)
+                if output_key:
+                    completer.add_path(f"data.{output_key}", f"Output of {type(step).__name__}")
+        for output_key, paths in (response_paths or {}).items():
+            completer.add_path(f"data.{output_key}", "Analyzed response")
+            completer.add_response_paths(output_key, paths)
+        return completer
+
+    def complete(self, text: str, cursor: Optional[int] = None, limit: int = DEFAULT_LIMIT) -> CompletionResult:
+        """Return the completions of the token that ends at the cursor."""
+        if cursor is None:
+            cursor = len(text)
+        start = cursor
+        while start > 0 and text[start - 1] in _TOKEN_CHARS:
+            start -= 1
+        end = cursor
+        while end < len(text) and text[end] in _IDENTIFIER_CHARS:
+            end += 1
+        token = text[start:cursor]
+        result = CompletionResult(start, end, token)
+        if _inside_string(text, start):
+            return result
+
+        method = token.rfind(".$")
+        if method > 0:
+            # value.$HELPER()
+            target, partial = token[:method + 1], token[method + 2:]
+            result.items = [Completion(f"${name}", f"{target}${name}()", "method", detail)
+                            for name, detail in self._helpers.complete(partial, limit)]
+        elif token.startswith("$"):
+            result.items = [Completion(f"${name}", f"${name}()", "function", detail)
+                            for name, detail in self._helpers.complete(token[1:], limit)]
+        elif any(ch in _SEPARATORS for ch in token):
+            result.items = self._complete_paths(token, limit)
+        elif token and token[0] not in "0123456789]":
+            result.items = self._complete_paths(token, limit)
+            result.items += [Completion(name, f"{name}()", "function", detail)
+                             for name, detail in self._functions.complete(token, limit - len(result.items))]
+        return result
+
+    def _complete_paths(self, prefix: str, limit: int) -> List[Completion]:
+        return [Completion(path, path, kind, detail)
+                for path, (kind, detail) in self._paths.complete(prefix, limit, stop_at=_SEPARATORS)]
+
+
+def _inside_string(text: str, position: int) -> bool:
+    """Whether position lies inside a quoted string literal of text."""
+    quote = None
+    index = 0
+    while index < position:
+        ch = text[index]
+        if quote is not None:
+            if ch == "\\":
+                index += 1
+            elif ch == quote:
+                quote = None
+        elif ch in "'\"":
+            quote = ch
+        index += 1
+    return quote is not None
@@ -0,0 +1,756 @@
+"""
+Compiled evaluator for Bender (Moveworks Data Mapping Language) expressions.
+
+Expressions are parsed once and compiled into nested Python closures, so a
+repeated preview only runs the closures. Both forms of Bender are covered:
+
+- DSL strings such as ``data.user.email.$TRIM()``,
+  ``$INTEGER(state.value) + 1`` or ``MAP(data.users, 'user.name')``
+- mapper definitions with operator keys such as
+  ``{"MAP()": {"items": "data.users", "converter": "item.email"}}``
+
+Semantics follow docs/moveworks-bender-language-reference.md: missing
+paths evaluate to null, comparisons between incompatible types are false,
+and MAP/FILTER/SORT/COALESCE iterate object values with ``item`` and
+``loop`` (index0, index1, key) in scope.
+"""
+
+import json
+import math
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+from .parser import (
+    Attribute, BinaryOp, Call, Index, ListExpr, Literal, MethodCall, Name, Node, UnaryOp,
+    item_variable, parse_expression
+)
+
+
+# Size of the compiled-expression caches
+COMPILE_CACHE_SIZE = 4096
+
+Compiled = Callable[["Scope"], Any]
+
+
+class BenderEvaluationError(ValueError):
+    """Raised when an expression cannot be evaluated; carries the character offset."""
+
+    def __init__(self, message: str, position: int = 0):
+        super().__init__(f"{message} at position {position}")
+        self.message = message
+        self.position = position
+
+
+class Scope(dict):
+    """Variables visible to an expression; unknown names fall back to the parent, then null."""
+    __slots__ = ("parent",)
+
+    def __init__(self, values: Any = (), parent: Optional["Scope"] = None):
+        super().__init__(values)
+        self.parent = parent
+
+    def __missing__(self, key):
+        if self.parent is not None:
+            return self.parent[key]
+        return None
+
+
+def _truthy(value: Any) -> bool:
+    return bool(value)
+
+
+def _to_string(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _to_integer(value: Any) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        try:
+            return int(value)
+        except ValueError:
+            return int(float(value))
+    return int(value)
+
+
+def _to_number(value: Any) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    number = float(value.strip() if isinstance(value, str) else value)
+    return int(number) if number.is_integer() else number
+
+
+def _concat(items: Any, separator: Any = "") -> str:
+    if not isinstance(items, list):
+        items = [items]
+    return _to_string(separator).join(_to_string(item) for item in items if item is not None)
+
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_BLOCK_TAG_RE = re.compile(r'</(?:div|p|li|tr|h[1-6])>|<br\s*/?>', re.IGNORECASE)
+
+
+def _strip_html(text: Any) -> str:
+    text = _BLOCK_TAG_RE.sub("\n", _to_string(text))
+    return _TAG_RE.sub("", text).strip()
+
+
+def _length(value: Any) -> Optional[int]:
+    return len(value) if isinstance(value, (str, list, dict)) else None
+
+
+# $HELPER(value, ...) and value.$HELPER(...) functions
+HELPERS: Dict[str, Callable[..., Any]] = {
+    "INTEGER": _to_integer,
+    "DECIMAL": _to_number,
+    "NUMBER": _to_number,
+    "STRING": _to_string,
+    "BOOLEAN": _truthy,
+    "TRIM": lambda value: _to_string(value).strip(),
+    "LOWERCASE": lambda value: _to_string(value).lower(),
+    "LOWER": lambda value: _to_string(value).lower(),
+    "UPPERCASE": lambda value: _to_string(value).upper(),
+    "UPPER": lambda value: _to_string(value).upper(),
+    "TITLECASE": lambda value: _to_string(value).title(),
+    "LENGTH": _length,
+    "LEN": _length,
+    "CONCAT": _concat,
+    "SPLIT": lambda value, separator=None: _to_string(value).split(separator),
+    "JOIN": lambda items, separator="": _concat(items, separator),
+    "REPLACE": lambda value, old, new: _to_string(value).replace(_to_string(old), _to_string(new)),
+    "STARTS_WITH": lambda value, prefix: _to_string(value).startswith(_to_string(prefix)),
+    "ENDS_WITH": lambda value, suffix: _to_string(value).endswith(_to_string(suffix)),
+    "CONTAINS": lambda value, part: part in value if isinstance(value, (list, dict)) else
+    _to_string(part) in _to_string(value),
+    "STRIP_HTML": _strip_html,
+    "FLATTEN": lambda items: [x for item in items or [] for x in (item if isinstance(item, list) else [item])],
+    "ROUND": lambda value, digits=0: round(_to_number(value), int(digits)),
+    "FLOOR": lambda value: math.floor(_to_number(value)),
+    "CEIL": lambda value: math.ceil(_to_number(value)),
+}
+
+
+def _get_attribute(value: Any, name: str) -> Any:
+    if isinstance(value, dict):
+        return value.get(name)
+    if name == "length" and isinstance(value, (list, str)):
+        return len(value)
+    return None
+
+
+def _get_index(value: Any, index: Any) -> Any:
+    if isinstance(value, list) and isinstance(index, int) and not isinstance(index, bool):
+        if -len(value) <= index < len(value):
+            return value[index]
+        return None
+    if isinstance(value, dict) and index is not None:
+        return value.get(index if isinstance(index, str) else str(index))
+    return None
+
+
+def _iteration(items: Any):
+    """Yield (item, loop) pairs; objects are iterated by value with loop.key."""
+    if isinstance(items, dict):
+        for position, (key, value) in enumerate(items.items()):
+            yield value, {"index0": position, "index1": position + 1, "key": key}
+    elif isinstance(items, list):
+        for position, value in enumerate(items):
+            yield value, {"index0": position, "index1": position + 1, "key": position}
+
+
+def _compare(op: str, left: Any, right: Any) -> bool:
+    try:
+        if op == "<":
+            return left < right
+        if op == "<=":
+            return left <= right
+        if op == ">":
+            return left > right
+        return left >= right
+    except TypeError:
+        return False
+
+
+def _arithmetic(op: str, left: Any, right: Any, position: int) -> Any:
+    try:
+        if op == "+":
+            if isinstance(left, str) or isinstance(right, str):
+                return _to_string(left) + _to_string(right)
+            return left + right
+        if op == "-":
+            return left - right
+        if op == "*":
+            return left * right
+        if op == "/":
+            return left / right
+        return left % right
+    except ZeroDivisionError:
+        raise BenderEvaluationError("Division by zero", position)
+    except TypeError:
+        raise BenderEvaluationError(
+            f"Unsupported operands for '{op}': {type(left).__name__} and {type(right).__name__}", position)
+
+
+def _compile_node(node: Node) -> Compiled:
+    """Compile an AST node into a closure taking a Scope."""
+    if isinstance(node, Literal):
+        value = node.value
+        return lambda scope: value
+
+    if isinstance(node, Name):
+        name = node.name
+        return lambda scope: scope[name]
+
+    if isinstance(node, Attribute):
+        target, name = _compile_node(node.target), node.name
+        return lambda scope: _get_attribute(target(scope), name)
+
+    if isinstance(node, Index):
+        target, index = _compile_node(node.target), _compile_node(node.index)
+        return lambda scope: _get_index(target(scope), index(scope))
+
+    if isinstance(node, ListExpr):
+        items = [_compile_node(item) for item in node.items]
+        return lambda scope: [item(scope) for item in items]
+
+    if isinstance(node, UnaryOp):
+        operand = _compile_node(node.operand)
+        if node.op == "not":
+            return lambda scope: not operand(scope)
+        position = node.start
+
+        def negate(scope):
+            value = operand(scope)
+            try:
+                return -value
+            except TypeError:
+                raise BenderEvaluationError(f"Cannot negate {type(value).__name__}", position)
+        return negate
+
+    if isinstance(node, BinaryOp):
+        return _compile_binary(node)
+
+    if isinstance(node, MethodCall):
+        helper = _helper(node.name, node.start)
+        target = _compile_node(node.target)
+        args = [_compile_node(arg) for arg in node.args]
+        return _guard(lambda scope: helper(target(scope), *[arg(scope) for arg in args]), node)
+
+    if isinstance(node, Call):
+        compiler = _CALL_COMPILERS.get(node.name.upper())
+        if compiler is not None:
+            return compiler(node)
+        helper = _helper(node.name, node.start)
+        args = [_compile_node(arg) for arg in node.args]
+        return _guard(lambda scope: helper(*[arg(scope) for arg in args]), node)
+
+    raise BenderEvaluationError(f"Cannot evaluate {type(node).__name__}", node.start)
+
+
+def _helper(name: str, position: int) -> Callable[..., Any]:
+    helper = HELPERS.get(name.upper())
+    if helper is None:
+        raise BenderEvaluationError(f"Unknown function: {name}", position)
+    return helper
+
+
+def _guard(function: Compiled, node: Node) -> Compiled:
+    """Turn helper exceptions into BenderEvaluationError at the call's position."""
+    name, position = node.name, node.start
+
+    def guarded(scope):
+        try:
+            return function(scope)
+        except BenderEvaluationError:
+            raise
+        except (TypeError, ValueError, AttributeError) as e:
+            raise BenderEvaluationError(f"{name}() failed: {e}", position)
+    return guarded
+
+
+def _compile_binary(node: BinaryOp) -> Compiled:
+    left, right, op, position = _compile_node(node.left), _compile_node(node.right), node.op, node.start
+    if op == "and":
+        return lambda scope: bool(left(scope)) and bool(right(scope))
+    if op == "or":
+        return lambda scope: bool(left(scope)) or bool(right(scope))
+    if op == "==":
+        return lambda scope: left(scope) == right(scope)
+    if op == "!=":
+        return lambda scope: left(scope) != right(scope)
+    if op in ("<", "<=", ">", ">="):
+        return lambda scope: _compare(op, left(scope), right(scope))
+    if op == "in":
+        def contains(scope):
+            container = right(scope)
+            try:
+                return left(scope) in container if container is not None else False
+            except TypeError:
+                return False
+        return contains
+    return lambda scope: _arithmetic(op, left(scope), right(scope), position)
+
+
+# Function-call forms whose string arguments are expressions evaluated per item,
+# e.g. MAP(data.users, 'user.name') or FILTER(data.tickets, 'ticket.priority == "high"')
+
+def _item_expression(node: Call, position: int):
+    """Return the per-item expression AST of an argument and its item variable."""
+    if len(node.args) <= position:
+        return None, None
+    argument = node.args[position]
+    if isinstance(argument, Literal) and isinstance(argument.value, str):
+        tree = parse_expression(argument.value)
+        # The element is bound to "item" and to the root of the expression's own item paths
+        return tree, item_variable(tree)
+    return argument, None
+
+
+def _item_function(node: Call, position: int):
+    """Compile the per-item expression argument and return (function, item variable)."""
+    tree, variable = _item_expression(node, position)
+    if tree is None:
+        return None, None
+    return _compile_node(tree), variable
+
+
+def _columnar(method: str, plan, scope: Scope, values: Any) -> Optional[List[Any]]:
+    """Run a columnar plan over a large array; None means evaluate per element."""
+    from . import columnar
+
+    if plan is None:
+        return None
+    arguments = columnar.columnar_input(values)
+    if arguments is None:
+        return None
+    try:
+        return getattr(plan, method)(scope, *arguments)
+    except BenderEvaluationError:
+        # Per-element evaluation short-circuits and/or, and reports the exact failure
+        return None
+
+
+def _columnar_plan(tree: Optional[Node], variable: Optional[str]):
+    from .columnar import compile_columnar
+
+    return compile_columnar(tree, variable) if tree is not None else None
+
+
+def _columnar_definition_plan(definition: Any):
+    from .columnar import compile_columnar_definition
+
+    return compile_columnar_definition(definition)
+
+
+def _item_scope(scope: Scope, item: Any, loop: Dict[str, Any], variable: Optional[str]) -> Scope:
+    inner = Scope({"item": item, "loop": loop}, scope)
+    if variable:
+        inner[variable] = item
+    return inner
+
+
+def _arity(node: Call, minimum: int, maximum: int) -> None:
+    if not minimum <= len(node.args) <= maximum:
+        expected = str(minimum) if minimum == maximum else f"{minimum}-{maximum}"
+        raise BenderEvaluationError(f"{node.name}() takes {expected} arguments, got {len(node.args)}", node.start)
+
+
+def _compile_map_call(node: Call) -> Compiled:
+    _arity(node, 2, 2)
+    items = _compile_node(node.args[0])
+    tree, variable = _item_expression(node, 1)
+    converter, plan = _compile_node(tree), _columnar_plan(tree, variable)
+
+    def map_items(scope):
+        values = items(scope)
+        result = _columnar("map", plan, scope, values)
+        if result is not None:
+            return result
+        return [converter(_item_scope(scope, item, loop, variable)) for item, loop in _iteration(values)]
+    return map_items
+
+
+def _compile_filter_call(node: Call) -> Compiled:
+    _arity(node, 1, 2)
+    items = _compile_node(node.args[0])
+    tree, variable = _item_expression(node, 1)
+    if tree is None:
+        return lambda scope: [item for item, _ in _iteration(items(scope)) if item]
+    condition, plan = _compile_node(tree), _columnar_plan(tree, variable)
+
+    def filter_items(scope):
+        values = items(scope)
+        result = _columnar("filter", plan, scope, values)
+        if result is not None:
+            return result
+        return [item for item, loop in _iteration(values) if condition(_item_scope(scope, item, loop, variable))]
+    return filter_items
+
+
+def _compile_sort_call(node: Call) -> Compiled:
+    _arity(node, 1, 3)
+    items = _compile_node(node.args[0])
+    key, variable = _item_function(node, 1)
+    descending = _compile_node(node.args[2]) if len(node.args) > 2 else (lambda scope: False)
+
+    def sort(scope):
+        pairs = list(_iteration(items(scope)))
+        if key is None:
+            keyed = [(item, item) for item, _ in pairs]
+        else:
+            keyed = [(key(_item_scope(scope, item, loop, variable)), item) for item, loop in pairs]
+        return [item for _, item in sorted(keyed, key=lambda pair: _sort_key(pair[0]),
+                                           reverse=bool(descending(scope)))]
+    return sort
+
+
+def _sort_key(value: Any):
+    # Order nulls first, then numbers, then strings, without comparing across types
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (1, value)
+    if isinstance(value, list):
+        return (2, tuple(_sort_key(v) for v in value))
+    return (3, _to_string(value))
+
+
+def _compile_coalesce_call(node: Call) -> Compiled:
+    args = [_compile_node(arg) for arg in node.args]
+
+    def coalesce(scope):
+        for arg in args:
+            value = arg(scope)
+            if value:
+                return value
+        return None
+    return coalesce
+
+
+def _compile_conditional_call(node: Call) -> Compiled:
+    _arity(node, 2, 3)
+    condition, on_pass = _compile_node(node.args[0]), _compile_node(node.args[1])
+    on_fail = _compile_node(node.args[2]) if len(node.args) > 2 else (lambda scope: None)
+    return lambda scope: on_pass(scope) if condition(scope) else on_fail(scope)
+
+
+def _compile_concat_call(node: Call) -> Compiled:
+    args = [_compile_node(arg) for arg in node.args]
+    if node.dollar:
+        # $CONCAT(items, separator)
+        return _guard(lambda scope: _concat(*[arg(scope) for arg in args]), node)
+    # CONCAT(value1, value2, ...)
+    return lambda scope: _concat([arg(scope) for arg in args])
+
+
+def _compile_render_call(node: Call) -> Compiled:
+    _arity(node, 1, 2)
+    template_node = node.args[0]
+    if not (isinstance(template_node, Literal) and isinstance(template_node.value, str)):
+        raise BenderEvaluationError("RENDER() needs a literal template", node.start)
+    render = _compile_template(template_node.value)
+    if len(node.args) == 1:
+        return render
+    args = _compile_node(node.args[1])
+
+    def render_with(scope):
+        values = args(scope)
+        return render(Scope(values if isinstance(values, dict) else {}, scope))
+    return render_with
+
+
+def _compile_extract_call(node: Call) -> Compiled:
+    _arity(node, 2, 2)
+    text = _compile_node(node.args[0])
+    pattern_node = node.args[1]
+    if not (isinstance(pattern_node, Literal) and isinstance(pattern_node.value, str)):
+        raise BenderEvaluationError("EXTRACT() needs a literal pattern", node.start)
+    try:
+        pattern = re.compile(pattern_node.value)
+    except re.error as e:
+        raise BenderEvaluationError(f"Invalid pattern: {e}", pattern_node.start)
+
+    def extract(scope):
+        match = pattern.search(_to_string(text(scope)))
+        if match is None:
+            return None
+        return match.group(1) if pattern.groups else match.group(0)
+    return extract
+
+
+_CALL_COMPILERS: Dict[str, Callable[[Call], Compiled]] = {
+    "MAP": _compile_map_call,
+    "FILTER": _compile_filter_call,
+    "SORT": _compile_sort_call,
+    "COALESCE": _compile_coalesce_call,
+    "CONDITIONAL": _compile_conditional_call,
+    "IF": _compile_conditional_call,
+    "CONCAT": _compile_concat_call,
+    "RENDER": _compile_render_call,
+    "EXTRACT": _compile_extract_call,
+}
+
+_PLACEHOLDER_RE = re.compile(r'\{\{\s*(.*?)\s*\}\}')
+
+
+def _compile_template(template: str) -> Compiled:
+    """Compile a Mustache-style template into a closure rendering it."""
+    parts: List[Any] = []
+    position = 0
+    for match in _PLACEHOLDER_RE.finditer(template):
+        if match.start() > position:
+            parts.append(template[position:match.start()])
+        parts.append(_compile_node(parse_expression(match.group(1))))
+        position = match.end()
+    if position < len(template):
+        parts.append(template[position:])
+
+    if all(isinstance(part, str) for part in parts):
+        return lambda scope: template
+    return lambda scope: "".join(part if isinstance(part, str) else _to_string(part(scope))
+                                 for part in parts)
+
+
+@lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def compile_expression(expression: str) -> Compiled:
+    """
+    Compile a DSL expression string into a closure taking a Scope.
+
+    Compiled closures are cached by expression text.
+
+    Raises:
+        BenderSyntaxError: If the expression is malformed
+        BenderEvaluationError: If it uses an unknown function or wrong arity
+    """
+    return _compile_node(parse_expression(expression))
+
+
+# Mapper operators with named parameters, e.g. {"MAP()": {"items": ..., "converter": ...}}
+
+def _compile_items_operator(spec: Dict[str, Any], per_item: str, combine,
+                            columnar_method: Optional[str] = None) -> Compiled:
+    items = _compile_definition(spec.get("items"))
+    function = _compile_definition(spec[per_item]) if per_item in spec else None
+    plan = _columnar_definition_plan(spec[per_item]) if columnar_method and function else None
+    if plan is None:
+        return lambda scope: combine(scope, _iteration(items(scope)), function)
+
+    def run(scope):
+        values = items(scope)
+        result = _columnar(columnar_method, plan, scope, values)
+        if result is not None:
+            return result
+        return combine(scope, _iteration(values), function)
+    return run
+
+
+def _map_items(scope, pairs, converter):
+    if converter is None:
+        return [item for item, _ in pairs]
+    return [converter(_item_scope(scope, item, loop, None)) for item, loop in pairs]
+
+
+def _filter_items(scope, pairs, condition):
+    if condition is None:
+        return [item for item, _ in pairs if item]
+    return [item for item, loop in pairs if condition(_item_scope(scope, item, loop, None))]
+
+
+def _coalesce_items(scope, pairs, condition):
+    for item, loop in pairs:
+        if (condition(_item_scope(scope, item, loop, None)) if condition else item):
+            return item
+    return None
+
+
+def _compile_sort_operator(spec: Dict[str, Any]) -> Compiled:
+    items = _compile_definition(spec.get("items"))
+    key = _compile_definition(spec["key"]) if "key" in spec else None
+    descending = _compile_definition(spec["desc"]) if "desc" in spec else (lambda scope: False)
+
+    def sort(scope):
+        pairs = list(_iteration(items(scope)))
+        if key is None:
+            keyed = [(item, item) for item, _ in pairs]
+        else:
+            keyed = [(key(_item_scope(scope, item, loop, None)), item) for item, loop in pairs]
+        return [item for _, item in sorted(keyed, key=lambda pair: _sort_key(pair[0]),
+                                           reverse=bool(descending(scope)))]
+    return sort
+
+
+def _compile_conditional_operator(spec: Dict[str, Any]) -> Compiled:
+    condition = _compile_definition(spec.get("condition"))
+    on_pass = _compile_definition(spec["on_pass"]) if "on_pass" in spec else (lambda scope: None)
+    on_fail = _compile_definition(spec["on_fail"]) if "on_fail" in spec else (lambda scope: None)
+    return lambda scope: on_pass(scope) if condition(scope) else on_fail(scope)
+
+
+def _compile_lookup_operator(spec: Dict[str, Any]) -> Compiled:
+    key = _compile_definition(spec.get("key"))
+    mapping = {str(k): _compile_definition(v) for k, v in (spec.get("mapping") or {}).items()}
+    default = _compile_definition(spec["default"]) if "default" in spec else (lambda scope: None)
+
+    def lookup(scope):
+        entry = mapping.get(_to_string(key(scope)))
+        return entry(scope) if entry is not None else default(scope)
+    return lookup
+
+
+def _compile_concat_operator(spec: Dict[str, Any]) -> Compiled:
+    items = _compile_definition(spec.get("items"))
+    separator = _compile_definition(spec["separator"], literal_strings=True) \
+        if "separator" in spec else (lambda scope: "")
+    return lambda scope: _concat(items(scope), separator(scope))
+
+
+def _compile_render_operator(spec: Dict[str, Any]) -> Compiled:
+    render = _compile_template(spec.get("template") or "")
+    if "args" not in spec:
+        return render
+    args = _compile_definition(spec["args"])
+
+    def render_with(scope):
+        values = args(scope)
+        return render(Scope(values if isinstance(values, dict) else {}, scope))
+    return render_with
+
+
+def _compile_eval_operator(spec: Dict[str, Any]) -> Compiled:
+    expression = compile_expression(spec.get("expression", ""))
+    if "args" not in spec:
+        return expression
+    args = _compile_definition(spec["args"])
+
+    def evaluate_with(scope):
+        values = args(scope)
+        return expression(Scope(values if isinstance(values, dict) else {}, scope))
+    return evaluate_with
+
+
+def _compile_flatten_operator(spec: Any) -> Compiled:
+    items = _compile_definition(spec)
+    return lambda scope: HELPERS["FLATTEN"](items(scope))
+
+
+def _compile_merge_operator(spec: Any) -> Compiled:
+    items = _compile_definition(spec)
+
+    def merge(scope):
+        merged: Dict[str, Any] = {}
+        for value in items(scope) or []:
+            if isinstance(value, dict):
+                merged.update(value)
+        return merged
+    return merge
+
+
+def _compile_strip_html_operator(spec: Any) -> Compiled:
+    text = _compile_definition(spec.get("text") if isinstance(spec, dict) else spec)
+    return lambda scope: _strip_html(text(scope))
+
+
+_OPERATOR_COMPILERS: Dict[str, Callable[[Any], Compiled]] = {
+    "MAP()": lambda spec: _compile_items_operator(spec, "converter", _map_items, "map"),
+    "FILTER()": lambda spec: _compile_items_operator(spec, "condition", _filter_items, "filter"),
+    "COALESCE()": lambda spec: _compile_items_operator(spec, "condition", _coalesce_items),
+    "SORT()": _compile_sort_operator,
+    "CONDITIONAL()": _compile_conditional_operator,
+    "LOOKUP()": _compile_lookup_operator,
+    "CONCAT()": _compile_concat_operator,
+    "RENDER()": _compile_render_operator,
+    "EVAL()": _compile_eval_operator,
+    "FLATTEN()": _compile_flatten_operator,
+    "MERGE()": _compile_merge_operator,
+    "STRIP_HTML()": _compile_strip_html_operator,
+}
+
+
+def _compile_definition(definition: Any, literal_strings: bool = False) -> Compiled:
+    """Compile a mapper definition: expression string, list, object or operator."""
+    if isinstance(definition, str):
+        if literal_strings:
+            return lambda scope: definition
+        return compile_expression(definition)
+
+    if isinstance(definition, list):
+        items = [_compile_definition(item) for item in definition]
+        return lambda scope: [item(scope) for item in items]
+
+    if isinstance(definition, dict):
+        if len(definition) == 1:
+            (key, spec), = definition.items()
+            compiler = _OPERATOR_COMPILERS.get(key.upper()) if isinstance(key, str) else None
+            if compiler is not None:
+                if key.upper() in ("FLATTEN()", "MERGE()", "STRIP_HTML()"):
+                    return compiler(spec)
+                if not isinstance(spec, dict):
+                    raise BenderEvaluationError(f"{key} expects named parameters")
+                return compiler(spec)
+        fields = [(key, _compile_definition(value)) for key, value in definition.items()]
+        return lambda scope: {key: value(scope) for key, value in fields}
+
+    # Numbers, booleans and null are constants
+    return lambda scope: definition
+
+
+_definition_cache: Dict[str, Compiled] = {}
+
+
+def compile_definition(definition: Any) -> Compiled:
+    """
+    Compile a mapper definition (as used in input_args or output_mapper).
+
+    Compiled definitions are cached by their canonical JSON text.
+    """
+    if isinstance(definition, str):
+        return compile_expression(definition)
+    key = json.dumps(definition, sort_keys=True, default=str)
+    compiled = _definition_cache.get(key)
+    if compiled is None:
+        if len(_definition_cache) >= COMPILE_CACHE_SIZE:
+            _definition_cache.pop(next(iter(_definition_cache)))
+        compiled = _definition_cache[key] = _compile_definition(definition)
+    return compiled
+
+
+def make_scope(payload: Any = None, variables: Optional[Dict[str, Any]] = None) -> Scope:
+    """
+    Build an evaluation scope.
+
+    Top-level keys of an object payload are visible by name (as in mapper
+    examples such as ``number.display_value``); ``variables`` (e.g.
+    ``{"data": {...}, "requestor": {...}}``) take precedence.
+    """
+    root = Scope(payload if isinstance(payload, dict) else {})
+    if variables:
+        return Scope(variables, root)
+    return root
+
+
+def evaluate(definition: Any, payload: Any = None, variables: Optional[Dict[str, Any]] = None) -> Any:
+    """Evaluate an expression string or mapper definition against a payload."""
+    return compile_definition(definition)(make_scope(payload, variables))
+
+
+def preview_expression(definition: Any, json_data: Any, source_name: str = "http_response") -> Any:
+    """
+    Evaluate an expression against JSON as analyzed by JSONAnalyzer.
+
+    The JSON is visible under the analyzer's source name (``api.users``),
+    under ``data.<source_name>`` as a step output, and by its top-level keys.
+    """
+    if isinstance(json_data, str):
+        json_data = json.loads(json_data)
+    return evaluate(definition, json_data, {source_name: json_data, "data": {source_name: json_data}})
@@ -0,0 +1,318 @@
+"""
+Whole-document linting of Bender expressions in Compound Actions.
+
+The step tree of a Compound Action (a model or its YAML dictionary) is
+walked once, collecting every Bender expression with its step path:
+step and compound action ``input_args``, ``for``/``parallel.for`` ``in``
+iterables, switch case conditions, ``delay_config`` values and return
+``output_mapper`` mappings, including the parameters of mapper operators
+such as ``MAP()`` and the ``{{ }}`` placeholders of ``RENDER()`` templates.
+Each distinct expression text is parsed once per linter, so large batches
+of files sharing expressions stay fast enough for pre-commit hooks.
+"""
+
+import json
+import re
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import yaml
+
+from .parser import DSL_FUNCTIONS, BenderSyntaxError, Call, MethodCall, iter_nodes, parse_expression
+
+
+# The C loader is several times faster when PyYAML was built with libyaml
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+YAML_SUFFIXES = (".yaml", ".yml")
+
+# Mapper operator parameters that are not expressions
+_LITERAL_PARAMETERS = {"CONCAT()": ("separator",), "SORT()": ("desc",)}
+_TEMPLATE_PARAMETERS = {"RENDER()": "template"}
+
+_PLACEHOLDER_RE = re.compile(r'\{\{\s*(.*?)\s*\}\}')
+
+# Signs that a value that failed to parse was meant as an expression rather than text
+_EXPRESSION_MARKERS_RE = re.compile(
+    r'\$[A-Za-z_]|\b(?:data|meta_info|requestor|item|loop)\s*[.\[]|[A-Za-z_]\w*\(|==|!=|<=|>=|&&|\|\|')
+
+
+@dataclass
+class LintIssue:
+    """A problem found in one expression of a document."""
+
+    path: str
+    expression: str
+    message: str
+    position: int
+    severity: str = "error"
+    file: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the issue as a JSON-serializable dictionary."""
+        return asdict(self)
+
+    def format(self) -> str:
+        """Format as ``file:path:offset: severity: message``."""
+        location = f"{self.path or '<document>'}:{self.position}"
+        if self.file:
+            location = f"{self.file}:{location}"
+        return f"{location}: {self.severity}: {self.message}"
+
+
+@dataclass
+class ExpressionSite:
+    """A Bender expression found in a document."""
+
+    path: str
+    text: str
+    strict: bool = True  # False for plain mapper values, which may be literal text
+    offset: int = 0  # Offset of text within the original string (RENDER() placeholders)
+
+
+def iter_expressions(document: Any) -> Iterator[ExpressionSite]:
+    """
+    Yield every Bender expression of a Compound Action with its step path.
+
+    ``document`` is a CompoundAction or its YAML dictionary; paths look like
+    ``steps[2].switch.cases[0].condition``.
+    """
+    if hasattr(document, "to_yaml_dict"):
+        document = document.to_yaml_dict()
+    if not isinstance(document, dict):
+        return
+
+    if "steps" in document:
+        yield from _steps(document["steps"], "steps")
+    else:
+        yield from _step(document, "")
+    if isinstance(document.get("input_args"), dict):
+        yield from _mapper(document["input_args"], "input_args", strict=False)
+
+
+def _join(path: str, key: Any) -> str:
+    return f"{path}.{key}" if path else str(key)
+
+
+def _steps(steps: Any, path: str) -> Iterator[ExpressionSite]:
+    if isinstance(steps, dict):
+        yield from _step(steps, path)
+    elif isinstance(steps, list):
+        for index, step in enumerate(steps):
+            if isinstance(step, dict):
+                yield from _step(step, f"{path}[{index}]")
+
+
+def _step(step: Dict[str, Any], path: str) -> Iterator[ExpressionSite]:
+    for kind, body in step.items():
+        if not isinstance(body, dict):
+            continue
+        here = _join(path, kind)
+        if kind in ("action", "script"):
+            if isinstance(body.get("input_args"), dict):
+                yield from _mapper(body["input_args"], f"{here}.input_args", strict=False)
+            delay = body.get("delay_config")
+            if isinstance(delay, dict):
+                for unit, value in delay.items():
+                    if isinstance(value, str):
+                        yield ExpressionSite(f"{here}.delay_config.{unit}", value)
+        elif kind == "for":
+            yield from _loop(body, here)
+        elif kind == "parallel":
+            if isinstance(body.get("for"), dict):
+                yield from _loop(body["for"], f"{here}.for")
+            for index, branch in enumerate(body.get("branches") or []):
+                if isinstance(branch, dict):
+                    yield from _steps(branch.get("steps"), f"{here}.branches[{index}].steps")
+        elif kind == "switch":
+            for index, case in enumerate(body.get("cases") or []):
+                if not isinstance(case, dict):
+                    continue
+                case_path = f"{here}.cases[{index}]"
+                if isinstance(case.get("condition"), str):
+                    yield ExpressionSite(f"{case_path}.condition", case["condition"])
+                yield from _steps(case.get("steps"), f"{case_path}.steps")
+            default = body.get("default")
+            if isinstance(default, dict):
+                yield from _steps(default.get("steps"), f"{here}.default.steps")
+            else:
+                yield from _steps(default, f"{here}.default")
+        elif kind == "try_catch":
+            for block in ("try", "catch"):
+                if isinstance(body.get(block), dict):
+                    yield from _steps(body[block].get("steps"), f"{here}.{block}.steps")
+        elif kind == "return":
+            if "output_mapper" in body:
+                yield from _mapper(body["output_mapper"], f"{here}.output_mapper", strict=False)
+
+
+def _loop(body: Dict[str, Any], path: str) -> Iterator[ExpressionSite]:
+    if isinstance(body.get("in"), str):
+        yield ExpressionSite(f"{path}.in", body["in"])
+    yield from _steps(body.get("steps"), f"{path}.steps")
+
+
+def _mapper(value: Any, path: str, strict: bool) -> Iterator[ExpressionSite]:
+    """Yield the expressions of a mapper value: string, list, object or operator."""
+    if isinstance(value, str):
+        yield ExpressionSite(path, value, strict)
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            yield from _mapper(item, f"{path}[{index}]", strict)
+    elif isinstance(value, dict):
+        if len(value) == 1 and str(next(iter(value))).upper().endswith("()"):
+            (operator, spec), = value.items()
+            yield from _operator(operator.upper(), spec, _join(path, operator))
+            return
+        for key, item in value.items():
+            yield from _mapper(item, _join(path, key), strict)
+
+
+def _operator(operator: str, spec: Any, path: str) -> Iterator[ExpressionSite]:
+    if not isinstance(spec, dict):
+        yield from _mapper(spec, path, strict=True)
+        return
+    literal = _LITERAL_PARAMETERS.get(operator, ())
+    template = _TEMPLATE_PARAMETERS.get(operator)
+    for key, item in spec.items():
+        here = _join(path, key)
+        if key in literal:
+            continue
+        if key == template and isinstance(item, str):
+            for match in _PLACEHOLDER_RE.finditer(item):
+                yield ExpressionSite(here, match.group(1), offset=match.start(1))
+        elif operator == "LOOKUP()" and key == "mapping" and isinstance(item, dict):
+            for name, entry in item.items():
+                yield from _mapper(entry, _join(here, name), strict=True)
+        else:
+            yield from _mapper(item, here, strict=True)
+
+
+def looks_like_expression(text: str) -> bool:
+    """Whether text that failed to parse was meant as an expression rather than literal text."""
+    return bool(_EXPRESSION_MARKERS_RE.search(text))
+
+
+class BenderLinter:
+    """
+    Lints every Bender expression of Compound Action documents.
+
+    Results are cached by expression text for the lifetime of the linter,
+    so an expression repeated across steps and files is parsed once.
+    """
+
+    def __init__(self, check_types: bool = False, output_schemas: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            check_types: Also type check expressions against the outputs of earlier steps
+            output_schemas: SchemaNodes of step output keys, e.g. from analyzed sample responses
+        """
+        self._results: Dict[str, Tuple[Tuple[str, str, int], ...]] = {}
+        self.expressions_checked = 0
+        self.check_types = check_types
+        self.output_schemas = output_schemas or {}
+        self._type_checkers: Dict[int, Any] = {}
+
+    @property
+    def distinct_expressions(self) -> int:
+        """Number of distinct expression texts checked so far."""
+        return len(self._results)
+
+    def check_expression(self, text: str) -> Tuple[Tuple[str, str, int], ...]:
+        """Return (severity, message, position) tuples for an expression, cached by text."""
+        result = self._results.get(text)
+        if result is None:
+            result = self._results[text] = self._check(text)
+        return result
+
+    def _check(self, text: str) -> Tuple[Tuple[str, str, int], ...]:
+        try:
+            tree = parse_expression(text)
+        except BenderSyntaxError as e:
+            return (("error", e.message, e.position),)
+
+        issues = []
+        for node in iter_nodes(tree):
+            if isinstance(node, (Call, MethodCall)) and not self._is_known_function(node.name):
+                position = node.start if isinstance(node, Call) else max(text.find(node.name, node.target.end), 0)
+                issues.append(("warning", f"Unknown function: {node.name}", position))
+        return tuple(issues)
+
+    @staticmethod
+    def _is_known_function(name: str) -> bool:
+        from .bender_assistant import bender_assistant
+        from .evaluator import HELPERS
+
+        upper = name.upper()
+        return upper in DSL_FUNCTIONS or upper in HELPERS or bender_assistant.get_function(upper) is not None
+
+    def lint(self, document: Any, file: Optional[str] = None) -> List[LintIssue]:
+        """Lint a CompoundAction or its YAML dictionary."""
+        issues = []
+        for site in iter_expressions(document):
+            self.expressions_checked += 1
+            text = site.text
+            if not text.strip():
+                if site.strict:
+                    issues.append(LintIssue(site.path, text, "Empty expression", site.offset, "error", file))
+                continue
+            results = self.check_expression(text)
+            if not results:
+                continue
+            if not site.strict and results[0][0] == "error" and not looks_like_expression(text):
+                continue  # Literal text in a mapper value
+            for severity, message, position in results:
+                issues.append(LintIssue(site.path, text, message, site.offset + position, severity, file))
+
+        if self.check_types:
+            from .type_checker import check_compound_action
+
+            issues.extend(check_compound_action(document, self.output_schemas,
+                                                checker_cache=self._type_checkers, file=file))
+        return issues
+
+    def lint_file(self, path: Any) -> List[LintIssue]:
+        """Lint a Compound Action YAML file."""
+        name = str(path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                document = yaml.load(f, Loader=_YAML_LOADER)
+        except yaml.YAMLError as e:
+            mark = getattr(e, "problem_mark", None)
+            where = f" at line {mark.line + 1}, column {mark.column + 1}" if mark is not None else ""
+            message = f"Invalid YAML{where}: {getattr(e, 'problem', None) or e}"
+            return [LintIssue("", "", message, mark.index if mark is not None else 0, "error", name)]
+        except OSError as e:
+            return [LintIssue("", "", f"Cannot read file: {e}", 0, "error", name)]
+        return self.lint(document, name)
+
+    def lint_paths(self, paths: Iterable[Any]) -> List[LintIssue]:
+        """Lint files and every YAML file below directories."""
+        issues = []
+        for path in expand_paths(paths):
+            issues.extend(self.lint_file(path))
+        return issues
+
+
+def expand_paths(paths: Iterable[Any]) -> List[Path]:
+    """Expand directories to the YAML files below them, keeping files as given."""
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(p for p in path.rglob("*") if p.suffix.lower() in YAML_SUFFIXES and p.is_file()))
+        else:
+            files.append(path)
+    return files
+
+
+def format_json_report(issues: List[LintIssue], files: int, linter: BenderLinter) -> str:
+    """Format lint results as a JSON document."""
+    return json.dumps({
+        "files": files,
+        "expressions": linter.expressions_checked,
+        "distinct_expressions": linter.distinct_expressions,
+        "errors": sum(1 for issue in issues if issue.severity == "error"),
+        "warnings": sum(1 for issue in issues if issue.severity == "warning"),
+        "issues": [issue.to_dict() for issue in issues],
+    }, indent=2)
@@ -0,0 +1,585 @@
+"""
+Tokenizer and parser for Bender (Moveworks Data Mapping Language) expressions.
+
+Parses DSL strings such as ``data.user.email.$TRIM()``,
+``$INTEGER(state.value) + 1`` or ``CONCAT(data.first, ' ', data.last)``
+into an AST whose nodes carry their source positions. Parsed expressions
+are kept in an LRU cache keyed by the expression text, since the same
+expressions are validated, linted and previewed over and over.
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Iterator, List, NamedTuple, Optional, Tuple
+
+
+# Size of the parsed-expression cache
+PARSE_CACHE_SIZE = 8192
+
+# Root names of data sources available to compound action expressions
+DATA_ROOTS = ("data", "meta_info", "requestor")
+
+# Functions and operators documented in the Data Mapper reference
+DSL_FUNCTIONS = frozenset({
+    "CONCAT", "INTEGER", "TRIM", "MAP", "FILTER", "SORT", "COALESCE", "CONDITIONAL",
+    "LOOKUP", "RENDER", "FLATTEN", "MERGE", "STRIP_HTML", "EVAL", "SIMPLE_EVAL",
+})
+
+
+class BenderSyntaxError(ValueError):
+    """Raised for malformed Bender expressions; carries the character offset."""
+
+    def __init__(self, message: str, expression: str, position: int):
+        super().__init__(f"{message} at position {position}")
+        self.message = message
+        self.expression = expression
+        self.position = position
+
+
+class Token(NamedTuple):
+    """A lexical token with its [start, end) offsets in the expression."""
+    kind: str
+    value: str
+    start: int
+    end: int
+
+
+_TOKEN_RE = re.compile(r"""\s*(?:
+    (?P<number>\d+(?:\.\d+)?)
+  | (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+  | (?P<func>\$[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<op>==|!=|<=|>=|&&|\|\||[-+*/%<>!().,\[\]])
+)""", re.VERBOSE)
+
+# Plain dotted/indexed paths, the most common expression shape, skip the tokenizer
+_SIMPLE_PATH_RE = re.compile(r'\s*([A-Za-z_][A-Za-z0-9_]*)((?:\.[A-Za-z_][A-Za-z0-9_]*|\[\d+\])*)\s*')
+_PATH_PART_RE = re.compile(r'\.([A-Za-z_][A-Za-z0-9_]*)|\[(\d+)\]')
+
+# Word operators and literals, matched case-insensitively
+_KEYWORDS = {
+    "and": ("op", "and"), "or": ("op", "or"), "not": ("op", "not"), "in": ("op", "in"),
+    "true": ("literal", True), "false": ("literal", False),
+    "null": ("literal", None), "none": ("literal", None),
+}
+
+_SYMBOL_ALIASES = {"&&": "and", "||": "or", "!": "not"}
+
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "\\": "\\", "'": "'", '"': '"'}
+_ESCAPE_RE = re.compile(r"\\(.)", re.DOTALL)
+
+
+def _scan(expression: str) -> List[Tuple[str, str, int, int]]:
+    """Return (kind, value, start, end) tuples; "op" also covers word operators."""
+    tokens = []
+    append = tokens.append
+    position = 0
+    length = len(expression)
+    for m in _TOKEN_RE.finditer(expression):
+        kind = m.lastgroup
+        start = m.start(kind)
+        if m.start() != position or kind is None:
+            break
+        value = m.group(kind)
+        end = m.end()
+        if kind == "name" and value.lower() in _KEYWORDS:
+            keyword_kind, keyword_value = _KEYWORDS[value.lower()]
+            if keyword_kind == "op":
+                kind = "word"
+        append((kind, value, start, end))
+        position = end
+
+    if position < length:
+        rest = expression[position:]
+        stripped = rest.lstrip()
+        if stripped:
+            offset = position + len(rest) - len(stripped)
+            if stripped[0] in "'\"":
+                raise BenderSyntaxError("Unterminated string literal", expression, offset)
+            raise BenderSyntaxError(f"Unexpected character {stripped[0]!r}", expression, offset)
+    return tokens
+
+
+def tokenize(expression: str) -> List[Token]:
+    """Split an expression into tokens, skipping whitespace."""
+    return [Token("name" if kind == "word" else kind, value, start, end)
+            for kind, value, start, end in _scan(expression)]
+
+
+def _unquote(literal: str) -> str:
+    body = literal[1:-1]
+    if "\\" not in body:
+        return body
+    return _ESCAPE_RE.sub(lambda m: _ESCAPES.get(m.group(1), m.group(1)), body)
+
+
+class Node:
+    """Base class of AST nodes; ``start``/``end`` are character offsets."""
+    __slots__ = ("start", "end")
+    _fields: Tuple[str, ...] = ()
+
+    def children(self) -> Iterator["Node"]:
+        """Yield the direct child nodes."""
+        for field in self._fields:
+            value = getattr(self, field)
+            if isinstance(value, Node):
+                yield value
+            elif isinstance(value, list):
+                for item in value:
+                    if isinstance(item, Node):
+                        yield item
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, f) == getattr(other, f) for f in self._fields)
+
+    def __hash__(self):
+        return hash((type(self).__name__,) + tuple(
+            tuple(v) if isinstance(v, list) else v for v in (getattr(self, f) for f in self._fields)))
+
+    def __repr__(self):
+        args = ", ".join(f"{f}={getattr(self, f)!r}" for f in self._fields)
+        return f"{type(self).__name__}({args})"
+
+
+class Literal(Node):
+    """String, number, boolean or null literal."""
+    __slots__ = ("value",)
+    _fields = ("value",)
+
+    def __init__(self, value: Any, start: int = 0, end: int = 0):
+        self.value = value
+        self.start, self.end = start, end
+
+
+class Name(Node):
+    """Bare identifier, e.g. the ``data`` of ``data.user`` or a loop variable."""
+    __slots__ = ("name",)
+    _fields = ("name",)
+
+    def __init__(self, name: str, start: int = 0, end: int = 0):
+        self.name = name
+        self.start, self.end = start, end
+
+
+class Attribute(Node):
+    """Property access ``target.name``."""
+    __slots__ = ("target", "name")
+    _fields = ("target", "name")
+
+    def __init__(self, target: Node, name: str, start: int = 0, end: int = 0):
+        self.target, self.name = target, name
+        self.start, self.end = start, end
+
+
+class Index(Node):
+    """Index access ``target[index]`` or ``target.0``."""
+    __slots__ = ("target", "index")
+    _fields = ("target", "index")
+
+    def __init__(self, target: Node, index: Node, start: int = 0, end: int = 0):
+        self.target, self.index = target, index
+        self.start, self.end = start, end
+
+
+class Call(Node):
+    """Function call ``$NAME(args)`` (dollar=True) or ``NAME(args)``."""
+    __slots__ = ("name", "args", "dollar")
+    _fields = ("name", "args", "dollar")
+
+    def __init__(self, name: str, args: List[Node], dollar: bool = True,
+                 start: int = 0, end: int = 0):
+        self.name, self.args, self.dollar = name, args, dollar
+        self.start, self.end = start, end
+
+
+class MethodCall(Node):
+    """Method chain call ``target.$NAME(args)``."""
+    __slots__ = ("target", "name", "args")
+    _fields = ("target", "name", "args")
+
+    def __init__(self, target: Node, name: str, args: List[Node], start: int = 0, end: int = 0):
+        self.target, self.name, self.args = target, name, args
+        self.start, self.end = start, end
+
+
+class UnaryOp(Node):
+    """Unary ``not``/``-`` operation."""
+    __slots__ = ("op", "operand")
+    _fields = ("op", "operand")
+
+    def __init__(self, op: str, operand: Node, start: int = 0, end: int = 0):
+        self.op, self.operand = op, operand
+        self.start, self.end = start, end
+
+
+class BinaryOp(Node):
+    """Binary arithmetic, comparison, membership or logical operation."""
+    __slots__ = ("op", "left", "right")
+    _fields = ("op", "left", "right")
+
+    def __init__(self, op: str, left: Node, right: Node, start: int = 0, end: int = 0):
+        self.op, self.left, self.right = op, left, right
+        self.start, self.end = start, end
+
+
+class ListExpr(Node):
+    """List literal ``[a, b, ...]``."""
+    __slots__ = ("items",)
+    _fields = ("items",)
+
+    def __init__(self, items: List[Node], start: int = 0, end: int = 0):
+        self.items = items
+        self.start, self.end = start, end
+
+
+# Binary operator precedence, loosest first
+_PRECEDENCE = {
+    "or": 1,
+    "and": 2,
+    "==": 3, "!=": 3, "<": 3, "<=": 3, ">": 3, ">=": 3, "in": 3,
+    "+": 4, "-": 4,
+    "*": 5, "/": 5, "%": 5,
+}
+
+# Precedence of the operand of "not": it binds looser than comparisons
+_NOT_OPERAND_PRECEDENCE = 3
+
+
+class _Parser:
+    """Precedence-climbing parser over a token list."""
+
+    __slots__ = ("expression", "tokens", "position", "count")
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self.tokens = _scan(expression)
+        self.position = 0
+        self.count = len(self.tokens)
+
+    def parse(self) -> Node:
+        if not self.tokens:
+            raise BenderSyntaxError("Empty expression", self.expression, 0)
+        node = self._binary(1)
+        if self.position < self.count:
+            token = self.tokens[self.position]
+            raise BenderSyntaxError(f"Unexpected {token[1]!r}", self.expression, token[2])
+        return node
+
+    def _operator(self) -> Optional[str]:
+        """Return the normalized operator at the current position, if any."""
+        if self.position >= self.count:
+            return None
+        kind, value = self.tokens[self.position][:2]
+        if kind == "op":
+            return _SYMBOL_ALIASES.get(value, value)
+        if kind == "word":
+            return value.lower()
+        return None
+
+    def _expect(self, value: str) -> Tuple[str, str, int, int]:
+        if self.position >= self.count:
+            raise BenderSyntaxError(f"Expected {value!r} but the expression ended",
+                                    self.expression, len(self.expression))
+        token = self.tokens[self.position]
+        if token[0] != "op" or token[1] != value:
+            raise BenderSyntaxError(f"Expected {value!r} but found {token[1]!r}",
+                                    self.expression, token[2])
+        self.position += 1
+        return token
+
+    def _binary(self, min_precedence: int) -> Node:
+        left = self._unary()
+        while True:
+            op = self._operator()
+            precedence = _PRECEDENCE.get(op)
+            if precedence is None or precedence < min_precedence:
+                return left
+            self.position += 1
+            right = self._binary(precedence + 1)
+            left = BinaryOp(op, left, right, left.start, right.end)
+
+    def _unary(self) -> Node:
+        op = self._operator()
+        if op == "not" or op == "-":
+            start = self.tokens[self.position][2]
+            self.position += 1
+            operand = self._binary(_NOT_OPERAND_PRECEDENCE) if op == "not" else self._unary()
+            return UnaryOp(op, operand, start, operand.end)
+        return self._postfix(self._primary())
+
+    def _primary(self) -> Node:
+        if self.position >= self.count:
+            raise BenderSyntaxError("Unexpected end of expression", self.expression, len(self.expression))
+        kind, value, start, end = self.tokens[self.position]
+        self.position += 1
+
+        if kind == "name":
+            keyword = _KEYWORDS.get(value.lower())
+            if keyword is not None:
+                return Literal(keyword[1], start, end)
+            if self.position < self.count and self.tokens[self.position][1] == "(" \
+                    and self.tokens[self.position][0] == "op":
+                args, end = self._arguments()
+                return Call(value, args, False, start, end)
+            return Name(value, start, end)
+
+        if kind == "func":
+            args, end = self._arguments()
+            return Call(value[1:], args, True, start, end)
+
+        if kind == "string":
+            return Literal(_unquote(value), start, end)
+
+        if kind == "number":
+            return Literal(float(value) if "." in value else int(value), start, end)
+
+        if value == "(" and kind == "op":
+            node = self._binary(1)
+            self._expect(")")
+            return node
+
+        if value == "[" and kind == "op":
+            items, end = self._sequence("]")
+            return ListExpr(items, start, end)
+
+        raise BenderSyntaxError(f"Unexpected {value!r}", self.expression, start)
+
+    def _arguments(self) -> Tuple[List[Node], int]:
+        if self.position >= self.count or self.tokens[self.position][1] != "(":
+            position = self.tokens[self.position][2] if self.position < self.count else len(self.expression)
+            raise BenderSyntaxError("Expected '(' after function name", self.expression, position)
+        self.position += 1
+        return self._sequence(")")
+
+    def _sequence(self, closing: str) -> Tuple[List[Node], int]:
+        """Parse comma-separated expressions up to the closing bracket."""
+        items: List[Node] = []
+        tokens = self.tokens
+        if self.position < self.count and tokens[self.position][1] == closing \
+                and tokens[self.position][0] == "op":
+            self.position += 1
+            return items, tokens[self.position - 1][3]
+        while True:
+            items.append(self._binary(1))
+            if self.position < self.count and tokens[self.position][1] == "," \
+                    and tokens[self.position][0] == "op":
+                self.position += 1
+                continue
+            return items, self._expect(closing)[3]
+
+    def _postfix(self, node: Node) -> Node:
+        tokens = self.tokens
+        while self.position < self.count:
+            kind, value = tokens[self.position][:2]
+            if kind != "op" or (value != "." and value != "["):
+                return node
+            self.position += 1
+
+            if value == "[":
+                index = self._binary(1)
+                end = self._expect("]")[3]
+                node = Index(node, index, node.start, end)
+                continue
+
+            if self.position >= self.count:
+                raise BenderSyntaxError("Expected a property name after '.'",
+                                        self.expression, len(self.expression))
+            member_kind, member, member_start, member_end = tokens[self.position]
+            self.position += 1
+            if member_kind == "name" or member_kind == "word":
+                node = Attribute(node, member, node.start, member_end)
+            elif member_kind == "func":
+                args, end = self._arguments()
+                node = MethodCall(node, member[1:], args, node.start, end)
+            elif member_kind == "number":
+                # list.0 index access; "0.1" is lexed as one number
+                offset = member_start
+                for part in member.split("."):
+                    index = Literal(int(part), offset, offset + len(part))
+                    offset += len(part) + 1
+                    node = Index(node, index, node.start, index.end)
+            else:
+                raise BenderSyntaxError(f"Expected a property name after '.' but found {member!r}",
+                                        self.expression, member_start)
+        return node
+
+
+def _parse_simple_path(expression: str) -> Optional[Node]:
+    """Build the AST of a plain path such as data.users[0].email without tokenizing."""
+    m = _SIMPLE_PATH_RE.fullmatch(expression)
+    if m is None or m.group(1).lower() in _KEYWORDS:
+        return None
+    start = m.start(1)
+    node: Node = Name(m.group(1), start, m.end(1))
+    offset = m.start(2)
+    for part in _PATH_PART_RE.finditer(m.group(2)):
+        end = offset + part.end()
+        if part.group(1) is not None:
+            node = Attribute(node, part.group(1), start, end)
+        else:
+            index_start = offset + part.start(2)
+            index = Literal(int(part.group(2)), index_start, index_start + len(part.group(2)))
+            node = Index(node, index, start, end)
+    return node
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_expression(expression: str) -> Node:
+    """
+    Parse a Bender expression into an AST.
+
+    Results are cached by expression text; the returned tree is shared and
+    must not be modified.
+
+    Raises:
+        BenderSyntaxError: If the expression is malformed
+    """
+    node = _parse_simple_path(expression)
+    if node is not None:
+        return node
+    return _Parser(expression).parse()
+
+
+def iter_nodes(node: Node) -> Iterator[Node]:
+    """Yield a node and all of its descendants, depth first."""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        children = list(current.children())
+        children.reverse()
+        stack.extend(children)
+
+
+def node_path(node: Node) -> Optional[str]:
+    """
+    Return the dotted path of a Name/Attribute/Index chain, e.g.
+    ``data.users[0].email``, or None for other expressions.
+    """
+    parts = []
+    while True:
+        if isinstance(node, Attribute):
+            parts.append("." + node.name)
+            node = node.target
+        elif isinstance(node, Index):
+            if not isinstance(node.index, Literal):
+                return None
+            parts.append(f"[{node.index.value!r}]" if isinstance(node.index.value, str)
+                         else f"[{node.index.value}]")
+            node = node.target
+        elif isinstance(node, Name):
+            parts.append(node.name)
+            return "".join(reversed(parts))
+        else:
+            return None
+
+
+def data_references(node: Node, roots: Tuple[str, ...] = DATA_ROOTS) -> List[str]:
+    """Return the outermost paths rooted at data/meta_info/requestor, in source order."""
+    references = []
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        path = node_path(current)
+        if path is not None:
+            root = path.split(".", 1)[0].split("[", 1)[0]
+            if root in roots:
+                references.append((current.start, path))
+            continue
+        stack.extend(current.children())
+    references.sort()
+    return [path for _, path in references]
+
+
+def item_variable(node: Node) -> Optional[str]:
+    """
+    Return the name a per-item expression uses for the element, if any.
+
+    That is the root of the first property path not rooted at data,
+    meta_info, requestor, item or loop: ``u`` in ``'limit < u.age'``. Bare
+    names are not taken as the element, so ``'limit'`` binds nothing.
+    """
+    paths = [n for n in iter_nodes(node) if isinstance(n, (Attribute, Index, MethodCall))]
+    paths.sort(key=lambda n: n.start)
+    for path in paths:
+        root = path
+        while isinstance(root, (Attribute, Index, MethodCall)):
+            root = root.target
+        if isinstance(root, Name) and root.name not in DATA_ROOTS and root.name not in ("item", "loop"):
+            return root.name
+    return None
+
+
+def function_names(node: Node) -> List[str]:
+    """Return the names of all called functions and methods, in source order."""
+    calls = [(n.start, n.name) for n in iter_nodes(node) if isinstance(n, (Call, MethodCall))]
+    calls.sort()
+    return [name for _, name in calls]
+
+
+_QUOTE_ESCAPES = {"\\": "\\\\", "'": "\\'", "\n": "\\n", "\t": "\\t", "\r": "\\r"}
+
+# Precedence of nodes that are not binary operations when printed as operands
+_NOT_PRECEDENCE = 2.5
+_UNARY_PRECEDENCE = 6
+_ATOM_PRECEDENCE = 7
+
+
+def quote_string(value: str) -> str:
+    """Return a single-quoted Bender string literal for value."""
+    return "'" + "".join(_QUOTE_ESCAPES.get(ch, ch) for ch in value) + "'"
+
+
+def _precedence(node: Node) -> float:
+    if isinstance(node, BinaryOp):
+        return _PRECEDENCE[node.op]
+    if isinstance(node, UnaryOp):
+        return _NOT_PRECEDENCE if node.op == "not" else _UNARY_PRECEDENCE
+    if isinstance(node, Literal) and isinstance(node.value, (int, float)) \
+            and not isinstance(node.value, bool) and node.value < 0:
+        return _UNARY_PRECEDENCE
+    return _ATOM_PRECEDENCE
+
+
+def _operand(node: Node, minimum: float) -> str:
+    text = to_source(node)
+    return f"({text})" if _precedence(node) < minimum else text
+
+
+def to_source(node: Node) -> str:
+    """
+    Print an AST back as Bender source, adding only the parentheses the
+    precedence rules need; ``parse_expression(to_source(node)) == node``.
+    """
+    if isinstance(node, Literal):
+        value = node.value
+        if value is None:
+            return "null"
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        if isinstance(value, str):
+            return quote_string(value)
+        return repr(value)
+    if isinstance(node, Name):
+        return node.name
+    if isinstance(node, Attribute):
+        return f"{_operand(node.target, _ATOM_PRECEDENCE)}.{node.name}"
+    if isinstance(node, Index):
+        return f"{_operand(node.target, _ATOM_PRECEDENCE)}[{to_source(node.index)}]"
+    if isinstance(node, Call):
+        args = ", ".join(to_source(arg) for arg in node.args)
+        return f"{'$' if node.dollar else ''}{node.name}({args})"
+    if isinstance(node, MethodCall):
+        args = ", ".join(to_source(arg) for arg in node.args)
+        return f"{_operand(node.target, _ATOM_PRECEDENCE)}.${node.name}({args})"
+    if isinstance(node, ListExpr):
+        return "[" + ", ".join(to_source(item) for item in node.items) + "]"
+    if isinstance(node, UnaryOp):
+        if node.op == "not":
+            return f"not {_operand(node.operand, _NOT_OPERAND_PRECEDENCE)}"
+        return f"-{_operand(node.operand, _UNARY_PRECEDENCE)}"
+    if isinstance(node, BinaryOp):
+        precedence = _PRECEDENCE[node.op]
+        return f"{_operand(node.left, precedence)} {node.op} {_operand(node.right, precedence + 1)}"
+    raise TypeError(f"Cannot print {type(node).__name__}")
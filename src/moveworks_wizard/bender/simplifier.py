@@ -0,0 +1,414 @@
+"""
+Simplification of Bender expressions before serialization.
+
+Expressions assembled by the wizard and by templates often carry
+constant parts: ``CONCAT('Ticket', ' ', data.id)``, ``$TRIM(' x ')``,
+``CONDITIONAL(true, data.a, data.b)`` or a ``RENDER()`` whose template has
+no placeholders. The simplifier rewrites the AST bottom-up:
+
+* literal-only subexpressions are folded with the evaluator's semantics,
+* adjacent literal ``CONCAT`` arguments are merged and single-argument
+  ``CONCAT`` calls collapse to their argument,
+* ``CONDITIONAL``/``IF`` calls with a literal condition keep only the
+  reachable branch, and ``false and x``/``true or x`` short-circuit,
+* ``RENDER`` calls with a placeholder-free template become the template.
+
+Documents are simplified site by site, including the ``CONDITIONAL()``,
+``CONCAT()`` and ``RENDER()`` mapper operators. Expressions that do not
+change are kept verbatim, so simplification never reformats them.
+"""
+
+import copy
+import math
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from .evaluator import HELPERS, BenderEvaluationError, Scope, _compile_node, _to_string
+from .linter import looks_like_expression
+from .parser import (
+    BenderSyntaxError, BinaryOp, Call, ListExpr, Literal, MethodCall, Node, UnaryOp,
+    parse_expression, quote_string, to_source,
+)
+
+
+SIMPLIFY_CACHE_SIZE = 4096
+
+# Calls the evaluator compiles specially; every other helper is a pure function
+_SPECIAL_CALLS = frozenset({"MAP", "FILTER", "SORT", "COALESCE", "CONDITIONAL", "IF", "CONCAT", "RENDER", "EXTRACT"})
+
+_PLACEHOLDER_RE = re.compile(r'\{\{.*?\}\}', re.DOTALL)
+
+# Mapper operator parameters that are not expressions (see linter._LITERAL_PARAMETERS)
+_LITERAL_PARAMETERS = {"CONCAT()": ("separator",), "SORT()": ("desc",), "RENDER()": ("template",)}
+
+_NO_VALUE = object()
+
+
+def _constant(node: Node) -> Any:
+    """Return the value of a literal or a list of literals, else _NO_VALUE."""
+    if isinstance(node, Literal):
+        return node.value
+    if isinstance(node, ListExpr):
+        values = [_constant(item) for item in node.items]
+        return _NO_VALUE if any(value is _NO_VALUE for value in values) else values
+    return _NO_VALUE
+
+
+def _literal_node(value: Any, node: Node) -> Optional[Node]:
+    """Build a literal node for a folded value, or None if it has no Bender spelling."""
+    if isinstance(value, float) and (not math.isfinite(value) or "e" in repr(value)):
+        return None
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return Literal(value, node.start, node.end)
+    if isinstance(value, list):
+        items = [_literal_node(item, node) for item in value]
+        return None if any(item is None for item in items) else ListExpr(items, node.start, node.end)
+    return None
+
+
+def _fold(node: Node) -> Optional[Node]:
+    """Evaluate a node whose operands are all constant; None if it cannot be folded."""
+    try:
+        value = _compile_node(node)(Scope())
+    except (BenderEvaluationError, TypeError, ValueError, ZeroDivisionError):
+        return None
+    return _literal_node(value, node)
+
+
+def _is_constant(node: Node) -> bool:
+    return _constant(node) is not _NO_VALUE
+
+
+class _Simplifier:
+    """Bottom-up rewriter counting the rules that fired."""
+
+    def __init__(self):
+        self.rewrites = 0
+
+    def _rewrote(self, node: Node) -> Node:
+        self.rewrites += 1
+        return node
+
+    def simplify(self, node: Node) -> Node:
+        if isinstance(node, UnaryOp):
+            node = UnaryOp(node.op, self.simplify(node.operand), node.start, node.end)
+            folded = _fold(node) if _is_constant(node.operand) else None
+            return self._rewrote(folded) if folded is not None else node
+
+        if isinstance(node, BinaryOp):
+            node = BinaryOp(node.op, self.simplify(node.left), self.simplify(node.right), node.start, node.end)
+            return self._binary(node)
+
+        if isinstance(node, ListExpr):
+            return ListExpr([self.simplify(item) for item in node.items], node.start, node.end)
+
+        if isinstance(node, MethodCall):
+            node = MethodCall(self.simplify(node.target), node.name,
+                              [self.simplify(arg) for arg in node.args], node.start, node.end)
+            if node.name.upper() in HELPERS and _is_constant(node.target) and all(map(_is_constant, node.args)):
+                folded = _fold(node)
+                if folded is not None:
+                    return self._rewrote(folded)
+            return node
+
+        if isinstance(node, Call):
+            name = node.name.upper()
+            if name == "RENDER":
+                return self._render(node)
+            node = Call(node.name, [self.simplify(arg) for arg in node.args], node.dollar, node.start, node.end)
+            if name in ("CONDITIONAL", "IF"):
+                return self._conditional(node)
+            if name == "CONCAT":
+                return self._concat(node)
+            if name == "COALESCE":
+                return self._coalesce(node)
+            if name in HELPERS and name not in _SPECIAL_CALLS and all(map(_is_constant, node.args)):
+                folded = _fold(node)
+                if folded is not None:
+                    return self._rewrote(folded)
+            return node
+
+        # Paths and literals; index expressions of paths are left as written
+        return node
+
+    def _binary(self, node: BinaryOp) -> Node:
+        left, right = node.left, node.right
+        if isinstance(left, Literal) and node.op in ("and", "or") and bool(left.value) == (node.op == "or"):
+            # false and x -> false, true or x -> true
+            return self._rewrote(Literal(node.op == "or", node.start, node.end))
+        if _is_constant(left) and _is_constant(right):
+            folded = _fold(node)
+            if folded is not None:
+                return self._rewrote(folded)
+        return node
+
+    def _conditional(self, node: Call) -> Node:
+        if len(node.args) not in (2, 3) or not _is_constant(node.args[0]):
+            return node
+        if _constant(node.args[0]):
+            return self._rewrote(node.args[1])
+        return self._rewrote(node.args[2] if len(node.args) == 3 else Literal(None, node.start, node.end))
+
+    def _concat(self, node: Call) -> Node:
+        if node.dollar:
+            # $CONCAT(items[, separator]): merge the literal items of a list
+            if not node.args or not isinstance(node.args[0], ListExpr) or len(node.args) > 2:
+                return node
+            separator = _constant(node.args[1]) if len(node.args) == 2 else ""
+            if separator is _NO_VALUE:
+                return node
+            items = self._merge_literals(node.args[0].items, _to_string(separator))
+            if items is None:
+                return node
+            if len(items) == 1:
+                return self._rewrote(items[0])
+            merged = ListExpr(items, node.args[0].start, node.args[0].end)
+            return self._rewrote(Call(node.name, [merged] + node.args[1:], True, node.start, node.end))
+
+        items = self._merge_literals(node.args, "")
+        if items is None:
+            return node
+        if len(items) == 1:
+            return self._rewrote(items[0])
+        return self._rewrote(Call(node.name, items, False, node.start, node.end))
+
+    def _merge_literals(self, items: List[Node], separator: str) -> Optional[List[Node]]:
+        """
+        Join adjacent literal CONCAT items into one string literal, dropping
+        nulls; return None when nothing changes.
+        """
+        merged: List[Node] = []
+        changed = False
+        for item in items:
+            if isinstance(item, Literal) and item.value is None:
+                changed = True
+                continue
+            if isinstance(item, Literal) and merged and isinstance(merged[-1], Literal):
+                previous = merged[-1]
+                text = _to_string(previous.value) + separator + _to_string(item.value)
+                merged[-1] = Literal(text, previous.start, item.end)
+                changed = True
+                continue
+            merged.append(item)
+        if not merged:
+            return [Literal("")]
+        if len(merged) == 1:
+            only = merged[0]
+            if isinstance(only, Literal) and not isinstance(only.value, str):
+                return [Literal(_to_string(only.value), only.start, only.end)]
+            return merged
+        return merged if changed else None
+
+    def _coalesce(self, node: Call) -> Node:
+        # Falsy literals never win; a truthy literal ends the search
+        args: List[Node] = []
+        for arg in node.args:
+            value = _constant(arg)
+            if value is _NO_VALUE:
+                args.append(arg)
+                continue
+            if value:
+                if not args:
+                    return self._rewrote(arg)
+                args.append(arg)
+                break
+        if not args:
+            return self._rewrote(Literal(None, node.start, node.end))
+        if len(args) == len(node.args):
+            return node
+        return self._rewrote(Call(node.name, args, node.dollar, node.start, node.end))
+
+    def _render(self, node: Call) -> Node:
+        template = node.args[0] if node.args else None
+        if not (isinstance(template, Literal) and isinstance(template.value, str)) \
+                or len(node.args) > 2 or _PLACEHOLDER_RE.search(template.value):
+            args = [self.simplify(arg) for arg in node.args]
+            return Call(node.name, args, node.dollar, node.start, node.end)
+        return self._rewrote(Literal(template.value, node.start, node.end))
+
+
+@lru_cache(maxsize=SIMPLIFY_CACHE_SIZE)
+def simplify_expression(expression: str) -> Tuple[str, bool]:
+    """
+    Simplify a DSL expression.
+
+    Returns:
+        (text, changed); unchanged or malformed expressions are returned verbatim
+    """
+    try:
+        tree = parse_expression(expression)
+    except BenderSyntaxError:
+        return expression, False
+    simplifier = _Simplifier()
+    simplified = simplifier.simplify(tree)
+    if not simplifier.rewrites:
+        return expression, False
+    text = to_source(simplified)
+    if text == expression.strip():
+        return expression, False
+    return text, True
+
+
+class DocumentSimplifier:
+    """
+    Simplifies every Bender expression of a Compound Action dictionary,
+    counting the expressions it rewrote.
+    """
+
+    def __init__(self):
+        self.rewrites = 0
+
+    def simplify(self, document: Any) -> Any:
+        """Return a simplified copy of a CompoundAction's YAML dictionary."""
+        if hasattr(document, "to_yaml_dict"):
+            document = document.to_yaml_dict()
+        document = copy.deepcopy(document)
+        if not isinstance(document, dict):
+            return document
+        if "steps" in document:
+            self._steps(document["steps"])
+        else:
+            self._step(document)
+        if isinstance(document.get("input_args"), dict):
+            self._mapper_fields(document["input_args"], strict=False)
+        return document
+
+    def _expression(self, text: str, strict: bool) -> str:
+        if not strict and not looks_like_expression(text):
+            return text  # Possibly literal text in a mapper value
+        simplified, changed = simplify_expression(text)
+        if changed:
+            self.rewrites += 1
+        return simplified
+
+    def _field(self, container: Dict[str, Any], key: str, strict: bool = True) -> None:
+        if isinstance(container.get(key), str):
+            container[key] = self._expression(container[key], strict)
+
+    def _steps(self, steps: Any) -> None:
+        if isinstance(steps, dict):
+            self._step(steps)
+        elif isinstance(steps, list):
+            for step in steps:
+                if isinstance(step, dict):
+                    self._step(step)
+
+    def _step(self, step: Dict[str, Any]) -> None:
+        for kind, body in step.items():
+            if not isinstance(body, dict):
+                continue
+            if kind in ("action", "script"):
+                if isinstance(body.get("input_args"), dict):
+                    self._mapper_fields(body["input_args"], strict=False)
+                if isinstance(body.get("delay_config"), dict):
+                    for unit in list(body["delay_config"]):
+                        self._field(body["delay_config"], unit)
+            elif kind == "for":
+                self._loop(body)
+            elif kind == "parallel":
+                if isinstance(body.get("for"), dict):
+                    self._loop(body["for"])
+                for branch in body.get("branches") or []:
+                    if isinstance(branch, dict):
+                        self._steps(branch.get("steps"))
+            elif kind == "switch":
+                for case in body.get("cases") or []:
+                    if isinstance(case, dict):
+                        self._field(case, "condition")
+                        self._steps(case.get("steps"))
+                default = body.get("default")
+                self._steps(default.get("steps") if isinstance(default, dict) else default)
+            elif kind == "try_catch":
+                for block in ("try", "catch"):
+                    if isinstance(body.get(block), dict):
+                        self._steps(body[block].get("steps"))
+            elif kind == "return" and "output_mapper" in body:
+                body["output_mapper"] = self.simplify_definition(body["output_mapper"], strict=False)
+
+    def _loop(self, body: Dict[str, Any]) -> None:
+        self._field(body, "in")
+        self._steps(body.get("steps"))
+
+    def _mapper_fields(self, mapping: Dict[str, Any], strict: bool) -> None:
+        for key in list(mapping):
+            mapping[key] = self.simplify_definition(mapping[key], strict)
+
+    def simplify_definition(self, definition: Any, strict: bool = True) -> Any:
+        """Simplify a mapper value: expression string, list, object or operator."""
+        if isinstance(definition, str):
+            return self._expression(definition, strict)
+        if isinstance(definition, list):
+            return [self.simplify_definition(item, strict) for item in definition]
+        if not isinstance(definition, dict):
+            return definition
+        if len(definition) == 1 and str(next(iter(definition))).upper().endswith("()"):
+            (operator, spec), = definition.items()
+            return self._operator(operator, spec)
+        return {key: self.simplify_definition(value, strict) for key, value in definition.items()}
+
+    def _operator(self, operator: str, spec: Any) -> Any:
+        name = operator.upper()
+        if not isinstance(spec, dict):
+            return {operator: self.simplify_definition(spec)}
+        literal = _LITERAL_PARAMETERS.get(name, ())
+        before = self.rewrites
+        simplified = {}
+        for key, value in spec.items():
+            if key in literal:
+                simplified[key] = value
+            elif name == "LOOKUP()" and key == "mapping" and isinstance(value, dict):
+                simplified[key] = {entry: self.simplify_definition(item) for entry, item in value.items()}
+            else:
+                simplified[key] = self.simplify_definition(value)
+        spec = simplified
+        reduced = self._reduce_operator(name, spec)
+        if reduced is _NO_VALUE:
+            return {operator: spec}
+        # Replacing the operator counts as one rewrite, whatever its parameters needed
+        self.rewrites = before + 1
+        return reduced
+
+    @staticmethod
+    def _reduce_operator(name: str, spec: Dict[str, Any]) -> Any:
+        """Return the replacement of a reducible operator, else _NO_VALUE."""
+        if name == "CONDITIONAL()":
+            condition = _definition_constant(spec.get("condition"))
+            if condition is not _NO_VALUE:
+                return spec.get("on_pass" if condition else "on_fail", "null")
+        elif name == "CONCAT()" and isinstance(spec.get("items"), list):
+            items = spec["items"]
+            if len(items) == 1:
+                return items[0]
+            values = [_definition_constant(item) for item in items]
+            if items and _NO_VALUE not in values and isinstance(spec.get("separator", ""), str):
+                return quote_string(spec.get("separator", "").join(_to_string(v) for v in values if v is not None))
+        elif name == "RENDER()":
+            template = spec.get("template")
+            if isinstance(template, str) and not _PLACEHOLDER_RE.search(template):
+                return quote_string(template)
+        return _NO_VALUE
+
+
+def _definition_constant(definition: Any) -> Any:
+    """Value of a constant mapper definition (literal expression or YAML scalar), else _NO_VALUE."""
+    if isinstance(definition, str):
+        try:
+            return _constant(parse_expression(definition))
+        except BenderSyntaxError:
+            return _NO_VALUE
+    if definition is None or isinstance(definition, (bool, int, float)):
+        return definition
+    return _NO_VALUE
+
+
+def simplify_document(document: Any) -> Tuple[Any, int]:
+    """
+    Simplify the Bender expressions of a CompoundAction or its YAML dictionary.
+
+    Returns:
+        (simplified copy of the YAML dictionary, number of rewritten expressions)
+    """
+    simplifier = DocumentSimplifier()
+    simplified = simplifier.simplify(document)
+    return simplified, simplifier.rewrites
@@ -0,0 +1,704 @@
+"""
+Type inference for Bender expressions against a data schema.
+
+A schema is a tree of SchemaNodes, each holding the union of JSON types a
+value can take, the fields of objects and the item schema of arrays. It
+can be built from JSONAnalyzer suggestions (merged suggestions contribute
+the union of the types seen across documents and nullability for paths
+missing from some documents) and from the ``output_key``s produced by the
+earlier steps of a Compound Action.
+
+The checker infers the result type of an expression and reports errors
+that would otherwise surface only at runtime: MAP()/FILTER() over a value
+that is not an array, paths missing from the schema, arithmetic on strings
+and comparisons that are always false. Results are cached per expression
+text and schema version (a structural fingerprint), so re-checking a
+document after an edit only infers the expressions that changed.
+"""
+
+import difflib
+import re
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+from .linter import LintIssue, _join
+from .parser import (
+    Attribute, BenderSyntaxError, BinaryOp, Call, Index, ListExpr, Literal, MethodCall, Name, Node,
+    UnaryOp, item_variable, node_path, parse_expression
+)
+
+
+# Maximum cached (expression, schema version) results per checker
+TYPE_CACHE_SIZE = 8192
+
+NUMERIC = frozenset({"integer", "number"})
+
+# Result types of helpers and functions
+_STRING_FUNCTIONS = frozenset({"STRING", "TRIM", "LOWER", "LOWERCASE", "UPPER", "UPPERCASE", "TITLECASE",
+                               "REPLACE", "STRIP_HTML"})
+_RETURN_TYPES = {
+    "INTEGER": "integer", "FLOOR": "integer", "CEIL": "integer", "LENGTH": "integer", "LEN": "integer",
+    "DECIMAL": "number", "NUMBER": "number", "ROUND": "number",
+    "CONCAT": "string", "JOIN": "string", "RENDER": "string",
+    "BOOLEAN": "boolean", "STARTS_WITH": "boolean", "ENDS_WITH": "boolean", "CONTAINS": "boolean",
+}
+_ITEM_FUNCTIONS = frozenset({"MAP", "FILTER", "SORT"})
+
+_PATH_SEGMENT_RE = re.compile(r'\[(?:\d+|\*)\]|[^.\[\]]+')
+
+# JSONAnalyzer data types mapped to schema types
+_ANALYZER_TYPES = {"date": "string", "email": "string", "url": "string", "uuid": "string",
+                   "string": "string", "integer": "integer", "number": "number", "boolean": "boolean",
+                   "null": "null", "array": "array", "object": "object"}
+
+
+class SchemaNode:
+    """
+    The type of a value: a union of JSON types with object fields and array items.
+
+    ``open`` objects may have fields beyond the known ones, so missing
+    fields are not reported. Nodes are immutable once built.
+    """
+    __slots__ = ("types", "fields", "items", "open", "_fingerprint")
+
+    def __init__(self, types: Iterable[str], fields: Optional[Dict[str, "SchemaNode"]] = None,
+                 items: Optional["SchemaNode"] = None, open: bool = False):
+        self.types: FrozenSet[str] = frozenset(types)
+        self.fields = fields or {}
+        self.items = items
+        self.open = open or "any" in self.types
+        self._fingerprint = None
+
+    @property
+    def fingerprint(self) -> int:
+        """Structural hash, used as the schema version."""
+        if self._fingerprint is None:
+            self._fingerprint = hash((
+                self.types, self.open,
+                tuple(sorted((name, node.fingerprint) for name, node in self.fields.items())),
+                self.items.fingerprint if self.items is not None else None,
+            ))
+        return self._fingerprint
+
+    @property
+    def is_any(self) -> bool:
+        return "any" in self.types
+
+    def may_be(self, *types: str) -> bool:
+        """Whether the value can have one of ``types`` (always true for any)."""
+        return self.is_any or any(t in self.types for t in types)
+
+    def only(self, types: Iterable[str]) -> bool:
+        """Whether every non-null type of the value is in ``types``."""
+        known = self.types - {"null"}
+        return not self.is_any and bool(known) and known <= set(types)
+
+    def describe(self) -> str:
+        """Human-readable type, e.g. ``array[string]`` or ``integer|null``."""
+        if self.is_any:
+            return "any"
+        names = []
+        for name in sorted(self.types):
+            if name == "array" and self.items is not None and not self.items.is_any:
+                names.append(f"array[{self.items.describe()}]")
+            else:
+                names.append(name)
+        return "|".join(names) or "never"
+
+    def __repr__(self) -> str:
+        return f"SchemaNode({self.describe()})"
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, SchemaNode) and self.fingerprint == other.fingerprint
+
+    def __hash__(self) -> int:
+        return self.fingerprint
+
+
+ANY = SchemaNode({"any"})
+INTEGER = SchemaNode({"integer"})
+BOOLEAN = SchemaNode({"boolean"})
+STRING = SchemaNode({"string"})
+
+
+def array_of(items: SchemaNode) -> SchemaNode:
+    """Return the schema of an array of ``items``."""
+    return SchemaNode({"array"}, items=items)
+
+
+def object_of(fields: Dict[str, SchemaNode], open: bool = False) -> SchemaNode:
+    """Return the schema of an object with ``fields``."""
+    return SchemaNode({"object"}, fields=fields, open=open)
+
+
+def union(*nodes: SchemaNode) -> SchemaNode:
+    """Return the schema of a value that can be any of ``nodes``."""
+    nodes = [node for node in nodes if node is not None]
+    if not nodes:
+        return ANY
+    if len(nodes) == 1:
+        return nodes[0]
+    if any(node.is_any for node in nodes):
+        return ANY
+    fields: Dict[str, SchemaNode] = {}
+    for node in nodes:
+        for name, child in node.fields.items():
+            fields[name] = union(fields[name], child) if name in fields else child
+    items = [node.items for node in nodes if node.items is not None]
+    return SchemaNode(frozenset().union(*(node.types for node in nodes)), fields,
+                      union(*items) if items else None, any(node.open for node in nodes))
+
+
+def nullable(node: SchemaNode) -> SchemaNode:
+    """Return ``node`` allowing null."""
+    if node.is_any or "null" in node.types:
+        return node
+    return SchemaNode(node.types | {"null"}, node.fields, node.items, node.open)
+
+
+class _Builder:
+    """Mutable schema tree used while reading suggestions."""
+    __slots__ = ("types", "fields", "items")
+
+    def __init__(self):
+        self.types = set()
+        self.fields: Dict[str, "_Builder"] = {}
+        self.items: Optional["_Builder"] = None
+
+    def build(self) -> SchemaNode:
+        types = set(self.types)
+        if self.fields:
+            types.add("object")
+        if self.items is not None:
+            types.add("array")
+        fields = {name: child.build() for name, child in self.fields.items()}
+        items = self.items.build() if self.items is not None else None
+        # Objects whose fields were not analyzed (depth limit) stay open
+        return SchemaNode(types or {"any"}, fields, items, open="object" in types and not fields)
+
+
+def _analyzer_type(data_type: str) -> str:
+    if data_type.startswith("array_property[") and data_type.endswith("]"):
+        data_type = data_type[len("array_property["):-1]
+    base = re.sub(r'\[.*\]$', '', data_type)
+    return _ANALYZER_TYPES.get(base, "any")
+
+
+def schema_from_suggestions(suggestions: Iterable[Any]) -> SchemaNode:
+    """
+    Build the schema of a response from JSONAnalyzer suggestions.
+
+    Paths such as ``users``, ``users[0].email`` and ``users[*].email`` are
+    merged into one tree. For merged suggestions the union of the types
+    seen across documents is used, and paths missing from some documents
+    are nullable.
+    """
+    root = _Builder()
+    for suggestion in suggestions:
+        path = suggestion.path
+        if path.endswith(".length") or path == "length":
+            continue
+        node = root
+        for segment in _PATH_SEGMENT_RE.findall(path):
+            if segment.startswith("["):
+                if node.items is None:
+                    node.items = _Builder()
+                node = node.items
+            else:
+                node = node.fields.setdefault(segment, _Builder())
+
+        node.types.add(_analyzer_type(suggestion.data_type))
+        type_counts = getattr(suggestion, "type_counts", None)
+        if type_counts:
+            node.types.update(_ANALYZER_TYPES.get(name, "any") for name in type_counts)
+        total = getattr(suggestion, "total_documents", 0)
+        if total and getattr(suggestion, "document_count", total) < total:
+            node.types.add("null")
+    if not root.fields and root.items is None:
+        return ANY
+    return root.build()
+
+
+def root_schema(data: Optional[Dict[str, SchemaNode]] = None, **roots: SchemaNode) -> SchemaNode:
+    """
+    Return the root scope schema of a Compound Action expression.
+
+    ``data`` maps input arguments and output keys to their schemas;
+    ``meta_info`` and ``requestor`` are open objects. Extra ``roots`` add
+    further top-level names (e.g. a JSON analyzer source name).
+    """
+    fields = {"data": object_of(dict(data or {})),
+              "meta_info": object_of({}, open=True),
+              "requestor": object_of({}, open=True)}
+    fields.update(roots)
+    return object_of(fields)
+
+
+class TypeChecker:
+    """
+    Infers expression types against a schema and reports type errors.
+
+    ``check`` results are cached per expression text, item bindings and
+    schema version; an edited document only re-infers changed expressions.
+    """
+
+    def __init__(self, schema: SchemaNode):
+        self.schema = schema
+        self._cache: Dict[Tuple[str, int, Tuple], Tuple[SchemaNode, Tuple[Tuple[str, str, int], ...]]] = {}
+        self.inferences = 0
+
+    @property
+    def version(self) -> int:
+        """The schema version that cached results belong to."""
+        return self.schema.fingerprint
+
+    def check(self, expression: str, bindings: Optional[Dict[str, SchemaNode]] = None
+              ) -> Tuple[SchemaNode, Tuple[Tuple[str, str, int], ...]]:
+        """
+        Return the inferred type and (severity, message, position) issues of an expression.
+
+        ``bindings`` are loop variables (e.g. ``item`` or a ``for`` step's
+        ``each`` name). Syntax errors are left to the linter: an expression
+        that does not parse has type any and no issues.
+        """
+        bindings = bindings or {}
+        key = (expression, self.version, tuple(sorted((n, s.fingerprint) for n, s in bindings.items())))
+        result = self._cache.get(key)
+        if result is None:
+            if len(self._cache) >= TYPE_CACHE_SIZE:
+                self._cache.pop(next(iter(self._cache)))
+            result = self._cache[key] = self._infer_text(expression, bindings)
+        return result
+
+    def _infer_text(self, expression: str, bindings: Dict[str, SchemaNode]):
+        self.inferences += 1
+        try:
+            tree = parse_expression(expression)
+        except BenderSyntaxError:
+            return ANY, ()
+        issues: List[Tuple[str, str, int]] = []
+        node_type = _Inference(self.schema, issues).infer(tree, bindings, 0)
+        return node_type, tuple(issues)
+
+
+class _Inference:
+    """Type inference over one expression AST."""
+    __slots__ = ("schema", "issues")
+
+    def __init__(self, schema: SchemaNode, issues: List[Tuple[str, str, int]]):
+        self.schema = schema
+        self.issues = issues
+
+    def error(self, message: str, position: int) -> None:
+        self.issues.append(("error", message, position))
+
+    def warning(self, message: str, position: int) -> None:
+        self.issues.append(("warning", message, position))
+
+    def infer(self, node: Node, bindings: Dict[str, SchemaNode], offset: int) -> SchemaNode:
+        if isinstance(node, Literal):
+            value = node.value
+            if value is None:
+                return SchemaNode({"null"})
+            if isinstance(value, bool):
+                return BOOLEAN
+            if isinstance(value, int):
+                return INTEGER
+            if isinstance(value, float):
+                return SchemaNode({"number"})
+            return STRING
+
+        if isinstance(node, Name):
+            if node.name in bindings:
+                return bindings[node.name]
+            field = self.schema.fields.get(node.name)
+            if field is not None:
+                return field
+            if not self.schema.open:
+                # Often literal text that should be quoted, e.g. 'high'
+                self.warning(f"Unknown variable '{node.name}'{_did_you_mean(node.name, self.schema)}",
+                             offset + node.start)
+            return ANY
+
+        if isinstance(node, Attribute):
+            target = self.infer(node.target, bindings, offset)
+            return self.member(target, node.name, node, offset)
+
+        if isinstance(node, Index):
+            target = self.infer(node.target, bindings, offset)
+            index = node.index
+            if isinstance(index, Literal) and isinstance(index.value, str):
+                return self.member(target, index.value, node, offset)
+            self.infer(index, bindings, offset)
+            if target.is_any:
+                return ANY
+            if target.may_be("array"):
+                return target.items or ANY
+            if target.only(("string",)):
+                return STRING
+            if target.only(("object",)):
+                return ANY
+            self.error(f"Cannot index {target.describe()}", offset + node.start)
+            return ANY
+
+        if isinstance(node, ListExpr):
+            items = [self.infer(item, bindings, offset) for item in node.items]
+            return array_of(union(*items) if items else ANY)
+
+        if isinstance(node, UnaryOp):
+            operand = self.infer(node.operand, bindings, offset)
+            if node.op == "not":
+                return BOOLEAN
+            if not operand.is_any and not operand.may_be("integer", "number"):
+                self.error(f"Arithmetic on {operand.describe()}: cannot negate", offset + node.start)
+                return ANY
+            return SchemaNode(operand.types & NUMERIC or {"number"})
+
+        if isinstance(node, BinaryOp):
+            return self.binary(node, bindings, offset)
+
+        if isinstance(node, MethodCall):
+            target = self.infer(node.target, bindings, offset)
+            args = [self.infer(arg, bindings, offset) for arg in node.args]
+            return self.function(node.name, [target] + args, node, offset)
+
+        if isinstance(node, Call):
+            name = node.name.upper()
+            if name in _ITEM_FUNCTIONS and node.args:
+                return self.item_function(node, bindings, offset)
+            args = [self.infer(arg, bindings, offset) for arg in node.args]
+            if name in ("IF", "CONDITIONAL"):
+                return union(*args[1:3]) if len(args) > 1 else ANY
+            if name == "COALESCE":
+                return union(*args)
+            if name == "EXTRACT":
+                return nullable(STRING)
+            if name == "CONCAT" and not node.dollar:
+                return STRING
+            return self.function(node.name, args, node, offset)
+
+        return ANY
+
+    def member(self, target: SchemaNode, name: str, node: Node, offset: int) -> SchemaNode:
+        """Type of ``target.name``."""
+        if target.is_any:
+            return ANY
+        # Point at the member name rather than the start of the path
+        position = offset + (node.end - len(name) if isinstance(node, Attribute) else node.start)
+        if name == "length" and target.may_be("array", "string"):
+            return INTEGER
+        if target.may_be("object"):
+            field = target.fields.get(name)
+            if field is not None:
+                return nullable(field) if "null" in target.types else field
+            if not target.open:
+                path = node_path(node) or name
+                self.error(f"Unknown path '{path}'{_did_you_mean(name, target)}", position)
+            return ANY
+        if name.isdigit() and target.may_be("array"):
+            return target.items or ANY
+        if target.types <= {"null"}:
+            return ANY
+        self.error(f"Cannot access '.{name}' on {target.describe()}", position)
+        return ANY
+
+    def binary(self, node: BinaryOp, bindings: Dict[str, SchemaNode], offset: int) -> SchemaNode:
+        left = self.infer(node.left, bindings, offset)
+        right = self.infer(node.right, bindings, offset)
+        op, position = node.op, offset + node.start
+
+        if op in ("and", "or", "==", "!=", "in"):
+            return BOOLEAN
+        if op in ("<", "<=", ">", ">="):
+            if (left.only(("string",)) and right.only(NUMERIC)) or (left.only(NUMERIC) and right.only(("string",))):
+                self.warning(f"Comparing {left.describe()} with {right.describe()} is always false; "
+                             f"convert with $INTEGER() or $DECIMAL()", position)
+            return BOOLEAN
+
+        if op == "+" and left.only(("string",)) and right.only(("string",)):
+            return STRING
+        for side in (left, right):
+            if not side.is_any and not side.may_be("integer", "number"):
+                hint = "; use CONCAT() or $INTEGER()" if side.may_be("string") else ""
+                self.error(f"Arithmetic '{op}' on {side.describe()}{hint}", position)
+                return ANY
+        if op == "/":
+            return SchemaNode({"number"})
+        if left.only(("integer",)) and right.only(("integer",)):
+            return INTEGER
+        return SchemaNode({"number"})
+
+    def function(self, name: str, args: List[SchemaNode], node: Node, offset: int) -> SchemaNode:
+        """Result type of a helper call, checking scalar helpers are not given containers."""
+        upper = name.upper()
+        first = args[0] if args else ANY
+        if (upper in _STRING_FUNCTIONS or upper in ("INTEGER", "DECIMAL", "NUMBER")) and \
+                first.only(("array", "object")):
+            self.error(f"{name}() expects a scalar, got {first.describe()}", offset + node.start)
+        if upper in _STRING_FUNCTIONS:
+            return STRING
+        if upper in _RETURN_TYPES:
+            return SchemaNode({_RETURN_TYPES[upper]})
+        if upper == "SPLIT":
+            return array_of(STRING)
+        if upper == "FLATTEN":
+            return array_of(first.items.items if first.items is not None and first.items.items else ANY)
+        return ANY
+
+    def item_function(self, node: Call, bindings: Dict[str, SchemaNode], offset: int) -> SchemaNode:
+        """MAP/FILTER/SORT: check the items are iterable and infer the per-item expression."""
+        items = self.infer(node.args[0], bindings, offset)
+        item = self.iterated(items, f"{node.name}()", offset + node.start)
+
+        result = None
+        if len(node.args) > 1:
+            argument = node.args[1]
+            if isinstance(argument, Literal) and isinstance(argument.value, str):
+                try:
+                    tree = parse_expression(argument.value)
+                except BenderSyntaxError:
+                    tree = None
+                if tree is not None:
+                    variable = item_variable(tree)
+                    inner = dict(bindings, item=item, loop=_LOOP)
+                    if variable:
+                        inner[variable] = item
+                    # The expression starts after the opening quote of the literal
+                    result = self.infer(tree, inner, offset + argument.start + 1)
+            else:
+                result = self.infer(argument, dict(bindings, item=item, loop=_LOOP), offset)
+            for extra in node.args[2:]:
+                self.infer(extra, bindings, offset)
+
+        if node.name.upper() == "MAP":
+            return array_of(result or ANY)
+        return array_of(item)
+
+    def iterated(self, items: SchemaNode, label: str, position: int) -> SchemaNode:
+        """Item type of an iterated value, reporting values that cannot be iterated."""
+        item, problem = item_type(items, label)
+        if problem:
+            self.error(problem, position)
+        return item
+
+
+def item_type(items: SchemaNode, label: str = "MAP()") -> Tuple[SchemaNode, Optional[str]]:
+    """Return the item type of an iterated value and an error message if it cannot be iterated."""
+    if items.is_any:
+        return ANY, None
+    if not items.may_be("array", "object"):
+        return ANY, f"{label} over a non-array: {items.describe()}"
+    if items.only(("array",)):
+        return items.items or ANY, None
+    return ANY, None
+
+
+_LOOP = object_of({"index0": INTEGER, "index1": INTEGER, "key": SchemaNode({"integer", "string"})})
+
+
+def _did_you_mean(name: str, node: SchemaNode) -> str:
+    matches = difflib.get_close_matches(name, list(node.fields), n=1)
+    return f" (did you mean '{matches[0]}'?)" if matches else ""
+
+
+def check_compound_action(document: Any, output_schemas: Optional[Dict[str, SchemaNode]] = None,
+                          input_schemas: Optional[Dict[str, SchemaNode]] = None,
+                          checker_cache: Optional[Dict[int, TypeChecker]] = None,
+                          file: Optional[str] = None) -> List[LintIssue]:
+    """
+    Type check every expression of a Compound Action.
+
+    Steps are walked in order; each expression sees ``data.<key>`` for the
+    compound action's input arguments and for the output keys of the steps
+    before it (typed by ``output_schemas`` when given, open objects
+    otherwise). ``for`` variables are bound to the item type of their
+    iterable. Pass the same ``checker_cache`` dict across calls to reuse
+    results for unchanged expressions after an edit.
+    """
+    if hasattr(document, "to_yaml_dict"):
+        document = document.to_yaml_dict()
+    if not isinstance(document, dict):
+        return []
+
+    data: Dict[str, SchemaNode] = {}
+    for name in document.get("input_args") or {}:
+        data[name] = (input_schemas or {}).get(name, ANY)
+    walker = _DocumentWalker(output_schemas or {}, checker_cache if checker_cache is not None else {}, file)
+    steps = document["steps"] if "steps" in document else [document]
+    walker.steps(steps, "steps" if "steps" in document else "", data, {})
+    return walker.issues
+
+
+class _DocumentWalker:
+    """Walks steps in execution order, tracking the output keys available to each expression."""
+
+    def __init__(self, output_schemas: Dict[str, SchemaNode], checkers: Dict[int, TypeChecker],
+                 file: Optional[str]):
+        self.output_schemas = output_schemas
+        self.checkers = checkers
+        self.file = file
+        self.issues: List[LintIssue] = []
+
+    def checker(self, data: Dict[str, SchemaNode]) -> TypeChecker:
+        schema = root_schema(data)
+        checker = self.checkers.get(schema.fingerprint)
+        if checker is None:
+            checker = self.checkers[schema.fingerprint] = TypeChecker(schema)
+        return checker
+
+    def expression(self, text: str, path: str, data, bindings, offset: int = 0) -> SchemaNode:
+        node_type, issues = self.checker(data).check(text, bindings)
+        for severity, message, position in issues:
+            self.issues.append(LintIssue(path, text, message, offset + position, severity, self.file))
+        return node_type
+
+    def steps(self, steps: Any, path: str, data: Dict[str, SchemaNode], bindings) -> Dict[str, SchemaNode]:
+        """Check a step list; return ``data`` extended with the outputs of the steps."""
+        if isinstance(steps, dict):
+            steps = [steps]
+        if not isinstance(steps, list):
+            return data
+        data = dict(data)
+        for index, step in enumerate(steps):
+            if isinstance(step, dict):
+                here = f"{path}[{index}]" if path else ""
+                data = self.step(step, here, data, bindings)
+        return data
+
+    def step(self, step: Dict[str, Any], path: str, data, bindings) -> Dict[str, SchemaNode]:
+        for kind, body in step.items():
+            if not isinstance(body, dict):
+                continue
+            here = _join(path, kind)
+            if kind in ("action", "script"):
+                self.mapper(body.get("input_args"), f"{here}.input_args", data, bindings)
+                for unit, value in (body.get("delay_config") or {}).items():
+                    if isinstance(value, str):
+                        self.expression(value, f"{here}.delay_config.{unit}", data, bindings)
+                if isinstance(body.get("output_key"), str):
+                    data = dict(data, **{body["output_key"]: self.output_schemas.get(
+                        body["output_key"], ANY if kind == "script" else object_of({}, open=True))})
+            elif kind == "for" or (kind == "parallel" and isinstance(body.get("for"), dict)):
+                loop = body if kind == "for" else body["for"]
+                data = self.loop(loop, here if kind == "for" else f"{here}.for", data, bindings)
+            elif kind == "parallel":
+                branches = [self.steps(branch.get("steps"), f"{here}.branches[{i}].steps", data, bindings)
+                            for i, branch in enumerate(body.get("branches") or []) if isinstance(branch, dict)]
+                data = _merge_outputs(data, branches, optional=False)
+            elif kind == "switch":
+                outcomes = []
+                for index, case in enumerate(body.get("cases") or []):
+                    if not isinstance(case, dict):
+                        continue
+                    case_path = f"{here}.cases[{index}]"
+                    if isinstance(case.get("condition"), str):
+                        self.expression(case["condition"], f"{case_path}.condition", data, bindings)
+                    outcomes.append(self.steps(case.get("steps"), f"{case_path}.steps", data, bindings))
+                default = body.get("default")
+                if isinstance(default, dict):
+                    outcomes.append(self.steps(default.get("steps"), f"{here}.default.steps", data, bindings))
+                elif default is not None:
+                    outcomes.append(self.steps(default, f"{here}.default", data, bindings))
+                data = _merge_outputs(data, outcomes, optional=True)
+            elif kind == "try_catch":
+                outcomes = [self.steps(body[block].get("steps"), f"{here}.{block}.steps", data, bindings)
+                            for block in ("try", "catch") if isinstance(body.get(block), dict)]
+                data = _merge_outputs(data, outcomes, optional=True)
+            elif kind == "return":
+                self.mapper(body.get("output_mapper"), f"{here}.output_mapper", data, bindings)
+        return data
+
+    def loop(self, loop: Dict[str, Any], path: str, data, bindings) -> Dict[str, SchemaNode]:
+        item = ANY
+        if isinstance(loop.get("in"), str):
+            iterable = self.expression(loop["in"], f"{path}.in", data, bindings)
+            item, problem = item_type(iterable, "for loop")
+            if problem:
+                self.issues.append(LintIssue(f"{path}.in", loop["in"], problem, 0, "error", self.file))
+        inner = dict(bindings)
+        if isinstance(loop.get("each"), str):
+            inner[loop["each"]] = item
+        for key in ("index", "index_key"):
+            if isinstance(loop.get(key), str):
+                inner[loop[key]] = INTEGER
+        self.steps(loop.get("steps"), f"{path}.steps", data, inner)
+        if isinstance(loop.get("output_key"), str):
+            data = dict(data, **{loop["output_key"]: array_of(ANY)})
+        return data
+
+    def mapper(self, value: Any, path: str, data, bindings) -> None:
+        """Check the expressions of an input_args or output_mapper value."""
+        if isinstance(value, str):
+            self.expression(value, path, data, bindings)
+        elif isinstance(value, list):
+            for index, item in enumerate(value):
+                self.mapper(item, f"{path}[{index}]", data, bindings)
+        elif isinstance(value, dict):
+            if len(value) == 1 and str(next(iter(value))).upper().endswith("()"):
+                (operator, spec), = value.items()
+                self.operator(operator.upper(), spec, _join(path, operator), data, bindings)
+                return
+            for key, item in value.items():
+                self.mapper(item, _join(path, key), data, bindings)
+
+    def operator(self, operator: str, spec: Any, path: str, data, bindings) -> None:
+        if not isinstance(spec, dict):
+            self.mapper(spec, path, data, bindings)
+            return
+        inner = bindings
+        if operator in ("MAP()", "FILTER()", "SORT()", "COALESCE()") and isinstance(spec.get("items"), str):
+            items = self.expression(spec["items"], f"{path}.items", data, bindings)
+            item, problem = item_type(items, operator)
+            if problem:
+                self.issues.append(LintIssue(f"{path}.items", spec["items"], problem, 0, "error", self.file))
+            inner = dict(bindings, item=item, loop=_LOOP)
+        for key, value in spec.items():
+            if key == "items" and inner is not bindings:
+                continue
+            if (operator, key) in (("CONCAT()", "separator"), ("SORT()", "desc")):
+                continue
+            if operator == "RENDER()" and key == "template" and isinstance(value, str):
+                for match in re.finditer(r'\{\{\s*(.*?)\s*\}\}', value):
+                    self.expression(match.group(1), _join(path, key), data, bindings, match.start(1))
+                continue
+            self.mapper(value, _join(path, key), data, inner)
+
+
+def _merge_outputs(data: Dict[str, SchemaNode], outcomes: List[Dict[str, SchemaNode]],
+                   optional: bool) -> Dict[str, SchemaNode]:
+    """
+    Add the output keys of alternative (optional) or concurrent branches to ``data``.
+
+    A key set by several branches can have the schema of any of them; after
+    alternative branches it may also keep its earlier schema, or be unset.
+    """
+    merged = dict(data)
+    names = dict.fromkeys(name for outcome in outcomes for name in outcome)
+    for name in names:
+        assigned = [outcome[name] for outcome in outcomes
+                    if name in outcome and outcome[name] is not data.get(name)]
+        if not assigned:
+            continue
+        if optional and name in data:
+            assigned.append(data[name])
+        node = _union_alternatives(assigned)
+        merged[name] = nullable(node) if optional and name not in data else node
+    return merged
+
+
+def _union_alternatives(nodes: List[SchemaNode]) -> SchemaNode:
+    """Union the schemas of alternative values; object fields missing from some of them may be null."""
+    node = union(*nodes)
+    objects = [n for n in nodes if "object" in n.types]
+    if node.is_any or len(objects) < 2:
+        return node
+    fields = {name: child if all(name in n.fields for n in objects) else nullable(child)
+              for name, child in node.fields.items()}
+    return SchemaNode(node.types, fields, node.items, node.open)
+
+
+def iter_type_issues(documents: Iterable[Tuple[str, Any]],
+                     output_schemas: Optional[Dict[str, SchemaNode]] = None) -> Iterator[LintIssue]:
+    """Type check several (file name, document) pairs, sharing caches across them."""
+    checkers: Dict[int, TypeChecker] = {}
+    for file, document in documents:
+        yield from check_compound_action(document, output_schemas, checker_cache=checkers, file=file)
@@ -5,11 +5,17 @@ This module provides catalogs and reference information for creating
 compound actions, including built-in actions and common patterns.
 """
 
-from .builtin_actions import BuiltinActionCatalog, BuiltinAction, ActionParameter, builtin_catalog
+from .builtin_actions import BuiltinActionCatalog, BuiltinAction, ActionParameter, ActionPerformance, builtin_catalog
+from .providers import CatalogProvider, CatalogFileProvider, DirectoryProvider, SQLiteProvider
 
 __all__ = [
     "BuiltinActionCatalog",
     "BuiltinAction", 
     "ActionParameter",
-    "builtin_catalog"
+    "ActionPerformance",
+    "builtin_catalog",
+    "CatalogProvider",
+    "CatalogFileProvider",
+    "DirectoryProvider",
+    "SQLiteProvider"
 ]
@@ -0,0 +1,189 @@
+"""
+Performance profiles of catalog actions.
+
+A profile file records how actions behave in production: latency, the
+connector each action calls with its rate limit and concurrency cap,
+whether the action is idempotent or read-only, and the size class of its
+payloads::
+
+    {
+      "version": 1,
+      "connectors": {"itsm": {"rate_limit_rps": 10, "max_concurrency": 5}},
+      "actions": {
+        "mw.create_ticket": {"connector": "itsm", "typical_latency_ms": 800,
+                             "p99_latency_ms": 3200, "idempotent": false,
+                             "read_only": false, "payload_size": "small"}
+      }
+    }
+
+Connector limits apply to every action of the connector unless the action
+overrides them. The packaged profile (``catalog/profiles/builtin_actions.json``)
+can be extended or replaced by files listed in ``$MOVEWORKS_WIZARD_PROFILE_PATH``.
+
+Regenerate the measured fields from production call logs, JSON Lines with
+``action``, ``latency_ms`` and optionally ``response_bytes`` per call,
+keeping connectors and flags from an existing profile::
+
+    python -m moveworks_wizard.catalog.action_profiles calls.jsonl \\
+        --base src/moveworks_wizard/catalog/profiles/builtin_actions.json -o profile.json
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import warnings
+from dataclasses import fields
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from .builtin_actions import CATALOG_DIR, ActionPerformance
+
+
+PROFILE_VERSION = 1
+
+# Packaged profile of the built-in actions
+DEFAULT_PROFILE_PATH = CATALOG_DIR / "profiles" / "builtin_actions.json"
+
+# Extra profile files, separated by os.pathsep; later files take precedence
+PROFILE_PATH_ENV = "MOVEWORKS_WIZARD_PROFILE_PATH"
+
+# Upper bounds (bytes) of the payload size classes below "large"
+PAYLOAD_SIZE_CLASSES = (("small", 10_000), ("medium", 1_000_000))
+
+_PERFORMANCE_FIELDS = {field.name for field in fields(ActionPerformance)}
+_CONNECTOR_FIELDS = ("rate_limit_rps", "max_concurrency")
+
+
+def default_profile_files() -> List[Path]:
+    """Return the packaged profile followed by those listed in $MOVEWORKS_WIZARD_PROFILE_PATH."""
+    files = [DEFAULT_PROFILE_PATH]
+    files.extend(Path(entry) for entry in os.environ.get(PROFILE_PATH_ENV, "").split(os.pathsep) if entry)
+    return files
+
+
+def payload_size_class(size: float) -> str:
+    """Return the size class of a payload of the given number of bytes."""
+    for name, limit in PAYLOAD_SIZE_CLASSES:
+        if size < limit:
+            return name
+    return "large"
+
+
+def parse_profile(profile: Dict[str, Any]) -> Dict[str, ActionPerformance]:
+    """
+    Resolve the actions of a profile, with their connector limits, to ActionPerformance objects.
+
+    Raises:
+        ValueError: If the profile has an unknown version or unknown fields
+    """
+    if not isinstance(profile, dict):
+        raise ValueError("a profile must be an object")
+    if profile.get("version", PROFILE_VERSION) != PROFILE_VERSION:
+        raise ValueError(f"unsupported profile version: {profile.get('version')}")
+    connectors = profile.get("connectors", {})
+    performances = {}
+    for name, entry in profile.get("actions", {}).items():
+        if not isinstance(entry, dict):
+            raise ValueError(f"the profile of {name} must be an object")
+        unknown = set(entry) - _PERFORMANCE_FIELDS
+        if unknown:
+            raise ValueError(f"unknown fields for {name}: {', '.join(sorted(unknown))}")
+        values = {key: value for key, value in connectors.get(entry.get("connector"), {}).items()
+                  if key in _CONNECTOR_FIELDS}
+        values.update(entry)
+        try:
+            performances[name] = ActionPerformance(**values)
+        except TypeError as e:
+            raise ValueError(f"invalid profile for {name}: {e}") from e
+    return performances
+
+
+def load_profiles(paths: Iterable[Union[str, Path]]) -> Dict[str, ActionPerformance]:
+    """
+    Load profile files, later files overriding actions of earlier ones.
+
+    Missing files are skipped; unreadable or invalid files are skipped with a RuntimeWarning.
+    """
+    performances: Dict[str, ActionPerformance] = {}
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                performances.update(parse_profile(json.load(f)))
+        except FileNotFoundError:
+            continue
+        except (OSError, ValueError) as e:
+            warnings.warn(f"skipping performance profile {path}: {e}", RuntimeWarning, stacklevel=2)
+    return performances
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    rank = max(1, math.ceil(percentile / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def build_profile(records: Iterable[Dict[str, Any]],
+                  base: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Build a profile from call records.
+
+    Each record names an ``action`` and its ``latency_ms``, optionally with
+    ``response_bytes``. Latencies and payload size classes are measured from
+    the records; connectors, limits and flags are kept from base.
+    """
+    latencies: Dict[str, List[float]] = {}
+    sizes: Dict[str, List[float]] = {}
+    for record in records:
+        name = record.get("action")
+        if not name or record.get("latency_ms") is None:
+            continue
+        latencies.setdefault(name, []).append(float(record["latency_ms"]))
+        if record.get("response_bytes") is not None:
+            sizes.setdefault(name, []).append(float(record["response_bytes"]))
+
+    base = base or {}
+    actions = {name: dict(entry) for name, entry in base.get("actions", {}).items()}
+    for name, values in latencies.items():
+        values.sort()
+        entry = actions.setdefault(name, {})
+        entry["typical_latency_ms"] = round(_percentile(values, 50), 1)
+        entry["p99_latency_ms"] = round(_percentile(values, 99), 1)
+        if name in sizes:
+            entry["payload_size"] = payload_size_class(_percentile(sorted(sizes[name]), 50))
+    return {
+        "version": PROFILE_VERSION,
+        "connectors": base.get("connectors", {}),
+        "actions": {name: actions[name] for name in sorted(actions)},
+    }
+
+
+def _read_records(path: str) -> Iterable[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build an action performance profile from call logs.")
+    parser.add_argument("logs", nargs="+", help="JSON Lines call logs")
+    parser.add_argument("--base", help="Existing profile to keep connectors and flags from")
+    parser.add_argument("--output", "-o", help="Output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    base = None
+    if args.base:
+        with open(args.base, "r", encoding="utf-8") as f:
+            base = json.load(f)
+    records = (record for path in args.logs for record in _read_records(path))
+    text = json.dumps(build_profile(records, base), indent=2) + "\n"
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    else:
+        sys.stdout.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,42 @@ Built-in action catalog for Moveworks Compound Actions.
 
 This module provides a comprehensive catalog of built-in Moveworks actions
 with their expected input arguments and descriptions.
+
+Action definitions live in packaged data files (``catalog/*.json``), each
+with a precompiled index (see catalog_index). Nothing is read when the
+catalog is created; on first use only the indexes are loaded, and an
+action is parsed into a BuiltinAction the first time it is requested, so
+startup does not depend on the size of the catalog.
+
+Organization-specific actions come from further providers (see providers):
+catalog data files, directories of JSON or YAML definitions and SQLite
+databases, listed in ``$MOVEWORKS_WIZARD_CATALOG_PATH`` or added with
+add_provider(). refresh() re-reads only the sources whose files changed and
+re-indexes only the actions that changed.
+
+Lookups by category and search go through indexes built on first use and
+updated as actions are added or removed: a category map (from the catalog
+indexes, without parsing actions) and a CatalogSearchIndex.
 """
 
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+import os
+from itertools import repeat
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Any, Optional, Union
+from dataclasses import dataclass, replace
+
+from .search_index import FIELD_PARAMETER, FIELD_TEXT, CatalogSearchIndex
+
+if TYPE_CHECKING:
+    from .providers import CatalogProvider
+
+
+# Directory of the packaged catalog data files
+CATALOG_DIR = Path(__file__).parent
+
+# Extra catalog sources (catalog data files, definition directories or
+# SQLite databases), separated by os.pathsep
+CATALOG_PATH_ENV = "MOVEWORKS_WIZARD_CATALOG_PATH"
 
 
 @dataclass
@@ -19,6 +51,44 @@ class ActionParameter:
     example: Optional[str] = None
 
 
+@dataclass
+class ActionPerformance:
+    """
+    Operational profile of an action, as measured in production.
+    
+    Rate limits and concurrency caps usually belong to the connector the
+    action calls, so actions sharing a connector share its limits.
+    """
+    typical_latency_ms: Optional[float] = None
+    p99_latency_ms: Optional[float] = None
+    connector: Optional[str] = None
+    rate_limit_rps: Optional[float] = None
+    max_concurrency: Optional[int] = None
+    idempotent: Optional[bool] = None
+    read_only: Optional[bool] = None
+    payload_size: Optional[str] = None  # "small", "medium" or "large"
+    
+    def summary(self) -> str:
+        """Describe the profile in one line, e.g. for wizard prompts."""
+        parts = []
+        if self.typical_latency_ms is not None:
+            latency = f"typical latency {format_duration(self.typical_latency_ms / 1000)}"
+            if self.p99_latency_ms is not None:
+                latency += f" (p99 {format_duration(self.p99_latency_ms / 1000)})"
+            parts.append(latency)
+        if self.rate_limit_rps is not None:
+            parts.append(f"{self.connector or 'connector'} limited to {self.rate_limit_rps:g} rps")
+        if self.max_concurrency is not None:
+            parts.append(f"at most {self.max_concurrency} concurrent calls")
+        if self.read_only:
+            parts.append("read-only")
+        if self.idempotent is not None:
+            parts.append("safe to retry" if self.idempotent else "not safe to retry")
+        if self.payload_size:
+            parts.append(f"{self.payload_size} payloads")
+        return ", ".join(parts)
+
+
 @dataclass
 class BuiltinAction:
     """Represents a built-in Moveworks action."""
@@ -27,6 +97,46 @@ class BuiltinAction:
     category: str
     parameters: List[ActionParameter]
     example_usage: Optional[str] = None
+    performance: Optional[ActionPerformance] = None
+
+
+def format_duration(seconds: float) -> str:
+    """Format a duration as ms, s, min or h."""
+    if seconds < 1:
+        return f"{seconds * 1000:.0f} ms"
+    if seconds < 60:
+        return f"{seconds:.1f} s"
+    if seconds < 3600:
+        return f"{seconds / 60:.1f} min"
+    return f"{seconds / 3600:.1f} h"
+
+
+def default_catalog_files() -> List[Path]:
+    """Return the packaged catalog data files."""
+    return sorted(CATALOG_DIR.glob("*.json"))
+
+
+def default_catalog_providers() -> List["CatalogProvider"]:
+    """
+    Return providers for the packaged catalog data files followed by those
+    for the entries of $MOVEWORKS_WIZARD_CATALOG_PATH: catalog data files,
+    directories of JSON or YAML definitions and SQLite databases.
+    """
+    from .providers import CatalogFileProvider, provider_for_path
+    providers: List["CatalogProvider"] = [CatalogFileProvider(path) for path in default_catalog_files()]
+    for entry in os.environ.get(CATALOG_PATH_ENV, "").split(os.pathsep):
+        if entry:
+            providers.append(provider_for_path(entry))
+    return providers
+
+
+def action_from_dict(data: Dict[str, Any]) -> BuiltinAction:
+    """Create a BuiltinAction from its catalog data file representation."""
+    fields = dict(data)
+    fields["parameters"] = [ActionParameter(**parameter) for parameter in data.get("parameters", [])]
+    if isinstance(data.get("performance"), dict):
+        fields["performance"] = ActionPerformance(**data["performance"])
+    return BuiltinAction(**fields)
 
 
 class BuiltinActionCatalog:
@@ -37,574 +147,229 @@ class BuiltinActionCatalog:
     and usage examples for the wizard.
     """
     
-    def __init__(self):
-        """Initialize the catalog with built-in actions."""
-        self._actions = self._load_builtin_actions()
-    
-    def _load_builtin_actions(self) -> Dict[str, BuiltinAction]:
-        """Load the catalog of built-in actions."""
-        actions = {}
-        
-        # Communication actions
-        actions["mw.send_plaintext_chat_notification"] = BuiltinAction(
-            name="mw.send_plaintext_chat_notification",
-            description="Send a plain text chat notification to a user",
-            category="Communication",
-            parameters=[
-                ActionParameter(
-                    name="user_record_id",
-                    type="string",
-                    required=True,
-                    description="The record ID of the user to notify",
-                    example="data.user_info.record_id"
-                ),
-                ActionParameter(
-                    name="message",
-                    type="string", 
-                    required=True,
-                    description="The message to send",
-                    example="Your request has been processed successfully."
-                )
-            ],
-            example_usage="Send notifications to users about request status"
-        )
-        
-        actions["mw.send_rich_chat_notification"] = BuiltinAction(
-            name="mw.send_rich_chat_notification",
-            description="Send a rich formatted chat notification with cards and buttons",
-            category="Communication",
-            parameters=[
-                ActionParameter(
-                    name="user_record_id",
-                    type="string",
-                    required=True,
-                    description="The record ID of the user to notify",
-                    example="data.user_info.record_id"
-                ),
-                ActionParameter(
-                    name="card_content",
-                    type="object",
-                    required=True,
-                    description="Rich card content with formatting",
-                    example="data.formatted_card"
-                )
-            ],
-            example_usage="Send formatted notifications with interactive elements"
-        )
-        
-        # User management actions
-        actions["mw.get_user_details"] = BuiltinAction(
-            name="mw.get_user_details",
-            description="Retrieve detailed information about a user",
-            category="User Management",
-            parameters=[
-                ActionParameter(
-                    name="user_id",
-                    type="string",
-                    required=True,
-                    description="The user ID to look up",
-                    example="data.employee_id"
-                )
-            ],
-            example_usage="Get user information for processing requests"
-        )
-        
-        actions["mw.update_user_profile"] = BuiltinAction(
-            name="mw.update_user_profile",
-            description="Update user profile information",
-            category="User Management",
-            parameters=[
-                ActionParameter(
-                    name="user_record_id",
-                    type="string",
-                    required=True,
-                    description="The record ID of the user to update",
-                    example="data.user_info.record_id"
-                ),
-                ActionParameter(
-                    name="profile_updates",
-                    type="object",
-                    required=True,
-                    description="Object containing profile fields to update",
-                    example="data.profile_changes"
-                )
-            ],
-            example_usage="Update user information in the system"
-        )
-        
-        # Ticket management actions
-        actions["mw.create_ticket"] = BuiltinAction(
-            name="mw.create_ticket",
-            description="Create a new support ticket",
-            category="Ticket Management",
-            parameters=[
-                ActionParameter(
-                    name="title",
-                    type="string",
-                    required=True,
-                    description="The ticket title",
-                    example="data.issue_summary"
-                ),
-                ActionParameter(
-                    name="description",
-                    type="string",
-                    required=True,
-                    description="Detailed description of the issue",
-                    example="data.issue_details"
-                ),
-                ActionParameter(
-                    name="requestor_id",
-                    type="string",
-                    required=True,
-                    description="ID of the user requesting support",
-                    example="meta_info.requestor.employee_id"
-                ),
-                ActionParameter(
-                    name="priority",
-                    type="string",
-                    required=False,
-                    description="Ticket priority level",
-                    example="Medium"
-                )
-            ],
-            example_usage="Create tickets for issues that require manual intervention"
-        )
+    def __init__(self, catalog_files: Optional[Iterable[Union[str, Path]]] = None,
+                 providers: Optional[Iterable["CatalogProvider"]] = None,
+                 profile_files: Optional[Iterable[Union[str, Path]]] = None):
+        """
+        Initialize the catalog; no source is read until first use.
         
-        actions["mw.update_ticket_status"] = BuiltinAction(
-            name="mw.update_ticket_status",
-            description="Update the status of an existing ticket",
-            category="Ticket Management",
-            parameters=[
-                ActionParameter(
-                    name="ticket_id",
-                    type="string",
-                    required=True,
-                    description="The ID of the ticket to update",
-                    example="data.ticket_number"
-                ),
-                ActionParameter(
-                    name="status",
-                    type="string",
-                    required=True,
-                    description="New status for the ticket",
-                    example="Resolved"
-                ),
-                ActionParameter(
-                    name="resolution_notes",
-                    type="string",
-                    required=False,
-                    description="Notes about the resolution",
-                    example="data.resolution_summary"
-                )
-            ],
-            example_usage="Update ticket status when issues are resolved"
-        )
+        Args:
+            catalog_files: Catalog data files
+            providers: Further catalog providers, after the catalog files
+            profile_files: Performance profiles of the actions
+                (default: action_profiles.default_profile_files())
+                
+        Later sources override actions of earlier ones. Without either
+        argument the catalog uses default_catalog_providers().
+        """
+        self._catalog_files = [Path(p) for p in catalog_files] if catalog_files is not None else None
+        self._extra_providers = list(providers) if providers is not None else None
+        self._providers: Optional[List["CatalogProvider"]] = None
+        self._profile_files = [Path(p) for p in profile_files] if profile_files is not None else None
+        self._profiles: Optional[Dict[str, ActionPerformance]] = None
+        # Number of the last provider defining each action, built on first use
+        self._owners: Optional[Dict[str, int]] = None
+        # Actions added at runtime, which override every provider
+        self._added: Dict[str, BuiltinAction] = {}
+        # Lookup indexes, built on first use
+        self._categories: Optional[Dict[str, Dict[str, None]]] = None
+        self._indexed_categories: Dict[str, str] = {}
+        self._sorted_categories: Optional[List[str]] = None
+        self._search_index: Optional[CatalogSearchIndex] = None
+        self._order: Dict[str, int] = {}
+    
+    @property
+    def providers(self) -> List["CatalogProvider"]:
+        """The sources of the catalog, in increasing precedence."""
+        if self._providers is None:
+            if self._catalog_files is None and self._extra_providers is None:
+                self._providers = default_catalog_providers()
+            else:
+                from .providers import CatalogFileProvider
+                self._providers = [CatalogFileProvider(path) for path in self._catalog_files or ()]
+                self._providers.extend(self._extra_providers or ())
+        return self._providers
+    
+    def _index(self) -> Dict[str, int]:
+        """Load every provider on first use."""
+        if self._owners is None:
+            owners: Dict[str, int] = {}
+            for number, provider in enumerate(self.providers):
+                provider.refresh()
+                owners.update(zip(provider.names(), repeat(number)))
+            self._owners = owners
+        return self._owners
+    
+    def add_provider(self, provider: "CatalogProvider") -> None:
+        """Add a source overriding the current ones."""
+        self.providers.append(provider)
+        if self._owners is not None:
+            for name in provider.refresh().updated:
+                self._reindex(name)
+    
+    def refresh(self) -> List[str]:
+        """
+        Re-read the sources that changed on disk since they were loaded.
         
-        # Approval workflow actions
-        actions["mw.request_approval"] = BuiltinAction(
-            name="mw.request_approval",
-            description="Request approval from a manager or approver",
-            category="Approval Workflow",
-            parameters=[
-                ActionParameter(
-                    name="approver_id",
-                    type="string",
-                    required=True,
-                    description="ID of the person who should approve",
-                    example="data.manager_id"
-                ),
-                ActionParameter(
-                    name="request_details",
-                    type="object",
-                    required=True,
-                    description="Details of what needs approval",
-                    example="data.approval_request"
-                ),
-                ActionParameter(
-                    name="timeout_hours",
-                    type="number",
-                    required=False,
-                    description="Hours to wait before timeout",
-                    example="24"
-                )
-            ],
-            example_usage="Get manager approval for requests requiring authorization"
-        )
+        Only the actions that were added, changed or removed are re-indexed.
         
-        # Data retrieval actions
-        actions["mw.query_database"] = BuiltinAction(
-            name="mw.query_database",
-            description="Execute a database query to retrieve information",
-            category="Data Retrieval",
-            parameters=[
-                ActionParameter(
-                    name="query_id",
-                    type="string",
-                    required=True,
-                    description="ID of the predefined query to execute",
-                    example="data.query_identifier"
-                ),
-                ActionParameter(
-                    name="query_parameters",
-                    type="object",
-                    required=False,
-                    description="Parameters to pass to the query",
-                    example="data.search_criteria"
-                )
-            ],
-            example_usage="Retrieve data from enterprise systems"
-        )
-
-        # Additional Data Retrieval actions
-        actions["mw.search_knowledge_base"] = BuiltinAction(
-            name="mw.search_knowledge_base",
-            description="Search the knowledge base for relevant articles",
-            category="Data Retrieval",
-            parameters=[
-                ActionParameter(
-                    name="search_query",
-                    type="string",
-                    required=True,
-                    description="Search terms to find relevant articles",
-                    example="data.user_question"
-                ),
-                ActionParameter(
-                    name="max_results",
-                    type="number",
-                    required=False,
-                    description="Maximum number of results to return",
-                    example="5"
-                )
-            ],
-            example_usage="Find relevant knowledge base articles for user questions"
-        )
-
-        actions["mw.get_system_status"] = BuiltinAction(
-            name="mw.get_system_status",
-            description="Check the status of enterprise systems",
-            category="Data Retrieval",
-            parameters=[
-                ActionParameter(
-                    name="system_name",
-                    type="string",
-                    required=True,
-                    description="Name of the system to check",
-                    example="data.target_system"
-                )
-            ],
-            example_usage="Monitor system health and availability"
-        )
-
-        # Security & Access Management actions
-        actions["mw.check_user_permissions"] = BuiltinAction(
-            name="mw.check_user_permissions",
-            description="Verify user permissions for specific resources",
-            category="Security & Access",
-            parameters=[
-                ActionParameter(
-                    name="user_id",
-                    type="string",
-                    required=True,
-                    description="ID of the user to check",
-                    example="meta_info.requestor.employee_id"
-                ),
-                ActionParameter(
-                    name="resource_type",
-                    type="string",
-                    required=True,
-                    description="Type of resource to check access for",
-                    example="data.resource_name"
-                ),
-                ActionParameter(
-                    name="permission_level",
-                    type="string",
-                    required=False,
-                    description="Required permission level",
-                    example="read"
-                )
-            ],
-            example_usage="Validate user access before performing sensitive operations"
-        )
-
-        actions["mw.grant_access"] = BuiltinAction(
-            name="mw.grant_access",
-            description="Grant access permissions to a user",
-            category="Security & Access",
-            parameters=[
-                ActionParameter(
-                    name="user_id",
-                    type="string",
-                    required=True,
-                    description="ID of the user to grant access",
-                    example="data.target_user_id"
-                ),
-                ActionParameter(
-                    name="resource_id",
-                    type="string",
-                    required=True,
-                    description="ID of the resource to grant access to",
-                    example="data.resource_identifier"
-                ),
-                ActionParameter(
-                    name="access_level",
-                    type="string",
-                    required=True,
-                    description="Level of access to grant",
-                    example="data.requested_access_level"
-                ),
-                ActionParameter(
-                    name="expiry_date",
-                    type="string",
-                    required=False,
-                    description="When the access should expire",
-                    example="data.access_expiry"
-                )
-            ],
-            example_usage="Provision access to systems and resources"
-        )
-
-        actions["mw.revoke_access"] = BuiltinAction(
-            name="mw.revoke_access",
-            description="Revoke access permissions from a user",
-            category="Security & Access",
-            parameters=[
-                ActionParameter(
-                    name="user_id",
-                    type="string",
-                    required=True,
-                    description="ID of the user to revoke access from",
-                    example="data.target_user_id"
-                ),
-                ActionParameter(
-                    name="resource_id",
-                    type="string",
-                    required=True,
-                    description="ID of the resource to revoke access from",
-                    example="data.resource_identifier"
-                ),
-                ActionParameter(
-                    name="reason",
-                    type="string",
-                    required=False,
-                    description="Reason for revoking access",
-                    example="data.revocation_reason"
-                )
-            ],
-            example_usage="Remove access when no longer needed"
-        )
-
-        # Integration & Automation actions
-        actions["mw.trigger_webhook"] = BuiltinAction(
-            name="mw.trigger_webhook",
-            description="Trigger an external webhook with data",
-            category="Integration & Automation",
-            parameters=[
-                ActionParameter(
-                    name="webhook_url",
-                    type="string",
-                    required=True,
-                    description="URL of the webhook to trigger",
-                    example="data.webhook_endpoint"
-                ),
-                ActionParameter(
-                    name="payload",
-                    type="object",
-                    required=True,
-                    description="Data to send to the webhook",
-                    example="data.webhook_payload"
-                ),
-                ActionParameter(
-                    name="headers",
-                    type="object",
-                    required=False,
-                    description="Additional headers to include",
-                    example="data.custom_headers"
-                )
-            ],
-            example_usage="Integrate with external systems via webhooks"
-        )
-
-        actions["mw.schedule_task"] = BuiltinAction(
-            name="mw.schedule_task",
-            description="Schedule a task to be executed later",
-            category="Integration & Automation",
-            parameters=[
-                ActionParameter(
-                    name="task_type",
-                    type="string",
-                    required=True,
-                    description="Type of task to schedule",
-                    example="data.task_category"
-                ),
-                ActionParameter(
-                    name="execution_time",
-                    type="string",
-                    required=True,
-                    description="When to execute the task",
-                    example="data.scheduled_time"
-                ),
-                ActionParameter(
-                    name="task_parameters",
-                    type="object",
-                    required=False,
-                    description="Parameters for the scheduled task",
-                    example="data.task_config"
-                )
-            ],
-            example_usage="Schedule follow-up actions or reminders"
-        )
-
-        # Analytics & Reporting actions
-        actions["mw.log_event"] = BuiltinAction(
-            name="mw.log_event",
-            description="Log an event for analytics and reporting",
-            category="Analytics & Reporting",
-            parameters=[
-                ActionParameter(
-                    name="event_type",
-                    type="string",
-                    required=True,
-                    description="Type of event being logged",
-                    example="data.event_category"
-                ),
-                ActionParameter(
-                    name="event_data",
-                    type="object",
-                    required=True,
-                    description="Data associated with the event",
-                    example="data.event_details"
-                ),
-                ActionParameter(
-                    name="user_id",
-                    type="string",
-                    required=False,
-                    description="ID of the user associated with the event",
-                    example="meta_info.requestor.employee_id"
-                )
-            ],
-            example_usage="Track user interactions and system events"
-        )
-
-        actions["mw.generate_report"] = BuiltinAction(
-            name="mw.generate_report",
-            description="Generate a report based on specified criteria",
-            category="Analytics & Reporting",
-            parameters=[
-                ActionParameter(
-                    name="report_type",
-                    type="string",
-                    required=True,
-                    description="Type of report to generate",
-                    example="data.report_template"
-                ),
-                ActionParameter(
-                    name="date_range",
-                    type="object",
-                    required=True,
-                    description="Date range for the report",
-                    example="data.reporting_period"
-                ),
-                ActionParameter(
-                    name="filters",
-                    type="object",
-                    required=False,
-                    description="Additional filters for the report",
-                    example="data.report_filters"
-                )
-            ],
-            example_usage="Create reports for management and compliance"
-        )
-
-        # File & Document Management actions
-        actions["mw.upload_file"] = BuiltinAction(
-            name="mw.upload_file",
-            description="Upload a file to the document management system",
-            category="File & Document Management",
-            parameters=[
-                ActionParameter(
-                    name="file_content",
-                    type="string",
-                    required=True,
-                    description="Content of the file to upload",
-                    example="data.file_data"
-                ),
-                ActionParameter(
-                    name="file_name",
-                    type="string",
-                    required=True,
-                    description="Name of the file",
-                    example="data.document_name"
-                ),
-                ActionParameter(
-                    name="folder_path",
-                    type="string",
-                    required=False,
-                    description="Path where the file should be stored",
-                    example="data.storage_location"
-                )
-            ],
-            example_usage="Store documents and files in the system"
-        )
-
-        actions["mw.download_file"] = BuiltinAction(
-            name="mw.download_file",
-            description="Download a file from the document management system",
-            category="File & Document Management",
-            parameters=[
-                ActionParameter(
-                    name="file_id",
-                    type="string",
-                    required=True,
-                    description="ID of the file to download",
-                    example="data.document_id"
-                ),
-                ActionParameter(
-                    name="include_metadata",
-                    type="boolean",
-                    required=False,
-                    description="Whether to include file metadata",
-                    example="true"
-                )
-            ],
-            example_usage="Retrieve documents and files from the system"
-        )
-
-        return actions
+        Returns:
+            Names of the actions whose definitions changed
+        """
+        if self._owners is None:
+            return []
+        changed: List[str] = []
+        for provider in self.providers:
+            updated, removed = provider.refresh()
+            for name in updated + removed:
+                self._reindex(name)
+            changed.extend(updated + removed)
+        return list(dict.fromkeys(changed))
+    
+    def _names(self) -> List[str]:
+        """Names of all actions: source order, then added actions."""
+        return list(dict.fromkeys([*self._index(), *self._added]))
+    
+    def _category(self, action_name: str) -> Optional[str]:
+        action = self._added.get(action_name)
+        if action is not None:
+            return action.category
+        owner = self._index().get(action_name)
+        return self.providers[owner].category(action_name) if owner is not None else None
     
     def get_action(self, action_name: str) -> Optional[BuiltinAction]:
         """Get information about a specific built-in action."""
-        return self._actions.get(action_name)
+        action = self._added.get(action_name)
+        if action is None:
+            owner = self._index().get(action_name)
+            if owner is not None:
+                action = self.providers[owner].get_action(action_name)
+        if action is not None and action.performance is None:
+            performance = self._profile().get(action_name)
+            if performance is not None and action_name in self._added:
+                # Leave the object passed to add_action untouched
+                action = self._added[action_name] = replace(action, performance=performance)
+            elif performance is not None:
+                action.performance = performance
+        return action
+    
+    def _profile(self) -> Dict[str, ActionPerformance]:
+        """Performance profiles by action name, loaded on first use."""
+        if self._profiles is None:
+            from .action_profiles import default_profile_files, load_profiles
+            files = self._profile_files if self._profile_files is not None else default_profile_files()
+            self._profiles = load_profiles(files)
+        return self._profiles
+    
+    def get_performance(self, action_name: str) -> Optional[ActionPerformance]:
+        """Get the performance profile of an action, if it has one."""
+        action = self.get_action(action_name)
+        return action.performance if action is not None else self._profile().get(action_name)
+    
+    def _category_map(self) -> Dict[str, Dict[str, None]]:
+        """Action names by category, in catalog order."""
+        if self._categories is None:
+            categories: Dict[str, Dict[str, None]] = {}
+            indexed: Dict[str, str] = {}
+            for name in self._names():
+                category = indexed[name] = self._category(name)
+                categories.setdefault(category, {})[name] = None
+            self._categories, self._indexed_categories = categories, indexed
+        return self._categories
+    
+    def _search(self) -> CatalogSearchIndex:
+        """The search index, built from all actions on first search."""
+        if self._search_index is None:
+            actions = self.get_all_actions()
+            self._order = {action.name: position for position, action in enumerate(actions)}
+            self._search_index = CatalogSearchIndex(actions)
+        return self._search_index
+    
+    def _reindex(self, action_name: str) -> None:
+        """Update the owner and lookup indexes of an action whose definition changed."""
+        owners = self._index()
+        owner = next((number for number in range(len(self.providers) - 1, -1, -1)
+                      if action_name in self.providers[number]), None)
+        if owner is None:
+            owners.pop(action_name, None)
+        else:
+            owners[action_name] = owner
+        action = self.get_action(action_name)
+        if self._categories is not None:
+            self._uncategorize(action_name)
+            if action is not None:
+                self._categories.setdefault(action.category, {})[action_name] = None
+                self._indexed_categories[action_name] = action.category
+                self._sorted_categories = None
+        if self._search_index is not None:
+            self._search_index.remove(action_name)
+            if action is not None:
+                self._search_index.add(action)
+                self._order.setdefault(action_name, len(self._order))
+            else:
+                self._order.pop(action_name, None)
+    
+    def _actions(self, names: Iterable[str]) -> List[BuiltinAction]:
+        """Get the named actions, leaving out those whose definitions are invalid."""
+        actions = (self.get_action(name) for name in names)
+        return [action for action in actions if action is not None]
+    
+    def get_action_names(self) -> List[str]:
+        """Get the names of all actions without materializing them."""
+        return self._names()
     
     def get_actions_by_category(self, category: str) -> List[BuiltinAction]:
         """Get all actions in a specific category."""
-        return [action for action in self._actions.values() if action.category == category]
+        return self._actions(self._category_map().get(category, ()))
     
     def get_all_categories(self) -> List[str]:
         """Get all available action categories."""
-        categories = set(action.category for action in self._actions.values())
-        return sorted(list(categories))
+        if self._sorted_categories is None:
+            self._sorted_categories = sorted(self._category_map())
+        return list(self._sorted_categories)
     
     def get_all_actions(self) -> List[BuiltinAction]:
         """Get all available built-in actions."""
-        return list(self._actions.values())
+        return self._actions(self._names())
     
-    def search_actions(self, query: str) -> List[BuiltinAction]:
-        """Search for actions by name or description."""
-        query = query.lower()
-        results = []
+    def search_actions(self, query: str, include_parameters: bool = False) -> List[BuiltinAction]:
+        """
+        Search for actions by name, description or category.
         
-        for action in self._actions.values():
-            if (query in action.name.lower() or 
-                query in action.description.lower() or
-                query in action.category.lower()):
-                results.append(action)
-        
-        return results
+        Actions whose name starts with the query match, as do actions for
+        which every query word starts a word of their name, description or
+        category (or parameter names, with include_parameters).
+        """
+        fields = FIELD_TEXT | (FIELD_PARAMETER if include_parameters else 0)
+        names = self._search().search(query, fields)
+        return self._actions(sorted(names, key=self._order.__getitem__))
+    
+    def add_action(self, action: BuiltinAction) -> None:
+        """Add an action to the catalog, replacing any action with the same name."""
+        self._added[action.name] = action
+        self._reindex(action.name)
+    
+    def remove_action(self, action_name: str) -> None:
+        """Remove an added action; actions of the catalog sources are restored."""
+        self._added.pop(action_name, None)
+        self._reindex(action_name)
+    
+    def _uncategorize(self, action_name: str) -> None:
+        category = self._indexed_categories.pop(action_name, None)
+        names = self._categories.get(category)
+        if names is not None and action_name in names:
+            del names[action_name]
+            if not names:
+                del self._categories[category]
+            self._sorted_categories = None
     
     def is_builtin_action(self, action_name: str) -> bool:
-        """Check if an action name is a built-in Moveworks action."""
-        return action_name in self._actions
+        """Check if an action name is defined by the catalog or one of its sources."""
+        return action_name in self._added or action_name in self._index()
+    
+    def __len__(self) -> int:
+        return len(self._names())
 
 
-# Global catalog instance
+# Global catalog instance; catalog files are read on first use
 builtin_catalog = BuiltinActionCatalog()
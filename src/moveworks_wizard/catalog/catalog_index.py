@@ -0,0 +1,166 @@
+"""
+Precompiled binary index of catalog data files.
+
+A catalog data file is a JSON array of action objects. Its index, stored
+next to it with the ``.idx`` suffix, records for every action its name,
+its category and the character span of its object in the file, together
+with a checksum of the data file. With the index a catalog can list
+names and categories and answer membership questions without parsing the
+JSON; a single action is parsed only when it is asked for.
+
+The index is columnar so that it decodes with a few bulk operations
+(little-endian)::
+
+    header      magic "MWCI" + format version (5 bytes), data CRC-32 (u32),
+                entry count (u32), category count (u32)
+    spans       start and end offset of each entry (2 x count u32)
+    categories  category number of each entry (count u32)
+    names       newline-separated UTF-8 names, preceded by their byte length (u32)
+    category    newline-separated UTF-8 category names, preceded by their byte length (u32)
+
+Recompile the indexes after editing a data file::
+
+    python -m moveworks_wizard.catalog.catalog_index src/moveworks_wizard/catalog/*.json
+"""
+
+import json
+import struct
+import sys
+import zlib
+from array import array
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Union
+
+
+INDEX_SUFFIX = ".idx"
+
+_MAGIC = b"MWCI\x02"
+_HEADER = struct.Struct("<5sIII")
+_LENGTH = struct.Struct("<I")
+
+
+class CatalogIndex(NamedTuple):
+    """
+    Columns locating the action objects of a catalog data file.
+
+    Entry ``i`` is named ``names[i]``, belongs to ``categories[i]`` and spans
+    ``text[spans[2 * i]:spans[2 * i + 1]]`` of the decoded data file.
+    """
+    names: List[str]
+    categories: List[str]
+    spans: array
+
+
+def index_path(data_path: Union[str, Path]) -> Path:
+    """Return the index file of a catalog data file."""
+    return Path(data_path).with_suffix(INDEX_SUFFIX)
+
+
+def scan_catalog(text: str) -> CatalogIndex:
+    """
+    Locate every action object of a catalog data file by parsing it.
+
+    Raises:
+        ValueError: If the text is not a JSON array of objects with a name
+    """
+    decoder = json.JSONDecoder()
+    index = CatalogIndex([], [], array("I"))
+    position = _skip(text, 0)
+    if text[position:position + 1] != "[":
+        raise ValueError("catalog data must be a JSON array")
+    position = _skip(text, position + 1)
+    while text[position:position + 1] != "]":
+        obj, end = decoder.raw_decode(text, position)
+        if not isinstance(obj, dict) or not isinstance(obj.get("name"), str):
+            raise ValueError(f"catalog entry at offset {position} has no name")
+        index.names.append(obj["name"])
+        index.categories.append(str(obj.get("category", "")))
+        index.spans.extend((position, end))
+        position = _skip(text, end)
+        if text[position:position + 1] == ",":
+            position = _skip(text, position + 1)
+        elif text[position:position + 1] != "]":
+            raise ValueError(f"expected ',' or ']' at offset {position}")
+    return index
+
+
+def _skip(text: str, position: int) -> int:
+    while position < len(text) and text[position] in " \t\r\n":
+        position += 1
+    return position
+
+
+def _u32(values) -> bytes:
+    column = values if isinstance(values, array) else array("I", values)
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column.tobytes()
+
+
+def _read_u32(index: bytes, offset: int, count: int) -> array:
+    column = array("I")
+    column.frombytes(index[offset:offset + 4 * count])
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column
+
+
+def encode_index(index: CatalogIndex, data: bytes) -> bytes:
+    """Serialize an index for the given data file contents."""
+    categories = list(dict.fromkeys(index.categories))
+    numbers = {category: number for number, category in enumerate(categories)}
+    names = "\n".join(index.names).encode("utf-8")
+    category_names = "\n".join(categories).encode("utf-8")
+    return b"".join([
+        _HEADER.pack(_MAGIC, zlib.crc32(data), len(index.names), len(categories)),
+        _u32(index.spans),
+        _u32(numbers[category] for category in index.categories),
+        _LENGTH.pack(len(names)), names,
+        _LENGTH.pack(len(category_names)), category_names,
+    ])
+
+
+def decode_index(index: bytes, data: bytes) -> Optional[CatalogIndex]:
+    """Deserialize an index; None if it is malformed or was compiled for other data."""
+    try:
+        magic, checksum, count, category_count = _HEADER.unpack_from(index, 0)
+        if magic != _MAGIC or checksum != zlib.crc32(data):
+            return None
+        offset = _HEADER.size
+        spans = _read_u32(index, offset, 2 * count)
+        offset += 8 * count
+        numbers = _read_u32(index, offset, count)
+        offset += 4 * count
+        (length,) = _LENGTH.unpack_from(index, offset)
+        names = index[offset + 4:offset + 4 + length].decode("utf-8").split("\n") if count else []
+        offset += 4 + length
+        (length,) = _LENGTH.unpack_from(index, offset)
+        categories = index[offset + 4:offset + 4 + length].decode("utf-8").split("\n") if category_count else []
+        category_column = [categories[number] for number in numbers]
+    except (struct.error, ValueError, IndexError):
+        return None
+    if len(names) != count or len(spans) != 2 * count:
+        return None
+    return CatalogIndex(names, category_column, spans)
+
+
+def load_index(data_path: Union[str, Path], data: bytes, text: str) -> CatalogIndex:
+    """Return the index of a data file, scanning the data if the index file is missing or stale."""
+    try:
+        index = decode_index(index_path(data_path).read_bytes(), data)
+    except OSError:
+        index = None
+    return index if index is not None else scan_catalog(text)
+
+
+def compile_index(data_path: Union[str, Path]) -> Path:
+    """Write the index of a catalog data file and return its path."""
+    data = Path(data_path).read_bytes()
+    path = index_path(data_path)
+    path.write_bytes(encode_index(scan_catalog(data.decode("utf-8")), data))
+    return path
+
+
+if __name__ == "__main__":
+    for argument in sys.argv[1:]:
+        print(compile_index(argument))
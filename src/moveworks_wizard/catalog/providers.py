@@ -0,0 +1,428 @@
+"""
+Catalog providers: sources of action definitions merged into one catalog.
+
+A provider reads nothing until its first refresh() and afterwards re-reads
+its source only when the file modification times changed. Each refresh
+reports which action names were added or changed and which were removed,
+so the catalog can update its membership map and search indexes for just
+those actions. Definitions are parsed into BuiltinAction objects only when
+they are requested.
+
+Three providers are available:
+
+- CatalogFileProvider: a JSON array of actions with a precompiled index
+  (the packaged built-in catalog uses these);
+- DirectoryProvider: a directory tree of JSON or YAML files, each holding
+  one action, a list of actions or ``{"actions": [...]}``. Parsed files are
+  cached on disk by modification time, so a restart only parses the files
+  that changed;
+- SQLiteProvider: a table of actions in a SQLite database (see SQLITE_SCHEMA).
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import warnings
+from abc import ABC, abstractmethod
+from array import array
+from pathlib import Path
+from dataclasses import MISSING, fields
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+import yaml
+
+from .builtin_actions import ActionParameter, ActionPerformance, BuiltinAction, action_from_dict
+from .catalog_index import CatalogIndex, load_index
+
+
+DEFINITION_SUFFIXES = (".json", ".yaml", ".yml")
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+# Expected layout of SQLiteProvider tables; parameters hold a JSON array
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS actions (
+    name TEXT PRIMARY KEY,
+    description TEXT NOT NULL,
+    category TEXT NOT NULL,
+    parameters TEXT NOT NULL DEFAULT '[]',
+    example_usage TEXT
+)
+"""
+
+# Fields of action definitions and their parameters, and which are required
+_ACTION_FIELDS = {field.name for field in fields(BuiltinAction)}
+_REQUIRED_ACTION_FIELDS = ("name", "description", "category")
+_PARAMETER_FIELDS = {field.name for field in fields(ActionParameter)}
+_REQUIRED_PARAMETER_FIELDS = {field.name for field in fields(ActionParameter) if field.default is MISSING}
+_PERFORMANCE_FIELDS = {field.name for field in fields(ActionPerformance)}
+
+# Bump when the directory cache format changes
+_DIRECTORY_CACHE_VERSION = 1
+
+# File modification stamp: (mtime in ns, size)
+Stamp = Optional[Tuple[int, int]]
+
+
+class CatalogChanges(NamedTuple):
+    """Names whose definitions were added or changed, and names that were removed."""
+    updated: List[str]
+    removed: List[str]
+
+
+def _stamp(path: Path) -> Stamp:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _diff(old: Dict[str, Any], new: Dict[str, Any]) -> CatalogChanges:
+    return CatalogChanges([name for name, value in new.items() if name not in old or old[name] != value],
+                          [name for name in old if name not in new])
+
+
+def validate_definition(definition: Any) -> None:
+    """
+    Check that an action definition can be turned into a BuiltinAction.
+
+    Raises:
+        ValueError: If fields are missing, unknown or of the wrong type
+    """
+    if not isinstance(definition, dict):
+        raise ValueError("an action must be an object")
+    for name in _REQUIRED_ACTION_FIELDS:
+        if not isinstance(definition.get(name), str):
+            raise ValueError(f"action {definition.get('name')!r} needs a string {name!r}")
+    unknown = set(definition) - _ACTION_FIELDS
+    if unknown:
+        raise ValueError(f"action {definition['name']!r} has unknown fields: {', '.join(sorted(unknown))}")
+    parameters = definition.get("parameters", [])
+    if not isinstance(parameters, list):
+        raise ValueError(f"action {definition['name']!r}: parameters must be a list")
+    for parameter in parameters:
+        if (not isinstance(parameter, dict) or not _REQUIRED_PARAMETER_FIELDS <= set(parameter)
+                or not set(parameter) <= _PARAMETER_FIELDS):
+            raise ValueError(f"action {definition['name']!r}: parameters need exactly the fields "
+                             f"{', '.join(sorted(_REQUIRED_PARAMETER_FIELDS))} and optionally example")
+    performance = definition.get("performance")
+    if performance is not None and (not isinstance(performance, dict) or not set(performance) <= _PERFORMANCE_FIELDS):
+        raise ValueError(f"action {definition['name']!r}: invalid performance profile")
+
+
+def default_provider_cache_dir() -> Path:
+    """Return the directory of provider caches, honouring $XDG_CACHE_HOME."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "moveworks-wizard" / "catalogs"
+
+
+class CatalogProvider(ABC):
+    """
+    A source of action definitions.
+
+    Sources that cannot be read and definitions that are invalid are
+    skipped, with a RuntimeWarning, and reported in ``errors`` (location to
+    message), so one bad source never breaks the catalog.
+    """
+
+    def __init__(self):
+        self._cache: Dict[str, BuiltinAction] = {}
+        self.errors: Dict[str, str] = {}
+
+    @abstractmethod
+    def refresh(self) -> CatalogChanges:
+        """Load the source, or re-read it if it changed, and report what changed."""
+
+    @abstractmethod
+    def names(self) -> Iterable[str]:
+        """Names of the actions of the source, in source order."""
+
+    @abstractmethod
+    def __contains__(self, action_name: str) -> bool:
+        """Whether the source defines an action."""
+
+    @abstractmethod
+    def category(self, action_name: str) -> Optional[str]:
+        """Category of an action without materializing it."""
+
+    @abstractmethod
+    def _definition(self, action_name: str) -> Optional[Dict[str, Any]]:
+        """The raw definition of an action."""
+
+    def get_action(self, action_name: str) -> Optional[BuiltinAction]:
+        """Return an action, parsing its definition on first request; None if it is invalid."""
+        action = self._cache.get(action_name)
+        if action is None:
+            try:
+                definition = self._definition(action_name)
+                if definition is None:
+                    return None
+                validate_definition(definition)
+                action = action_from_dict(definition)
+            except ValueError as e:
+                self._report(action_name, str(e))
+                return None
+            self._cache[action_name] = action
+        return action
+
+    def _report(self, location: str, message: str) -> None:
+        self.errors[location] = message
+        warnings.warn(f"{self!r}: skipping {location}: {message}", RuntimeWarning, stacklevel=3)
+
+    def _forget(self, changes: CatalogChanges) -> CatalogChanges:
+        for name in changes.updated + changes.removed:
+            self._cache.pop(name, None)
+        return changes
+
+
+class CatalogFileProvider(CatalogProvider):
+    """A catalog data file: a JSON array of actions with a precompiled ``.idx`` index."""
+
+    def __init__(self, path: Union[str, Path]):
+        super().__init__()
+        self.path = Path(path)
+        self._stamp: Stamp = None
+        self._text = ""
+        self._index = CatalogIndex([], [], array("I"))
+        self._entries: Dict[str, int] = {}
+
+    def __repr__(self) -> str:
+        return f"CatalogFileProvider({str(self.path)!r})"
+
+    def _object(self, entry: int) -> str:
+        return self._text[self._index.spans[2 * entry]:self._index.spans[2 * entry + 1]]
+
+    def refresh(self) -> CatalogChanges:
+        stamp = _stamp(self.path)
+        if stamp is not None and stamp == self._stamp:
+            return CatalogChanges([], [])
+        old = {name: self._object(entry) for name, entry in self._entries.items()}
+        self._stamp = stamp
+        self.errors = {}
+        self._text, self._index = "", CatalogIndex([], [], array("I"))
+        if stamp is not None:
+            try:
+                data = self.path.read_bytes()
+                self._text = data.decode("utf-8")
+                self._index = load_index(self.path, data, self._text)
+            except (OSError, ValueError) as e:
+                self._text = ""
+                self._report(str(self.path), str(e))
+        # Later entries with the same name override earlier ones
+        self._entries = dict(zip(self._index.names, range(len(self._index.names))))
+        if not old:
+            return CatalogChanges(list(self._entries), [])
+        # Compare the JSON text of each action with the previous version
+        return self._forget(_diff(old, {name: self._object(entry) for name, entry in self._entries.items()}))
+
+    def names(self) -> Iterable[str]:
+        return self._entries.keys()
+
+    def __contains__(self, action_name: str) -> bool:
+        return action_name in self._entries
+
+    def category(self, action_name: str) -> Optional[str]:
+        entry = self._entries.get(action_name)
+        return self._index.categories[entry] if entry is not None else None
+
+    def _definition(self, action_name: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(action_name)
+        return json.loads(self._object(entry)) if entry is not None else None
+
+
+class DirectoryProvider(CatalogProvider):
+    """
+    A directory tree of JSON and YAML action definition files.
+
+    Files that cannot be parsed are skipped and reported in ``errors``.
+    When an action is defined in several files, the first file in sorted
+    path order wins.
+    """
+
+    def __init__(self, path: Union[str, Path], cache_dir: Optional[Union[str, Path]] = None,
+                 persist: bool = True):
+        """
+        Args:
+            path: Directory to read definitions from
+            cache_dir: Directory of the parsed-file cache (default: default_provider_cache_dir())
+            persist: Whether to keep parsed files in the on-disk cache
+        """
+        super().__init__()
+        self.path = Path(path)
+        self.cache_dir = Path(cache_dir) if cache_dir else default_provider_cache_dir()
+        self.persist = persist
+        # relative path -> (stamp, definitions)
+        self._files: Optional[Dict[str, Tuple[Stamp, List[Dict[str, Any]]]]] = None
+        self._definitions: Dict[str, Dict[str, Any]] = {}
+
+    def __repr__(self) -> str:
+        return f"DirectoryProvider({str(self.path)!r})"
+
+    @property
+    def cache_path(self) -> Path:
+        digest = hashlib.sha256(str(self.path.resolve()).encode("utf-8")).hexdigest()[:16]
+        return self.cache_dir / f"{digest}.json"
+
+    def _load_cache(self) -> Dict[str, Tuple[Stamp, List[Dict[str, Any]]]]:
+        if not self.persist:
+            return {}
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("version") != _DIRECTORY_CACHE_VERSION:
+                return {}
+            return {name: (tuple(stamp), definitions) for name, (stamp, definitions) in cached["files"].items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def _save_cache(self) -> None:
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+            # json.dumps uses the C encoder; json.dump would not
+            tmp_path.write_text(json.dumps({"version": _DIRECTORY_CACHE_VERSION,
+                                            "files": {name: [list(stamp), definitions]
+                                                      for name, (stamp, definitions) in self._files.items()}}),
+                                encoding="utf-8")
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            pass  # A read-only cache only costs re-parsing on the next start
+
+    @staticmethod
+    def parse_file(path: Path) -> List[Dict[str, Any]]:
+        """
+        Return the action definitions of a JSON or YAML file.
+
+        Raises:
+            ValueError: If the file is not valid or does not hold named actions
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            try:
+                content = json.load(f) if path.suffix == ".json" else yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise ValueError(str(e)) from e
+        if isinstance(content, dict):
+            content = content["actions"] if isinstance(content.get("actions"), list) else [content]
+        if not isinstance(content, list):
+            raise ValueError("expected an action, a list of actions or {actions: [...]}")
+        for definition in content:
+            validate_definition(definition)
+        return content
+
+    def refresh(self) -> CatalogChanges:
+        previous = self._files if self._files is not None else self._load_cache()
+        files: Dict[str, Tuple[Stamp, List[Dict[str, Any]]]] = {}
+        parsed = False
+        errors: Dict[str, str] = {}
+        paths = sorted(p for p in self.path.rglob("*") if p.suffix.lower() in DEFINITION_SUFFIXES and p.is_file())
+        for path in paths:
+            relative = path.relative_to(self.path).as_posix()
+            stamp = _stamp(path)
+            known = previous.get(relative)
+            if known is not None and known[0] == stamp:
+                files[relative] = known
+                continue
+            parsed = True
+            try:
+                files[relative] = (stamp, self.parse_file(path))
+            except (OSError, ValueError) as e:
+                errors[relative] = str(e)
+                warnings.warn(f"{self!r}: skipping {relative}: {e}", RuntimeWarning, stacklevel=2)
+        self.errors = errors
+        unchanged = self._files is not None and not parsed and files.keys() == self._files.keys()
+        self._files = files
+        if self.persist and (parsed or files.keys() != previous.keys()):
+            self._save_cache()
+        if unchanged:
+            return CatalogChanges([], [])
+
+        definitions: Dict[str, Dict[str, Any]] = {}
+        for _, file_definitions in files.values():
+            for definition in file_definitions:
+                definitions.setdefault(definition["name"], definition)
+        old, self._definitions = self._definitions, definitions
+        return self._forget(_diff(old, definitions))
+
+    def names(self) -> Iterable[str]:
+        return self._definitions.keys()
+
+    def __contains__(self, action_name: str) -> bool:
+        return action_name in self._definitions
+
+    def category(self, action_name: str) -> Optional[str]:
+        definition = self._definitions.get(action_name)
+        return str(definition.get("category", "")) if definition is not None else None
+
+    def _definition(self, action_name: str) -> Optional[Dict[str, Any]]:
+        return self._definitions.get(action_name)
+
+
+class SQLiteProvider(CatalogProvider):
+    """Actions stored in a SQLite table laid out as SQLITE_SCHEMA."""
+
+    def __init__(self, path: Union[str, Path], table: str = "actions"):
+        super().__init__()
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table}")
+        self.path = Path(path)
+        self.table = table
+        self._stamps: Tuple[Stamp, Stamp] = (None, None)
+        self._definitions: Dict[str, Dict[str, Any]] = {}
+
+    def __repr__(self) -> str:
+        return f"SQLiteProvider({str(self.path)!r})"
+
+    def refresh(self) -> CatalogChanges:
+        # Writes in WAL mode only touch the -wal file until a checkpoint
+        stamps = (_stamp(self.path), _stamp(Path(f"{self.path}-wal")))
+        if stamps == self._stamps and stamps[0] is not None:
+            return CatalogChanges([], [])
+        self._stamps = stamps
+        self.errors = {}
+        rows: List[Tuple[Any, ...]] = []
+        if stamps[0] is not None:
+            try:
+                connection = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True)
+                try:
+                    query = f"SELECT name, description, category, parameters, example_usage FROM {self.table}"
+                    rows = connection.execute(query).fetchall()
+                finally:
+                    connection.close()
+            except sqlite3.Error as e:
+                self._report(str(self.path), str(e))
+        definitions: Dict[str, Dict[str, Any]] = {}
+        for name, description, category, parameters, example_usage in rows:
+            try:
+                definition = {"name": name, "description": description, "category": category,
+                              "parameters": json.loads(parameters or "[]"), "example_usage": example_usage}
+                validate_definition(definition)
+            except ValueError as e:
+                self._report(str(name), str(e))
+                continue
+            definitions[name] = definition
+        old, self._definitions = self._definitions, definitions
+        return self._forget(_diff(old, definitions))
+
+    def names(self) -> Iterable[str]:
+        return self._definitions.keys()
+
+    def __contains__(self, action_name: str) -> bool:
+        return action_name in self._definitions
+
+    def category(self, action_name: str) -> Optional[str]:
+        definition = self._definitions.get(action_name)
+        return definition["category"] if definition is not None else None
+
+    def _definition(self, action_name: str) -> Optional[Dict[str, Any]]:
+        return self._definitions.get(action_name)
+
+
+def provider_for_path(path: Union[str, Path]) -> CatalogProvider:
+    """Return the provider for a catalog directory, SQLite database or catalog data file."""
+    path = Path(path)
+    if path.is_dir():
+        return DirectoryProvider(path)
+    if path.suffix.lower() in SQLITE_SUFFIXES:
+        return SQLiteProvider(path)
+    return CatalogFileProvider(path)
@@ -0,0 +1,160 @@
+"""
+Search indexes over the action catalog.
+
+CatalogSearchIndex keeps two structures that are updated one action at a
+time, so registering an action never rebuilds them:
+
+- a character trie of action names, each node holding the names below it,
+  so a name prefix such as ``mw.send_`` resolves in time proportional to
+  the prefix and the number of results;
+- an inverted index from tokens of names, descriptions, categories and
+  parameter names to the actions containing them, with a trie of the
+  tokens so every query word matches as a token prefix.
+"""
+
+import re
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from .builtin_actions import BuiltinAction
+
+
+# Fields of an action a token can come from
+FIELD_TEXT = 1        # name, description or category
+FIELD_PARAMETER = 2   # parameter name
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase alphanumeric tokens; identifiers split on punctuation."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+class _TrieNode:
+    __slots__ = ("children", "keys")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        # Keys stored at or below this node
+        self.keys: Set[str] = set()
+
+
+class PrefixIndex:
+    """Character trie answering "which keys start with this prefix"."""
+
+    def __init__(self):
+        self._root = _TrieNode()
+
+    def add(self, key: str, text: Optional[str] = None) -> None:
+        """Store key under text (default: the key itself)."""
+        node = self._root
+        node.keys.add(key)
+        for ch in key if text is None else text:
+            child = node.children.get(ch)
+            if child is None:
+                child = node.children[ch] = _TrieNode()
+            node = child
+            node.keys.add(key)
+
+    def remove(self, key: str, text: Optional[str] = None) -> None:
+        """Remove a key stored under text."""
+        node = self._root
+        node.keys.discard(key)
+        for ch in key if text is None else text:
+            child = node.children.get(ch)
+            if child is None:
+                return
+            child.keys.discard(key)
+            if not child.keys:
+                del node.children[ch]
+                return
+            node = child
+
+    def with_prefix(self, prefix: str) -> Set[str]:
+        """Return the keys starting with prefix (do not modify the result)."""
+        node = self._root
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return set()
+        return node.keys
+
+
+class CatalogSearchIndex:
+    """Name-prefix trie and token inverted index over catalog actions."""
+
+    def __init__(self, actions: Iterable["BuiltinAction"] = ()):
+        self._names = PrefixIndex()
+        self._tokens = PrefixIndex()
+        # field -> token -> names of the actions with the token in that field
+        self._postings: Dict[int, Dict[str, Set[str]]] = {FIELD_TEXT: {}, FIELD_PARAMETER: {}}
+        self._action_tokens: Dict[str, List[Tuple[int, str]]] = {}
+        for action in actions:
+            self.add(action)
+
+    def __len__(self) -> int:
+        return len(self._action_tokens)
+
+    def __contains__(self, action_name: str) -> bool:
+        return action_name in self._action_tokens
+
+    def add(self, action: "BuiltinAction") -> None:
+        """Index an action, replacing an earlier action with the same name."""
+        if action.name in self._action_tokens:
+            self.remove(action.name)
+        tokens = {(FIELD_TEXT, token)
+                  for token in tokenize(f"{action.name} {action.description} {action.category}")}
+        tokens.update((FIELD_PARAMETER, token)
+                      for parameter in action.parameters for token in tokenize(parameter.name))
+
+        self._action_tokens[action.name] = list(tokens)
+        self._names.add(action.name, action.name.lower())
+        for field, token in tokens:
+            postings = self._postings[field]
+            if token not in postings:
+                postings[token] = set()
+                if not any(token in other for other in self._postings.values() if other is not postings):
+                    self._tokens.add(token)
+            postings[token].add(action.name)
+
+    def remove(self, action_name: str) -> None:
+        """Remove an action from the index."""
+        tokens = self._action_tokens.pop(action_name, None)
+        if tokens is None:
+            return
+        self._names.remove(action_name, action_name.lower())
+        for field, token in tokens:
+            postings = self._postings[field]
+            names = postings[token]
+            names.discard(action_name)
+            if not names:
+                del postings[token]
+                if not any(token in other for other in self._postings.values()):
+                    self._tokens.remove(token)
+
+    def names_with_prefix(self, prefix: str) -> Set[str]:
+        """Return the names of actions whose name starts with prefix, ignoring case."""
+        return set(self._names.with_prefix(prefix.lower()))
+
+    def search(self, query: str, fields: int = FIELD_TEXT) -> Set[str]:
+        """
+        Return the names of actions matching a query.
+
+        An action matches when its name starts with the query, or when every
+        query word is a prefix of one of its tokens from the given fields.
+        """
+        query = query.strip().lower()
+        matches = set(self._names.with_prefix(query))
+        postings = [self._postings[field] for field in (FIELD_TEXT, FIELD_PARAMETER) if field & fields]
+        per_word = []
+        for word in dict.fromkeys(tokenize(query)):
+            found = [p[token] for token in self._tokens.with_prefix(word) for p in postings if token in p]
+            if not found:
+                return matches
+            per_word.append(found[0] if len(found) == 1 else set().union(*found))
+        if per_word:
+            # Intersect starting from the smallest set
+            per_word.sort(key=len)
+            matches |= per_word[0].intersection(*per_word[1:])
+        return matches
@@ -20,8 +20,12 @@ from ..serializers import serialize_compound_action
 from ..templates.template_library import template_library
 from ..ai.action_suggester import action_suggester
 from ..bender.bender_assistant import bender_assistant
+from ..bender.completion import BenderCompleter
+from ..bender.evaluator import preview_expression
 from ..catalog.builtin_actions import builtin_catalog
 from ..utils.json_analyzer import JSONAnalyzer, VariableSuggestion
+from ..utils.analysis_cache import AnalysisCache
+from ..utils.suggestion_index import SuggestionIndex
 
 
 class MoveworksWizardGUI:
@@ -40,6 +44,9 @@ class MoveworksWizardGUI:
         
         # Current compound action being edited
         self.compound_action: Optional[CompoundAction] = None
+
+        # Analyzed JSON responses by source name, offered as completions
+        self.analyzed_responses: Dict[str, List[VariableSuggestion]] = {}
         
         # Setup the UI
         self._setup_ui()
@@ -449,7 +456,7 @@ class MoveworksWizardGUI:
     # Input argument management methods
     def _add_input_argument(self):
         """Add a new input argument."""
-        dialog = InputArgumentDialog(self.root, "Add Input Argument")
+        dialog = InputArgumentDialog(self.root, "Add Input Argument", completer=self._bender_completer(0))
         if dialog.result:
             name, value = dialog.result
             if self.compound_action:
@@ -472,7 +479,8 @@ class MoveworksWizardGUI:
         name = self.input_args_tree.item(item, 'text')
         current_value = self.input_args_tree.item(item, 'values')[0]
 
-        dialog = InputArgumentDialog(self.root, "Edit Input Argument", name, current_value)
+        dialog = InputArgumentDialog(self.root, "Edit Input Argument", name, current_value,
+                                     completer=self._bender_completer(0))
         if dialog.result:
             new_name, new_value = dialog.result
             if self.compound_action and self.compound_action.input_args:
@@ -509,7 +517,8 @@ class MoveworksWizardGUI:
             messagebox.showwarning("Warning", "Please create a compound action first")
             return
 
-        dialog = StepDialog(self.root, "Add Step")
+        dialog = StepDialog(self.root, "Add Step",
+                            completer=self._bender_completer(len(self.compound_action.steps or [])))
         if dialog.result:
             step = dialog.result
             if not self.compound_action.steps:
@@ -532,7 +541,8 @@ class MoveworksWizardGUI:
 
         if self.compound_action and self.compound_action.steps:
             current_step = self.compound_action.steps[step_index]
-            dialog = StepDialog(self.root, "Edit Step", current_step)
+            dialog = StepDialog(self.root, "Edit Step", current_step,
+                                completer=self._bender_completer(step_index))
             if dialog.result:
                 self.compound_action.steps[step_index] = dialog.result
                 self._update_steps_tree()
@@ -641,11 +651,19 @@ class MoveworksWizardGUI:
         else:
             return "Unknown step type"
 
+    def _bender_completer(self, before_step: int) -> BenderCompleter:
+        """Build the expression completer for an editor placed before the given step."""
+        return BenderCompleter.for_compound_action(self.compound_action, before_step, self.analyzed_responses)
+
     def _show_json_analyzer(self):
         """Show the JSON analyzer dialog."""
         dialog = JSONAnalyzerDialog(self.root)
         if dialog.result:
             suggestions = dialog.result
+            responses: Dict[str, List[VariableSuggestion]] = {}
+            for suggestion in suggestions:
+                responses.setdefault(suggestion.source_name or "response", []).append(suggestion)
+            self.analyzed_responses.update(responses)
             # Show suggestions dialog
             suggestions_dialog = JSONSuggestionsDialog(self.root, suggestions)
             if suggestions_dialog.result:
@@ -693,10 +711,93 @@ class MoveworksWizardGUI:
         self.root.mainloop()
 
 
+class BenderCompletionPopup:
+    """Completion list for a Bender expression entry, updated as the user types."""
+
+    MAX_ROWS = 10
+
+    def __init__(self, entry, completer: BenderCompleter):
+        self.entry = entry
+        self.completer = completer
+        self.result = None
+        self.window = None
+        self.listbox = None
+
+        entry.bind("<KeyRelease>", self._on_key_release, add="+")
+        entry.bind("<Down>", self._focus_list, add="+")
+        entry.bind("<Tab>", self._accept_first, add="+")
+        entry.bind("<Escape>", self._hide, add="+")
+        entry.bind("<FocusOut>", lambda event: entry.after(150, self._hide_unless_focused), add="+")
+
+    def _on_key_release(self, event):
+        if event.keysym in ("Down", "Up", "Return", "Escape", "Tab"):
+            return
+        self.result = self.completer.complete(self.entry.get(), self.entry.index(tk.INSERT),
+                                              limit=self.MAX_ROWS)
+        if not self.result.prefix or not self.result.items:
+            self._hide()
+            return
+        self._show([f"{item.label}    {item.detail}" if item.detail else item.label
+                    for item in self.result.items])
+
+    def _show(self, rows):
+        if self.window is None:
+            self.window = tk.Toplevel(self.entry)
+            self.window.overrideredirect(True)
+            self.listbox = tk.Listbox(self.window, activestyle="dotbox", exportselection=False)
+            self.listbox.pack(fill=tk.BOTH, expand=True)
+            self.listbox.bind("<Return>", self._accept)
+            self.listbox.bind("<Double-Button-1>", self._accept)
+            self.listbox.bind("<Escape>", self._hide)
+        self.listbox.delete(0, tk.END)
+        for row in rows:
+            self.listbox.insert(tk.END, row)
+        self.listbox.configure(height=len(rows), width=max(30, max(len(row) for row in rows)))
+        self.window.geometry("+%d+%d" % (self.entry.winfo_rootx(),
+                                         self.entry.winfo_rooty() + self.entry.winfo_height()))
+        self.window.deiconify()
+        self.window.lift()
+
+    def _focus_list(self, event=None):
+        if self.window is not None and self.window.winfo_viewable():
+            self.listbox.focus_set()
+            self.listbox.selection_clear(0, tk.END)
+            self.listbox.selection_set(0)
+            self.listbox.activate(0)
+            return "break"
+
+    def _accept_first(self, event=None):
+        if self.window is not None and self.window.winfo_viewable() and self.result and self.result.items:
+            self._insert(self.result.items[0])
+            return "break"
+
+    def _accept(self, event=None):
+        selection = self.listbox.curselection()
+        if selection and self.result:
+            self._insert(self.result.items[selection[0]])
+        return "break"
+
+    def _insert(self, completion):
+        text, cursor = self.result.apply(self.entry.get(), completion)
+        self.entry.delete(0, tk.END)
+        self.entry.insert(0, text)
+        self.entry.icursor(cursor)
+        self._hide()
+        self.entry.focus_set()
+
+    def _hide_unless_focused(self):
+        if self.listbox is None or self.entry.focus_get() is not self.listbox:
+            self._hide()
+
+    def _hide(self, event=None):
+        if self.window is not None:
+            self.window.withdraw()
+
+
 class InputArgumentDialog:
     """Dialog for adding/editing input arguments."""
 
-    def __init__(self, parent, title, name="", value=""):
+    def __init__(self, parent, title, name="", value="", completer: Optional[BenderCompleter] = None):
         self.result = None
 
         # Create dialog window
@@ -724,6 +825,8 @@ class InputArgumentDialog:
         self.value_entry = ttk.Entry(frame, width=40)
         self.value_entry.grid(row=1, column=1, sticky=tk.W+tk.E, pady=5)
         self.value_entry.insert(0, value)
+        if completer is not None:
+            self.completion = BenderCompletionPopup(self.value_entry, completer)
 
         # Buttons
         button_frame = ttk.Frame(frame)
@@ -769,7 +872,7 @@ class JSONAnalyzerDialog:
         # Create dialog window
         self.dialog = tk.Toplevel(parent)
         self.dialog.title("JSON Analysis for Variable Suggestions")
-        self.dialog.geometry("600x500")
+        self.dialog.geometry("600x560")
         self.dialog.transient(parent)
         self.dialog.grab_set()
 
@@ -800,6 +903,24 @@ class JSONAnalyzerDialog:
         self.json_text = scrolledtext.ScrolledText(main_frame, height=15, wrap=tk.WORD)
         self.json_text.pack(fill=tk.BOTH, expand=True, pady=(5, 10))
 
+        # Expression preview against the JSON
+        preview_frame = ttk.Frame(main_frame)
+        preview_frame.pack(fill=tk.X, pady=(0, 10))
+
+        ttk.Label(preview_frame, text="Preview Expression:").pack(side=tk.LEFT)
+        self.expression_entry = ttk.Entry(preview_frame)
+        self.expression_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(10, 5))
+        self.expression_entry.bind("<Return>", lambda event: self._preview_expression())
+        ttk.Button(preview_frame, text="Preview", command=self._preview_expression).pack(side=tk.LEFT)
+
+        self.preview_var = tk.StringVar()
+        ttk.Label(main_frame, textvariable=self.preview_var, wraplength=550,
+                  foreground="gray").pack(anchor=tk.W, pady=(0, 10))
+
+        # Parsed JSON of the last preview, reused while the text is unchanged
+        self._preview_source = None
+        self._preview_data = None
+
         # Buttons
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(fill=tk.X)
@@ -836,6 +957,26 @@ class JSONAnalyzerDialog:
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load file: {str(e)}")
 
+    def _preview_expression(self):
+        """Evaluate the preview expression against the JSON data."""
+        expression = self.expression_entry.get().strip()
+        if not expression:
+            self.preview_var.set("")
+            return
+
+        json_text = self.json_text.get("1.0", tk.END).strip()
+        try:
+            if json_text != self._preview_source:
+                self._preview_data = json.loads(json_text)
+                self._preview_source = json_text
+            source_name = self.source_entry.get().strip() or "http_response"
+            value = preview_expression(expression, self._preview_data, source_name)
+            self.preview_var.set(f"= {json.dumps(value, default=str)[:500]}")
+        except json.JSONDecodeError as e:
+            self.preview_var.set(f"Invalid JSON data: {str(e)}")
+        except ValueError as e:
+            self.preview_var.set(f"Error: {str(e)}")
+
     def _analyze_json(self):
         """Analyze the JSON and return suggestions."""
         json_data = self.json_text.get("1.0", tk.END).strip()
@@ -850,7 +991,8 @@ class JSONAnalyzerDialog:
             return
 
         try:
-            analyzer = JSONAnalyzer()
+            # Repeat clicks on unchanged JSON are served from the on-disk cache
+            analyzer = JSONAnalyzer(cache=AnalysisCache())
             suggestions = analyzer.analyze_json(json_data, source_name)
 
             if not suggestions:
@@ -872,9 +1014,19 @@ class JSONAnalyzerDialog:
 class JSONSuggestionsDialog:
     """Dialog for selecting JSON analysis suggestions."""
 
+    # Rows inserted into the tree at a time; more are added on scroll
+    PAGE_SIZE = 200
+
     def __init__(self, parent, suggestions):
         self.result = None
         self.suggestions = suggestions
+        self.index = SuggestionIndex(suggestions)
+
+        # Selection is tracked by index id so it survives re-filtering
+        self._selected_ids = set()
+        self._matches: List[int] = []
+        self._rendered = 0
+        self._syncing_selection = False
 
         # Create dialog window
         self.dialog = tk.Toplevel(parent)
@@ -903,6 +1055,18 @@ class JSONSuggestionsDialog:
                             foreground="blue")
         help_text.pack(anchor=tk.W, pady=(0, 10))
 
+        # Filter box - matches path prefixes, substrings and near misses
+        filter_frame = ttk.Frame(main_frame)
+        filter_frame.pack(fill=tk.X, pady=(0, 10))
+
+        ttk.Label(filter_frame, text="Filter:").pack(side=tk.LEFT, padx=(0, 5))
+        self.filter_var = tk.StringVar()
+        filter_entry = ttk.Entry(filter_frame, textvariable=self.filter_var)
+        filter_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.match_label = ttk.Label(filter_frame, text="")
+        self.match_label.pack(side=tk.LEFT, padx=(5, 0))
+        self.filter_var.trace_add('write', lambda *args: self._apply_filter())
+
         # Quick Selection buttons - moved to top
         selection_frame = ttk.LabelFrame(main_frame, text="Quick Selection", padding=10)
         selection_frame.pack(fill=tk.X, pady=(0, 10))
@@ -941,7 +1105,8 @@ class JSONSuggestionsDialog:
 
         # Add scrollbar
         scrollbar = ttk.Scrollbar(main_frame, orient=tk.VERTICAL, command=self.suggestions_tree.yview)
-        self.suggestions_tree.configure(yscrollcommand=scrollbar.set)
+        self.suggestions_tree.configure(yscrollcommand=self._on_tree_scroll)
+        self._scrollbar = scrollbar
 
         # Pack treeview and scrollbar - after buttons are packed
         tree_frame = ttk.Frame(main_frame)
@@ -951,12 +1116,7 @@ class JSONSuggestionsDialog:
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
         # Populate suggestions
-        for suggestion in suggestions:
-            self.suggestions_tree.insert('', 'end',
-                                       text=suggestion.path,
-                                       values=(suggestion.data_type,
-                                             suggestion.description,
-                                             suggestion.bender_expression))
+        self._apply_filter()
 
         # Bind selection change event
         self.suggestions_tree.bind('<<TreeviewSelect>>', self._on_selection_change)
@@ -965,46 +1125,100 @@ class JSONSuggestionsDialog:
         self.dialog.bind('<Return>', lambda e: self._add_selected())
         self.dialog.bind('<Escape>', lambda e: self._cancel_clicked())
 
-        # Focus on the tree for keyboard navigation
-        self.suggestions_tree.focus_set()
+        # Focus on the filter box so typing narrows the list immediately
+        filter_entry.focus_set()
 
         # Wait for dialog to close
         self.dialog.wait_window()
 
+    def _apply_filter(self):
+        """Show the suggestions matching the filter text."""
+        query = self.filter_var.get()
+        if query.strip():
+            self._matches = self.index.search(query, limit=len(self.index))
+            self.match_label.config(text=f"{len(self._matches)} matches")
+        else:
+            self._matches = list(range(len(self.index)))
+            self.match_label.config(text="")
+
+        self.suggestions_tree.delete(*self.suggestions_tree.get_children())
+        self._rendered = 0
+        self._render_more()
+
+    def _render_more(self):
+        """Insert the next page of matching suggestions into the tree."""
+        page = self._matches[self._rendered:self._rendered + self.PAGE_SIZE]
+        for item_id in page:
+            suggestion = self.index.get(item_id)
+            self.suggestions_tree.insert('', 'end', iid=str(item_id),
+                                       text=suggestion.path,
+                                       values=(suggestion.data_type,
+                                             suggestion.description,
+                                             suggestion.bender_expression))
+        self._rendered += len(page)
+        self._sync_tree_selection([str(item_id) for item_id in page])
+
+    def _on_tree_scroll(self, first, last):
+        """Update the scrollbar and load another page near the end of the list."""
+        self._scrollbar.set(first, last)
+        if float(last) > 0.9 and self._rendered < len(self._matches):
+            self._render_more()
+
+    def _sync_tree_selection(self, items):
+        """Reflect the tracked selection onto rendered tree items."""
+        selected = [item for item in items if int(item) in self._selected_ids]
+        if selected:
+            self._syncing_selection = True
+            self.suggestions_tree.selection_add(selected)
+            self._syncing_selection = False
+        self._update_selection_count()
+
+    def _set_selection(self, item_ids):
+        """Replace the selection with the given suggestion ids."""
+        self._selected_ids = set(item_ids)
+        self._syncing_selection = True
+        self.suggestions_tree.selection_set(
+            [item for item in self.suggestions_tree.get_children() if int(item) in self._selected_ids])
+        self._syncing_selection = False
+        self._update_selection_count()
+
     def _select_all(self):
-        """Select all suggestions."""
-        for item in self.suggestions_tree.get_children():
-            self.suggestions_tree.selection_add(item)
+        """Select all suggestions matching the filter."""
+        self._set_selection(self._selected_ids.union(self._matches))
 
     def _select_none(self):
         """Deselect all suggestions."""
-        self.suggestions_tree.selection_remove(self.suggestions_tree.selection())
+        self._set_selection(())
 
     def _select_top_5(self):
         """Select the top 5 suggestions."""
-        self._select_none()
-
-        # Select first 5 items (they're already prioritized)
-        children = self.suggestions_tree.get_children()
-        for item in children[:5]:
-            self.suggestions_tree.selection_add(item)
+        # Suggestions are already prioritized, so the first ids are the top ones
+        self._set_selection(range(min(5, len(self.index))))
 
     def _select_common(self):
         """Select common/useful suggestions."""
-        self._select_none()
-
         # Select suggestions with common patterns
         common_patterns = ['id', 'email', 'name', 'status', 'user', 'data']
 
-        for item in self.suggestions_tree.get_children():
-            path = self.suggestions_tree.item(item, 'text').lower()
-            if any(pattern in path for pattern in common_patterns):
-                self.suggestions_tree.selection_add(item)
+        selected = set()
+        for pattern in common_patterns:
+            selected.update(self.index.substring(pattern))
+        self._set_selection(selected)
 
     def _on_selection_change(self, event):
         """Handle selection change in the treeview."""
-        selection = self.suggestions_tree.selection()
-        count = len(selection)
+        if self._syncing_selection:
+            return
+
+        # Rendered rows follow the tree; rows hidden by the filter keep their state
+        rendered = {int(item) for item in self.suggestions_tree.get_children()}
+        self._selected_ids -= rendered
+        self._selected_ids.update(int(item) for item in self.suggestions_tree.selection())
+        self._update_selection_count()
+
+    def _update_selection_count(self):
+        """Update the selection count label and button."""
+        count = len(self._selected_ids)
 
         # Update button text and label
         self.add_button.config(text=f"Add Selected ({count})")
@@ -1018,19 +1232,11 @@ class JSONSuggestionsDialog:
 
     def _add_selected(self):
         """Add selected suggestions."""
-        selection = self.suggestions_tree.selection()
-        if not selection:
+        if not self._selected_ids:
             messagebox.showwarning("Warning", "Please select at least one suggestion")
             return
 
-        selected_suggestions = []
-        for item in selection:
-            path = self.suggestions_tree.item(item, 'text')
-            # Find the corresponding suggestion object
-            for suggestion in self.suggestions:
-                if suggestion.path == path:
-                    selected_suggestions.append(suggestion)
-                    break
+        selected_suggestions = [self.index.get(item_id) for item_id in sorted(self._selected_ids)]
 
         # Show confirmation with details
         count = len(selected_suggestions)
@@ -1068,7 +1274,7 @@ class JSONSuggestionsDialog:
 class StepDialog:
     """Dialog for adding/editing steps."""
 
-    def __init__(self, parent, title, step=None):
+    def __init__(self, parent, title, step=None, completer: Optional[BenderCompleter] = None):
         self.result = None
 
         # Create dialog window
@@ -1142,6 +1348,8 @@ class StepDialog:
         self.value_entry.grid(row=0, column=0, sticky=tk.W+tk.E, padx=(0, 5))
         ttk.Button(value_frame, text="Suggest", width=6,
                   command=self._suggest_return_values).grid(row=0, column=1)
+        if completer is not None:
+            self.completion = BenderCompletionPopup(self.value_entry, completer)
 
         # Buttons
         button_frame = ttk.Frame(main_frame)
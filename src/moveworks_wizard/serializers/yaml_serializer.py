@@ -6,7 +6,7 @@ formatted YAML strings that conform to Moveworks standards.
 """
 
 import yaml
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from io import StringIO
 
 from ..models.base import CompoundAction
@@ -92,7 +92,9 @@ class YamlSerializer:
     @staticmethod
     def serialize(compound_action: CompoundAction, 
                   include_comments: bool = False,
-                  sort_keys: bool = False) -> str:
+                  sort_keys: bool = False,
+                  simplify: bool = False,
+                  stats: Optional[Dict[str, int]] = None) -> str:
         """
         Serialize a CompoundAction to YAML string.
         
@@ -100,6 +102,9 @@ class YamlSerializer:
             compound_action: The CompoundAction model to serialize
             include_comments: Whether to include helpful comments (default: False)
             sort_keys: Whether to sort dictionary keys (default: False)
+            simplify: Whether to fold constant parts of Bender expressions (default: False)
+            stats: Optional dictionary receiving the number of rewritten
+                expressions under "simplified_expressions"
             
         Returns:
             YAML string representation of the compound action
@@ -107,6 +112,13 @@ class YamlSerializer:
         # Convert to dictionary
         yaml_dict = compound_action.to_yaml_dict()
         
+        # Simplify Bender expressions if requested
+        if simplify:
+            from ..bender.simplifier import simplify_document
+            yaml_dict, rewrites = simplify_document(yaml_dict)
+            if stats is not None:
+                stats["simplified_expressions"] = rewrites
+        
         # Add comments if requested
         if include_comments:
             yaml_dict = YamlSerializer._add_comments(yaml_dict, compound_action)
@@ -182,7 +194,9 @@ class YamlSerializer:
 
 def serialize_compound_action(compound_action: CompoundAction, 
                             include_comments: bool = False,
-                            format_for_moveworks: bool = True) -> str:
+                            format_for_moveworks: bool = True,
+                            simplify: bool = False,
+                            stats: Optional[Dict[str, int]] = None) -> str:
     """
     Convenience function to serialize a CompoundAction to YAML.
     
@@ -190,12 +204,15 @@ def serialize_compound_action(compound_action: CompoundAction,
         compound_action: The CompoundAction model to serialize
         include_comments: Whether to include helpful comments
         format_for_moveworks: Whether to apply Moveworks-specific formatting
+        simplify: Whether to fold constant parts of Bender expressions
+        stats: Optional dictionary receiving the number of rewritten expressions
         
     Returns:
         YAML string representation of the compound action
     """
     serializer = YamlSerializer()
-    yaml_str = serializer.serialize(compound_action, include_comments=include_comments)
+    yaml_str = serializer.serialize(compound_action, include_comments=include_comments,
+                                    simplify=simplify, stats=stats)
     
     if format_for_moveworks:
         yaml_str = serializer.format_for_moveworks(yaml_str)
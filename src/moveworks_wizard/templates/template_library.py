@@ -2,10 +2,12 @@
 Template library for common Compound Action patterns.
 
 This module provides pre-built templates that users can customize for their needs.
+Templates are registered as metadata plus a factory, so importing the module
+and listing or searching templates builds no models; a template's
+CompoundAction is built when it is first requested.
 """
 
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+from typing import Callable, Dict, List, Any, Optional
 from pathlib import Path
 
 from ..models.base import CompoundAction
@@ -15,15 +17,64 @@ from ..models.terminal import ReturnStep, RaiseStep
 from ..models.common import ProgressUpdates, DelayConfig
 
 
-@dataclass
 class CompoundActionTemplate:
-    """Represents a template for a Compound Action."""
-    name: str
-    description: str
-    category: str
-    use_case: str
-    compound_action: CompoundAction
-    customization_notes: List[str]
+    """
+    Represents a template for a Compound Action.
+    
+    A template is either given its CompoundAction or a factory that builds
+    it. Factory templates build and validate the model on first access of
+    ``compound_action`` and keep it; listing, filtering and searching
+    templates only read the metadata.
+    """
+    
+    def __init__(self, name: str, description: str, category: str, use_case: str,
+                 compound_action: Optional[CompoundAction] = None,
+                 customization_notes: Optional[List[str]] = None,
+                 factory: Optional[Callable[[], CompoundAction]] = None,
+                 input_args: Optional[List[str]] = None):
+        """
+        Args:
+            name: Display name
+            description: What the workflow does
+            category: Template category
+            use_case: When to use the template
+            compound_action: The template's Compound Action
+            customization_notes: Suggestions for adapting the template
+            factory: Builds the Compound Action on first use, instead of compound_action
+            input_args: Names of the input arguments (default: those of the built Compound Action)
+        """
+        if compound_action is None and factory is None:
+            raise ValueError("A template needs a compound_action or a factory")
+        self.name = name
+        self.description = description
+        self.category = category
+        self.use_case = use_case
+        self.customization_notes = customization_notes or []
+        self._compound_action = compound_action
+        self._factory = factory
+        self._input_args = input_args
+    
+    def __repr__(self) -> str:
+        return f"CompoundActionTemplate(name={self.name!r}, category={self.category!r}, built={self.is_built})"
+    
+    @property
+    def compound_action(self) -> CompoundAction:
+        """The template's Compound Action, built on first access."""
+        if self._compound_action is None:
+            self._compound_action = self._factory()
+        return self._compound_action
+    
+    @property
+    def is_built(self) -> bool:
+        """Whether the Compound Action has been built."""
+        return self._compound_action is not None
+    
+    @property
+    def input_args(self) -> List[str]:
+        """Names of the template's input arguments."""
+        if self._input_args is None:
+            return list(self.compound_action.input_args or {})
+        return list(self._input_args)
 
 
 class TemplateLibrary:
@@ -39,30 +90,154 @@ class TemplateLibrary:
         self._templates = self._load_templates()
     
     def _load_templates(self) -> Dict[str, CompoundActionTemplate]:
-        """Load all available templates."""
+        """Register the built-in templates; their compound actions are built on first use."""
         templates = {}
         
         # User Management Templates
-        templates["user_onboarding"] = self._create_user_onboarding_template()
-        templates["user_offboarding"] = self._create_user_offboarding_template()
-        templates["access_request"] = self._create_access_request_template()
+        templates["user_onboarding"] = CompoundActionTemplate(
+            name="User Onboarding Workflow",
+            description="Automated workflow for onboarding new employees with access provisioning and welcome notifications",
+            category="User Management",
+            use_case="When a new employee joins the company and needs basic system access and welcome information",
+            customization_notes=[
+                "Customize 'basic_systems' to match your organization's default access requirements",
+                "Modify 'welcome_card' content to include company-specific onboarding information",
+                "Add additional steps for department-specific access or training materials",
+                "Consider adding approval steps for sensitive system access"
+            ],
+            input_args=["new_employee_id", "basic_systems", "welcome_card"],
+            factory=self._build_user_onboarding
+        )
+
+        templates["user_offboarding"] = CompoundActionTemplate(
+            name="User Offboarding Workflow",
+            description="Automated workflow for securely offboarding departing employees",
+            category="User Management",
+            use_case="When an employee leaves the company and needs access revoked and handover processes initiated",
+            customization_notes=[
+                "Customize system list to include all organizational systems",
+                "Add steps for equipment return tracking",
+                "Include exit interview scheduling",
+                "Consider adding final payroll processing steps"
+            ],
+            input_args=["departing_employee_id", "all_systems", "handover_details", "manager_id"],
+            factory=self._build_user_offboarding
+        )
+
+        templates["access_request"] = CompoundActionTemplate(
+            name="Access Request Workflow",
+            description="Automated access request processing with conditional approval routing",
+            category="Security & Access",
+            use_case="When users request access to systems or resources requiring manager approval",
+            customization_notes=[
+                "Adjust approval routing logic based on your organization's hierarchy",
+                "Modify timeout periods to match your approval SLAs",
+                "Add additional validation steps for high-security resources",
+                "Consider adding notification steps to keep requestors informed"
+            ],
+            input_args=["requested_resource", "requested_access_level", "access_request_details",
+                        "direct_manager_id", "security_manager_id"],
+            factory=self._build_access_request
+        )
         
         # Support & Ticketing Templates
-        templates["ticket_escalation"] = self._create_ticket_escalation_template()
-        templates["incident_response"] = self._create_incident_response_template()
+        templates["ticket_escalation"] = CompoundActionTemplate(
+            name="Ticket Escalation Workflow",
+            description="Automated escalation of support tickets based on SLA thresholds",
+            category="Support & Ticketing",
+            use_case="When support tickets exceed SLA thresholds and need management attention",
+            customization_notes=[
+                "Adjust escalation thresholds to match your SLA requirements",
+                "Customize notification messages for different escalation levels",
+                "Add integration with your ticketing system",
+                "Consider adding customer notification steps"
+            ],
+            input_args=["ticket_id", "ticket_age", "priority", "ticket_summary", "escalation_manager_id"],
+            factory=self._build_ticket_escalation
+        )
+
+        templates["incident_response"] = CompoundActionTemplate(
+            name="Incident Response Workflow",
+            description="Automated security incident response with logging and notifications",
+            category="Support & Ticketing",
+            use_case="When security incidents are reported and need immediate response",
+            customization_notes=[
+                "Customize security team notification channels",
+                "Add integration with security monitoring tools",
+                "Include automated containment steps if appropriate",
+                "Consider adding compliance reporting steps"
+            ],
+            input_args=["incident_details", "incident_description", "security_team_id"],
+            factory=self._build_incident_response
+        )
         
         # Approval Workflow Templates
-        templates["manager_approval"] = self._create_manager_approval_template()
-        templates["multi_level_approval"] = self._create_multi_level_approval_template()
+        templates["manager_approval"] = CompoundActionTemplate(
+            name="Manager Approval Workflow",
+            description="Simple workflow for requesting manager approval with automatic notifications",
+            category="Approval Workflow",
+            use_case="When requests need manager approval before processing",
+            customization_notes=[
+                "Adjust timeout period based on your approval SLAs",
+                "Customize notification messages for your organization",
+                "Add escalation logic for overdue approvals",
+                "Consider adding approval reason tracking"
+            ],
+            input_args=["manager_id", "approval_request"],
+            factory=self._build_manager_approval
+        )
+
+        templates["multi_level_approval"] = CompoundActionTemplate(
+            name="Multi-Level Approval Workflow",
+            description="Conditional multi-level approval workflow based on request criteria",
+            category="Approval Workflow",
+            use_case="When high-value requests need multiple levels of approval",
+            customization_notes=[
+                "Adjust approval thresholds for your organization",
+                "Add more approval levels if needed",
+                "Customize approval criteria beyond financial amounts",
+                "Include parallel approval paths for different departments"
+            ],
+            input_args=["manager_id", "director_id", "approval_request", "request_amount"],
+            factory=self._build_multi_level_approval
+        )
         
         # Data Processing Templates
-        templates["data_validation"] = self._create_data_validation_template()
-        templates["report_generation"] = self._create_report_generation_template()
+        templates["data_validation"] = CompoundActionTemplate(
+            name="Data Validation Workflow",
+            description="Validate user input data with comprehensive error checking",
+            category="Data Processing",
+            use_case="When user-submitted data needs validation before processing",
+            customization_notes=[
+                "Customize validation rules for your data requirements",
+                "Add domain-specific validation logic",
+                "Include data sanitization steps",
+                "Consider adding external validation services"
+            ],
+            input_args=["email", "phone", "name", "dept"],
+            factory=self._build_data_validation
+        )
+
+        templates["report_generation"] = CompoundActionTemplate(
+            name="Report Generation Workflow",
+            description="Automated report generation with file storage and stakeholder notifications",
+            category="Data Processing",
+            use_case="When periodic reports need to be generated and distributed to stakeholders",
+            customization_notes=[
+                "Customize report templates for your organization",
+                "Add scheduling logic for recurring reports",
+                "Include data quality checks before generation",
+                "Consider adding report archival and retention policies"
+            ],
+            input_args=["report_template", "reporting_period", "report_filters", "report_filename",
+                        "reports_folder", "stakeholder_list", "report_notification_card"],
+            factory=self._build_report_generation
+        )
         
         return templates
     
-    def _create_user_onboarding_template(self) -> CompoundActionTemplate:
-        """Create user onboarding workflow template."""
+    def _build_user_onboarding(self) -> CompoundAction:
+        """Build the user onboarding workflow."""
         # Step 1: Get user details
         get_user_step = ActionStep(
             action_name="mw.get_user_details",
@@ -115,7 +290,7 @@ class TemplateLibrary:
             }
         )
         
-        compound_action = CompoundAction(
+        return CompoundAction(
             name="User Onboarding Workflow",
             description="Automated workflow for onboarding new employees",
             input_args={
@@ -125,23 +300,9 @@ class TemplateLibrary:
             },
             steps=[get_user_step, grant_access_step, welcome_notification, return_step]
         )
-        
-        return CompoundActionTemplate(
-            name="User Onboarding Workflow",
-            description="Automated workflow for onboarding new employees with access provisioning and welcome notifications",
-            category="User Management",
-            use_case="When a new employee joins the company and needs basic system access and welcome information",
-            compound_action=compound_action,
-            customization_notes=[
-                "Customize 'basic_systems' to match your organization's default access requirements",
-                "Modify 'welcome_card' content to include company-specific onboarding information",
-                "Add additional steps for department-specific access or training materials",
-                "Consider adding approval steps for sensitive system access"
-            ]
-        )
     
-    def _create_access_request_template(self) -> CompoundActionTemplate:
-        """Create access request workflow template."""
+    def _build_access_request(self) -> CompoundAction:
+        """Build the access request workflow."""
         # Step 1: Check current permissions
         check_permissions = ActionStep(
             action_name="mw.check_user_permissions",
@@ -195,7 +356,7 @@ class TemplateLibrary:
             }
         )
         
-        compound_action = CompoundAction(
+        return CompoundAction(
             name="Access Request Workflow",
             description="Automated workflow for processing access requests with appropriate approvals",
             input_args={
@@ -207,23 +368,9 @@ class TemplateLibrary:
             },
             steps=[check_permissions, approval_switch, grant_access]
         )
-        
-        return CompoundActionTemplate(
-            name="Access Request Workflow",
-            description="Automated access request processing with conditional approval routing",
-            category="Security & Access",
-            use_case="When users request access to systems or resources requiring manager approval",
-            compound_action=compound_action,
-            customization_notes=[
-                "Adjust approval routing logic based on your organization's hierarchy",
-                "Modify timeout periods to match your approval SLAs",
-                "Add additional validation steps for high-security resources",
-                "Consider adding notification steps to keep requestors informed"
-            ]
-        )
 
-    def _create_user_offboarding_template(self) -> CompoundActionTemplate:
-        """Create user offboarding workflow template."""
+    def _build_user_offboarding(self) -> CompoundAction:
+        """Build the user offboarding workflow."""
         # Step 1: Get user details and current access
         get_user_step = ActionStep(
             action_name="mw.get_user_details",
@@ -256,7 +403,7 @@ class TemplateLibrary:
             }
         )
 
-        compound_action = CompoundAction(
+        return CompoundAction(
             name="User Offboarding Workflow",
             description="Automated workflow for offboarding departing employees",
             input_args={
@@ -268,22 +415,8 @@ class TemplateLibrary:
             steps=[get_user_step, revoke_access_step, create_ticket_step]
         )
 
-        return CompoundActionTemplate(
-            name="User Offboarding Workflow",
-            description="Automated workflow for securely offboarding departing employees",
-            category="User Management",
-            use_case="When an employee leaves the company and needs access revoked and handover processes initiated",
-            compound_action=compound_action,
-            customization_notes=[
-                "Customize system list to include all organizational systems",
-                "Add steps for equipment return tracking",
-                "Include exit interview scheduling",
-                "Consider adding final payroll processing steps"
-            ]
-        )
-
-    def _create_ticket_escalation_template(self) -> CompoundActionTemplate:
-        """Create ticket escalation workflow template."""
+    def _build_ticket_escalation(self) -> CompoundAction:
+        """Build the ticket escalation workflow."""
         # Step 1: Check ticket age and priority
         check_ticket_script = ScriptStep(
             code="""
@@ -342,7 +475,7 @@ return {
             ]
         )
 
-        compound_action = CompoundAction(
+        return CompoundAction(
             name="Ticket Escalation Workflow",
             description="Automated ticket escalation based on age and priority",
             input_args={
@@ -355,22 +488,8 @@ return {
             steps=[check_ticket_script, escalation_switch]
         )
 
-        return CompoundActionTemplate(
-            name="Ticket Escalation Workflow",
-            description="Automated escalation of support tickets based on SLA thresholds",
-            category="Support & Ticketing",
-            use_case="When support tickets exceed SLA thresholds and need management attention",
-            compound_action=compound_action,
-            customization_notes=[
-                "Adjust escalation thresholds to match your SLA requirements",
-                "Customize notification messages for different escalation levels",
-                "Add integration with your ticketing system",
-                "Consider adding customer notification steps"
-            ]
-        )
-
-    def _create_incident_response_template(self) -> CompoundActionTemplate:
-        """Create incident response workflow template."""
+    def _build_incident_response(self) -> CompoundAction:
+        """Build the incident response workflow."""
         # Step 1: Log the incident
         log_incident = ActionStep(
             action_name="mw.log_event",
@@ -404,7 +523,7 @@ return {
             }
         )
 
-        compound_action = CompoundAction(
+        return CompoundAction(
             name="Incident Response Workflow",
             description="Automated workflow for security incident response",
             input_args={
@@ -415,22 +534,8 @@ return {
             steps=[log_incident, create_incident_ticket, notify_security]
         )
 
-        return CompoundActionTemplate(
-            name="Incident Response Workflow",
-            description="Automated security incident response with logging and notifications",
-            category="Support & Ticketing",
-            use_case="When security incidents are reported and need immediate response",
-            compound_action=compound_action,
-            customization_notes=[
-                "Customize security team notification channels",
-                "Add integration with security monitoring tools",
-                "Include automated containment steps if appropriate",
-                "Consider adding compliance reporting steps"
-            ]
-        )
-
-    def _create_manager_approval_template(self) -> CompoundActionTemplate:
-        """Create manager approval workflow template."""
+    def _build_manager_approval(self) -> CompoundAction:
+        """Build the manager approval workflow."""
         # Step 1: Request approval
         request_approval = ActionStep(
             action_name="mw.request_approval",
@@ -475,7 +580,7 @@ return {
             ]
         )
 
-        compound_action = CompoundAction(
+        return CompoundAction(
             name="Manager Approval Workflow",
             description="Simple manager approval workflow with notifications",
             input_args={
@@ -485,22 +590,8 @@ return {
             steps=[request_approval, approval_switch]
         )
 
-        return CompoundActionTemplate(
-            name="Manager Approval Workflow",
-            description="Simple workflow for requesting manager approval with automatic notifications",
-            category="Approval Workflow",
-            use_case="When requests need manager approval before processing",
-            compound_action=compound_action,
-            customization_notes=[
-                "Adjust timeout period based on your approval SLAs",
-                "Customize notification messages for your organization",
-                "Add escalation logic for overdue approvals",
-                "Consider adding approval reason tracking"
-            ]
-        )
-
-    def _create_multi_level_approval_template(self) -> CompoundActionTemplate:
-        """Create multi-level approval workflow template."""
+    def _build_multi_level_approval(self) -> CompoundAction:
+        """Build the multi-level approval workflow."""
         # Step 1: First level approval (manager)
         manager_approval = ActionStep(
             action_name="mw.request_approval",
@@ -532,7 +623,7 @@ return {
             ]
         )
 
-        compound_action = CompoundAction(
+        return CompoundAction(
             name="Multi-Level Approval Workflow",
             description="Multi-level approval workflow based on request value",
             input_args={
@@ -544,22 +635,8 @@ return {
             steps=[manager_approval, director_approval_switch]
         )
 
-        return CompoundActionTemplate(
-            name="Multi-Level Approval Workflow",
-            description="Conditional multi-level approval workflow based on request criteria",
-            category="Approval Workflow",
-            use_case="When high-value requests need multiple levels of approval",
-            compound_action=compound_action,
-            customization_notes=[
-                "Adjust approval thresholds for your organization",
-                "Add more approval levels if needed",
-                "Customize approval criteria beyond financial amounts",
-                "Include parallel approval paths for different departments"
-            ]
-        )
-
-    def _create_data_validation_template(self) -> CompoundActionTemplate:
-        """Create data validation workflow template."""
+    def _build_data_validation(self) -> CompoundAction:
+        """Build the data validation workflow."""
         # Step 1: Validate input data
         validation_script = ScriptStep(
             code="""
@@ -601,7 +678,7 @@ return {
             }
         )
 
-        compound_action = CompoundAction(
+        return CompoundAction(
             name="Data Validation Workflow",
             description="Comprehensive data validation with error reporting",
             input_args={
@@ -613,22 +690,8 @@ return {
             steps=[validation_script]
         )
 
-        return CompoundActionTemplate(
-            name="Data Validation Workflow",
-            description="Validate user input data with comprehensive error checking",
-            category="Data Processing",
-            use_case="When user-submitted data needs validation before processing",
-            compound_action=compound_action,
-            customization_notes=[
-                "Customize validation rules for your data requirements",
-                "Add domain-specific validation logic",
-                "Include data sanitization steps",
-                "Consider adding external validation services"
-            ]
-        )
-
-    def _create_report_generation_template(self) -> CompoundActionTemplate:
-        """Create report generation workflow template."""
+    def _build_report_generation(self) -> CompoundAction:
+        """Build the report generation workflow."""
         # Step 1: Generate the report
         generate_report = ActionStep(
             action_name="mw.generate_report",
@@ -665,7 +728,7 @@ return {
             }
         )
 
-        compound_action = CompoundAction(
+        return CompoundAction(
             name="Report Generation Workflow",
             description="Automated report generation and distribution",
             input_args={
@@ -680,20 +743,6 @@ return {
             steps=[generate_report, upload_report, notify_stakeholders]
         )
 
-        return CompoundActionTemplate(
-            name="Report Generation Workflow",
-            description="Automated report generation with file storage and stakeholder notifications",
-            category="Data Processing",
-            use_case="When periodic reports need to be generated and distributed to stakeholders",
-            compound_action=compound_action,
-            customization_notes=[
-                "Customize report templates for your organization",
-                "Add scheduling logic for recurring reports",
-                "Include data quality checks before generation",
-                "Consider adding report archival and retention policies"
-            ]
-        )
-
     def get_template(self, template_name: str) -> Optional[CompoundActionTemplate]:
         """Get a specific template by name."""
         return self._templates.get(template_name)
@@ -707,10 +756,18 @@ return {
         categories = set(template.category for template in self._templates.values())
         return sorted(list(categories))
     
+    def get_template_names(self) -> List[str]:
+        """Get the names under which templates are registered."""
+        return list(self._templates)
+    
     def get_all_templates(self) -> List[CompoundActionTemplate]:
         """Get all available templates."""
         return list(self._templates.values())
     
+    def add_template(self, template_name: str, template: CompoundActionTemplate) -> None:
+        """Add a template to the library, replacing any template with the same name."""
+        self._templates[template_name] = template
+    
     def search_templates(self, query: str) -> List[CompoundActionTemplate]:
         """Search for templates by name, description, or use case."""
         query = query.lower()
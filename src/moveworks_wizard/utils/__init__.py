@@ -5,11 +5,43 @@ This package contains helper utilities for JSON analysis, variable suggestion,
 and other supporting functionality.
 """
 
-from .json_analyzer import JSONAnalyzer, VariableSuggestion, analyze_json_file, analyze_json_string
+from .json_analyzer import (
+    JSONAnalyzer,
+    VariableSuggestion,
+    ValuePreview,
+    MergedSuggestion,
+    analyze_json_file,
+    analyze_json_files,
+    analyze_ndjson_file,
+    analyze_json_string,
+    expand_json_paths
+)
+from .analysis_cache import AnalysisCache
+from .suggestion_index import SuggestionIndex
+from .payload_profiler import PayloadProfile, PathSize, compute_path_sizes, collect_used_paths
+from .pagination import PaginationInfo, detect_pagination, generate_pagination_yaml
+from .loop_load import ConnectorLoad, estimate_loop_load, loop_load_warnings
 
 __all__ = [
     "JSONAnalyzer",
     "VariableSuggestion", 
+    "ValuePreview",
+    "MergedSuggestion",
     "analyze_json_file",
-    "analyze_json_string"
+    "analyze_json_files",
+    "analyze_ndjson_file",
+    "analyze_json_string",
+    "expand_json_paths",
+    "AnalysisCache",
+    "SuggestionIndex",
+    "PaginationInfo",
+    "detect_pagination",
+    "generate_pagination_yaml",
+    "PayloadProfile",
+    "PathSize",
+    "compute_path_sizes",
+    "collect_used_paths",
+    "ConnectorLoad",
+    "estimate_loop_load",
+    "loop_load_warnings"
 ]
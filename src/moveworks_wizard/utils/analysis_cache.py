@@ -0,0 +1,239 @@
+"""
+Persistent cache for JSON analysis results.
+
+Analysis results are stored on disk, content-addressed by the SHA-256 of the
+JSON bytes together with the source name, analyzer version and analyzer
+options. Entries are kept in a compact binary format (zlib-compressed
+pickle) and evicted least-recently-used first once the cache grows past its
+size budget.
+
+A cache directory that cannot be written (read-only, or a path through a
+file) disables caching with a warning instead of failing the analysis.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import warnings
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+
+# Default size budget for cached analysis results
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Magic header and format version of cache entry files
+_ENTRY_MAGIC = b"MWJA\x01"
+
+# Maximum number of remembered file digests in the stat index
+_MAX_INDEXED_FILES = 2048
+
+
+def default_cache_dir() -> Path:
+    """Return the cache directory, honouring $XDG_CACHE_HOME."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "moveworks-wizard" / "json-analysis"
+
+
+class AnalysisCache:
+    """
+    Size-bounded, content-addressed on-disk cache of analysis rows.
+
+    File digests are remembered by (path, size, mtime) so a repeat analysis
+    of an unchanged file does not need to read or hash it again.
+    """
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.max_bytes = max_bytes
+        self._entries_dir = self.cache_dir / "entries"
+        self._index_path = self.cache_dir / "file_index.json"
+        self._file_index: Optional[Dict[str, List[Any]]] = None
+        # Set once a write fails; the cache then only serves existing entries
+        self._read_only = False
+        # Estimated size of the entries, measured on the first put; eviction
+        # scans the directory only once the estimate exceeds the budget
+        self._total_bytes: Optional[int] = None
+
+    @staticmethod
+    def digest_bytes(data: bytes) -> str:
+        """Return the content digest of raw JSON bytes."""
+        return hashlib.sha256(data).hexdigest()
+
+    def digest_file(self, file_path: Union[str, Path]) -> str:
+        """
+        Return the content digest of a file.
+
+        The digest is reused while the file's size and modification time
+        are unchanged; otherwise the file is hashed in chunks.
+        """
+        path = os.path.abspath(str(file_path))
+        stat = os.stat(path)
+        index = self._load_file_index()
+        known = index.get(path)
+        if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            return known[2]
+
+        hasher = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                hasher.update(chunk)
+        digest = hasher.hexdigest()
+
+        index.pop(path, None)
+        index[path] = [stat.st_size, stat.st_mtime_ns, digest]
+        while len(index) > _MAX_INDEXED_FILES:
+            index.pop(next(iter(index)))
+        self._write(self._index_path, json.dumps(index).encode("utf-8"))
+        return digest
+
+    @staticmethod
+    def make_key(digest: str, source_name: str, version: str, options: Tuple[Any, ...] = ()) -> str:
+        """Combine a content digest with the analysis parameters into a cache key."""
+        material = "\0".join([digest, source_name, version, repr(options)])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached payload for a key, or None on a miss."""
+        entry = self._entry_path(key)
+        try:
+            with open(entry, 'rb') as f:
+                blob = f.read()
+        except OSError:
+            return None
+
+        if not blob.startswith(_ENTRY_MAGIC):
+            self._remove(entry)
+            return None
+        try:
+            payload = pickle.loads(zlib.decompress(blob[len(_ENTRY_MAGIC):]))
+        except (zlib.error, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            self._remove(entry)
+            return None
+
+        # Mark as recently used for LRU eviction
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return payload
+
+    def put(self, key: str, payload: Any) -> None:
+        """Store a payload and evict least-recently-used entries over budget."""
+        blob = _ENTRY_MAGIC + zlib.compress(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+        if len(blob) > self.max_bytes:
+            return
+        entry = self._entry_path(key)
+        if self._total_bytes is None:
+            self._total_bytes = self._scan()[1]
+        try:
+            replaced = entry.stat().st_size
+        except OSError:
+            replaced = 0
+        if self._write(entry, blob):
+            self._total_bytes += len(blob) - replaced
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def clear(self) -> int:
+        """Remove all cached entries and remembered file digests. Returns the entry count."""
+        removed = 0
+        for entry in self._iter_entries():
+            if self._remove(entry):
+                removed += 1
+        self._remove(self._index_path)
+        self._file_index = None
+        self._total_bytes = None
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Return entry count and total size of the cache."""
+        entries = list(self._iter_entries())
+        total = 0
+        for entry in entries:
+            try:
+                total += entry.stat().st_size
+            except OSError:
+                pass
+        return {"directory": str(self.cache_dir), "entries": len(entries),
+                "bytes": total, "max_bytes": self.max_bytes}
+
+    def _entry_path(self, key: str) -> Path:
+        return self._entries_dir / key[:2] / f"{key}.bin"
+
+    def _iter_entries(self):
+        if not self._entries_dir.is_dir():
+            return iter(())
+        return self._entries_dir.glob("*/*.bin")
+
+    def _scan(self) -> Tuple[List[Tuple[int, int, Path]], int]:
+        """Return (mtime, size, path) of every entry and their total size."""
+        entries = []
+        total = 0
+        for entry in self._iter_entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry))
+            total += stat.st_size
+        return entries, total
+
+    def _evict(self) -> None:
+        # Other processes may have added or evicted entries since the estimate
+        entries, total = self._scan()
+        if total > self.max_bytes:
+            entries.sort()
+            for _, size, entry in entries:
+                if total <= self.max_bytes:
+                    break
+                if self._remove(entry):
+                    total -= size
+        self._total_bytes = total
+
+    def _load_file_index(self) -> Dict[str, List[Any]]:
+        if self._file_index is None:
+            try:
+                with open(self._index_path, 'r', encoding='utf-8') as f:
+                    self._file_index = json.load(f)
+            except (OSError, ValueError):
+                self._file_index = {}
+        return self._file_index
+
+    def _write(self, path: Path, data: bytes) -> bool:
+        """Write a cache file; on failure warn once and stop writing. Returns whether it was written."""
+        if self._read_only:
+            return False
+        try:
+            self._write_atomic(path, data)
+            return True
+        except OSError as e:
+            self._read_only = True
+            warnings.warn(f"JSON analysis cache disabled, cannot write to {self.cache_dir}: {e}",
+                          RuntimeWarning, stacklevel=3)
+            return False
+
+    @classmethod
+    def _write_atomic(cls, path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # A temporary name unique to this writer, also across threads of one process
+        fd, tmp_name = tempfile.mkstemp(prefix=f"{path.name}.", suffix=".tmp", dir=path.parent)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_name, path)
+        except OSError:
+            cls._remove(Path(tmp_name))
+            raise
+
+    @staticmethod
+    def _remove(path: Path) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
@@ -5,32 +5,318 @@ This module provides functionality to analyze JSON responses from HTTP connector
 and suggest variable paths that can be used in Compound Actions.
 """
 
+import glob
+import heapq
 import json
+import os
 import re
-from typing import Dict, List, Any, Optional, Tuple, Set
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Iterable, Optional, Tuple, Set, Union
 from dataclasses import dataclass
 from pathlib import Path
 
+from .analysis_cache import AnalysisCache
+from .suggestion_index import SuggestionIndex
+from .payload_profiler import PayloadProfile, compute_path_sizes, collect_used_paths
+from .pagination import PaginationInfo, detect_pagination, generate_pagination_yaml, DEFAULT_MAX_PAGES
+
+
+# Version of the analysis output; part of the cache key, bump when suggestions change
+ANALYZER_VERSION = "2"
+
+# Number of items/keys kept when a container value is stored as a preview
+DEFAULT_PREVIEW_ITEMS = 3
+
+# Generation modes of JSONAnalyzer.generate_comprehensive_yaml_example
+YAML_EXAMPLE_MODES = ("per_property", "single_script", "map")
+
 
 @dataclass
+class ValuePreview:
+    """
+    Bounded stand-in for a JSON array or object value.
+
+    Keeps the container size and its first few items (arrays) or key/value
+    pairs (objects), two levels deep; deeper containers are reduced to their
+    size summary.
+    """
+    __slots__ = ("kind", "size", "items")
+    kind: str
+    size: int
+    items: Tuple[Any, ...]
+
+    @classmethod
+    def from_value(cls, value: Any, max_items: int = DEFAULT_PREVIEW_ITEMS,
+                   depth: int = 2) -> Any:
+        """Build a preview for containers; scalars are returned unchanged."""
+        if isinstance(value, list):
+            limit = max_items if depth > 0 else 0
+            items = tuple(cls.from_value(item, max_items, depth - 1) for item in value[:limit])
+            return cls("array", len(value), items)
+        if isinstance(value, dict):
+            pairs: List[Tuple[str, Any]] = []
+            if depth > 0:
+                for key, item in value.items():
+                    if len(pairs) >= max_items:
+                        break
+                    pairs.append((key, cls.from_value(item, max_items, depth - 1)))
+            return cls("object", len(value), tuple(pairs))
+        return value
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def truncated(self) -> bool:
+        """Whether the preview omits items of the original container."""
+        return len(self.items) < self.size
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable summary."""
+        if self.kind == "array":
+            items: Any = [_preview_to_json(item) for item in self.items]
+        else:
+            items = {key: _preview_to_json(item) for key, item in self.items}
+        return {"preview": self.kind, "size": self.size, "items": items,
+                "truncated": self.truncated}
+
+
+def _preview_to_json(value: Any) -> Any:
+    """Convert a (possibly previewed) suggestion value to plain JSON data."""
+    return value.to_dict() if isinstance(value, ValuePreview) else value
+
+
 class VariableSuggestion:
-    """Represents a suggested variable path from JSON analysis."""
-    path: str
-    value: Any
-    data_type: str
-    description: str
-    bender_expression: str
-    example_usage: str
+    """
+    Represents a suggested variable path from JSON analysis.
+
+    ``description`` and ``example_usage`` can be passed explicitly or, for
+    suggestions produced by a JSONAnalyzer, are rendered on first access so
+    that large analyses only pay for the text that is actually shown.
+    """
+
+    __slots__ = (
+        "path", "value", "data_type", "bender_expression", "source_name",
+        "_description", "_example_usage", "_analyzer",
+    )
+
+    def __init__(self, path: str, value: Any, data_type: str,
+                 description: Optional[str] = None, bender_expression: str = "",
+                 example_usage: Optional[str] = None, source_name: str = "",
+                 analyzer: Optional["JSONAnalyzer"] = None):
+        self.path = path
+        self.value = value
+        self.data_type = data_type
+        self.bender_expression = bender_expression
+        self.source_name = source_name
+        self._description = description
+        self._example_usage = example_usage
+        self._analyzer = analyzer
+
+    @property
+    def description(self) -> str:
+        """Human-readable description, rendered lazily."""
+        if self._description is None:
+            self._description = (self._analyzer or JSONAnalyzer())._render_description(self)
+        return self._description
+
+    @description.setter
+    def description(self, value: str) -> None:
+        self._description = value
+
+    @property
+    def example_usage(self) -> str:
+        """Example Compound Action usage, rendered lazily."""
+        if self._example_usage is None:
+            self._example_usage = (self._analyzer or JSONAnalyzer())._render_example_usage(self)
+        return self._example_usage
+
+    @example_usage.setter
+    def example_usage(self, value: str) -> None:
+        self._example_usage = value
+
+    def _fields(self) -> Tuple[Any, ...]:
+        return (self.path, self.value, self.data_type, self.description,
+                self.bender_expression, self.example_usage)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, VariableSuggestion):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    def __repr__(self) -> str:
+        return (f"VariableSuggestion(path={self.path!r}, data_type={self.data_type!r}, "
+                f"bender_expression={self.bender_expression!r})")
+
+    def __getstate__(self) -> Tuple[Any, ...]:
+        # Render the lazy fields so the analyzer reference is not pickled
+        return self._fields() + (self.source_name,)
+
+    def __setstate__(self, state: Tuple[Any, ...]) -> None:
+        (self.path, self.value, self.data_type, self._description,
+         self.bender_expression, self._example_usage, self.source_name) = state
+        self._analyzer = None
+
+
+class MergedSuggestion(VariableSuggestion):
+    """
+    A suggestion merged across several analyzed JSON documents.
+
+    Records in how many documents (files, or records of a JSON Lines
+    stream) the path appears, how often its value is null and a histogram
+    of the (size-independent) data types it takes across those documents.
+    """
+
+    __slots__ = ("document_count", "total_documents", "null_count", "type_counts", "unit")
+
+    def __init__(self, path: str, value: Any, data_type: str,
+                 description: Optional[str] = None, bender_expression: str = "",
+                 example_usage: Optional[str] = None, source_name: str = "",
+                 analyzer: Optional["JSONAnalyzer"] = None, document_count: int = 0,
+                 total_documents: int = 0, null_count: int = 0,
+                 type_counts: Optional[Dict[str, int]] = None, unit: str = "files"):
+        super().__init__(path, value, data_type, description, bender_expression,
+                         example_usage, source_name, analyzer)
+        self.document_count = document_count
+        self.total_documents = total_documents
+        self.null_count = null_count
+        self.type_counts = type_counts if type_counts is not None else {}
+        self.unit = unit
+
+    @property
+    def frequency(self) -> float:
+        """Fraction of analyzed documents that contain this path."""
+        return self.document_count / self.total_documents if self.total_documents else 0.0
+
+    @property
+    def null_rate(self) -> float:
+        """Fraction of occurrences of this path whose value is null."""
+        return self.null_count / self.document_count if self.document_count else 0.0
+
+    def __getstate__(self) -> Tuple[Any, ...]:
+        return super().__getstate__() + (self.document_count, self.total_documents,
+                                         self.null_count, self.type_counts, self.unit)
+
+    def __setstate__(self, state: Tuple[Any, ...]) -> None:
+        super().__setstate__(state[:7])
+        (self.document_count, self.total_documents, self.null_count,
+         self.type_counts, self.unit) = state[7:]
+
+
+class _SuggestionAggregator:
+    """Accumulates per-document suggestion rows into MergedSuggestions."""
+
+    def __init__(self, analyzer: "JSONAnalyzer", source_name: str, unit: str):
+        self.analyzer = analyzer
+        self.source_name = source_name
+        self.unit = unit
+        self.documents = 0
+        self.merged: Dict[Tuple[str, str], MergedSuggestion] = {}
+
+    def add(self, rows: List[Tuple[Any, ...]]) -> None:
+        """Add the de-duplicated suggestion rows of one document."""
+        self.documents += 1
+        for path, value, data_type, bender_expression in rows:
+            key = (path, bender_expression)
+            suggestion = self.merged.get(key)
+            if suggestion is None:
+                suggestion = MergedSuggestion(
+                    path=path,
+                    value=value,
+                    data_type=data_type,
+                    bender_expression=bender_expression,
+                    source_name=self.source_name,
+                    analyzer=self.analyzer,
+                    unit=self.unit
+                )
+                self.merged[key] = suggestion
+            elif suggestion.value is None and value is not None:
+                # Prefer a non-null example value
+                suggestion.value = value
+                suggestion.data_type = data_type
+            suggestion.document_count += 1
+            base_type = _base_data_type(data_type)
+            if base_type == "null":
+                suggestion.null_count += 1
+            suggestion.type_counts[base_type] = suggestion.type_counts.get(base_type, 0) + 1
+
+    def finish(self) -> List[MergedSuggestion]:
+        """Return merged suggestions, most frequent paths first."""
+        pattern_re = self.analyzer._common_pattern_regex()
+        for suggestion in self.merged.values():
+            suggestion.total_documents = self.documents
+        return sorted(
+            self.merged.values(),
+            key=lambda s: (-s.document_count, self.analyzer._suggestion_priority(s, pattern_re))
+        )
+
+
+def _base_data_type(data_type: str) -> str:
+    """
+    Strip size annotations, e.g. 'array[3]' -> 'array', 'object[2 keys]' -> 'object'.
+
+    Array properties count as their item type, e.g. 'array_property[null]' -> 'null'.
+    """
+    if data_type.startswith("array_property[") and data_type.endswith("]"):
+        data_type = data_type[len("array_property["):-1]
+    return re.sub(r'\[\d+(?: keys)?\]', '', data_type)
+
+
+def _analyze_file_worker(args: Tuple[str, str, bool, int]) -> Tuple[str, Optional[List[Tuple[Any, ...]]], Optional[str]]:
+    """
+    Analyze one JSON file in a worker process.
+
+    Returns compact (path, value, data_type, bender_expression) tuples rather
+    than suggestion objects to keep inter-process traffic small.
+    """
+    file_path, source_name, keep_full_values, preview_items = args
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            json_data = f.read()
+        analyzer = JSONAnalyzer(keep_full_values=keep_full_values, preview_items=preview_items)
+        analyzer._collect_suggestions(json_data, source_name)
+    except (OSError, ValueError) as e:
+        return file_path, None, str(e)
+    return file_path, analyzer._suggestion_rows(), None
+
+
+def expand_json_paths(spec: Union[str, Path], pattern: str = "*.json") -> List[Path]:
+    """
+    Expand a file, directory or glob specification into a sorted list of files.
+
+    Directories are searched (non-recursively) for ``pattern``.
+    """
+    spec_str = str(spec)
+    if os.path.isdir(spec_str):
+        return sorted(Path(spec_str).glob(pattern))
+    if glob.has_magic(spec_str):
+        return sorted(Path(p) for p in glob.glob(spec_str, recursive=True) if os.path.isfile(p))
+    return [Path(spec_str)]
 
 
 class JSONAnalyzer:
     """
     Analyzes JSON responses from HTTP connectors to suggest variable paths
     for use in Compound Action input arguments and step parameters.
+
+    Container values (arrays and objects) are stored on suggestions as a
+    bounded ValuePreview unless ``keep_full_values`` is set. When a
+    ``cache`` is given, results are looked up by content hash before the
+    JSON is parsed.
     """
     
-    def __init__(self):
+    def __init__(self, keep_full_values: bool = False,
+                 preview_items: int = DEFAULT_PREVIEW_ITEMS,
+                 cache: Optional[AnalysisCache] = None):
+        self.keep_full_values = keep_full_values
+        self.preview_items = preview_items
+        self.cache = cache
         self.suggestions: List[VariableSuggestion] = []
+        self.batch_errors: Dict[str, str] = {}
+        self.skipped_lines = 0
+        self._ranked = False
+        self._index = None
+        self._pattern_cache: Tuple[Optional[Tuple[str, ...]], Optional[Any]] = (None, None)
         self.common_patterns = {
             'id': 'Unique identifier',
             'email': 'Email address',
@@ -49,30 +335,245 @@ class JSONAnalyzer:
             'success': 'Success indicator'
         }
     
-    def analyze_json(self, json_data: str, source_name: str = "http_response") -> List[VariableSuggestion]:
+    def analyze_json(self, json_data: str, source_name: str = "http_response",
+                     top_k: Optional[int] = None) -> List[VariableSuggestion]:
         """
         Analyze JSON data and return variable suggestions.
         
         Args:
             json_data: JSON string from HTTP connector test results
             source_name: Name of the source (e.g., "user_api_response")
+            top_k: If given, only the k highest-priority suggestions are ranked
+                and returned; the full ordering stays available through
+                get_ranked_suggestions()
             
         Returns:
             List of VariableSuggestion objects
         """
+        self._collect_suggestions(json_data, source_name)
+
+        # Rank suggestions by usefulness
+        if top_k is not None:
+            return self.get_top_suggestions(top_k)
+
+        return self.get_ranked_suggestions()
+
+    def analyze_json_file(self, file_path: Union[str, Path], source_name: str = "http_response",
+                          top_k: Optional[int] = None) -> List[VariableSuggestion]:
+        """
+        Analyze a JSON file and return variable suggestions.
+
+        With a cache, an unchanged file is recognised by its size and
+        modification time and its suggestions are returned without reading it.
+
+        Args:
+            file_path: Path to JSON file
+            source_name: Name of the source for variable suggestions
+            top_k: See analyze_json()
+
+        Returns:
+            List of VariableSuggestion objects
+        """
+        digest = self.cache.digest_file(file_path) if self.cache else None
+        if digest is None or not self._load_cached(digest, source_name):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                json_data = f.read()
+            self._collect_suggestions(json_data, source_name, digest)
+
+        if top_k is not None:
+            return self.get_top_suggestions(top_k)
+        return self.get_ranked_suggestions()
+
+    def _collect_suggestions(self, json_data: str, source_name: str,
+                             digest: Optional[str] = None) -> None:
+        """Parse JSON data and collect de-duplicated, unranked suggestions."""
+        if self.cache is not None:
+            if digest is None:
+                digest = self.cache.digest_bytes(json_data.encode('utf-8'))
+            if self._load_cached(digest, source_name):
+                return
+
         try:
             parsed_data = json.loads(json_data)
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON data: {e}")
-        
+
+        self._collect_parsed(parsed_data, source_name)
+
+        if self.cache is not None and digest is not None:
+            self.cache.put(self._cache_key(digest, source_name), self._suggestion_rows())
+
+    def _collect_parsed(self, parsed_data: Any, source_name: str) -> None:
+        """Collect de-duplicated, unranked suggestions for already parsed JSON."""
         self.suggestions = []
+        self._ranked = False
+        self._index = None
         self._analyze_object(parsed_data, source_name, "")
-
-        # Remove duplicates and sort suggestions by usefulness
         self._remove_duplicate_suggestions()
-        self.suggestions.sort(key=self._suggestion_priority)
 
+    def _cache_key(self, digest: str, source_name: str) -> str:
+        """Build the cache key for content with the given digest."""
+        return AnalysisCache.make_key(digest, source_name, ANALYZER_VERSION,
+                                      (self.keep_full_values, self.preview_items))
+
+    def _load_cached(self, digest: str, source_name: str) -> bool:
+        """Restore suggestions from the cache; returns False on a miss."""
+        rows = self.cache.get(self._cache_key(digest, source_name)) if self.cache else None
+        if rows is None:
+            return False
+        self.suggestions = [
+            VariableSuggestion(path=path, value=value, data_type=data_type,
+                               bender_expression=bender_expression,
+                               source_name=source_name, analyzer=self)
+            for path, value, data_type, bender_expression in rows
+        ]
+        self._ranked = False
+        self._index = None
+        return True
+
+    def _suggestion_rows(self) -> List[Tuple[Any, ...]]:
+        """Return suggestions as compact (path, value, data_type, bender_expression) tuples."""
+        return [(s.path, s.value, s.data_type, s.bender_expression) for s in self.suggestions]
+
+    def analyze_json_files(self, file_paths: Iterable[Union[str, Path]],
+                           source_name: str = "http_response",
+                           max_workers: Optional[int] = None) -> List[MergedSuggestion]:
+        """
+        Analyze several JSON files in a process pool and merge the results.
+
+        Each path is reported once, with the number of files it appears in
+        and a histogram of its data types across files. Suggestions present
+        in more files are ranked first. Files that cannot be read or parsed
+        are skipped and recorded in ``self.batch_errors``.
+
+        Args:
+            file_paths: JSON files to analyze (e.g. from expand_json_paths())
+            source_name: Name of the source for variable suggestions
+            max_workers: Worker process count (defaults to the CPU count);
+                1 analyzes in-process
+
+        Returns:
+            List of MergedSuggestion objects
+        """
+        paths = [str(p) for p in file_paths]
+        jobs = [(p, source_name, self.keep_full_values, self.preview_items) for p in paths]
+
+        workers = max_workers or os.cpu_count() or 1
+        if workers <= 1 or len(jobs) <= 1:
+            results = map(_analyze_file_worker, jobs)
+            return self._merge_file_results(results, source_name)
+
+        chunksize = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            # map() preserves input order, so the merge is deterministic
+            results = executor.map(_analyze_file_worker, jobs, chunksize=chunksize)
+            return self._merge_file_results(results, source_name)
+
+    def _merge_file_results(self, results: Iterable[Tuple[str, Optional[List[Tuple[Any, ...]]], Optional[str]]],
+                            source_name: str) -> List[MergedSuggestion]:
+        """Merge per-file suggestion tuples into one ranked MergedSuggestion list."""
+        aggregator = _SuggestionAggregator(self, source_name, unit="files")
+        self.batch_errors = {}
+
+        for file_path, rows, error in results:
+            if rows is None:
+                self.batch_errors[file_path] = error or "unknown error"
+                continue
+            aggregator.add(rows)
+
+        self.suggestions = aggregator.finish()
+        self._ranked = True
+        self._index = None
         return self.suggestions
+
+    def analyze_ndjson(self, lines: Iterable[str], source_name: str = "http_response",
+                       max_errors: int = 20) -> List[MergedSuggestion]:
+        """
+        Analyze a JSON Lines (NDJSON) stream, one JSON document per line.
+
+        Records are parsed and analyzed one at a time and folded into
+        per-path aggregates, so memory use does not grow with the number of
+        lines. Each returned suggestion reports how many records contain the
+        path, its null rate and a type histogram. Blank lines are ignored;
+        unparseable lines are skipped and the first ``max_errors`` of them
+        are recorded in ``self.batch_errors``.
+
+        Args:
+            lines: Iterable of text lines, e.g. an open file
+            source_name: Name of the source for variable suggestions
+            max_errors: Maximum number of skipped lines to record
+
+        Returns:
+            List of MergedSuggestion objects
+        """
+        located = ((f"line {line_number}", line) for line_number, line in enumerate(lines, 1))
+        return self._analyze_located_lines(located, source_name, max_errors)
+
+    def analyze_ndjson_files(self, file_paths: Iterable[Union[str, Path]], source_name: str = "http_response",
+                             max_errors: int = 20) -> List[MergedSuggestion]:
+        """
+        Analyze several JSON Lines files as one stream of records.
+
+        Files are opened one at a time, and skipped lines are recorded in
+        ``self.batch_errors`` as ``file:line``. See analyze_ndjson().
+
+        Raises:
+            OSError: If a file cannot be read
+        """
+        def located_lines():
+            for file_path in file_paths:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    for line_number, line in enumerate(f, 1):
+                        yield f"{file_path}:{line_number}", line
+
+        return self._analyze_located_lines(located_lines(), source_name, max_errors)
+
+    def _analyze_located_lines(self, lines: Iterable[Tuple[str, str]], source_name: str,
+                               max_errors: int) -> List[MergedSuggestion]:
+        """Fold (location, line) pairs of JSON Lines input into per-path aggregates."""
+        aggregator = _SuggestionAggregator(self, source_name, unit="records")
+        self.batch_errors = {}
+        self.skipped_lines = 0
+
+        for location, line in lines:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                self.skipped_lines += 1
+                if len(self.batch_errors) < max_errors:
+                    self.batch_errors[location] = f"Invalid JSON data: {e}"
+                continue
+            self._collect_parsed(record, source_name)
+            aggregator.add(self._suggestion_rows())
+
+        self.suggestions = aggregator.finish()
+        self._ranked = True
+        self._index = None
+        return self.suggestions
+
+    def get_ranked_suggestions(self) -> List[VariableSuggestion]:
+        """Return all suggestions in full priority order (sorted once, then reused)."""
+        if not self._ranked:
+            pattern_re = self._common_pattern_regex()
+            self.suggestions.sort(key=lambda s: self._suggestion_priority(s, pattern_re))
+            self._ranked = True
+            self._index = None
+        return self.suggestions
+
+    def get_top_suggestions(self, k: int) -> List[VariableSuggestion]:
+        """
+        Return the k highest-priority suggestions.
+
+        Uses a heap selection (O(n log k)) unless the full ordering has
+        already been computed.
+        """
+        if self._ranked:
+            return self.suggestions[:k]
+        pattern_re = self._common_pattern_regex()
+        return heapq.nsmallest(k, self.suggestions,
+                               key=lambda s: self._suggestion_priority(s, pattern_re))
     
     def _analyze_object(self, obj: Any, source_name: str, current_path: str) -> None:
         """Recursively analyze JSON object and extract variable paths."""
@@ -156,11 +657,11 @@ class JSONAnalyzer:
             # Create a special suggestion for array property extraction
             suggestion = VariableSuggestion(
                 path=prop_path,
-                value=example_value,
+                value=self._stored_value(example_value),
                 data_type=f"array_property[{data_type}]",
-                description=f"All {prop} values from array items ({data_type})",
                 bender_expression=bender_expr,
-                example_usage=self._generate_array_property_usage(prop, data_type, current_path, source_name)
+                source_name=source_name,
+                analyzer=self
             )
             self.suggestions.append(suggestion)
 
@@ -198,22 +699,23 @@ class JSONAnalyzer:
 
     def _add_suggestion(self, path: str, value: Any, source_name: str, is_computed: bool = False) -> None:
         """Add a variable suggestion based on the path and value."""
-        data_type = self._get_data_type(value)
-        description = self._generate_description(path, value, data_type)
-        bender_expression = f"{source_name}.{path}"
-        example_usage = self._generate_example_usage(path, value, data_type)
-        
         suggestion = VariableSuggestion(
             path=path,
-            value=value,
-            data_type=data_type,
-            description=description,
-            bender_expression=bender_expression,
-            example_usage=example_usage
+            value=self._stored_value(value),
+            data_type=self._get_data_type(value),
+            bender_expression=f"{source_name}.{path}",
+            source_name=source_name,
+            analyzer=self
         )
         
         self.suggestions.append(suggestion)
     
+    def _stored_value(self, value: Any) -> Any:
+        """Return the value to keep on a suggestion (a preview for containers)."""
+        if self.keep_full_values:
+            return value
+        return ValuePreview.from_value(value, self.preview_items)
+
     def _get_data_type(self, value: Any) -> str:
         """Determine the data type of a value."""
         if value is None:
@@ -243,6 +745,23 @@ class JSONAnalyzer:
         else:
             return "unknown"
     
+    def _render_description(self, suggestion: VariableSuggestion) -> str:
+        """Render the description of a lazily built suggestion."""
+        if suggestion.data_type.startswith("array_property"):
+            property_name = suggestion.path.rpartition('[*].')[2]
+            item_type = suggestion.data_type[len("array_property["):-1]
+            return f"All {property_name} values from array items ({item_type})"
+        return self._generate_description(suggestion.path, suggestion.value, suggestion.data_type)
+
+    def _render_example_usage(self, suggestion: VariableSuggestion) -> str:
+        """Render the example usage of a lazily built suggestion."""
+        if suggestion.data_type.startswith("array_property"):
+            array_path, _, property_name = suggestion.path.rpartition('[*].')
+            item_type = suggestion.data_type[len("array_property["):-1]
+            return self._generate_array_property_usage(property_name, item_type, array_path,
+                                                       suggestion.source_name)
+        return self._generate_example_usage(suggestion.path, suggestion.value, suggestion.data_type)
+
     def _generate_description(self, path: str, value: Any, data_type: str) -> str:
         """Generate a human-readable description for the variable."""
         # Check for common patterns in the path
@@ -295,7 +814,15 @@ script:
         else:
             return f"input_args: {{\"data\": \"{path}\"}}"
     
-    def _suggestion_priority(self, suggestion: VariableSuggestion) -> Tuple[int, int, str]:
+    def _common_pattern_regex(self) -> Any:
+        """Compile common_patterns into one alternation, recompiling only when the keys change."""
+        keys = tuple(self.common_patterns)
+        if self._pattern_cache[0] != keys:
+            self._pattern_cache = (keys, re.compile('|'.join(re.escape(k) for k in keys)) if keys else None)
+        return self._pattern_cache[1]
+
+    def _suggestion_priority(self, suggestion: VariableSuggestion,
+                             pattern_re: Optional[Any] = None) -> Tuple[int, int, str]:
         """Calculate priority for sorting suggestions (lower = higher priority)."""
         # Prioritize array property suggestions (new comprehensive array handling)
         array_property_priority = 0
@@ -304,11 +831,10 @@ script:
 
         # Prioritize common patterns
         pattern_priority = 0
-        path_lower = suggestion.path.lower()
-        for pattern in self.common_patterns.keys():
-            if pattern in path_lower:
-                pattern_priority = -10
-                break
+        if pattern_re is None:
+            pattern_re = self._common_pattern_regex()
+        if pattern_re is not None and pattern_re.search(suggestion.path.lower()):
+            pattern_priority = -10
 
         # Prioritize shorter paths
         depth_penalty = len(suggestion.path.split('.'))
@@ -339,23 +865,38 @@ script:
         self.suggestions = unique_suggestions
 
     def format_suggestions_for_display(self, suggestions: List[VariableSuggestion],
-                                     max_suggestions: int = 20) -> str:
-        """Format suggestions for CLI display."""
+                                     max_suggestions: int = 20,
+                                     total_count: Optional[int] = None) -> str:
+        """
+        Format suggestions for CLI display.
+
+        ``total_count`` is the size of the full result when ``suggestions``
+        is only a top-k selection.
+        """
         if not suggestions:
             return "No variable suggestions found."
+
+        total = len(suggestions) if total_count is None else total_count
         
         output = ["📊 Variable Suggestions from JSON Analysis:", ""]
         
         for i, suggestion in enumerate(suggestions[:max_suggestions], 1):
             output.append(f"{i:2d}. {suggestion.path}")
             output.append(f"    Type: {suggestion.data_type}")
+            if isinstance(suggestion, MergedSuggestion):
+                types = ", ".join(f"{t} ×{n}" for t, n in suggestion.type_counts.items())
+                output.append(f"    Seen in: {suggestion.document_count}/{suggestion.total_documents} "
+                              f"{suggestion.unit} ({types})")
+                if suggestion.null_count:
+                    output.append(f"    Null rate: {suggestion.null_rate:.1%}")
             output.append(f"    Description: {suggestion.description}")
             output.append(f"    Bender: {suggestion.bender_expression}")
             output.append(f"    Example: {suggestion.example_usage}")
             output.append("")
         
-        if len(suggestions) > max_suggestions:
-            output.append(f"... and {len(suggestions) - max_suggestions} more suggestions")
+        shown = min(len(suggestions), max_suggestions)
+        if total > shown:
+            output.append(f"... and {total - shown} more suggestions")
         
         return "\n".join(output)
     
@@ -365,36 +906,65 @@ script:
     
     def get_suggestions_by_pattern(self, pattern: str) -> List[VariableSuggestion]:
         """Get suggestions that match a specific pattern."""
-        pattern_lower = pattern.lower()
-        return [s for s in self.suggestions if pattern_lower in s.path.lower()]
+        index = self.get_index()
+        return [index.get(item_id) for item_id in index.substring(pattern)]
+
+    def get_index(self) -> SuggestionIndex:
+        """Return a search index over the current suggestions, built on first use."""
+        if self._index is None:
+            self._index = SuggestionIndex(self.suggestions)
+        return self._index
     
     def export_suggestions_to_json(self, output_path: Path) -> None:
         """Export suggestions to a JSON file for later use."""
         suggestions_data = []
-        for suggestion in self.suggestions:
-            suggestions_data.append({
+        for suggestion in self.get_ranked_suggestions():
+            entry = {
                 "path": suggestion.path,
-                "value": suggestion.value,
+                "value": _preview_to_json(suggestion.value),
                 "data_type": suggestion.data_type,
                 "description": suggestion.description,
                 "bender_expression": suggestion.bender_expression,
                 "example_usage": suggestion.example_usage
-            })
+            }
+            if isinstance(suggestion, MergedSuggestion):
+                entry["document_count"] = suggestion.document_count
+                entry["total_documents"] = suggestion.total_documents
+                entry["unit"] = suggestion.unit
+                entry["null_rate"] = suggestion.null_rate
+                entry["type_counts"] = suggestion.type_counts
+            suggestions_data.append(entry)
 
         with open(output_path, 'w', encoding='utf-8') as f:
             json.dump(suggestions_data, f, indent=2, ensure_ascii=False)
 
-    def generate_comprehensive_yaml_example(self, source_name: str = "api_response") -> str:
+    def generate_comprehensive_yaml_example(self, source_name: str = "api_response",
+                                            mode: str = "per_property") -> str:
         """
         Generate a comprehensive YAML example that extracts all array properties
         found in the JSON analysis. This creates a complete Moveworks Compound Action
         that processes all array data with valid YAML schema.
+
+        Modes (see YAML_EXAMPLE_MODES):
+            per_property: one script step per property plus a summary step
+            single_script: one script step extracting every property in a
+                single pass over each array
+            map: a return step using Bender MAP() per property, no script step
         """
+        if mode not in YAML_EXAMPLE_MODES:
+            raise ValueError(f"Unknown YAML example mode '{mode}'. "
+                             f"Choose from: {', '.join(YAML_EXAMPLE_MODES)}")
+
         array_properties = [s for s in self.suggestions if s.data_type.startswith("array_property")]
 
         if not array_properties:
             return "# No array properties found to extract"
 
+        if mode == "single_script":
+            return self._generate_single_script_yaml(source_name)
+        if mode == "map":
+            return self._generate_map_yaml(source_name)
+
         yaml_lines = [
             "# Comprehensive data extraction from JSON arrays",
             "# This YAML extracts all properties from array items",
@@ -457,6 +1027,189 @@ script:
 
         return "\n".join(yaml_lines)
 
+    def profile_payload(self, json_data: Union[str, Any], compound_action: Any = None,
+                        output_key: Optional[str] = None) -> PayloadProfile:
+        """
+        Profile the serialized byte size of every path in a response.
+
+        Args:
+            json_data: JSON string or already parsed data
+            compound_action: Optional CompoundAction (or its YAML dict) whose
+                data.<output_key>.<path> references mark paths as used
+            output_key: Output key the response is stored under; any key if omitted
+
+        Returns:
+            PayloadProfile with per-path sizes, shares and usage
+        """
+        if isinstance(json_data, str):
+            json_data = json.loads(json_data)
+        used = None
+        if compound_action is not None:
+            used = collect_used_paths(compound_action, output_key)
+        return PayloadProfile(compute_path_sizes(json_data), used)
+
+    def detect_pagination(self) -> Optional[PaginationInfo]:
+        """Detect offset, page-number or cursor pagination in the analyzed response."""
+        return detect_pagination(self.suggestions)
+
+    def generate_pagination_fragment(self, action_name: str,
+                                     max_pages: int = DEFAULT_MAX_PAGES) -> str:
+        """
+        Generate a compound action fragment that fetches all pages of the
+        analyzed response with the given action.
+
+        Pages are fetched in parallel when the response reports a total,
+        otherwise sequentially up to max_pages calls.
+        """
+        info = self.detect_pagination()
+        if info is None:
+            return "# No pagination fields found in the analyzed response"
+        return generate_pagination_yaml(info, action_name, max_pages)
+
+    def _array_property_groups(self) -> Dict[str, List[str]]:
+        """Group array property names by the array path they belong to, in suggestion order."""
+        groups: Dict[str, List[str]] = {}
+        for suggestion in self.suggestions:
+            if not suggestion.data_type.startswith("array_property"):
+                continue
+            array_path, _, property_name = suggestion.path.rpartition('[*].')
+            properties = groups.setdefault(array_path.replace('[*]', ''), [])
+            if property_name not in properties:
+                properties.append(property_name)
+        return groups
+
+    def _summary_keys(self, groups: Dict[str, List[str]]) -> Dict[Tuple[str, str], str]:
+        """Return summary keys per (array path, property); array-qualified when names clash."""
+        owners: Dict[str, int] = {}
+        for properties in groups.values():
+            for property_name in properties:
+                owners[property_name] = owners.get(property_name, 0) + 1
+
+        keys = {}
+        for array_path, properties in groups.items():
+            array_name = self._clean_property_name(array_path.rsplit('.', 1)[-1]) if array_path else "root"
+            for property_name in properties:
+                if owners[property_name] > 1:
+                    keys[(array_path, property_name)] = f"{array_name}_{property_name}_list"
+                else:
+                    keys[(array_path, property_name)] = f"{property_name}_list"
+        return keys
+
+    def _array_lengths(self) -> Dict[str, int]:
+        """Return the observed length of each array path (without [*] markers)."""
+        lengths = {}
+        for suggestion in self.suggestions:
+            match = re.fullmatch(r'array\[(\d+)\]', suggestion.data_type)
+            if match and '[*]' not in suggestion.path:
+                lengths[suggestion.path] = int(match.group(1))
+        return lengths
+
+    def estimate_yaml_example_cost(self, mode: str = "per_property") -> Dict[str, Any]:
+        """
+        Estimate the runtime cost of the YAML example generated in a mode.
+
+        Returns a dict with the number of steps and script steps, the number
+        of passes over array data, and the element iterations those passes
+        make for the array lengths observed in the analyzed JSON (None when
+        a length is unknown, e.g. for nested arrays).
+        """
+        if mode not in YAML_EXAMPLE_MODES:
+            raise ValueError(f"Unknown YAML example mode '{mode}'. "
+                             f"Choose from: {', '.join(YAML_EXAMPLE_MODES)}")
+
+        groups = self._array_property_groups()
+        lengths = self._array_lengths()
+        property_count = sum(len(properties) for properties in groups.values())
+
+        if mode == "per_property":
+            steps, script_steps = property_count + 1, property_count + 1
+            passes = {array_path: len(properties) for array_path, properties in groups.items()}
+        elif mode == "single_script":
+            steps, script_steps = 1, 1
+            passes = {array_path: 1 for array_path in groups}
+        else:
+            # MAP() is evaluated by Bender once per property, without a script step
+            steps, script_steps = 1, 0
+            passes = {array_path: len(properties) for array_path, properties in groups.items()}
+
+        iterations: Optional[int] = 0
+        for array_path, count in passes.items():
+            length = lengths.get(array_path)
+            if length is None:
+                iterations = None
+                break
+            iterations += count * length
+
+        return {
+            "mode": mode,
+            "properties": property_count,
+            "steps": steps if groups else 0,
+            "script_steps": script_steps if groups else 0,
+            "array_passes": sum(passes.values()),
+            "iterations": iterations,
+            "array_lengths": {array_path: lengths.get(array_path) for array_path in groups},
+        }
+
+    def _generate_single_script_yaml(self, source_name: str) -> str:
+        """Generate one script step that extracts every array property in one pass per array."""
+        groups = self._array_property_groups()
+        keys = self._summary_keys(groups)
+
+        yaml_lines = [
+            "# Comprehensive data extraction from JSON arrays",
+            "# This YAML extracts all properties from array items in a single pass per array",
+            "",
+            "steps:",
+            "  - # Step 1: Extract all array properties",
+            "    script:",
+            "      code: |",
+            "        summary = {}",
+        ]
+
+        for array_path, properties in groups.items():
+            full_array_path = f"{source_name}.{array_path}" if array_path else source_name
+            yaml_lines.append(f"        # Extract {len(properties)} properties from {array_path or 'root array'}")
+            for property_name in properties:
+                yaml_lines.append(f"        summary['{keys[(array_path, property_name)]}'] = []")
+            yaml_lines.append(f"        for item in {full_array_path}:")
+            for property_name in properties:
+                yaml_lines.extend([
+                    f"          if '{property_name}' in item:",
+                    f"            summary['{keys[(array_path, property_name)]}'].append(item['{property_name}'])",
+                ])
+
+        yaml_lines.extend([
+            "        return summary",
+            "    output_key: extractedDataSummary",
+        ])
+        return "\n".join(yaml_lines)
+
+    def _generate_map_yaml(self, source_name: str) -> str:
+        """Generate a return step that extracts every array property with Bender MAP()."""
+        groups = self._array_property_groups()
+        keys = self._summary_keys(groups)
+
+        yaml_lines = [
+            "# Comprehensive data extraction from JSON arrays",
+            "# This YAML extracts all properties from array items with Bender MAP(), without script steps",
+            "",
+            "steps:",
+            "  - # Step 1: Map all array properties",
+            "    return:",
+            "      output_mapper:",
+        ]
+
+        for array_path, properties in groups.items():
+            full_array_path = f"{source_name}.{array_path}" if array_path else source_name
+            for property_name in properties:
+                yaml_lines.extend([
+                    f"        {keys[(array_path, property_name)]}:",
+                    f"          MAP():",
+                    f"            items: {full_array_path}",
+                    f"            converter: item.{property_name}",
+                ])
+        return "\n".join(yaml_lines)
+
     def _clean_property_name(self, property_name: str) -> str:
         """Clean property name to be valid for YAML keys."""
         # Remove special characters and convert to camelCase
@@ -469,35 +1222,75 @@ script:
         return clean_name or 'property'
 
 
-def analyze_json_file(file_path: Path, source_name: str = "http_response") -> List[VariableSuggestion]:
+def analyze_json_file(file_path: Path, source_name: str = "http_response",
+                      keep_full_values: bool = False,
+                      cache: Optional[AnalysisCache] = None) -> List[VariableSuggestion]:
     """
     Convenience function to analyze JSON from a file.
     
     Args:
         file_path: Path to JSON file
         source_name: Name of the source for variable suggestions
+        keep_full_values: Keep full container values instead of previews
+        cache: Optional on-disk cache for analysis results
         
     Returns:
         List of VariableSuggestion objects
     """
-    analyzer = JSONAnalyzer()
+    analyzer = JSONAnalyzer(keep_full_values=keep_full_values, cache=cache)
+    return analyzer.analyze_json_file(file_path, source_name)
+
+
+def analyze_json_files(file_paths: Iterable[Union[str, Path]], source_name: str = "http_response",
+                       max_workers: Optional[int] = None,
+                       keep_full_values: bool = False) -> List[MergedSuggestion]:
+    """
+    Batch counterpart of analyze_json_file: analyze many files in parallel.
     
-    with open(file_path, 'r', encoding='utf-8') as f:
-        json_data = f.read()
+    Args:
+        file_paths: Paths of the JSON files to analyze
+        source_name: Name of the source for variable suggestions
+        max_workers: Worker process count (defaults to the CPU count)
+        keep_full_values: Keep full container values instead of previews
+        
+    Returns:
+        List of MergedSuggestion objects with per-path file counts and type histograms
+    """
+    analyzer = JSONAnalyzer(keep_full_values=keep_full_values)
+    return analyzer.analyze_json_files(file_paths, source_name, max_workers)
+
+
+def analyze_ndjson_file(file_path: Union[str, Path], source_name: str = "http_response",
+                        keep_full_values: bool = False) -> List[MergedSuggestion]:
+    """
+    Convenience function to analyze a JSON Lines (NDJSON) file.
     
-    return analyzer.analyze_json(json_data, source_name)
+    Args:
+        file_path: Path to the JSON Lines file
+        source_name: Name of the source for variable suggestions
+        keep_full_values: Keep full container values instead of previews
+        
+    Returns:
+        List of MergedSuggestion objects with per-path record counts,
+        null rates and type histograms
+    """
+    analyzer = JSONAnalyzer(keep_full_values=keep_full_values)
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return analyzer.analyze_ndjson(f, source_name)
 
 
-def analyze_json_string(json_string: str, source_name: str = "http_response") -> List[VariableSuggestion]:
+def analyze_json_string(json_string: str, source_name: str = "http_response",
+                        keep_full_values: bool = False) -> List[VariableSuggestion]:
     """
     Convenience function to analyze JSON from a string.
     
     Args:
         json_string: JSON data as string
         source_name: Name of the source for variable suggestions
+        keep_full_values: Keep full container values instead of previews
         
     Returns:
         List of VariableSuggestion objects
     """
-    analyzer = JSONAnalyzer()
+    analyzer = JSONAnalyzer(keep_full_values=keep_full_values)
     return analyzer.analyze_json(json_string, source_name)
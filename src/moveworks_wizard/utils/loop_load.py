@@ -0,0 +1,127 @@
+"""
+Connector load estimates for loops.
+
+Counts the actions a ``for`` loop (or a parallel ``for``) calls per
+iteration and combines them with the performance profiles of the catalog
+to estimate, per connector, how many calls the loop makes and how long
+they take at least given the connector's rate limit, concurrency cap and
+typical latency. The wizard uses this to warn when a loop is about to
+hammer a rate-limited connector or repeat calls that are not safe to retry.
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..catalog.builtin_actions import ActionPerformance, BuiltinActionCatalog, builtin_catalog, format_duration
+
+
+# Loops expected to take longer than this are reported even without a rate limit
+LONG_LOOP_SECONDS = 60.0
+
+
+@dataclass
+class ConnectorLoad:
+    """Calls a loop makes to one connector, or to one action without a profiled connector."""
+
+    connector: str
+    calls: int = 0
+    actions: List[str] = field(default_factory=list)
+    rate_limit_rps: Optional[float] = None
+    max_concurrency: Optional[int] = None
+    # Lower bound on the time the calls take; None without latency or limits
+    min_seconds: Optional[float] = None
+    # Actions that are neither idempotent nor read-only
+    unsafe_to_retry: List[str] = field(default_factory=list)
+
+
+def _loop_body(loop: Any) -> Tuple[Dict[str, Any], bool]:
+    """Return the body of a for loop and whether its iterations run in parallel."""
+    if hasattr(loop, "to_yaml_dict"):
+        loop = loop.to_yaml_dict()
+    if isinstance(loop.get("parallel"), dict):
+        return loop["parallel"].get("for") or {}, True
+    return loop.get("for", loop), False
+
+
+def _count_actions(node: Any, counts: Counter) -> None:
+    if isinstance(node, dict):
+        action = node.get("action")
+        if isinstance(action, dict) and isinstance(action.get("action_name"), str):
+            counts[action["action_name"]] += 1
+        for value in node.values():
+            _count_actions(value, counts)
+    elif isinstance(node, list):
+        for item in node:
+            _count_actions(item, counts)
+
+
+def _strictest(current, limit):
+    if limit is None:
+        return current
+    return limit if current is None else min(current, limit)
+
+
+def estimate_loop_load(loop: Any, iterations: int,
+                       catalog: Optional[BuiltinActionCatalog] = None) -> List[ConnectorLoad]:
+    """
+    Estimate the calls a loop makes to each connector.
+
+    ``loop`` is a ForStep or ParallelStep, or its YAML dictionary. Every
+    action in the loop body counts once per iteration, including actions in
+    switch cases and nested loops, so the counts are a lower bound.
+    """
+    catalog = catalog or builtin_catalog
+    body, parallel = _loop_body(loop)
+    counts: Counter = Counter()
+    _count_actions(body.get("steps", []), counts)
+
+    loads: Dict[str, ConnectorLoad] = {}
+    latency_seconds: Dict[str, float] = {}
+    for name, per_iteration in counts.items():
+        performance = catalog.get_performance(name) or ActionPerformance()
+        key = performance.connector or name
+        load = loads.get(key)
+        if load is None:
+            load = loads[key] = ConnectorLoad(key)
+        calls = per_iteration * iterations
+        load.calls += calls
+        load.actions.append(name)
+        load.rate_limit_rps = _strictest(load.rate_limit_rps, performance.rate_limit_rps)
+        load.max_concurrency = _strictest(load.max_concurrency, performance.max_concurrency)
+        if performance.typical_latency_ms is not None:
+            latency_seconds[key] = latency_seconds.get(key, 0.0) + calls * performance.typical_latency_ms / 1000
+        if performance.idempotent is False and not performance.read_only:
+            load.unsafe_to_retry.append(name)
+
+    for key, load in loads.items():
+        bounds = []
+        if load.rate_limit_rps:
+            bounds.append(load.calls / load.rate_limit_rps)
+        if key in latency_seconds:
+            # Parallel iterations overlap up to the concurrency cap
+            overlap = min(load.max_concurrency or iterations, iterations) if parallel else 1
+            bounds.append(latency_seconds[key] / max(overlap, 1))
+        load.min_seconds = max(bounds) if bounds else None
+    return list(loads.values())
+
+
+def loop_load_warnings(loop: Any, iterations: int,
+                       catalog: Optional[BuiltinActionCatalog] = None) -> List[str]:
+    """Return warnings about the connector load of a loop running the given number of iterations."""
+    _, parallel = _loop_body(loop)
+    warnings = []
+    for load in estimate_loop_load(loop, iterations, catalog):
+        if load.rate_limit_rps and load.calls > load.rate_limit_rps:
+            warnings.append(f"This loop will make ~{load.calls:,} calls to {load.connector}, a connector limited "
+                            f"to {load.rate_limit_rps:g} rps: at least {format_duration(load.min_seconds)}")
+        elif load.min_seconds is not None and load.min_seconds >= LONG_LOOP_SECONDS:
+            warnings.append(f"This loop will make ~{load.calls:,} calls to {load.connector}, "
+                            f"taking about {format_duration(load.min_seconds)}")
+        if parallel and load.max_concurrency and iterations > load.max_concurrency:
+            warnings.append(f"{load.connector} accepts at most {load.max_concurrency} concurrent calls; "
+                            f"the remaining parallel iterations will queue or be throttled")
+        for name in load.unsafe_to_retry:
+            warnings.append(f"{name} is not safe to retry: re-running the loop after a partial failure "
+                            f"repeats calls that already succeeded")
+    return warnings
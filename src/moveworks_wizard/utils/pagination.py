@@ -0,0 +1,344 @@
+"""
+Pagination detection for analyzed connector responses.
+
+Recognizes offset/limit, page-number and cursor pagination from the paths
+found by the JSON analyzer (e.g. ``next_page_token``, ``links.next``,
+``offset``/``limit``, ``total_count``) and generates compound action
+fragments that fetch the remaining pages: in parallel over a computed
+offset or page range when the total is known, or as a bounded sequential
+loop otherwise.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+
+# Leaf key names (lower-cased, without "_" and "-") that identify pagination fields
+CURSOR_KEYS = {"next", "nextpagetoken", "pagetoken", "nextcursor", "cursor", "nexttoken",
+               "continuationtoken", "nextlink", "nextpage", "nextpageurl", "nexturl"}
+OFFSET_KEYS = {"offset", "start", "skip", "startat", "startindex"}
+LIMIT_KEYS = {"limit", "pagesize", "perpage", "maxresults", "size", "top"}
+PAGE_KEYS = {"page", "pagenumber", "pagenum", "currentpage"}
+TOTAL_KEYS = {"totalcount", "total", "totalresults", "totalsize", "totalitems", "totalrecords"}
+TOTAL_PAGES_KEYS = {"totalpages", "pagecount", "numpages"}
+
+# Pagination fields are expected near the top of a response
+_MAX_DEPTH = 3
+
+# Default bound on sequentially fetched pages when the total is unknown
+DEFAULT_MAX_PAGES = 10
+
+
+def _normalize(key: str) -> str:
+    return key.lower().replace("_", "").replace("-", "")
+
+
+@dataclass
+class PaginationInfo:
+    """Pagination scheme detected in a sample response."""
+
+    style: str  # "offset", "page" or "cursor"
+    items_path: Optional[str] = None
+    page_size: Optional[int] = None
+    offset_path: Optional[str] = None
+    limit_path: Optional[str] = None
+    page_path: Optional[str] = None
+    cursor_path: Optional[str] = None
+    cursor_is_url: bool = False
+    total_path: Optional[str] = None
+    total: Optional[int] = None
+    total_pages_path: Optional[str] = None
+    total_pages: Optional[int] = None
+
+    @property
+    def total_known(self) -> bool:
+        """Whether the response reports how many items or pages exist."""
+        return self.total_path is not None or self.total_pages_path is not None
+
+    @property
+    def estimated_calls(self) -> Optional[int]:
+        """Number of requests needed to fetch everything, or None if unknown."""
+        if self.total_pages is not None:
+            return max(1, self.total_pages)
+        if self.total is not None and self.page_size:
+            return max(1, math.ceil(self.total / self.page_size))
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the detected fields, omitting empty ones."""
+        result = {key: value for key, value in self.__dict__.items() if value is not None}
+        result["estimated_calls"] = self.estimated_calls
+        return result
+
+
+def detect_pagination(suggestions: Iterable[Any]) -> Optional[PaginationInfo]:
+    """
+    Detect the pagination scheme from analyzer suggestions.
+
+    Only object paths outside arrays are considered. Returns None when no
+    offset, page or cursor field is found.
+    """
+    found: Dict[str, Any] = {}
+    arrays: List[Any] = []
+
+    for suggestion in suggestions:
+        path = suggestion.path
+        if '[' in path or path.endswith('.length'):
+            continue
+        segments = path.split('.')
+        if len(segments) > _MAX_DEPTH:
+            continue
+        if suggestion.data_type.startswith("array["):
+            arrays.append(suggestion)
+            continue
+
+        leaf = _normalize(segments[-1])
+        if leaf == "href" and len(segments) > 1:
+            # HAL style links: links.next.href
+            leaf = _normalize(segments[-2])
+
+        value = suggestion.value
+        is_int = isinstance(value, int) and not isinstance(value, bool)
+        if leaf in CURSOR_KEYS and (value is None or isinstance(value, str)):
+            kind = "cursor"
+        elif leaf in OFFSET_KEYS and is_int:
+            kind = "offset"
+        elif leaf in LIMIT_KEYS and is_int:
+            kind = "limit"
+        elif leaf in PAGE_KEYS and is_int:
+            kind = "page"
+        elif leaf in TOTAL_KEYS and is_int:
+            kind = "total"
+        elif leaf in TOTAL_PAGES_KEYS and is_int:
+            kind = "total_pages"
+        else:
+            continue
+
+        # Prefer the shallowest occurrence of each kind
+        current = found.get(kind)
+        if current is None or len(segments) < len(current.path.split('.')):
+            found[kind] = suggestion
+
+    if "offset" in found:
+        style = "offset"
+    elif "page" in found:
+        style = "page"
+    elif "cursor" in found:
+        style = "cursor"
+    else:
+        return None
+
+    info = PaginationInfo(style=style)
+    if arrays:
+        items = max(arrays, key=lambda s: _array_length(s.data_type))
+        info.items_path = items.path
+        info.page_size = _array_length(items.data_type) or None
+    if "limit" in found:
+        info.limit_path = found["limit"].path
+        info.page_size = found["limit"].value or info.page_size
+    if "offset" in found:
+        info.offset_path = found["offset"].path
+    if "page" in found:
+        info.page_path = found["page"].path
+    if "cursor" in found:
+        info.cursor_path = found["cursor"].path
+        info.cursor_is_url = isinstance(found["cursor"].value, str) and \
+            found["cursor"].value.startswith(("http://", "https://"))
+    if "total" in found:
+        info.total_path = found["total"].path
+        info.total = found["total"].value
+    if "total_pages" in found:
+        info.total_pages_path = found["total_pages"].path
+        info.total_pages = found["total_pages"].value
+    return info
+
+
+def _array_length(data_type: str) -> int:
+    try:
+        return int(data_type[len("array["):-1])
+    except ValueError:
+        return 0
+
+
+def _request_arg(path: Optional[str], default: str) -> str:
+    """Derive the request argument name from a response field path."""
+    if not path:
+        return default
+    segments = [s for s in path.split('.') if s != "href"]
+    name = segments[-1]
+    if name.lower().startswith("next_"):
+        name = name[len("next_"):]
+    return name
+
+
+def generate_pagination_yaml(info: PaginationInfo, action_name: str,
+                             max_pages: int = DEFAULT_MAX_PAGES) -> str:
+    """
+    Generate a compound action fragment that fetches every page.
+
+    With a known total (item or page count) the first page is fetched,
+    the remaining offsets or page numbers are computed and fetched with a
+    parallel for loop. Otherwise pages are fetched one after another, each
+    guarded by a switch on the previous page, up to ``max_pages`` calls.
+    """
+    if max_pages < 1:
+        raise ValueError("max_pages must be at least 1")
+
+    calls = info.estimated_calls
+    if info.style in ("offset", "page") and info.total_known and info.page_size:
+        lines = _parallel_fragment(info, action_name)
+    else:
+        if calls is not None:
+            max_pages = min(max_pages, calls)
+        lines = _sequential_fragment(info, action_name, max_pages)
+
+    if calls is not None:
+        header = f"# Estimated calls for the sample's total: {calls}"
+    else:
+        header = f"# Total unknown: fetches at most {max_pages} pages sequentially"
+    return "\n".join([
+        f"# Paginated fetch ({info.style} pagination) for {action_name}",
+        header,
+        "",
+        "steps:",
+    ] + lines)
+
+
+def _items_expr(info: PaginationInfo) -> str:
+    if not info.items_path:
+        return ""
+    return "".join(f"['{segment}']" for segment in info.items_path.split('.'))
+
+
+def _parallel_fragment(info: PaginationInfo, action_name: str) -> List[str]:
+    page_size = info.page_size
+    if info.style == "offset":
+        arg = _request_arg(info.offset_path, "offset")
+        first_value = 0
+        per_page_arg = _request_arg(info.limit_path, "limit")
+    else:
+        arg = _request_arg(info.page_path, "page")
+        first_value = 1
+        per_page_arg = _request_arg(info.limit_path, "per_page")
+
+    lines = [
+        "  - # Step 1: Fetch the first page to learn the total",
+        "    action:",
+        f"      action_name: {action_name}",
+        "      output_key: first_page",
+        "      input_args:",
+        f"        {arg}: {first_value}",
+        f"        {per_page_arg}: {page_size}",
+        "",
+        "  - # Step 2: Compute the remaining pages",
+        "    script:",
+        "      code: |",
+    ]
+    if info.total_pages_path and info.style == "offset":
+        lines.append(f"        pages = range({page_size}, total_pages * {page_size}, {page_size})")
+        total_arg = ("total_pages", f"data.first_page.{info.total_pages_path}")
+    elif info.total_pages_path:
+        lines.append("        pages = range(2, total_pages + 1)")
+        total_arg = ("total_pages", f"data.first_page.{info.total_pages_path}")
+    elif info.style == "offset":
+        lines.append(f"        pages = range({page_size}, total, {page_size})")
+        total_arg = ("total", f"data.first_page.{info.total_path}")
+    else:
+        lines.append(f"        pages = range(2, (total + {page_size} - 1) // {page_size} + 1)")
+        total_arg = ("total", f"data.first_page.{info.total_path}")
+    lines.extend([
+        "        return list(pages)",
+        "      input_args:",
+        f"        {total_arg[0]}: {total_arg[1]}",
+        "      output_key: remaining_pages",
+        "",
+        "  - # Step 3: Fetch the remaining pages in parallel",
+        "    parallel:",
+        "      for:",
+        "        each: page_start",
+        "        in: data.remaining_pages",
+        "        index_key: page_index",
+        "        output_key: other_pages",
+        "        steps:",
+        "          - action:",
+        f"              action_name: {action_name}",
+        "              output_key: page",
+        "              input_args:",
+        f"                {arg}: page_start",
+        f"                {per_page_arg}: {page_size}",
+        "",
+    ])
+    lines.extend(_combine_step(info, 4, {"first_page": "data.first_page",
+                                         "other_pages": "data.other_pages"},
+                               "[first_page] + other_pages"))
+    return lines
+
+
+def _sequential_fragment(info: PaginationInfo, action_name: str, max_pages: int) -> List[str]:
+    if info.style == "cursor":
+        arg = "url" if info.cursor_is_url else _request_arg(info.cursor_path, "cursor")
+    elif info.style == "offset":
+        arg = _request_arg(info.offset_path, "offset")
+    else:
+        arg = _request_arg(info.page_path, "page")
+
+    lines = [
+        "  - # Step 1: Fetch the first page",
+        "    action:",
+        f"      action_name: {action_name}",
+        "      output_key: page_1",
+        "",
+    ]
+    for number in range(2, max_pages + 1):
+        previous = f"data.page_{number - 1}"
+        if info.style == "cursor":
+            condition = f"{previous}.{info.cursor_path} != null"
+            value = f"{previous}.{info.cursor_path}"
+        elif info.items_path and info.page_size:
+            # A full previous page means there may be more
+            condition = f"{previous}.{info.items_path}.length == {info.page_size}"
+            value = (number - 1) * info.page_size if info.style == "offset" else number
+        else:
+            items = f"{previous}.{info.items_path or 'items'}"
+            condition = f"{items}.length > 0"
+            if info.style == "page":
+                value = number
+            else:
+                value = f"{previous}.{info.offset_path} + {items}.length"
+        lines.extend([
+            f"  - # Step {number}: Fetch page {number} if the previous page has more",
+            "    switch:",
+            "      cases:",
+            f"        - condition: {condition}",
+            "          steps:",
+            "            - action:",
+            f"                action_name: {action_name}",
+            f"                output_key: page_{number}",
+            "                input_args:",
+            f"                  {arg}: {value}",
+            "",
+        ])
+
+    page_args = {f"page_{n}": f"data.page_{n}" for n in range(1, max_pages + 1)}
+    pages_expr = "[" + ", ".join(page_args) + "]"
+    lines.extend(_combine_step(info, max_pages + 1, page_args, pages_expr))
+    return lines
+
+
+def _combine_step(info: PaginationInfo, number: int, input_args: Dict[str, str],
+                  pages_expr: str) -> List[str]:
+    lines = [
+        f"  - # Step {number}: Combine the items of all pages",
+        "    script:",
+        "      code: |",
+        "        items = []",
+        f"        for page in {pages_expr}:",
+        "          if page:",
+        f"            items.extend(page{_items_expr(info)})",
+        "        return items",
+        "      input_args:",
+    ]
+    lines.extend(f"        {name}: {expr}" for name, expr in input_args.items())
+    lines.append("      output_key: all_items")
+    return lines
@@ -0,0 +1,249 @@
+"""
+Payload-size profiling for connector responses.
+
+Computes the serialized (compact JSON, UTF-8) byte size of every path in a
+sample response, with array items aggregated under ``[*]`` paths as in the
+JSON analyzer, and cross-references the paths a Compound Action actually
+reads so that large, never used fields can be dropped with field selection
+or projection in the connector request.
+"""
+
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+
+# Default share of the payload above which an unused field is reported
+DEFAULT_MIN_SHARE = 0.05
+
+# data.<output_key> followed by property and index accessors
+_DATA_REF_RE = re.compile(r'\bdata\.([A-Za-z_][\w-]*)((?:\.[A-Za-z_@][\w@-]*|\[[^\]]*\])*)')
+
+# item.<path> inside a MAP()/FILTER() converter, and a bare item
+_ITEM_REF_RE = re.compile(r'\bitem((?:\.[A-Za-z_@][\w@-]*|\[[^\]]*\])+)')
+_BARE_ITEM_RE = re.compile(r'\bitem\b(?![.\[])')
+
+# Splits "users[0].email" into "users", "[0]", "email"
+_REF_SEGMENT_RE = re.compile(r'\[[^\]]*\]|[^.\[\]]+')
+
+
+@dataclass
+class PathSize:
+    """Serialized size of one path of a response."""
+
+    path: str
+    bytes: int
+    share: float
+    used: bool = False
+    partially_used: bool = False
+
+
+def compute_path_sizes(data: Any) -> Dict[str, int]:
+    """
+    Return the compact-JSON byte size of every path in ``data``.
+
+    The size of an object field includes its key. Array items are
+    aggregated: ``users[*]`` is the size of all items and
+    ``users[*].email`` the size of every item's email field. The root is
+    stored under the empty path.
+    """
+    sizes: Dict[str, int] = {}
+    sizes[""] = _measure(data, "", sizes)
+    return sizes
+
+
+def _measure(value: Any, path: str, sizes: Dict[str, int]) -> int:
+    if isinstance(value, dict):
+        total = 2 + max(0, len(value) - 1)
+        for key, child in value.items():
+            child_path = f"{path}.{key}" if path else key
+            field = len(json.dumps(key, ensure_ascii=False).encode("utf-8")) + 1 + \
+                _measure(child, child_path, sizes)
+            sizes[child_path] = sizes.get(child_path, 0) + field
+            total += field
+        return total
+
+    if isinstance(value, list):
+        total = 2 + max(0, len(value) - 1)
+        item_path = f"{path}[*]"
+        for item in value:
+            size = _measure(item, item_path, sizes)
+            sizes[item_path] = sizes.get(item_path, 0) + size
+            total += size
+        return total
+
+    return len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+
+def _normalize_reference(rest: str) -> str:
+    """Turn ".users[0].email" into "users[*].email", stopping at methods and .length."""
+    segments = []
+    for segment in _REF_SEGMENT_RE.findall(rest):
+        if segment.startswith('$') or segment == 'length':
+            break
+        if segment.startswith('['):
+            segments.append('[*]')
+        elif segments:
+            segments.append('.' + segment)
+        else:
+            segments.append(segment)
+    return ''.join(segments)
+
+
+def _references(text: str, output_key: Optional[str]) -> Set[str]:
+    refs = set()
+    if "data." in text:
+        for match in _DATA_REF_RE.finditer(text):
+            if output_key is None or match.group(1) == output_key:
+                refs.add(_normalize_reference(match.group(2)))
+    return refs
+
+
+def _collect(value: Any, output_key: Optional[str], used: Set[str]) -> None:
+    if isinstance(value, str):
+        used.update(_references(value, output_key))
+    elif isinstance(value, dict):
+        for key, child in value.items():
+            if isinstance(key, str) and key.endswith("()") and isinstance(child, dict) \
+                    and isinstance(child.get("items"), str) and isinstance(child.get("converter"), str):
+                _collect_mapped(child, output_key, used)
+            else:
+                _collect(child, output_key, used)
+    elif isinstance(value, (list, tuple)):
+        for child in value:
+            _collect(child, output_key, used)
+
+
+def _collect_mapped(operator: Dict[str, Any], output_key: Optional[str], used: Set[str]) -> None:
+    """Resolve item.<path> in a MAP()/FILTER()-style converter against its items."""
+    items = _references(operator["items"], output_key)
+    converter = operator["converter"]
+    item_paths = {_normalize_reference(match.group(1))
+                  for match in _ITEM_REF_RE.finditer(converter)}
+    if _BARE_ITEM_RE.search(converter):
+        item_paths.add("")
+
+    for items_path in items:
+        if not item_paths:
+            used.add(items_path)
+        for item_path in item_paths:
+            if not item_path:
+                used.add(f"{items_path}[*]")
+            elif item_path.startswith('['):
+                used.add(f"{items_path}[*]{item_path}")
+            else:
+                used.add(f"{items_path}[*].{item_path}")
+
+    for key, child in operator.items():
+        if key not in ("items", "converter"):
+            _collect(child, output_key, used)
+    used.update(_references(converter, output_key))
+
+
+def collect_used_paths(compound_action: Any, output_key: Optional[str] = None) -> Set[str]:
+    """
+    Return the response paths a Compound Action references.
+
+    ``compound_action`` is a CompoundAction or its YAML dictionary. Every
+    string in it (input arguments, loop iterables, switch conditions,
+    return output mappers, ...) is scanned for ``data.<output_key>.<path>``
+    references; index accessors are normalized to ``[*]``. For MAP()-style
+    operators, ``item.<path>`` in the converter narrows the use of the
+    mapped array to those item fields. Without an output_key, references
+    to any output key count. An empty string in the result means the whole
+    response is referenced.
+    """
+    if hasattr(compound_action, "to_yaml_dict"):
+        compound_action = compound_action.to_yaml_dict()
+
+    used: Set[str] = set()
+    _collect(compound_action, output_key, used)
+    return used
+
+
+class PayloadProfile:
+    """Per-path payload sizes of a response, annotated with usage."""
+
+    def __init__(self, sizes: Dict[str, int], used_paths: Optional[Set[str]] = None):
+        self.total_bytes = sizes.get("", 0)
+        self.used_paths = used_paths
+        self.paths: List[PathSize] = []
+
+        used_prefixes: Set[str] = set()
+        for used in used_paths or ():
+            for end in _prefix_ends(used):
+                used_prefixes.add(used[:end])
+
+        total = self.total_bytes or 1
+        for path, size in sizes.items():
+            if not path:
+                continue
+            entry = PathSize(path, size, size / total)
+            if used_paths is not None:
+                entry.used = "" in used_paths or any(
+                    path[:end] in used_paths for end in _prefix_ends(path))
+                entry.partially_used = not entry.used and path in used_prefixes
+            self.paths.append(entry)
+        self.paths.sort(key=lambda entry: (-entry.bytes, entry.path))
+
+    def largest(self, limit: int = 20) -> List[PathSize]:
+        """Return the largest paths."""
+        return self.paths[:limit]
+
+    def unused_large_fields(self, min_share: float = DEFAULT_MIN_SHARE) -> List[PathSize]:
+        """
+        Return fields of at least ``min_share`` of the payload that are never used.
+
+        Only the outermost unused field is reported, not its children. Empty
+        when usage is unknown (no Compound Action was given).
+        """
+        if self.used_paths is None:
+            return []
+
+        reported: List[str] = []
+        result = []
+        for entry in sorted(self.paths, key=lambda e: (e.path.count('.') + e.path.count('['), -e.bytes)):
+            if entry.share < min_share or entry.used or entry.partially_used:
+                continue
+            if any(entry.path.startswith(parent) and entry.path[len(parent)] in '.['
+                   for parent in reported):
+                continue
+            reported.append(entry.path)
+            result.append(entry)
+        result.sort(key=lambda entry: -entry.bytes)
+        return result
+
+    def format_report(self, limit: int = 20, min_share: float = DEFAULT_MIN_SHARE) -> str:
+        """Format the size profile and projection recommendations for display."""
+        lines = [f"📦 Payload size: {self.total_bytes:,} bytes", "", "Largest paths:"]
+        for entry in self.largest(limit):
+            marker = ""
+            if self.used_paths is not None:
+                marker = " ✅ used" if entry.used else (" ◐ partially used" if entry.partially_used else " ❌ unused")
+            lines.append(f"  {entry.path}: {entry.bytes:,} bytes ({entry.share:.1%}){marker}")
+
+        if self.used_paths is None:
+            return "\n".join(lines)
+
+        unused = self.unused_large_fields(min_share)
+        lines.append("")
+        if not unused:
+            lines.append(f"✅ No unused field is {min_share:.0%} or more of the payload")
+            return "\n".join(lines)
+
+        saved = sum(entry.bytes for entry in unused)
+        lines.append(f"⚠️  Unused fields dominating the payload ({saved:,} bytes, "
+                     f"{saved / (self.total_bytes or 1):.1%}):")
+        for entry in unused:
+            lines.append(f"  • {entry.path}: {entry.bytes:,} bytes ({entry.share:.1%})")
+        lines.append("💡 Consider field selection or projection in the connector request to omit these fields")
+        return "\n".join(lines)
+
+
+def _prefix_ends(path: str) -> Iterable[int]:
+    """Yield the end offsets of every ancestor path of ``path`` and of the path itself."""
+    for position, char in enumerate(path):
+        if char in '.[' and position:
+            yield position
+    yield len(path)
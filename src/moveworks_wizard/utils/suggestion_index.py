@@ -0,0 +1,242 @@
+"""
+Search index over JSON analysis suggestion paths.
+
+Provides fast prefix, substring and fuzzy lookups over variable paths for
+filter-as-you-type pickers, without rescanning or re-lowercasing every path
+on each query.
+"""
+
+import bisect
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+# Splits "users[*].profile.email" into ["users", "[*]", "profile", "email"]
+_SEGMENT_RE = re.compile(r'\[[^\]]*\]|[^.\[\]]+')
+
+
+# Maximum posting-list entries consulted per trigram by fuzzy queries
+_FUZZY_SCAN = 5000
+
+
+def split_path(path: str) -> List[str]:
+    """Split a suggestion path into its segments."""
+    return _SEGMENT_RE.findall(path)
+
+
+def _trigrams(text: str) -> Set[str]:
+    """Return the set of character trigrams of a string."""
+    return set(map(''.join, zip(text, text[1:], text[2:])))
+
+
+class _TrieNode:
+    """Node of the path-segment trie."""
+    __slots__ = ("children", "ids")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.ids: List[int] = []
+
+
+class SuggestionIndex:
+    """
+    Incremental search index over suggestion paths.
+
+    - a path-segment trie answers prefix queries such as ``users[*].em``
+    - a trigram index answers substring and fuzzy queries
+
+    Suggestions are identified by (path, bender_expression); adding a
+    suggestion with an existing identity replaces the indexed object, so
+    new analyses can be merged in as they arrive. Results are returned in
+    insertion order, i.e. in the order of the (ranked) suggestions added.
+    """
+
+    def __init__(self, suggestions: Iterable[Any] = ()):
+        self._items: List[Any] = []
+        self._paths: List[str] = []
+        self._ids_by_key: Dict[Tuple[str, str], int] = {}
+        self._root = _TrieNode()
+        # Posting lists stay sorted because ids are assigned in increasing order
+        self._trigram_ids: Dict[str, List[int]] = {}
+        self.add_all(suggestions)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add_all(self, suggestions: Iterable[Any]) -> None:
+        """Index several suggestions."""
+        for suggestion in suggestions:
+            self.add(suggestion)
+
+    def add(self, suggestion: Any) -> int:
+        """Index a suggestion (or replace an already indexed one) and return its id."""
+        key = (suggestion.path, suggestion.bender_expression)
+        existing = self._ids_by_key.get(key)
+        if existing is not None:
+            self._items[existing] = suggestion
+            return existing
+
+        item_id = len(self._items)
+        path_lower = suggestion.path.lower()
+        self._items.append(suggestion)
+        self._paths.append(path_lower)
+        self._ids_by_key[key] = item_id
+
+        node = self._root
+        for segment in split_path(path_lower):
+            child = node.children.get(segment)
+            if child is None:
+                child = node.children[segment] = _TrieNode()
+            node = child
+        node.ids.append(item_id)
+
+        trigram_ids = self._trigram_ids
+        for trigram in _trigrams(path_lower):
+            postings = trigram_ids.get(trigram)
+            if postings is None:
+                trigram_ids[trigram] = [item_id]
+            else:
+                postings.append(item_id)
+        return item_id
+
+    def get(self, item_id: int) -> Any:
+        """Return the suggestion with the given id."""
+        return self._items[item_id]
+
+    def prefix(self, query: str, limit: Optional[int] = None) -> List[int]:
+        """
+        Return ids of paths starting with ``query``, matched segment by segment.
+
+        Results come in trie order and the walk stops as soon as ``limit``
+        ids have been found.
+        """
+        query = query.lower()
+        segments = split_path(query)
+        if not segments:
+            return self._first(limit)
+
+        # The last segment may be partially typed unless the query ends on a separator
+        partial = "" if query.endswith(('.', ']')) else segments.pop()
+        node = self._root
+        for segment in segments:
+            node = node.children.get(segment)
+            if node is None:
+                return []
+
+        if partial:
+            stack = [child for name, child in node.children.items() if name.startswith(partial)]
+        else:
+            stack = list(node.children.values())
+        stack.reverse()
+
+        ids: List[int] = []
+        while stack:
+            current = stack.pop()
+            ids.extend(current.ids)
+            if limit is not None and len(ids) >= limit:
+                return ids[:limit]
+            children = list(current.children.values())
+            children.reverse()
+            stack.extend(children)
+        return ids
+
+    def substring(self, query: str, limit: Optional[int] = None) -> List[int]:
+        """Return ids of paths containing ``query`` (case-insensitive), in insertion order."""
+        query = query.lower()
+        if not query:
+            return self._first(limit)
+
+        ids: List[int] = []
+        if len(query) < 3:
+            # Too short for trigrams; such queries match many paths, so an
+            # ordered scan usually stops early at the limit
+            for item_id, path in enumerate(self._paths):
+                if query in path:
+                    ids.append(item_id)
+                    if limit is not None and len(ids) >= limit:
+                        break
+            return ids
+
+        postings = [self._trigram_ids.get(t) for t in _trigrams(query)]
+        if any(p is None for p in postings):
+            return []
+
+        # Every match contains the rarest trigram; its posting list is
+        # sorted, so verifying it in order yields results in insertion order
+        # and can stop at the limit
+        paths = self._paths
+        for item_id in min(postings, key=len):
+            if query in paths[item_id]:
+                ids.append(item_id)
+                if limit is not None and len(ids) >= limit:
+                    break
+        return ids
+
+    def fuzzy(self, query: str, limit: int = 50, min_score: float = 0.5) -> List[Tuple[float, int]]:
+        """
+        Return (score, id) pairs ranked by trigram similarity to ``query``.
+
+        The score is the fraction of the query's trigrams found in the path.
+        Candidates are gathered from the rarest trigrams, and from at most
+        the first ``_FUZZY_SCAN`` (highest-ranked) entries of each posting
+        list, so very common trigrams do not force a pass over the index.
+        """
+        query_grams = _trigrams(query.lower())
+        if not query_grams:
+            return []
+        postings = sorted((self._trigram_ids.get(g, []) for g in query_grams), key=len)
+        total = len(query_grams)
+
+        # A path reaching min_score must contain one of the rarest
+        # (total - needed + 1) trigrams
+        needed = max(1, int(min_score * total + 0.999999))
+        counts: Counter = Counter()
+        for p in postings[:total - needed + 1]:
+            counts.update(p[:_FUZZY_SCAN])
+        for p in postings[total - needed + 1:]:
+            # Posting lists are sorted, so membership is a binary search
+            size = len(p)
+            for item_id in counts:
+                position = bisect.bisect_left(p, item_id)
+                if position < size and p[position] == item_id:
+                    counts[item_id] += 1
+
+        scored = [(count / total, item_id) for item_id, count in counts.items()
+                  if count >= needed]
+        scored.sort(key=lambda pair: (-pair[0], pair[1]))
+        return scored[:limit]
+
+    def search(self, query: str, limit: int = 200) -> List[int]:
+        """
+        Return ids for a filter box query.
+
+        Path-prefix matches come first, then other substring matches. Fuzzy
+        matches are only consulted when nothing matches exactly, e.g. for a
+        typo.
+        """
+        query = query.strip()
+        if not query:
+            return self._first(limit)
+
+        results = self.prefix(query, limit)
+        seen = set(results)
+        if len(results) < limit:
+            for item_id in self.substring(query):
+                if item_id not in seen:
+                    results.append(item_id)
+                    seen.add(item_id)
+                    if len(results) >= limit:
+                        break
+        if not results:
+            for _, item_id in self.fuzzy(query, limit):
+                if item_id not in seen:
+                    results.append(item_id)
+                    seen.add(item_id)
+                    if len(results) >= limit:
+                        break
+        return results
+
+    def _first(self, limit: Optional[int]) -> List[int]:
+        count = len(self._items) if limit is None else min(limit, len(self._items))
+        return list(range(count))
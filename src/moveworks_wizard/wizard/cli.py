@@ -5,7 +5,9 @@ This module provides the main CLI entry point and wizard flow logic.
 """
 
 import click
+import glob
 import json
+import yaml
 from typing import Optional, List, Dict, Any
 from pathlib import Path
 
@@ -18,8 +20,14 @@ from ..serializers import serialize_compound_action
 from ..catalog import builtin_catalog
 from ..templates.template_library import template_library
 from ..ai.action_suggester import action_suggester
+from ..ai.batch_suggest import DESCRIPTION_FIELD, read_descriptions, suggest_batch
 from ..bender.bender_assistant import bender_assistant
-from ..utils.json_analyzer import JSONAnalyzer, VariableSuggestion
+from ..bender.linter import BenderLinter, expand_paths, format_json_report
+from ..bender.type_checker import schema_from_suggestions
+from ..utils.json_analyzer import JSONAnalyzer, VariableSuggestion, expand_json_paths, YAML_EXAMPLE_MODES
+from ..utils.pagination import DEFAULT_MAX_PAGES
+from ..utils.analysis_cache import AnalysisCache
+from ..utils.loop_load import loop_load_warnings
 
 
 class CompoundActionWizard:
@@ -34,6 +42,7 @@ class CompoundActionWizard:
         """Initialize the wizard."""
         self.compound_action: Optional[CompoundAction] = None
         self.steps: List[BaseStep] = []
+        self.simplified_expressions = 0
 
     def start_wizard(self) -> CompoundAction:
         """
@@ -305,9 +314,24 @@ class CompoundActionWizard:
         click.echo("  • Action steps (HTTP requests, built-in Moveworks actions)")
         click.echo("  • Script steps (APIthon/Python code)")
         click.echo("  • Switch steps (conditional logic)")
+        click.echo("  • For loop steps (repeat steps for each item of a list)")
         click.echo("  • Return/Raise steps (exit compound action)")
         click.echo()
 
+        steps = self._collect_steps()
+
+        # Set steps on compound action
+        if len(steps) == 1:
+            self.compound_action.single_step = steps[0]
+        elif len(steps) > 1:
+            self.compound_action.steps = steps
+        else:
+            click.echo("❌ No steps added. A compound action must have at least one step.")
+            # Recursively call to add steps
+            self._add_steps()
+
+    def _collect_steps(self) -> List[BaseStep]:
+        """Prompt for steps until the user chooses Done."""
         steps = []
         step_count = 0
 
@@ -332,15 +356,7 @@ class CompoundActionWizard:
             else:
                 step_count -= 1  # Don't count failed steps
 
-        # Set steps on compound action
-        if len(steps) == 1:
-            self.compound_action.single_step = steps[0]
-        elif len(steps) > 1:
-            self.compound_action.steps = steps
-        else:
-            click.echo("❌ No steps added. A compound action must have at least one step.")
-            # Recursively call to add steps
-            self._add_steps()
+        return steps
 
     def _prompt_step_type(self) -> str:
         """Prompt user to select step type."""
@@ -351,8 +367,9 @@ class CompoundActionWizard:
         click.echo("  4. Return step (exit with success)")
         click.echo("  5. Raise step (exit with error)")
         click.echo("  6. Done (finish adding steps)")
+        click.echo("  7. For loop step (repeat steps for each item of a list)")
 
-        choice = click.prompt("Enter choice (1-6)", type=int)
+        choice = click.prompt("Enter choice (1-7)", type=click.IntRange(1, 7))
 
         type_map = {
             1: 'action',
@@ -360,10 +377,11 @@ class CompoundActionWizard:
             3: 'switch',
             4: 'return',
             5: 'raise',
-            6: 'done'
+            6: 'done',
+            7: 'for'
         }
 
-        return type_map.get(choice, 'action')
+        return type_map[choice]
 
     def _create_step(self, step_type: str) -> Optional[BaseStep]:
         """Create a step based on the specified type."""
@@ -374,6 +392,8 @@ class CompoundActionWizard:
                 return self._create_script_step()
             elif step_type == 'switch':
                 return self._create_switch_step()
+            elif step_type == 'for':
+                return self._create_for_step()
             elif step_type == 'return':
                 return self._create_return_step()
             elif step_type == 'raise':
@@ -403,6 +423,8 @@ class CompoundActionWizard:
         builtin_action = builtin_catalog.get_action(action_name)
         if builtin_action:
             click.echo(f"\n✅ Using built-in action: {builtin_action.description}")
+            if builtin_action.performance:
+                click.echo(f"Performance: {builtin_action.performance.summary()}")
             click.echo("Suggested parameters:")
             for param in builtin_action.parameters:
                 required_text = "REQUIRED" if param.required else "optional"
@@ -503,6 +525,39 @@ class CompoundActionWizard:
             default=default_steps
         )
 
+    def _create_for_step(self) -> BaseStep:
+        """Create a for loop step with user input."""
+        from ..models.control_flow import ForStep
+
+        click.echo("\n🔁 Creating for loop step...")
+        click.echo("For loops run their steps once for each item of a list.")
+
+        in_variable = click.prompt("Enter the variable holding the list to iterate over", type=str)
+        each = click.prompt("Variable name for the current item", default="item")
+        index = click.prompt("Variable name for the current index", default="index")
+        output_key = click.prompt("Enter output key for the loop results", type=str)
+
+        click.echo("Add the steps to execute for each item, then choose Done:")
+        steps = self._collect_steps()
+        while not steps:
+            click.echo("❌ A for loop must have at least one step.")
+            steps = self._collect_steps()
+
+        loop_step = ForStep(
+            each=each,
+            index=index,
+            output_key=output_key,
+            steps=steps,
+            **{"in": in_variable}
+        )
+
+        iterations = click.prompt("About how many items will the list hold?",
+                                  type=click.IntRange(min=1), default=100)
+        for warning in loop_load_warnings(loop_step, iterations, builtin_catalog):
+            click.echo(f"⚠️  {warning}")
+
+        return loop_step
+
     def _create_return_step(self) -> ReturnStep:
         """Create a return step with user input."""
         from ..models.terminal import ReturnStep
@@ -913,12 +968,14 @@ class CompoundActionWizard:
             input_args=input_args if input_args else None
         )
 
-    def save_to_file(self, output_path: Optional[Path] = None) -> Path:
+    def save_to_file(self, output_path: Optional[Path] = None, simplify: bool = False) -> Path:
         """
         Save the compound action to a YAML file.
         
         Args:
             output_path: Optional path to save the file
+            simplify: Whether to simplify Bender expressions; the number of
+                rewritten expressions is kept in ``simplified_expressions``
             
         Returns:
             Path where the file was saved
@@ -932,7 +989,9 @@ class CompoundActionWizard:
             output_path = Path(f"{filename}.yaml")
         
         # Serialize to YAML
-        yaml_content = serialize_compound_action(self.compound_action)
+        stats: Dict[str, int] = {}
+        yaml_content = serialize_compound_action(self.compound_action, simplify=simplify, stats=stats)
+        self.simplified_expressions = stats.get("simplified_expressions", 0)
         
         # Write to file
         output_path.write_text(yaml_content, encoding='utf-8')
@@ -949,7 +1008,8 @@ def cli():
 @cli.command()
 @click.option('--output', '-o', type=click.Path(), help='Output file path')
 @click.option('--interactive/--no-interactive', default=True, help='Run in interactive mode')
-def wizard(output: Optional[str], interactive: bool):
+@click.option('--simplify', is_flag=True, help='Fold constant parts of Bender expressions before saving')
+def wizard(output: Optional[str], interactive: bool, simplify: bool):
     """
     Moveworks Compound Action Wizard - Create valid Compound Action YAML files.
     
@@ -966,8 +1026,10 @@ def wizard(output: Optional[str], interactive: bool):
 
             # Save to file
             output_path = Path(output) if output else None
-            saved_path = wizard_instance.save_to_file(output_path)
+            saved_path = wizard_instance.save_to_file(output_path, simplify=simplify)
 
+            if simplify:
+                click.echo(f"\n🧹 Simplified {wizard_instance.simplified_expressions} Bender expression(s)")
             click.echo(f"\n🎉 Compound Action saved to: {saved_path}")
             click.echo("\nYou can now use this YAML file in a Moveworks Action Activity!")
 
@@ -1014,13 +1076,29 @@ def templates():
 
 
 @cli.command()
-@click.argument('description')
-def suggest(description: str):
-    """Get AI suggestions for a workflow description."""
+@click.argument('description', required=False)
+@click.option('--batch', 'batch_file', type=click.Path(exists=True, dir_okay=False),
+              help='Classify every description of a JSON Lines or CSV file and stream the results as JSONL')
+@click.option('--output', '-o', type=click.Path(), help='Output file for --batch results (default: stdout)')
+@click.option('--field', default=DESCRIPTION_FIELD, show_default=True,
+              help='JSON field or CSV column holding the description in --batch mode')
+@click.option('--workers', '-w', type=int, default=None, help='Worker processes for --batch (default: CPU count)')
+@click.option('--max-suggestions', '-n', type=int, default=5, show_default=True, help='Suggestions per description')
+def suggest(description: Optional[str], batch_file: Optional[str], output: Optional[str], field: str,
+            workers: Optional[int], max_suggestions: int):
+    """Get AI suggestions for a workflow description, or for a file of them with --batch."""
+    if batch_file:
+        if description:
+            raise click.UsageError("Give either a DESCRIPTION or --batch FILE, not both")
+        _suggest_batch(batch_file, output, field, workers, max_suggestions)
+        return
+    if not description:
+        raise click.UsageError("Missing DESCRIPTION (or --batch FILE)")
+
     click.echo(f"🤖 Analyzing: {description}")
     click.echo("=" * 50)
 
-    suggestions = action_suggester.suggest_actions(description, max_suggestions=5)
+    suggestions = action_suggester.suggest_actions(description, max_suggestions=max_suggestions)
 
     if not suggestions:
         click.echo("❌ No suggestions found for your description.")
@@ -1035,6 +1113,33 @@ def suggest(description: str):
         click.echo(f"   Reasoning: {suggestion.reasoning}")
 
 
+def _suggest_batch(batch_file: str, output: Optional[str], field: str,
+                   workers: Optional[int], max_suggestions: int) -> None:
+    """Stream suggestions for every description of a file as JSON Lines."""
+    # Progress goes to stderr when the results are written to stdout
+    to_stderr = output is None
+    click.echo(f"🤖 Classifying descriptions from {batch_file}...", err=to_stderr)
+    classified = failed = 0
+    try:
+        with click.open_file(output or '-', 'w', encoding='utf-8') as out:
+            results = suggest_batch(read_descriptions(batch_file, field), max_suggestions, workers)
+            for result in results:
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                if "error" in result:
+                    failed += 1
+                else:
+                    classified += 1
+    except (OSError, ValueError) as e:
+        click.echo(f"❌ Error reading {batch_file}: {e}", err=True)
+        raise SystemExit(1)
+
+    click.echo(f"✅ Classified {classified} descriptions", err=to_stderr)
+    if failed:
+        click.echo(f"⚠️  Skipped {failed} unreadable records (see their \"error\" field)", err=to_stderr)
+    if output:
+        click.echo(f"💾 Results saved to: {output}")
+
+
 @cli.command()
 @click.argument('expression')
 def validate_bender(expression: str):
@@ -1061,11 +1166,76 @@ def validate_bender(expression: str):
 
 
 @cli.command()
-@click.option('--file', '-f', 'json_file', type=click.Path(exists=True), help='JSON file to analyze')
+@click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True))
+@click.option('--json', 'as_json', is_flag=True, help='Output the results as JSON')
+@click.option('--strict', is_flag=True, help='Treat warnings (e.g. unknown functions) as errors')
+@click.option('--types', 'check_types', is_flag=True,
+              help='Type check expressions against the outputs of earlier steps')
+@click.option('--schema', 'schemas', multiple=True, metavar='OUTPUT_KEY=JSON_FILE',
+              help='Sample response typing data.OUTPUT_KEY for --types (repeatable)')
+def lint_bender(paths, as_json, strict, check_types, schemas):
+    """Lint every Bender expression in Compound Action YAML files.
+
+    PATHS are YAML files or directories searched for *.yaml/*.yml files.
+    Exits with status 1 when errors are found, for use in pre-commit hooks.
+    """
+    output_schemas = {}
+    for spec in schemas:
+        output_key, separator, json_file = spec.partition('=')
+        if not separator or not output_key or not json_file:
+            raise click.BadParameter(f"expected OUTPUT_KEY=JSON_FILE, got '{spec}'", param_hint='--schema')
+        try:
+            suggestions = JSONAnalyzer().analyze_json_file(json_file, output_key)
+        except (OSError, ValueError) as e:
+            raise click.BadParameter(f"cannot analyze {json_file}: {e}", param_hint='--schema')
+        output_schemas[output_key] = schema_from_suggestions(suggestions)
+
+    linter = BenderLinter(check_types=check_types or bool(output_schemas), output_schemas=output_schemas)
+    files = expand_paths(paths)
+    issues = []
+    for path in files:
+        issues.extend(linter.lint_file(path))
+
+    failing = [issue for issue in issues if issue.severity == "error" or strict]
+
+    if as_json:
+        click.echo(format_json_report(issues, len(files), linter))
+    else:
+        for issue in issues:
+            click.echo(issue.format())
+            if issue.expression:
+                click.echo(f"    {issue.expression}")
+                click.echo(f"    {' ' * issue.position}^")
+        errors = sum(1 for issue in issues if issue.severity == "error")
+        click.echo(f"{'❌' if failing else '✅'} {len(files)} file(s), {linter.expressions_checked} expression(s) "
+                   f"({linter.distinct_expressions} distinct): {errors} error(s), "
+                   f"{len(issues) - errors} warning(s)")
+
+    if failing:
+        raise SystemExit(1)
+
+
+@cli.command()
+@click.option('--file', '-f', 'json_file', type=click.Path(), help='JSON file, directory of JSON files, or glob pattern to analyze')
 @click.option('--source', '-s', default='http_response', help='Name for the data source')
 @click.option('--output', '-o', type=click.Path(), help='Output file for suggestions')
 @click.option('--yaml-example', '-y', is_flag=True, help='Generate comprehensive YAML example for array data extraction')
-def analyze_json(json_file, source, output, yaml_example):
+@click.option('--yaml-mode', type=click.Choice(YAML_EXAMPLE_MODES), default='per_property', show_default=True,
+              help='YAML example layout: one script per property, a single one-pass script, or Bender MAP() without scripts')
+@click.option('--full-values', is_flag=True, help='Keep full array/object values in exported suggestions instead of previews')
+@click.option('--workers', '-w', type=int, default=None, help='Worker processes for directory/glob analysis (default: CPU count)')
+@click.option('--no-cache', is_flag=True, help='Do not read or write the on-disk analysis cache')
+@click.option('--jsonl', is_flag=True, help='Treat input as JSON Lines (one JSON record per line) and aggregate field statistics')
+@click.option('--paginate', 'paginate_action', metavar='ACTION_NAME',
+              help='Generate a fragment fetching all pages with this action when pagination is detected')
+@click.option('--max-pages', type=int, default=DEFAULT_MAX_PAGES, show_default=True,
+              help='Upper bound on sequential page fetches when the total is unknown')
+@click.option('--profile-sizes', is_flag=True, help='Report the serialized byte size of each path and its share of the response')
+@click.option('--usage-yaml', type=click.Path(exists=True),
+              help='Compound Action YAML whose data references mark paths as used in the size profile')
+@click.option('--output-key', help='Output key the analyzed response is stored under in --usage-yaml (default: any)')
+def analyze_json(json_file, source, output, yaml_example, yaml_mode, full_values, workers, no_cache, jsonl,
+                 paginate_action, max_pages, profile_sizes, usage_yaml, output_key):
     """Analyze JSON from HTTP connector test results to suggest variables."""
     click.echo("🔍 JSON Analysis for Variable Suggestions")
     click.echo("This analyzes HTTP connector test results to suggest variables for Compound Actions.")
@@ -1073,16 +1243,15 @@ def analyze_json(json_file, source, output, yaml_example):
 
     json_data = None
 
-    if json_file:
-        # Load from file
-        try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                json_data = f.read()
-            click.echo(f"📁 Loaded JSON from: {json_file}")
-        except Exception as e:
-            click.echo(f"❌ Error reading file: {e}")
-            return
-    else:
+    if jsonl:
+        _analyze_json_lines(json_file, source, output, full_values)
+        return
+
+    if json_file and (Path(json_file).is_dir() or glob.has_magic(json_file)):
+        _analyze_json_batch(expand_json_paths(json_file), source, output, full_values, workers)
+        return
+
+    if not json_file:
         # Get JSON input interactively
         click.echo("Paste your JSON data (press Ctrl+D when finished):")
         json_lines = []
@@ -1099,28 +1268,59 @@ def analyze_json(json_file, source, output, yaml_example):
 
     # Analyze the JSON
     try:
-        analyzer = JSONAnalyzer()
-        suggestions = analyzer.analyze_json(json_data, source)
+        analyzer = JSONAnalyzer(keep_full_values=full_values,
+                                cache=None if no_cache else AnalysisCache())
+        # Only the displayed suggestions need ranking; exporting ranks the rest
+        if json_file:
+            try:
+                suggestions = analyzer.analyze_json_file(json_file, source, top_k=20)
+            except OSError as e:
+                click.echo(f"❌ Error reading file: {e}")
+                return
+            click.echo(f"📁 Loaded JSON from: {json_file}")
+        else:
+            suggestions = analyzer.analyze_json(json_data, source, top_k=20)
 
         if not suggestions:
             click.echo("❌ No variable suggestions found in the JSON data")
             return
 
-        click.echo(f"\n✅ Found {len(suggestions)} variable suggestions!")
+        click.echo(f"\n✅ Found {len(analyzer.suggestions)} variable suggestions!")
 
         # Display suggestions
-        display_text = analyzer.format_suggestions_for_display(suggestions)
+        display_text = analyzer.format_suggestions_for_display(
+            suggestions, total_count=len(analyzer.suggestions))
         click.echo(display_text)
 
+        if profile_sizes or usage_yaml:
+            _report_payload_sizes(analyzer, json_file, json_data, usage_yaml, output_key)
+
+        # Report pagination so large result sets can be fetched in bounded pages
+        pagination = analyzer.detect_pagination()
+        if pagination:
+            calls = pagination.estimated_calls
+            click.echo(f"\n📄 Pagination detected ({pagination.style}): "
+                       f"{calls if calls is not None else 'unknown number of'} calls for the sample's total")
+            if paginate_action:
+                click.echo(analyzer.generate_pagination_fragment(paginate_action, max_pages))
+            else:
+                click.echo("   Use --paginate ACTION_NAME to generate a page-fetch fragment")
+
         # Generate comprehensive YAML example if requested
         if yaml_example:
             click.echo("\n" + "="*60)
             click.echo("📋 COMPREHENSIVE YAML EXAMPLE FOR ARRAY DATA EXTRACTION:")
             click.echo("="*60)
 
-            yaml_content = analyzer.generate_comprehensive_yaml_example(source)
+            yaml_content = analyzer.generate_comprehensive_yaml_example(source, mode=yaml_mode)
             click.echo(yaml_content)
 
+            cost = analyzer.estimate_yaml_example_cost(yaml_mode)
+            iterations = cost['iterations'] if cost['iterations'] is not None else 'unknown'
+            click.echo(f"\n⏱️  Estimated runtime ({yaml_mode}): {cost['steps']} steps "
+                       f"({cost['script_steps']} script), {cost['array_passes']} array passes, "
+                       f"{iterations} item iterations for the sample data")
+
             # Optionally save YAML example to file
             if output:
                 yaml_output_path = Path(output).with_suffix('.yaml')
@@ -1147,5 +1347,107 @@ def analyze_json(json_file, source, output, yaml_example):
         click.echo(f"❌ Error analyzing JSON: {e}")
 
 
+def _report_payload_sizes(analyzer: JSONAnalyzer, json_file: Optional[str], json_data: Optional[str],
+                          usage_yaml: Optional[str], output_key: Optional[str]):
+    """Print the payload-size profile, cross-referenced with a Compound Action if given."""
+    if json_file:
+        with open(json_file, 'r', encoding='utf-8') as f:
+            json_data = f.read()
+
+    usage = None
+    if usage_yaml:
+        with open(usage_yaml, 'r', encoding='utf-8') as f:
+            usage = yaml.safe_load(f) or {}
+
+    profile = analyzer.profile_payload(json_data, usage, output_key)
+    click.echo("\n" + "="*60)
+    click.echo(profile.format_report())
+
+
+@cli.group()
+def cache():
+    """Manage the on-disk JSON analysis cache."""
+    pass
+
+
+@cache.command('clear')
+def cache_clear():
+    """Remove all cached JSON analysis results."""
+    removed = AnalysisCache().clear()
+    click.echo(f"🧹 Removed {removed} cached analysis result{'s' if removed != 1 else ''}")
+
+
+@cache.command('info')
+def cache_info():
+    """Show location and size of the JSON analysis cache."""
+    stats = AnalysisCache().stats()
+    click.echo(f"📂 Cache directory: {stats['directory']}")
+    click.echo(f"   Entries: {stats['entries']}")
+    click.echo(f"   Size: {stats['bytes'] / (1024 * 1024):.1f} MB of {stats['max_bytes'] / (1024 * 1024):.0f} MB")
+
+
+def _analyze_json_batch(json_files: List[Path], source: str, output: Optional[str],
+                        full_values: bool, workers: Optional[int]) -> None:
+    """Analyze several JSON files in parallel and display the merged suggestions."""
+    if not json_files:
+        click.echo("❌ No JSON files matched")
+        return
+
+    click.echo(f"📁 Analyzing {len(json_files)} JSON files...")
+
+    analyzer = JSONAnalyzer(keep_full_values=full_values)
+    suggestions = analyzer.analyze_json_files(json_files, source, max_workers=workers)
+
+    for file_path, error in analyzer.batch_errors.items():
+        click.echo(f"⚠️  Skipped {file_path}: {error}")
+
+    if not suggestions:
+        click.echo("❌ No variable suggestions found in the JSON files")
+        return
+
+    analyzed = len(json_files) - len(analyzer.batch_errors)
+    click.echo(f"\n✅ Found {len(suggestions)} distinct variable paths across {analyzed} files!")
+    click.echo(analyzer.format_suggestions_for_display(suggestions))
+
+    if output:
+        analyzer.export_suggestions_to_json(Path(output))
+        click.echo(f"\n💾 Suggestions saved to: {output}")
+
+
+def _analyze_json_lines(json_file: Optional[str], source: str, output: Optional[str],
+                        full_values: bool) -> None:
+    """Stream JSON Lines input and display per-path record statistics."""
+    analyzer = JSONAnalyzer(keep_full_values=full_values)
+
+    try:
+        if json_file:
+            json_files = expand_json_paths(json_file, pattern="*.jsonl")
+            click.echo(f"📁 Streaming JSON Lines from {len(json_files)} file{'s' if len(json_files) != 1 else ''}...")
+            suggestions = analyzer.analyze_ndjson_files(json_files, source)
+        else:
+            click.echo("Paste your JSON Lines data (press Ctrl+D when finished):")
+            suggestions = analyzer.analyze_ndjson(click.get_text_stream('stdin'), source)
+    except OSError as e:
+        click.echo(f"❌ Error reading file: {e}")
+        return
+
+    if analyzer.skipped_lines:
+        click.echo(f"⚠️  Skipped {analyzer.skipped_lines} invalid line{'s' if analyzer.skipped_lines != 1 else ''}")
+        for location, error in analyzer.batch_errors.items():
+            click.echo(f"   • {location}: {error}")
+
+    if not suggestions:
+        click.echo("❌ No variable suggestions found in the JSON Lines data")
+        return
+
+    click.echo(f"\n✅ Found {len(suggestions)} distinct variable paths across "
+               f"{suggestions[0].total_documents} records!")
+    click.echo(analyzer.format_suggestions_for_display(suggestions))
+
+    if output:
+        analyzer.export_suggestions_to_json(Path(output))
+        click.echo(f"\n💾 Suggestions saved to: {output}")
+
+
 if __name__ == '__main__':
     cli()
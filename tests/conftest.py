@@ -0,0 +1,11 @@
+"""
+Shared fixtures for the test suite.
+"""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_home(tmp_path, monkeypatch):
+    """Keep analysis caches and persisted vectors out of the user's ~/.cache."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg-cache"))
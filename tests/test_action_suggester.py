@@ -0,0 +1,314 @@
+"""
+Tests for action suggestion ranking, its search indexes and batch classification.
+"""
+
+import json
+import os
+
+import pytest
+from click.testing import CliRunner
+
+from src.moveworks_wizard.ai.action_suggester import ActionSuggester, SuggestionType
+from src.moveworks_wizard.ai.batch_suggest import read_descriptions, suggest_batch
+from src.moveworks_wizard.ai.keyword_matcher import KeywordMatcher
+from src.moveworks_wizard.ai.text_index import BM25Index, tokenize_text
+from src.moveworks_wizard.ai.vector_index import MAX_PERSISTED_FINGERPRINTS, VectorIndex
+from src.moveworks_wizard.catalog.builtin_actions import ActionParameter, BuiltinAction, builtin_catalog
+from src.moveworks_wizard.wizard.cli import cli
+
+
+@pytest.fixture
+def suggester(tmp_path):
+    """A suggester whose custom actions are removed from the shared catalog afterwards."""
+    added = []
+    instance = ActionSuggester(vector_cache_dir=tmp_path / "vectors")
+    add_action = instance.add_action
+
+    def tracked(action):
+        added.append(action.name)
+        add_action(action)
+    instance.add_action = tracked
+    yield instance
+    for name in added:
+        builtin_catalog.remove_action(name)
+
+
+class TestBM25Index:
+    """Test the inverted index and its BM25 ranking."""
+
+    def test_tokenize_text(self):
+        """Test identifier splitting, stop words and suffix stemming."""
+        assert tokenize_text("mw.send_plaintext_chat_notification") == [
+            "mw", "send", "plaintext", "chat", "notification"]
+        assert tokenize_text("I need to notify the users about tickets") == ["notify", "user", "about", "ticket"]
+        assert tokenize_text("Onboarding processes") == ["onboard", "process"]
+
+    def test_ranking_and_field_weights(self):
+        """Test that rare terms and name matches rank higher."""
+        index = BM25Index({"name": 2})
+        index.add("reset", {"name": "reset password", "description": "Reset a user password"})
+        index.add("unlock", {"name": "unlock account", "description": "Unlock a user account after a password reset"})
+        index.add("profile", {"name": "update profile", "description": "Update the user profile"})
+
+        hits = index.search("reset my password")
+        assert [hit.key for hit in hits] == ["reset", "unlock"]
+        assert hits[0].terms == ["reset", "password"]
+        assert index.search("user")[0].score < hits[0].score
+        assert index.search("printer") == []
+
+    def test_incremental_updates(self):
+        """Test adding, replacing and removing documents."""
+        index = BM25Index()
+        index.add("a", {"description": "send chat message"})
+        index.add("b", {"description": "create ticket"})
+        assert [hit.key for hit in index.search("ticket")] == ["b"]
+
+        index.add("b", {"description": "send email"})
+        assert index.search("ticket") == []
+        assert {hit.key for hit in index.search("send")} == {"a", "b"}
+
+        index.remove("a")
+        assert len(index) == 1 and "a" not in index
+        assert [hit.key for hit in index.search("send")] == ["b"]
+
+
+class TestKeywordMatcher:
+    """Test single-pass keyword matching."""
+
+    def test_word_boundaries_and_inflections(self):
+        """Test that keywords match whole words with common inflections only."""
+        matcher = KeywordMatcher({"g": {"user": 1.0, "manage": 1.0, "approve": 1.0, "onboard": 1.0}})
+        assert matcher.find("Onboarding users, approved by IT") == ["onboard", "user", "approve"]
+        assert matcher.find("superuser management") == []
+        assert matcher.find("managed by users") == ["manage", "user"]
+
+    def test_overlapping_and_longest_keywords(self):
+        """Test that keywords sharing prefixes or positions are all found."""
+        matcher = KeywordMatcher({"g": {"new user": 1.0, "user": 1.0, "manage": 1.0, "manager": 1.0}})
+        assert matcher.find("My manager onboards a new user") == ["manager", "new user", "user"]
+
+    def test_keywords_that_prefix_a_longer_match(self):
+        """Test that a keyword is found inside a longer keyword starting at the same position."""
+        matcher = KeywordMatcher({"a": {"password": 1, "password reset": 1, "user": 1, "users": 1}})
+        assert matcher.find("password reset") == ["password", "password reset"]
+        assert matcher.find("passwords reset for users") == ["password", "user", "users"]
+        assert matcher.scan("Password reset")["a"] == (2, ["password", "password reset"])
+
+    def test_scan_scores_groups(self):
+        """Test per-group scores when a keyword belongs to several groups."""
+        matcher = KeywordMatcher({"a": {"update": 0.6, "notify": 0.9}, "b": {"update": 0.5}})
+        scores = matcher.scan("Notify users about the update; update again")
+        assert scores["a"] == (pytest.approx(1.5), ["notify", "update"])
+        assert scores["b"] == (0.5, ["update"])
+        assert matcher.scan("nothing relevant") == {}
+
+    def test_suggester_scans_all_tables(self, suggester):
+        """Test that one scan scores categories, workflow patterns and template categories."""
+        matches = suggester.match_keywords("escalate the security incident")
+        assert matches[("category", "ticket_management")][1] == ["escalate"]
+        assert matches[("pattern", "incident_handling")][1] == ["security", "incident"]
+        assert ("template", "Support & Ticketing") in matches
+
+
+class TestVectorIndex:
+    """Test hashed n-gram similarity search and its persisted matrices."""
+
+    DOCUMENTS = {
+        "notify": "Send a chat notification to a user",
+        "reset": "Reset the password of an account",
+        "report": "Generate an analytics report",
+    }
+
+    @pytest.fixture(autouse=True)
+    def numpy_required(self):
+        pytest.importorskip("numpy")
+
+    def test_paraphrase_similarity(self, tmp_path):
+        """Test that inflected and partial wording still finds the document."""
+        index = VectorIndex("docs", self.DOCUMENTS, cache_dir=tmp_path)
+        hits = index.search("notifying users in chats", limit=2)
+        assert hits[0][0] == "notify"
+        assert 0 < hits[0][1] <= 1.0001
+        assert index.search("zzzz qqqq") == []
+
+    def test_matrix_is_persisted_and_memory_mapped(self, tmp_path):
+        """Test that an unchanged catalog loads its matrix from disk."""
+        first = VectorIndex("docs", self.DOCUMENTS, cache_dir=tmp_path)
+        expected = first.search("password reset")
+        assert not first.loaded_from_disk
+
+        second = VectorIndex("docs", self.DOCUMENTS, cache_dir=tmp_path)
+        assert second.search("password reset") == expected
+        assert second.loaded_from_disk
+        assert type(second._matrix).__name__ == "memmap"
+
+    def test_rebuild_when_fingerprint_changes(self, tmp_path):
+        """Test that a changed catalog is vectorized again next to the matrices of other catalogs."""
+        index = VectorIndex("docs", self.DOCUMENTS, cache_dir=tmp_path)
+        index.search("report")
+        old_fingerprint = index.fingerprint
+
+        index.add("unlock", "Unlock a locked account")
+        assert index.search("unlocking accounts")[0][0] == "unlock"
+        assert index.fingerprint != old_fingerprint and not index.loaded_from_disk
+        assert {path.name.split(".")[0] for path in tmp_path.iterdir()} == {
+            f"docs-{old_fingerprint}", f"docs-{index.fingerprint}"}
+
+        other = VectorIndex("docs", self.DOCUMENTS, cache_dir=tmp_path)
+        other.search("report")
+        assert other.loaded_from_disk
+
+    def test_least_recently_used_matrices_are_evicted(self, tmp_path):
+        """Test that only the most recently used matrices of a name are kept."""
+        def build(number):
+            index = VectorIndex("docs", {**self.DOCUMENTS, "extra": f"document {number}"}, cache_dir=tmp_path)
+            index.search("report")
+            return index
+
+        fingerprints = []
+        for number in range(MAX_PERSISTED_FINGERPRINTS):
+            fingerprints.append(build(number).fingerprint)
+            for path in tmp_path.glob(f"docs-{fingerprints[-1]}*"):
+                # Distinct use times regardless of the file system's clock resolution
+                os.utime(path, ns=(number * 10**9, number * 10**9))
+        assert build(0).loaded_from_disk
+        fingerprints.append(build(MAX_PERSISTED_FINGERPRINTS).fingerprint)
+
+        kept = {path.name.split(".")[0] for path in tmp_path.iterdir()}
+        assert not any(path.suffix == ".tmp" for path in tmp_path.iterdir())
+        assert len(kept) == MAX_PERSISTED_FINGERPRINTS
+        assert f"docs-{fingerprints[0]}" in kept and f"docs-{fingerprints[-1]}" in kept
+        assert f"docs-{fingerprints[1]}" not in kept
+
+    def test_paraphrased_custom_action_is_suggested(self, suggester):
+        """Test a suggestion found by similarity when no keyword or whole term matches."""
+        suggester.add_action(BuiltinAction(
+            name="acme.provision_mailbox",
+            description="Provision a shared mailbox for a distribution group",
+            category="Collaboration",
+            parameters=[],
+        ))
+        suggestions = suggester.suggest_actions("provisioners distributing", max_suggestions=3)
+        assert suggester.action_index.search("provisioners distributing") == []
+        assert suggestions[0].title == "Use acme.provision_mailbox"
+        assert suggestions[0].reasoning == "Similar wording to the action description"
+
+    def test_vector_cache_location_is_injectable(self, tmp_path):
+        """Test that the suggester persists its matrices where told to, or not at all."""
+        ActionSuggester(vector_cache_dir=tmp_path / "vectors").suggest_actions("notify users", max_suggestions=1)
+        assert any(path.name.startswith("actions-") for path in (tmp_path / "vectors").iterdir())
+
+        in_memory = ActionSuggester(vector_cache_dir=tmp_path / "unused", persist_vectors=False)
+        in_memory.suggest_actions("notify users", max_suggestions=1)
+        assert not (tmp_path / "unused").exists()
+
+
+class TestSuggesterRanking:
+    """Test BM25 ranking of catalog actions and templates."""
+
+    def test_best_matching_action_of_a_category_first(self, suggester):
+        """Test that the action matching the description outranks its category peers."""
+        suggestions = suggester.suggest_actions("generate a weekly report", max_suggestions=3)
+        assert suggestions[0].title == "Use mw.generate_report"
+
+    def test_keyword_only_confidence(self, suggester, monkeypatch):
+        """Test that actions found by category keywords alone keep the keyword confidence."""
+        monkeypatch.setattr(suggester, "_text_confidences", lambda *args, **kwargs: {})
+        suggestions = suggester._suggest_builtin_actions("send a message")
+        assert suggestions
+        # "send" (0.8) and "message" (0.8) of the communication keywords
+        assert all(s.confidence == pytest.approx(0.8) for s in suggestions)
+
+        # A text match breaks ties but never lowers the keyword confidence
+        monkeypatch.undo()
+        suggestions = suggester._suggest_builtin_actions("generate a weekly report")
+        assert suggestions[0].title == "Use mw.generate_report"
+        assert all(s.confidence >= 0.75 for s in suggestions)
+
+    def test_templates_are_ranked_by_index(self, suggester):
+        """Test template suggestions for a whole-sentence description."""
+        suggestions = suggester.suggest_actions("escalate old support tickets to management", max_suggestions=10)
+        templates = [s.title for s in suggestions if s.suggestion_type == SuggestionType.TEMPLATE]
+        assert templates[0] == "Use template: Ticket Escalation Workflow"
+
+    def test_custom_actions_are_indexed_incrementally(self, suggester):
+        """Test that actions added after the index was built are suggested."""
+        suggester.suggest_actions("warm up the index")
+        assert "acme.reimage_laptop" not in suggester.action_index
+
+        suggester.add_action(BuiltinAction(
+            name="acme.reimage_laptop",
+            description="Reimage a laptop and reinstall the standard software image",
+            category="Device Management",
+            parameters=[ActionParameter("laptop_serial", "string", True, "Serial number")],
+        ))
+
+        suggestions = suggester.suggest_actions("please reimage my laptop", max_suggestions=3)
+        assert suggestions[0].title == "Use acme.reimage_laptop"
+        assert suggestions[0].details["matched_keywords"] == ["reimage", "laptop"]
+        assert "reimage" in suggestions[0].reasoning
+
+    def test_without_numpy(self, suggester, monkeypatch):
+        """Test that suggestions fall back to keywords and BM25 when NumPy is missing."""
+        from src.moveworks_wizard.ai import vector_index
+        monkeypatch.setattr(vector_index, "np", None)
+        assert not suggester.action_vectors.available
+        suggestions = suggester.suggest_actions("generate a weekly report", max_suggestions=3)
+        assert suggestions[0].title == "Use mw.generate_report"
+
+
+class TestBatchSuggest:
+    """Test batch classification of description files."""
+
+    def test_read_json_lines(self, tmp_path):
+        """Test JSON Lines records, bare strings and unreadable lines."""
+        path = tmp_path / "requests.jsonl"
+        path.write_text('{"id": "T-1", "description": "Reset a password"}\n'
+                        '"Onboard a new hire"\n\n'
+                        '{"id": "T-4"}\n'
+                        'not json\n')
+        records = list(read_descriptions(path))
+        assert records[:2] == [("T-1", "Reset a password", None), (2, "Onboard a new hire", None)]
+        assert records[2][:2] == ("T-4", None) and "description" in records[2][2]
+        assert records[3][:2] == (5, None) and records[3][2].startswith("invalid JSON")
+
+    def test_read_csv(self, tmp_path):
+        """Test CSV rows, row numbering and a custom description column."""
+        path = tmp_path / "requests.csv"
+        path.write_text('text,team\nGenerate a weekly report,finance\n,it\n')
+        records = list(read_descriptions(path, field="text"))
+        assert records[0] == (1, "Generate a weekly report", None)
+        assert records[1][1] is None
+        with pytest.raises(ValueError):
+            list(read_descriptions(path))
+
+    def test_results_in_input_order(self):
+        """Test that results keep the input order across chunks and carry errors through."""
+        records = [(i, "generate a weekly report" if i % 2 else "notify the team", None) for i in range(7)]
+        records.append(("bad", None, "invalid JSON"))
+        results = list(suggest_batch(records, max_suggestions=2, max_workers=1, chunk_size=3))
+        assert [result["id"] for result in results] == list(range(7)) + ["bad"]
+        assert results[1]["suggestions"][0]["title"] == "Use mw.generate_report"
+        assert all(0 < s["confidence"] <= 1 and s["reasoning"] for s in results[0]["suggestions"])
+        assert results[-1] == {"id": "bad", "error": "invalid JSON"}
+
+    def test_process_pool(self):
+        """Test classification in worker processes."""
+        records = [(i, "grant access to the vpn", None) for i in range(5)]
+        results = list(suggest_batch(records, max_suggestions=1, max_workers=2, chunk_size=2))
+        assert [result["id"] for result in results] == list(range(5))
+        assert results[4]["suggestions"][0]["title"] == "Use mw.grant_access"
+
+    def test_cli_batch(self, tmp_path):
+        """Test the suggest --batch command writing JSON Lines to a file."""
+        source = tmp_path / "requests.jsonl"
+        source.write_text('{"id": 1, "description": "Escalate old support tickets"}\n')
+        output = tmp_path / "out.jsonl"
+        result = CliRunner().invoke(cli, ["suggest", "--batch", str(source), "-o", str(output), "-w", "1"])
+        assert result.exit_code == 0, result.output
+        lines = [json.loads(line) for line in output.read_text().splitlines()]
+        assert lines[0]["id"] == 1 and lines[0]["suggestions"]
+
+        result = CliRunner().invoke(cli, ["suggest", "text", "--batch", str(source)])
+        assert result.exit_code != 0
+
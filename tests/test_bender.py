@@ -0,0 +1,633 @@
+"""
+Tests for the Bender expression language tooling.
+
+This module tests parsing of Bender (Moveworks Data Mapping Language)
+expressions into ASTs with source positions and their compiled evaluation.
+"""
+
+import json
+
+import pytest
+import yaml
+from click.testing import CliRunner
+
+from src.moveworks_wizard.bender.parser import (
+    BenderSyntaxError, parse_expression, tokenize, node_path, data_references, function_names, to_source,
+    Attribute, BinaryOp, Call, Index, ListExpr, Literal, MethodCall, Name, UnaryOp
+)
+from src.moveworks_wizard.bender import columnar
+from src.moveworks_wizard.bender.columnar import compile_columnar
+from src.moveworks_wizard.bender.completion import BenderCompleter
+from src.moveworks_wizard.bender.evaluator import (
+    BenderEvaluationError, compile_definition, compile_expression, evaluate, preview_expression
+)
+from src.moveworks_wizard.bender.bender_assistant import bender_assistant
+from src.moveworks_wizard.bender.linter import BenderLinter, iter_expressions
+from src.moveworks_wizard.bender.simplifier import simplify_document, simplify_expression
+from src.moveworks_wizard.bender.type_checker import (
+    ANY, INTEGER, STRING, TypeChecker, _merge_outputs, array_of, check_compound_action, object_of, root_schema,
+    schema_from_suggestions
+)
+from src.moveworks_wizard.models.actions import ActionStep
+from src.moveworks_wizard.models.base import CompoundAction
+from src.moveworks_wizard.models.terminal import ReturnStep
+from src.moveworks_wizard.serializers import serialize_compound_action
+from src.moveworks_wizard.utils.json_analyzer import JSONAnalyzer
+from src.moveworks_wizard.wizard.cli import cli
+
+
+class TestBenderParser:
+    """Test the Bender tokenizer and parser."""
+
+    def test_paths_and_method_chains(self):
+        """Test data paths, index access and .$METHOD() chains."""
+        tree = parse_expression("data.users[0].email.$TRIM()")
+
+        assert isinstance(tree, MethodCall)
+        assert tree.name == "TRIM"
+        assert node_path(tree.target) == "data.users[0].email"
+        assert (tree.start, tree.end) == (0, 27)
+
+        dotted = parse_expression("first_list.0.name")
+        assert isinstance(dotted.target, Index)
+        assert dotted.target.index == Literal(0)
+
+    def test_calls_and_string_literals(self):
+        """Test that string literals are not mistaken for calls."""
+        tree = parse_expression("CONCAT(data.first, 'MAP(x)', $INTEGER(meta_info.count))")
+
+        assert isinstance(tree, Call) and not tree.dollar
+        assert tree.args[1] == Literal("MAP(x)")
+        assert isinstance(tree.args[2], Call) and tree.args[2].dollar
+        assert function_names(tree) == ["CONCAT", "INTEGER"]
+        assert data_references(tree) == ["data.first", "meta_info.count"]
+
+    def test_operator_precedence(self):
+        """Test arithmetic, comparison and logical precedence."""
+        tree = parse_expression("not data.a and data.b + 2 * 3 == 8 or requestor.is_admin")
+
+        assert isinstance(tree, BinaryOp) and tree.op == "or"
+        left = tree.left
+        assert left.op == "and"
+        assert isinstance(left.left, UnaryOp) and left.left.op == "not"
+        comparison = left.right
+        assert comparison.op == "=="
+        assert comparison.left.op == "+"
+        assert comparison.left.right.op == "*"
+
+    def test_lists_and_membership(self):
+        """Test list literals and the in operator."""
+        tree = parse_expression("data.status in ['open', \"pending\"]")
+
+        assert tree.op == "in"
+        assert isinstance(tree.right, ListExpr)
+        assert [item.value for item in tree.right.items] == ["open", "pending"]
+
+    @pytest.mark.parametrize("expression,position", [
+        ("CONCAT(data.a, ' '", 18),
+        ("data.", 5),
+        ("'unterminated", 0),
+        ("data.a )", 7),
+        ("data.a # b", 7),
+    ])
+    def test_syntax_error_positions(self, expression, position):
+        """Test that syntax errors report the offending offset."""
+        with pytest.raises(BenderSyntaxError) as info:
+            parse_expression(expression)
+        assert info.value.position == position
+
+    def test_parse_cache(self):
+        """Test that repeated expressions are served from the cache."""
+        expression = "data.cached_path.value"
+        assert parse_expression(expression) is parse_expression(expression)
+
+    def test_tokenize_positions(self):
+        """Test token kinds and offsets."""
+        tokens = tokenize("data.a == 'x'")
+        assert [(t.kind, t.value, t.start) for t in tokens] == [
+            ("name", "data", 0), ("op", ".", 4), ("name", "a", 5),
+            ("op", "==", 7), ("string", "'x'", 10)]
+
+    def test_validate_expression_reports_position(self):
+        """Test that validation surfaces parser error positions."""
+        result = bender_assistant.validate_expression("CONCAT(data.first_name, ' ', data.last_name")
+
+        assert not result['is_valid']
+        assert result['error_positions'] == [43]
+        assert "position 43" in result['errors'][0]
+
+
+class TestBenderEvaluator:
+    """Test the compiled Bender evaluator."""
+
+    @pytest.fixture
+    def payload(self):
+        return {
+            "number": {"display_value": " INC0012 "},
+            "state": {"value": "2"},
+            "impact": {"value": "3"},
+            "users": [
+                {"name": "Ann", "age": 34, "role": "admin"},
+                {"name": "Bob", "age": 27, "role": "user"},
+            ],
+        }
+
+    def test_paths_and_helpers(self, payload):
+        """Test root-relative paths, $METHOD() chains and arithmetic."""
+        assert evaluate("number.display_value.$TRIM()", payload) == "INC0012"
+        assert evaluate("$INTEGER(state.value) + $INTEGER(impact.value)", payload) == 5
+        assert evaluate("users[1].name", payload) == "Bob"
+        assert evaluate("users.length", payload) == 2
+        assert evaluate("users[5].name", payload) is None
+        assert evaluate("missing.path", payload) is None
+
+    def test_repo_style_calls(self, payload):
+        """Test MAP/FILTER/SORT/CONCAT/RENDER with per-item expression strings."""
+        scope = {"data": payload}
+        assert evaluate("MAP(data.users, 'user.name')", None, scope) == ["Ann", "Bob"]
+        assert evaluate("FILTER(data.users, 'user.role == \"admin\"')", None, scope) == [payload["users"][0]]
+        assert evaluate("MAP(SORT(data.users, 'u.age'), 'item.name')", None, scope) == ["Bob", "Ann"]
+        assert evaluate("CONCAT(data.users[0].name, ' & ', data.users[1].name)", None, scope) == "Ann & Bob"
+        assert evaluate("RENDER('Hi {{ name }}', data.users[0])", None, scope) == "Hi Ann"
+        assert evaluate("IF(data.users.length > 1, 'many', 'one')", None, scope) == "many"
+        assert evaluate("EXTRACT('ping @ann now', '@([a-z]+)')", None, scope) == "ann"
+
+    def test_mapper_operators(self, payload):
+        """Test dictionary operators with item and loop variables."""
+        mapped = evaluate({"MAP()": {"items": "users",
+                                     "converter": {"name": "item.name", "position": "loop.index1"}}}, payload)
+        assert mapped == [{"name": "Ann", "position": 1}, {"name": "Bob", "position": 2}]
+
+        assert evaluate({"SORT()": {"items": "users", "key": "item.age", "desc": True}}, payload)[0]["name"] == "Ann"
+        assert evaluate({"COALESCE()": {"items": ["missing", "state.value"]}}, payload) == "2"
+        assert evaluate({"CONDITIONAL()": {"condition": "users.length > 5",
+                                           "on_pass": "'big'", "on_fail": "'small'"}}, payload) == "small"
+        assert evaluate({"LOOKUP()": {"key": "state.value", "mapping": {"2": "'In Progress'"},
+                                      "default": "'Unknown'"}}, payload) == "In Progress"
+        assert evaluate({"CONCAT()": {"items": ["users[0].name", "users[1].name"],
+                                      "separator": ", "}}, payload) == "Ann, Bob"
+        assert evaluate({"RENDER()": {"template": "{{ who }} is {{ age }}",
+                                      "args": {"who": "users[0].name", "age": "users[0].age"}}}, payload) == \
+            "Ann is 34"
+
+    def test_objects_iterate_values_with_keys(self):
+        """Test that operators iterate object values and expose loop.key."""
+        result = evaluate({"MAP()": {"items": "fields", "converter": "CONCAT(loop.key, '=', item)"}},
+                          {"fields": {"a": 1, "b": 2}})
+        assert result == ["a=1", "b=2"]
+
+    def test_errors_report_positions(self, payload):
+        """Test that evaluation errors carry positions."""
+        with pytest.raises(BenderEvaluationError) as info:
+            evaluate("users[0].name - 1", payload)
+        assert info.value.position == 0
+
+        with pytest.raises(BenderEvaluationError) as info:
+            compile_expression("data.a + $NOPE(data.b)")
+        assert info.value.position == 9
+
+    def test_compiled_expressions_are_cached(self):
+        """Test that compiling the same text twice returns the same closure."""
+        assert compile_expression("data.cached.value") is compile_expression("data.cached.value")
+        definition = {"MAP()": {"items": "data.x", "converter": "item"}}
+        assert compile_definition(definition) is compile_definition(dict(definition))
+
+    def test_preview_against_analyzed_json(self):
+        """Test previews against JSON as passed to the JSON analyzer."""
+        json_text = '{"result": [{"sys_id": "1"}, {"sys_id": "2"}]}'
+        assert preview_expression("api.result[1].sys_id", json_text, "api") == "2"
+        assert preview_expression("MAP(data.api.result, 'r.sys_id')", json_text, "api") == ["1", "2"]
+
+    @pytest.mark.parametrize("expression", ["FILTER(users, 'limit < u.age')", "FILTER(users, 'u.age > limit')"])
+    def test_item_variable_is_the_root_of_an_item_path(self, expression):
+        """Test that names outside the item's paths keep their outer binding, in either order."""
+        payload = {"limit": 30, "users": [{"name": "Ann", "age": 41}, {"name": "Bob", "age": 25}]}
+        assert [user["name"] for user in evaluate(expression, payload)] == ["Ann"]
+        # Large arrays take the columnar path, which must bind the same name
+        payload["users"] = payload["users"] * 1000
+        assert len(evaluate(expression, payload)) == 1000
+
+    def test_bare_names_are_not_bound_to_the_item(self):
+        """Test that a converter without item paths does not treat its first name as the item."""
+        payload = {"limit": 30, "users": [{"age": 41}, {"age": 25}]}
+        assert evaluate("MAP(users, 'limit')", payload) == [30, 30]
+        assert evaluate("MAP(users, 'CONCAT(item.age, \"/\", limit)')", payload) == ["41/30", "25/30"]
+
+
+class TestColumnarEvaluation:
+    """Test that columnar MAP/FILTER matches per-element evaluation."""
+
+    @pytest.fixture(params=["python", "numpy"])
+    def backend(self, request, monkeypatch):
+        if request.param == "numpy":
+            monkeypatch.setattr(columnar, "np", pytest.importorskip("numpy"))
+        else:
+            monkeypatch.setattr(columnar, "np", None)
+        return request.param
+
+    @pytest.fixture
+    def records(self):
+        return [{"id": i, "score": i % 7 - 3, "ratio": i / 4, "name": f"user {i}",
+                 "tags": ["a", "b"][: i % 3], "active": i % 2 == 0,
+                 "manager": {"level": i % 4} if i % 5 else None}
+                for i in range(1500)]
+
+    @pytest.mark.parametrize("expression", [
+        "MAP(data.records, 'r.score * 2 + r.id')",
+        "MAP(data.records, 'item.ratio / 2 - loop.index0')",
+        "MAP(data.records, 'CONCAT(r.name, \"#\", loop.index1)')",
+        "MAP(data.records, 'r.name.$UPPERCASE()')",
+        "MAP(data.records, 'r.manager.level')",
+        "FILTER(data.records, 'r.score > 0 and r.active')",
+        "FILTER(data.records, 'not r.active or r.id % 100 == 0')",
+        "FILTER(data.records, 'r.manager.level >= data.min_level')",
+        "FILTER(data.records, 'r.name == \"user 42\"')",
+        "FILTER(data.records, 'item.tags')",
+        "FILTER(data.records, 'r.id in [1, 2, 3]')",
+    ])
+    def test_matches_per_element(self, backend, records, monkeypatch, expression):
+        """Test columnar results against the per-element path."""
+        variables = {"data": {"records": records, "min_level": 2}}
+        columnar_result = evaluate(expression, None, variables)
+
+        monkeypatch.setattr(columnar, "COLUMNAR_MIN_ITEMS", 10 ** 9)
+        assert columnar_result == evaluate(expression, None, variables)
+
+    def test_mapper_converter_objects(self, backend, records):
+        """Test that object converters are assembled from field columns."""
+        definition = {"MAP()": {"items": "records", "converter": {"id": "item.id", "big": "item.score > 2"}}}
+        result = evaluate(definition, {"records": records})
+        assert result[4] == {"id": 4, "big": False}
+        assert result[6] == {"id": 6, "big": True}
+
+    def test_plans_and_fallbacks(self):
+        """Test which expressions get a columnar plan."""
+        assert compile_columnar(parse_expression("item.a + 1 > data.limit")) is not None
+        assert compile_columnar(parse_expression("IF(item.a, 1, 2)")) is None
+        assert compile_columnar(parse_expression("MAP(item.children, 'c.id')")) is None
+
+    def test_errors_fall_back_to_per_element(self, backend):
+        """Test that short-circuited failures are not reported by the columnar path."""
+        records = [{"value": "text" if i % 2 else i} for i in range(1200)]
+        expression = "FILTER(data.records, 'r.value > 3 and r.value - 1 == 3')"
+        assert evaluate(expression, None, {"data": {"records": records}}) == [{"value": 4}]
+
+        with pytest.raises(BenderEvaluationError):
+            evaluate("MAP(data.records, 'r.value * 2 - 1')", None, {"data": {"records": records}})
+
+
+class TestBenderLinter:
+    """Test whole-document Bender linting."""
+
+    @pytest.fixture
+    def document(self):
+        return {
+            "input_args": {"user_id": "data.user_id"},
+            "steps": [
+                {"action": {
+                    "action_name": "mw.get_user_details",
+                    "output_key": "user_info",
+                    "input_args": {"user_id": "data.user_id", "note": "Fetching the user, please wait"},
+                    "delay_config": {"seconds": "$INTEGER(data.wait"},
+                }},
+                {"for": {
+                    "each": "user", "index": "i", "in": "data.users[", "output_key": "results",
+                    "steps": [{"script": {"code": "return 1", "output_key": "x",
+                                          "input_args": {"name": "user.name.$TRIM()"}}}],
+                }},
+                {"switch": {"cases": [
+                    {"condition": "data.user_info.active ==", "steps": [
+                        {"return": {"output_mapper": {"who": "data.user_id"}}}]},
+                ]}},
+                {"return": {"output_mapper": {
+                    "names": {"MAP()": {"items": "data.users", "converter": "item.name.$SHOUT()"}},
+                    "summary": {"RENDER()": {"template": "Hi {{ data.user_info.name }} {{ data. }}"}},
+                    "label": {"CONCAT()": {"items": ["data.a", "data.b"], "separator": ", "}},
+                }}},
+            ],
+        }
+
+    def test_reports_paths_and_offsets(self, document):
+        """Test that issues carry step paths and offsets in the expression."""
+        issues = {issue.path: issue for issue in BenderLinter().lint(document, "flow.yaml")}
+
+        assert set(issues) == {
+            "steps[0].action.delay_config.seconds",
+            "steps[1].for.in",
+            "steps[2].switch.cases[0].condition",
+            "steps[3].return.output_mapper.names.MAP().converter",
+            "steps[3].return.output_mapper.summary.RENDER().template",
+        }
+        assert issues["steps[0].action.delay_config.seconds"].position == 18
+        assert issues["steps[1].for.in"].position == 11
+        assert issues["steps[2].switch.cases[0].condition"].position == 24
+
+        unknown = issues["steps[3].return.output_mapper.names.MAP().converter"]
+        assert unknown.severity == "warning" and unknown.position == 11
+
+        # Offsets inside RENDER() templates are relative to the whole template
+        template = issues["steps[3].return.output_mapper.summary.RENDER().template"]
+        assert template.position == len("Hi {{ data.user_info.name }} {{ data.")
+        assert template.format().startswith("flow.yaml:steps[3].return.output_mapper.summary.RENDER().template:")
+
+    def test_deduplicates_expressions(self, document):
+        """Test that repeated expression texts are checked once."""
+        linter = BenderLinter()
+        linter.lint(document)
+        linter.lint(document)
+
+        sites = list(iter_expressions(document))
+        assert linter.expressions_checked == 2 * len(sites)
+        assert linter.distinct_expressions == len({site.text for site in sites}) < len(sites)
+
+    def test_compound_action_models(self):
+        """Test linting a CompoundAction model."""
+        action = CompoundAction(steps=[
+            ActionStep(action_name="mw.test", output_key="out", input_args={"a": "data.x +"}),
+            ReturnStep(output_mapper={"result": "data.out"}),
+        ])
+        issues = BenderLinter().lint(action)
+        assert [(issue.path, issue.position) for issue in issues] == [("steps[0].action.input_args.a", 8)]
+
+    def test_cli_json_output(self, tmp_path, document):
+        """Test the lint-bender command's JSON mode and exit status."""
+        (tmp_path / "flow.yaml").write_text(yaml.safe_dump(document))
+        (tmp_path / "clean.yml").write_text(yaml.safe_dump({"steps": [{"return": {"output_mapper": {"a": "data.a"}}}]}))
+
+        result = CliRunner().invoke(cli, ["lint-bender", "--json", str(tmp_path)])
+        assert result.exit_code == 1
+        report = json.loads(result.output)
+        assert report["files"] == 2
+        assert report["errors"] == 4 and report["warnings"] == 1
+        assert {issue["file"] for issue in report["issues"]} == {str(tmp_path / "flow.yaml")}
+
+
+class TestBenderTypeChecker:
+    """Test type inference against analyzed response schemas."""
+
+    @pytest.fixture
+    def response_schema(self):
+        sample = {"users": [{"name": "Ann", "age": 34}], "title": "Report", "count": 2}
+        return schema_from_suggestions(JSONAnalyzer().analyze_json(json.dumps(sample), "api"))
+
+    @pytest.fixture
+    def checker(self, response_schema):
+        return TypeChecker(root_schema({"api": response_schema}))
+
+    @pytest.mark.parametrize("expression,type_name", [
+        ("data.api.users", "array[object]"),
+        ("data.api.users.length", "integer"),
+        ("data.api.count * 2", "integer"),
+        ("data.api.count / 2", "number"),
+        ("MAP(data.api.users, 'user.age')", "array[integer]"),
+        ("FILTER(data.api.users, 'u.age > 30')", "array[object]"),
+        ("data.api.title.$TRIM()", "string"),
+        ("requestor.email", "any"),
+    ])
+    def test_infers_types(self, checker, expression, type_name):
+        """Test inferred result types."""
+        node_type, issues = checker.check(expression)
+        assert issues == ()
+        assert node_type.describe() == type_name
+
+    @pytest.mark.parametrize("expression,message,position", [
+        ("MAP(data.api.title, 'x.name')", "MAP() over a non-array: string", 0),
+        ("data.api.usres[0].name", "Unknown path 'data.api.usres' (did you mean 'users'?)", 9),
+        ("MAP(data.api.users, 'user.nme')", "Unknown path 'user.nme' (did you mean 'name'?)", 26),
+        ("data.api.title - 1", "Arithmetic '-' on string; use CONCAT() or $INTEGER()", 0),
+        ("data.api.users.$TRIM()", "TRIM() expects a scalar, got array[object]", 0),
+    ])
+    def test_reports_errors(self, checker, expression, message, position):
+        """Test errors that would otherwise fail at runtime."""
+        _, issues = checker.check(expression)
+        assert issues == (("error", message, position),)
+
+    def test_union_schema_from_merged_suggestions(self):
+        """Test that types seen across documents are unioned and partial paths are nullable."""
+        analyzer = JSONAnalyzer()
+        merged = analyzer.analyze_ndjson(['{"id": 1, "note": "x"}', '{"id": "A-2"}'], "rows")
+        schema = schema_from_suggestions(merged)
+
+        assert schema.fields["id"].types == {"integer", "string"}
+        assert schema.fields["note"].types == {"string", "null"}
+
+    def test_results_cached_per_schema_version(self, checker, response_schema):
+        """Test that re-checking unchanged expressions does not infer again."""
+        checker.check("data.api.count + 1")
+        checker.check("data.api.count + 1")
+        assert checker.inferences == 1
+
+        changed = TypeChecker(root_schema({"api": response_schema, "extra": ANY}))
+        assert changed.version != checker.version
+
+    def test_compound_action_outputs_of_earlier_steps(self, response_schema):
+        """Test that expressions only see outputs of earlier steps and typed loop items."""
+        document = {
+            "steps": [
+                {"action": {"action_name": "a", "output_key": "first",
+                            "input_args": {"early": "data.second.id"}}},
+                {"action": {"action_name": "b", "output_key": "second"}},
+                {"for": {"each": "user", "index": "i", "in": "data.first.users", "output_key": "out",
+                         "steps": [{"action": {"action_name": "c", "output_key": "c",
+                                               "input_args": {"n": "user.nam"}}}]}},
+                {"for": {"each": "ch", "index": "j", "in": "data.first.title", "output_key": "chars",
+                         "steps": []}},
+            ],
+        }
+        cache = {}
+        issues = check_compound_action(document, {"first": response_schema}, checker_cache=cache)
+
+        assert [(issue.path, issue.message) for issue in issues] == [
+            ("steps[0].action.input_args.early", "Unknown path 'data.second'"),
+            ("steps[2].for.steps[0].action.input_args.n", "Unknown path 'user.nam' (did you mean 'name'?)"),
+            ("steps[3].for.in", "for loop over a non-array: string"),
+        ]
+
+        inferences = sum(checker.inferences for checker in cache.values())
+        check_compound_action(document, {"first": response_schema}, checker_cache=cache)
+        assert sum(checker.inferences for checker in cache.values()) == inferences
+
+    @pytest.mark.parametrize("loop_first", [False, True])
+    def test_switch_branches_setting_one_output_key(self, loop_first):
+        """Test that an output key set by several branches has the union of their schemas, in either order."""
+        action = {"action": {"action_name": "get", "output_key": "result"}}
+        loop = {"for": {"each": "x", "in": "data.items", "output_key": "result", "steps": []}}
+        cases = [loop, action] if loop_first else [action, loop]
+        document = {"steps": [
+            {"action": {"action_name": "list", "output_key": "items"}},
+            {"switch": {"cases": [{"condition": "data.items.length > 0", "steps": [step]} for step in cases]}},
+            {"return": {"output_mapper": {"id": "data.result.id", "name": "data.result.name"}}},
+        ]}
+        schemas = {"result": object_of({"id": INTEGER}), "items": array_of(ANY)}
+
+        issues = check_compound_action(document, schemas)
+        assert [(issue.path, issue.message) for issue in issues] == [
+            ("steps[2].return.output_mapper.name", "Unknown path 'data.result.name'")]
+
+    def test_fields_of_some_branches_are_optional(self):
+        """Test that fields only some branches define may be null after the branches."""
+        merged = _merge_outputs({}, [{"r": object_of({"id": INTEGER, "name": STRING})},
+                                     {"r": object_of({"id": STRING})}], optional=False)
+        assert merged["r"].fields["id"].types == {"integer", "string"}
+        assert merged["r"].fields["name"].types == {"string", "null"}
+
+    def test_cli_schema_option(self, tmp_path):
+        """Test lint-bender --schema typing an output key from a sample response."""
+        (tmp_path / "users.json").write_text('{"users": [{"name": "Ann"}]}')
+        flow = tmp_path / "flow.yaml"
+        flow.write_text(yaml.safe_dump({"steps": [
+            {"action": {"action_name": "get_users", "output_key": "resp"}},
+            {"return": {"output_mapper": {"names": "MAP(data.resp.users, 'u.nam')"}}},
+        ]}))
+
+        result = CliRunner().invoke(cli, ["lint-bender", str(flow), "--schema", f"resp={tmp_path / 'users.json'}"])
+        assert result.exit_code == 1
+        assert "Unknown path 'u.nam' (did you mean 'name'?)" in result.output
+
+        (tmp_path / "broken.json").write_text('{"users": [')
+        result = CliRunner().invoke(cli, ["lint-bender", str(flow), "--schema", f"resp={tmp_path / 'broken.json'}"])
+        assert result.exit_code == 2
+        assert "cannot analyze" in result.output
+
+
+class TestBenderSimplifier:
+    """Test constant folding of Bender expressions."""
+
+    @pytest.mark.parametrize("expression", [
+        "not a == b", "(not a) == b", "a - (b - c)", "-(a + b).$STRING()",
+        "$CONCAT([a, 'it\\'s'], '\\n')", "data['k'].items[0]", "a in [1, 2.5, null, true]",
+    ])
+    def test_to_source_round_trips(self, expression):
+        """Test that printed ASTs parse back to the same tree."""
+        tree = parse_expression(expression)
+        assert parse_expression(to_source(tree)) == tree
+
+    @pytest.mark.parametrize("expression, expected", [
+        ("1 + 2 * 3", "7"),
+        ("data.n * (60 * 60)", "data.n * 3600"),
+        ("$TRIM('  x ').$UPPERCASE()", "'X'"),
+        ("not true", "false"),
+        ("false and data.flag", "false"),
+        ("CONCAT('Ticket', ' #', data.id)", "CONCAT('Ticket #', data.id)"),
+        ("CONCAT(data.name)", "data.name"),
+        ("CONCAT('a', null, 1)", "'a1'"),
+        ("$CONCAT([data.a, 'b', 'c'], '-')", "$CONCAT([data.a, 'b-c'], '-')"),
+        ("CONDITIONAL(1 > 2, data.a, data.b)", "data.b"),
+        ("IF(false, data.a)", "null"),
+        ("COALESCE(null, '', data.a, 'x', data.b)", "COALESCE(data.a, 'x')"),
+        ("RENDER('No placeholders', data.args)", "'No placeholders'"),
+    ])
+    def test_simplify_expression(self, expression, expected):
+        """Test the folding rules."""
+        assert simplify_expression(expression) == (expected, True)
+
+    @pytest.mark.parametrize("expression", [
+        "data.user.email", "-5", "data.x and false", "10 / 0",
+        "RENDER('Hi {{ name }}', data)", "MAP(data.users, 'u.name')", "data.a +",
+    ])
+    def test_unchanged_expressions_are_kept_verbatim(self, expression):
+        """Test that expressions without constant parts are not reformatted."""
+        assert simplify_expression(expression) == (expression, False)
+
+    def test_simplify_document(self):
+        """Test simplifying steps, mapper operators and plain-text values."""
+        document = {"steps": [
+            {"action": {"action_name": "create", "output_key": "ticket", "input_args": {
+                "title": "CONCAT('[', 'IT', '] ', data.title)",
+                "due": "2024-01-01",
+                "priority": {"CONDITIONAL()": {"condition": "1 == 1", "on_pass": "data.p", "on_fail": "'low'"}},
+                "tags": {"CONCAT()": {"items": ["'a'", "'b'"], "separator": ", "}},
+                "body": {"RENDER()": {"template": "Static body"}},
+                "names": {"MAP()": {"items": "data.users", "converter": "$LOWERCASE('X')"}},
+            }}},
+            {"switch": {"cases": [{"condition": "data.ok == (2 > 1)", "steps": [
+                {"return": {"output_mapper": {"id": "CONCAT(data.ticket.id)"}}}]}]}},
+        ]}
+
+        simplified, rewrites = simplify_document(document)
+
+        args = simplified["steps"][0]["action"]["input_args"]
+        assert args == {
+            "title": "CONCAT('[IT] ', data.title)",
+            "due": "2024-01-01",
+            "priority": "data.p",
+            "tags": "'a, b'",
+            "body": "'Static body'",
+            "names": {"MAP()": {"items": "data.users", "converter": "'x'"}},
+        }
+        case = simplified["steps"][1]["switch"]["cases"][0]
+        assert case["condition"] == "data.ok == true"
+        assert case["steps"][0]["return"]["output_mapper"] == {"id": "data.ticket.id"}
+        assert rewrites == 7
+        assert document["steps"][0]["action"]["input_args"]["due"] == "2024-01-01"
+        assert isinstance(document["steps"][0]["action"]["input_args"]["tags"], dict)
+
+    def test_simplify_serialization_option(self):
+        """Test serialize_compound_action(simplify=True) reporting the rewrite count."""
+        action = CompoundAction(steps=[
+            ActionStep(action_name="mw.test", output_key="out", input_args={"n": "data.n * (2 + 3)"}),
+            ReturnStep(output_mapper={"result": "CONCAT(data.out)"}),
+        ])
+        stats = {}
+
+        content = serialize_compound_action(action, simplify=True, stats=stats)
+
+        assert stats == {"simplified_expressions": 2}
+        document = yaml.safe_load(content)
+        assert document["steps"][0]["action"]["input_args"] == {"n": "data.n * 5"}
+        assert "CONCAT" in serialize_compound_action(action)
+
+
+class TestBenderCompletion:
+    """Test completion of the expression token under the cursor."""
+
+    @pytest.fixture
+    def completer(self):
+        action = CompoundAction(input_args={"user_email": "meta_info.user.email"}, steps=[
+            ActionStep(action_name="mw.get_user", output_key="user_info"),
+            ActionStep(action_name="mw.create_ticket", output_key="ticket"),
+        ])
+        suggestions = JSONAnalyzer().analyze_json('{"user": {"email": "a@b.c"}, "items": [{"id": 1}]}', "lookup")
+        return BenderCompleter.for_compound_action(action, before_step=1, response_paths={"lookup": suggestions})
+
+    def labels(self, result):
+        return [item.label for item in result.items]
+
+    def test_paths_in_scope(self, completer):
+        """Test input args, earlier step outputs and analyzed paths, one segment at a time."""
+        assert self.labels(completer.complete("data.")) == ["data.lookup", "data.user_email", "data.user_info"]
+        assert self.labels(completer.complete("data.lookup.")) == ["data.lookup.items", "data.lookup.user"]
+        assert self.labels(completer.complete("data.lookup.items[")) == ["data.lookup.items[0]"]
+        assert "data.ticket" not in self.labels(completer.complete("data.t"))
+
+    def test_functions_and_methods(self, completer):
+        """Test function names, $helpers and .$method() chains."""
+        result = completer.complete("CONCAT(con")
+        assert self.labels(result) == ["CONCAT", "CONDITIONAL"]
+        assert result.apply("CONCAT(con", result.items[0]) == ("CONCAT(CONCAT()", 14)
+
+        assert self.labels(completer.complete("$TR")) == ["$TRIM"]
+        result = completer.complete("data.user_email.$LOW")
+        assert self.labels(result) == ["$LOWER", "$LOWERCASE"]
+        assert result.items[1].insert == "data.user_email.$LOWERCASE()"
+
+    def test_only_the_token_at_the_cursor(self, completer):
+        """Test the replaced range and tokens inside string literals."""
+        text = "CONCAT(data.us, ' ')"
+        result = completer.complete(text, cursor=14)
+        assert (result.start, result.end, result.prefix) == (7, 14, "data.us")
+        assert result.apply(text, result.items[0]) == ("CONCAT(data.user_email, ' ')", 22)
+        assert completer.complete("MAP(data.x, 'data.").items == []
+
+    def test_large_path_sets(self):
+        """Test that completions stay fast with many known paths."""
+        import time
+
+        completer = BenderCompleter()
+        completer.add_paths(f"data.resp.rows[{i}].field_{j}" for i in range(100) for j in range(100))
+        assert completer.path_count > 10_000
+
+        start = time.perf_counter()
+        for text in ("data.", "data.resp.rows[4", "data.resp.rows[42].field_1", "da"):
+            assert completer.complete(text, limit=20).items
+        assert time.perf_counter() - start < 0.05
@@ -0,0 +1,383 @@
+"""
+Tests for the data-driven built-in action catalog, its indexes, providers and performance profiles.
+"""
+
+import json
+import os
+import sqlite3
+
+import pytest
+import yaml
+
+from src.moveworks_wizard.catalog.builtin_actions import (
+    CATALOG_DIR, CATALOG_PATH_ENV, BuiltinAction, BuiltinActionCatalog, default_catalog_files,
+    default_catalog_providers
+)
+from src.moveworks_wizard.catalog.catalog_index import (
+    compile_index, decode_index, encode_index, index_path, scan_catalog
+)
+from src.moveworks_wizard.catalog.action_profiles import build_profile, parse_profile
+from src.moveworks_wizard.catalog.providers import (
+    SQLITE_SCHEMA, CatalogFileProvider, DirectoryProvider, SQLiteProvider
+)
+from src.moveworks_wizard.utils.loop_load import estimate_loop_load, loop_load_warnings
+
+
+def write_catalog(path, actions, indexed=True):
+    path.write_text(json.dumps(actions, indent=2))
+    if indexed:
+        compile_index(path)
+    return path
+
+
+def action(name, category="Testing", **fields):
+    return {"name": name, "description": f"{name} action", "category": category, "parameters": [], **fields}
+
+
+class TestCatalogIndex:
+    """Test compiling and decoding catalog indexes."""
+
+    def test_packaged_indexes_are_up_to_date(self):
+        """Test that every packaged data file has an index compiled for its current contents."""
+        for path in CATALOG_DIR.glob("*.json"):
+            data = path.read_bytes()
+            index = decode_index(index_path(path).read_bytes(), data)
+            assert index is not None, f"recompile {index_path(path).name}"
+            assert index == scan_catalog(data.decode("utf-8"))
+
+    def test_round_trip_and_spans(self):
+        """Test that spans locate each object, including non-ASCII text."""
+        text = json.dumps([action("a.one", "Café"), action("a.two", description="naïve")], indent=1,
+                          ensure_ascii=False)
+        index = scan_catalog(text)
+        data = text.encode("utf-8")
+        assert decode_index(encode_index(index, data), data) == index
+        assert index.names == ["a.one", "a.two"] and index.categories == ["Café", "Testing"]
+        assert json.loads(text[index.spans[2]:index.spans[3]])["description"] == "naïve"
+
+    def test_stale_index_is_rejected(self):
+        """Test that an index compiled for other data does not decode."""
+        text = json.dumps([action("a.one")])
+        encoded = encode_index(scan_catalog(text), text.encode("utf-8"))
+        assert decode_index(encoded, text.replace("one", "two").encode("utf-8")) is None
+        assert decode_index(b"garbage", text.encode("utf-8")) is None
+
+    def test_invalid_catalog(self):
+        """Test that data files must be arrays of named objects."""
+        with pytest.raises(ValueError):
+            scan_catalog('{"name": "a"}')
+        with pytest.raises(ValueError):
+            scan_catalog('[{"description": "no name"}]')
+
+
+class TestLazyCatalog:
+    """Test lazy loading and materialization of catalog entries."""
+
+    def test_nothing_is_read_until_first_use(self, tmp_path):
+        """Test that creating a catalog reads no files."""
+        catalog = BuiltinActionCatalog([tmp_path / "missing.json"])
+        assert catalog._owners is None and catalog._providers is None
+
+    def test_actions_are_materialized_on_request(self, tmp_path):
+        """Test that listing names and categories parses no action."""
+        path = write_catalog(tmp_path / "extra.json", [action(f"x.a{i}", f"C{i % 3}") for i in range(30)])
+        catalog = BuiltinActionCatalog([path])
+
+        assert len(catalog) == 30 and catalog.is_builtin_action("x.a7")
+        assert catalog.get_all_categories() == ["C0", "C1", "C2"]
+        provider = catalog.providers[0]
+        assert provider._cache == {}
+
+        found = catalog.get_action("x.a7")
+        assert isinstance(found, BuiltinAction) and found.category == "C1"
+        assert list(provider._cache) == ["x.a7"]
+        assert catalog.get_action("x.a7") is found
+        assert catalog.get_action("x.missing") is None
+
+    def test_later_files_override_and_unindexed_files(self, tmp_path):
+        """Test file precedence, files without an index and added actions."""
+        base = write_catalog(tmp_path / "base.json", [action("x.one"), action("x.two")])
+        extra = write_catalog(tmp_path / "extra.json", [action("x.two", "Overridden")], indexed=False)
+        catalog = BuiltinActionCatalog([base, extra])
+        assert catalog.get_action("x.two").category == "Overridden"
+        assert catalog.get_action_names() == ["x.one", "x.two"]
+
+        catalog.add_action(BuiltinAction("x.three", "added", "Added", []))
+        assert catalog.get_action_names() == ["x.one", "x.two", "x.three"]
+        assert [a.name for a in catalog.get_actions_by_category("Added")] == ["x.three"]
+
+    def test_catalog_path_environment(self, tmp_path, monkeypatch):
+        """Test extension catalogs listed in the environment."""
+        write_catalog(tmp_path / "acme.json", [action("acme.reboot", "Devices")])
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+        monkeypatch.setenv(CATALOG_PATH_ENV, os.pathsep.join([str(tmp_path), str(tmp_path / "org.db")]))
+        providers = default_catalog_providers()
+        assert [type(p) for p in providers[-2:]] == [DirectoryProvider, SQLiteProvider]
+
+        catalog = BuiltinActionCatalog()
+        assert catalog.get_action("acme.reboot").category == "Devices"
+        assert catalog.get_action("mw.send_plaintext_chat_notification") is not None
+
+
+class TestCatalogSearch:
+    """Test the prefix, token and category indexes of the catalog."""
+
+    @pytest.fixture
+    def catalog(self):
+        return BuiltinActionCatalog(default_catalog_files())
+
+    def test_name_prefix_and_token_search(self, catalog):
+        """Test name prefixes, word prefixes and multi-word queries."""
+        assert [a.name for a in catalog.search_actions("mw.send_")] == [
+            "mw.send_plaintext_chat_notification", "mw.send_rich_chat_notification"]
+        assert [a.name for a in catalog.search_actions("rich notif")] == ["mw.send_rich_chat_notification"]
+        assert catalog.search_actions("notif nonexistent") == []
+        assert len(catalog.search_actions("")) == len(catalog)
+
+    def test_parameter_names_are_opt_in(self, catalog):
+        """Test that parameter names are only searched on request."""
+        assert catalog.search_actions("card_content") == []
+        assert [a.name for a in catalog.search_actions("card_content", include_parameters=True)] == [
+            "mw.send_rich_chat_notification"]
+
+    def test_indexes_follow_registration(self, catalog):
+        """Test that adding, overriding and removing actions updates every index."""
+        catalog.search_actions("warm up")
+        categories = catalog.get_all_categories()
+
+        catalog.add_action(BuiltinAction("acme.reimage_laptop", "Reimage a laptop", "Devices", []))
+        assert [a.name for a in catalog.search_actions("reimag")] == ["acme.reimage_laptop"]
+        assert [a.name for a in catalog.get_actions_by_category("Devices")] == ["acme.reimage_laptop"]
+        assert catalog.get_all_categories() == sorted(categories + ["Devices"])
+
+        catalog.add_action(BuiltinAction("mw.create_ticket", "Open an incident", "Incidents", []))
+        assert "mw.create_ticket" not in [a.name for a in catalog.get_actions_by_category("Ticket Management")]
+        assert [a.name for a in catalog.search_actions("incident")] == ["mw.create_ticket"]
+
+        catalog.remove_action("acme.reimage_laptop")
+        catalog.remove_action("mw.create_ticket")
+        assert catalog.search_actions("reimag") == [] and catalog.search_actions("incident") == []
+        assert catalog.get_action("mw.create_ticket").category == "Ticket Management"
+        assert catalog.get_all_categories() == categories
+
+
+def set_mtime(path, offset):
+    """Move a file's modification time so that rewrites within one clock tick are noticed."""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + offset))
+
+
+class TestProviders:
+    """Test directory and SQLite providers merged with the packaged catalog."""
+
+    TENANT_ACTION = "3f2b9c1e-8a4d-4e6f-9b7a-1c2d3e4f5a6b"
+
+    def test_directory_of_json_and_yaml(self, tmp_path):
+        """Test single actions, lists and {actions: [...]} in JSON and YAML files."""
+        (tmp_path / "nested").mkdir()
+        (tmp_path / "one.json").write_text(json.dumps(action("acme.one")))
+        (tmp_path / "nested" / "many.yaml").write_text(yaml.safe_dump(
+            {"actions": [action("acme.two", "Devices"), action(self.TENANT_ACTION, "Tenant")]}))
+        (tmp_path / "broken.yml").write_text("- description: no name\n")
+        provider = DirectoryProvider(tmp_path, cache_dir=tmp_path / "cache")
+        catalog = BuiltinActionCatalog(default_catalog_files(), providers=[provider])
+
+        with pytest.warns(RuntimeWarning, match="broken.yml"):
+            assert catalog.is_builtin_action(self.TENANT_ACTION)
+        assert catalog.is_builtin_action("mw.create_ticket")
+        assert catalog.get_action("acme.two").category == "Devices"
+        assert [a.name for a in catalog.get_actions_by_category("Tenant")] == [self.TENANT_ACTION]
+        assert list(provider.errors) == ["broken.yml"]
+
+    def test_directory_refresh_and_persistent_cache(self, tmp_path):
+        """Test that only changed files are parsed and that changes reach every index."""
+        root = tmp_path / "actions"
+        root.mkdir()
+        (root / "a.json").write_text(json.dumps([action("acme.a", "Alpha")]))
+        (root / "b.json").write_text(json.dumps([action("acme.b", "Beta")]))
+        catalog = BuiltinActionCatalog(providers=[DirectoryProvider(root, cache_dir=tmp_path / "cache")])
+        assert catalog.get_action_names() == ["acme.a", "acme.b"]
+        assert catalog.search_actions("alpha")[0].name == "acme.a"
+        assert catalog.refresh() == []
+
+        (root / "a.json").write_text(json.dumps([action("acme.a", "Gamma"), action("acme.c", "Gamma")]))
+        set_mtime(root / "a.json", 1_000_000)
+        (root / "b.json").unlink()
+        assert sorted(catalog.refresh()) == ["acme.a", "acme.b", "acme.c"]
+        assert not catalog.is_builtin_action("acme.b")
+        assert catalog.get_all_categories() == ["Gamma"]
+        assert catalog.search_actions("alpha") == []
+        assert [a.name for a in catalog.search_actions("gamma")] == ["acme.a", "acme.c"]
+
+        # A new process reuses the parsed files from the cache
+        restarted = DirectoryProvider(root, cache_dir=tmp_path / "cache")
+        parsed = []
+        restarted.parse_file = lambda path: parsed.append(path) or DirectoryProvider.parse_file(path)
+        assert sorted(restarted.refresh().updated) == ["acme.a", "acme.c"]
+        assert parsed == []
+
+    def test_sqlite_provider(self, tmp_path):
+        """Test SQLite catalogs with tenant UUID names, overrides and refresh."""
+        path = tmp_path / "org.db"
+        connection = sqlite3.connect(path)
+        connection.execute(SQLITE_SCHEMA)
+        parameters = json.dumps([{"name": "user_id", "type": "string", "required": True,
+                                  "description": "User"}])
+        connection.executemany("INSERT INTO actions VALUES (?, ?, ?, ?, ?)", [
+            (self.TENANT_ACTION, "Provision a tenant mailbox", "Tenant", parameters, None),
+            ("mw.create_ticket", "Open an incident in the org ITSM", "Incidents", "[]", None),
+        ])
+        connection.commit()
+        catalog = BuiltinActionCatalog(default_catalog_files(), providers=[SQLiteProvider(path)])
+
+        found = catalog.get_action(self.TENANT_ACTION)
+        assert found.parameters[0].name == "user_id"
+        assert catalog.get_action("mw.create_ticket").category == "Incidents"
+        assert [a.name for a in catalog.search_actions("mailbox")] == [self.TENANT_ACTION]
+
+        connection.execute("DELETE FROM actions WHERE name = 'mw.create_ticket'")
+        connection.commit()
+        connection.close()
+        set_mtime(path, 1_000_000)
+        assert catalog.refresh() == ["mw.create_ticket"]
+        assert catalog.get_action("mw.create_ticket").category == "Ticket Management"
+        assert catalog.search_actions("incident") == []
+        assert catalog.get_action(self.TENANT_ACTION) is found
+
+    def test_bad_sources_are_skipped(self, tmp_path):
+        """Test that invalid definitions and unreadable sources leave the rest of the catalog working."""
+        root = tmp_path / "actions"
+        root.mkdir()
+        (root / "good.yaml").write_text(yaml.safe_dump(action("acme.good")))
+        (root / "no_description.yaml").write_text(yaml.safe_dump({"name": "acme.bad", "category": "X"}))
+        (root / "extra_key.yaml").write_text(yaml.safe_dump(action("acme.extra", connector="itsm")))
+        directory = DirectoryProvider(root, persist=False)
+        no_table = SQLiteProvider(tmp_path / "empty.db")
+        sqlite3.connect(tmp_path / "empty.db").close()
+        truncated = tmp_path / "truncated.json"
+        truncated.write_text(json.dumps([action("x.one")])[:-5])
+        invalid = write_catalog(tmp_path / "invalid.json", [action("x.two"), {"name": "x.three", "category": "X"}])
+        providers = [directory, no_table, CatalogFileProvider(truncated), CatalogFileProvider(invalid)]
+
+        with pytest.warns(RuntimeWarning):
+            catalog = BuiltinActionCatalog(default_catalog_files(), providers=providers)
+            assert catalog.get_action("acme.good").category == "Testing"
+            assert catalog.get_action("mw.create_ticket") is not None
+            assert catalog.get_action("x.three") is None
+            names = [a.name for a in catalog.get_all_actions()]
+        assert "acme.good" in names and "x.two" in names and "x.three" not in names
+        assert sorted(directory.errors) == ["extra_key.yaml", "no_description.yaml"]
+        assert list(no_table.errors) == [str(tmp_path / "empty.db")]
+        assert list(providers[2].errors) == [str(truncated)]
+        assert list(providers[3].errors) == ["x.three"]
+
+    def test_catalog_file_refresh(self, tmp_path):
+        """Test that rewriting a catalog data file reports only the changed actions."""
+        path = write_catalog(tmp_path / "extra.json", [action("x.one"), action("x.two")])
+        provider = CatalogFileProvider(path)
+        catalog = BuiltinActionCatalog(providers=[provider])
+        assert len(catalog) == 2
+        write_catalog(path, [action("x.one"), action("x.two", "Changed"), action("x.three")])
+        set_mtime(path, 1_000_000)
+        assert catalog.refresh() == ["x.two", "x.three"]
+        assert catalog.get_action("x.two").category == "Changed"
+
+    def test_add_provider(self, tmp_path):
+        """Test that a provider added after loading overrides earlier sources."""
+        catalog = BuiltinActionCatalog(default_catalog_files())
+        categories = catalog.get_all_categories()
+        (tmp_path / "org.yaml").write_text(yaml.safe_dump(action("mw.create_ticket", "Incidents")))
+        catalog.add_provider(DirectoryProvider(tmp_path, persist=False))
+        assert catalog.get_action("mw.create_ticket").category == "Incidents"
+        assert catalog.get_all_categories() == sorted(categories + ["Incidents"])
+
+
+class TestActionProfiles:
+    """Test performance profiles and the loop load estimates built on them."""
+
+    PROFILE = {
+        "version": 1,
+        "connectors": {"hr": {"rate_limit_rps": 10, "max_concurrency": 4}},
+        "actions": {
+            "x.lookup": {"connector": "hr", "typical_latency_ms": 200, "read_only": True, "idempotent": True},
+            "x.notify": {"typical_latency_ms": 300, "idempotent": False, "rate_limit_rps": 50},
+        },
+    }
+
+    @pytest.fixture
+    def catalog(self, tmp_path):
+        path = write_catalog(tmp_path / "extra.json", [action("x.lookup"), action("x.notify")])
+        profile = tmp_path / "profile.json"
+        profile.write_text(json.dumps(self.PROFILE))
+        return BuiltinActionCatalog([path], profile_files=[profile, tmp_path / "missing.json"])
+
+    def test_profiles_attach_to_actions(self, catalog):
+        """Test that connector limits apply to the actions of the connector."""
+        performance = catalog.get_action("x.lookup").performance
+        assert performance.rate_limit_rps == 10 and performance.max_concurrency == 4
+        assert performance.summary() == ("typical latency 200 ms, hr limited to 10 rps, "
+                                         "at most 4 concurrent calls, read-only, safe to retry")
+        assert catalog.get_performance("x.unknown") is None
+
+    def test_packaged_profile(self):
+        """Test that the packaged profile covers every built-in action."""
+        catalog = BuiltinActionCatalog(default_catalog_files())
+        assert all(catalog.get_performance(name) is not None for name in catalog.get_action_names())
+
+    def test_invalid_profile(self):
+        """Test that profiles reject unknown fields and versions."""
+        with pytest.raises(ValueError):
+            parse_profile({"actions": {"x.a": {"latency": 1}}})
+        with pytest.raises(ValueError):
+            parse_profile({"version": 99})
+
+    def test_invalid_profile_files_are_skipped(self, tmp_path):
+        """Test that unreadable or invalid profile files do not break the catalog."""
+        path = write_catalog(tmp_path / "extra.json", [action("x.lookup"), action("x.notify")])
+        good = tmp_path / "profile.json"
+        good.write_text(json.dumps(self.PROFILE))
+        (tmp_path / "unknown.json").write_text(json.dumps({"actions": {"x.notify": {"latency": 1}}}))
+        (tmp_path / "truncated.json").write_text(json.dumps(self.PROFILE)[:20])
+        profile_files = [good, tmp_path / "unknown.json", tmp_path / "truncated.json", tmp_path]
+        catalog = BuiltinActionCatalog([path], profile_files=profile_files)
+
+        with pytest.warns(RuntimeWarning, match="skipping performance profile"):
+            assert catalog.get_action("x.lookup").performance.rate_limit_rps == 10
+        assert catalog.get_performance("x.notify").typical_latency_ms == 300
+
+    def test_added_actions_are_not_modified(self, catalog):
+        """Test that attaching a profile leaves the object passed to add_action unchanged."""
+        added = BuiltinAction("x.lookup", "Look up", "Testing", [])
+        catalog.add_action(added)
+        assert catalog.get_action("x.lookup").performance.rate_limit_rps == 10
+        assert added.performance is None
+        assert catalog.get_action("x.lookup") is catalog.get_action("x.lookup")
+
+    def test_build_profile_from_call_logs(self):
+        """Test that latencies and payload sizes are measured and flags are kept."""
+        records = [{"action": "x.lookup", "latency_ms": ms, "response_bytes": 50_000} for ms in range(1, 101)]
+        profile = build_profile(records, base=self.PROFILE)
+        lookup = profile["actions"]["x.lookup"]
+        assert (lookup["typical_latency_ms"], lookup["p99_latency_ms"]) == (50, 99)
+        assert lookup["payload_size"] == "medium" and lookup["connector"] == "hr"
+        assert profile["connectors"] == self.PROFILE["connectors"]
+        assert parse_profile(profile)["x.lookup"].read_only is True
+
+    def test_loop_load(self, catalog):
+        """Test call counts, time bounds and warnings of sequential and parallel loops."""
+        body = {"each": "u", "index": "i", "in": "users", "output_key": "out", "steps": [
+            {"action": {"action_name": "x.lookup", "output_key": "a"}},
+            {"switch": {"cases": [{"condition": "u.new", "steps": [
+                {"action": {"action_name": "x.notify", "output_key": "b"}}]}]}},
+        ]}
+        loads = {load.connector: load for load in estimate_loop_load({"for": body}, 800, catalog)}
+        assert loads["hr"].calls == 800 and loads["hr"].min_seconds == 160
+        assert loads["x.notify"].min_seconds == 240 and loads["x.notify"].unsafe_to_retry == ["x.notify"]
+
+        warnings = loop_load_warnings({"for": body}, 800, catalog)
+        assert warnings[0] == "This loop will make ~800 calls to hr, a connector limited to 10 rps: at least 2.7 min"
+        assert any(w.startswith("x.notify is not safe to retry") for w in warnings)
+        assert loop_load_warnings({"for": body}, 5, catalog) == [warnings[-1]]
+
+        parallel = loop_load_warnings({"parallel": {"for": body}}, 800, catalog)
+        assert "hr accepts at most 4 concurrent calls" in " ".join(parallel)
@@ -7,15 +7,26 @@ from HTTP connector test results.
 
 import pytest
 import json
+import yaml
 from pathlib import Path
 from tempfile import NamedTemporaryFile
 
 from src.moveworks_wizard.utils.json_analyzer import (
     JSONAnalyzer, 
     VariableSuggestion, 
+    ValuePreview,
     analyze_json_string, 
-    analyze_json_file
+    analyze_json_file,
+    analyze_json_files,
+    analyze_ndjson_file,
+    expand_json_paths
 )
+from src.moveworks_wizard.utils.analysis_cache import AnalysisCache
+from src.moveworks_wizard.utils.suggestion_index import SuggestionIndex, split_path
+from src.moveworks_wizard.utils.payload_profiler import compute_path_sizes, collect_used_paths
+from src.moveworks_wizard.models.base import CompoundAction
+from src.moveworks_wizard.models.actions import ActionStep
+from src.moveworks_wizard.models.terminal import ReturnStep
 
 
 class TestJSONAnalyzer:
@@ -257,6 +268,67 @@ class TestJSONAnalyzer:
         finally:
             output_path.unlink()
 
+    def test_lazy_description_and_example_usage(self):
+        """Test that description and example usage are rendered on first access."""
+        json_data = {"users": [{"id": 1, "name": "John"}], "email": "a@b.com"}
+
+        analyzer = JSONAnalyzer()
+        suggestions = analyzer.analyze_json(json.dumps(json_data), "users_api")
+
+        assert all(s._description is None for s in suggestions)
+
+        email_suggestion = next(s for s in suggestions if s.path == "email")
+        assert email_suggestion.description == "Email address (email)"
+        assert "recipient" in email_suggestion.example_usage
+
+        id_suggestion = next(s for s in suggestions if s.path == "users[*].id")
+        assert id_suggestion.description == "All id values from array items (integer)"
+        assert "users_api.users" in id_suggestion.example_usage
+
+    def test_top_k_matches_full_ranking(self):
+        """Test that heap-based top-k selection agrees with the full ordering."""
+        json_data = {f"field_{i}": i for i in range(50)}
+        json_data.update({"id": 1, "email": "a@b.com", "nested": {"user": {"name": "x"}}})
+
+        top_analyzer = JSONAnalyzer()
+        top = top_analyzer.analyze_json(json.dumps(json_data), "test", top_k=5)
+        full = JSONAnalyzer().analyze_json(json.dumps(json_data), "test")
+
+        assert [s.path for s in top] == [s.path for s in full[:5]]
+        assert len(top_analyzer.suggestions) == len(full)
+        assert [s.path for s in top_analyzer.get_ranked_suggestions()] == [s.path for s in full]
+
+    def test_container_values_are_bounded_previews(self):
+        """Test that container values are stored as bounded previews."""
+        json_data = {"items": [{"id": i, "tags": list(range(100))} for i in range(1000)]}
+
+        analyzer = JSONAnalyzer()
+        suggestions = analyzer.analyze_json(json.dumps(json_data), "api")
+
+        items_suggestion = next(s for s in suggestions if s.path == "items")
+        assert isinstance(items_suggestion.value, ValuePreview)
+        assert items_suggestion.value.size == 1000
+        assert len(items_suggestion.value.items) == 3
+        assert items_suggestion.value.truncated
+        assert items_suggestion.data_type == "array[1000]"
+        assert items_suggestion.description == "Array with 1000 items"
+
+        preview = items_suggestion.value.to_dict()
+        assert preview["preview"] == "array"
+        assert preview["items"][0]["items"]["tags"] == {
+            "preview": "array", "size": 100, "items": [], "truncated": True
+        }
+
+    def test_keep_full_values_opt_in(self):
+        """Test that full container values can be kept on request."""
+        json_data = {"tags": ["a", "b", "c", "d", "e"]}
+
+        analyzer = JSONAnalyzer(keep_full_values=True)
+        suggestions = analyzer.analyze_json(json.dumps(json_data), "api")
+
+        tags_suggestion = next(s for s in suggestions if s.path == "tags")
+        assert tags_suggestion.value == ["a", "b", "c", "d", "e"]
+
 
 class TestConvenienceFunctions:
     """Test convenience functions for JSON analysis."""
@@ -287,6 +359,406 @@ class TestConvenienceFunctions:
         finally:
             file_path.unlink()
 
+    def test_analyze_json_files_merges_results(self, tmp_path):
+        """Test batch analysis merges path frequencies and type histograms."""
+        for i in range(4):
+            payload = {"id": i, "items": [{"sku": f"A{i}"}]}
+            if i % 2:
+                payload["extra"] = "text" if i == 1 else 7
+            (tmp_path / f"response_{i}.json").write_text(json.dumps(payload), encoding="utf-8")
+        (tmp_path / "broken.json").write_text("{", encoding="utf-8")
+
+        files = expand_json_paths(tmp_path)
+        assert len(files) == 5
+
+        suggestions = analyze_json_files(files, "api", max_workers=2)
+        by_path = {s.path: s for s in suggestions}
+
+        assert by_path["id"].document_count == 4
+        assert by_path["id"].total_documents == 4
+        assert by_path["items"].type_counts == {"array": 4}
+        assert by_path["extra"].document_count == 2
+        assert by_path["extra"].type_counts == {"string": 1, "integer": 1}
+        assert by_path["extra"].frequency == 0.5
+        assert by_path["items[*].sku"].bender_expression == "ARRAY(api.items, item.sku)"
+
+        # Paths present in every file rank before partial ones
+        assert suggestions[-1].path == "extra"
+
+    def test_expand_json_paths_glob(self, tmp_path):
+        """Test glob expansion of JSON file specifications."""
+        (tmp_path / "a.json").write_text("{}", encoding="utf-8")
+        (tmp_path / "b.json").write_text("{}", encoding="utf-8")
+        (tmp_path / "c.txt").write_text("{}", encoding="utf-8")
+
+        assert [p.name for p in expand_json_paths(tmp_path / "*.json")] == ["a.json", "b.json"]
+
+
+class TestNDJSONAnalysis:
+    """Test JSON Lines analysis with field-frequency aggregation."""
+
+    def test_ndjson_aggregates_record_statistics(self):
+        """Test record counts, null rates and type histograms across lines."""
+        lines = [
+            json.dumps({"id": 1, "email": "a@example.com"}),
+            "",
+            json.dumps({"id": 2, "email": None}),
+            json.dumps({"id": "3", "email": "c@example.com", "extra": True}),
+            "not json",
+            json.dumps({"id": 4, "email": None}),
+        ]
+
+        analyzer = JSONAnalyzer()
+        suggestions = analyzer.analyze_ndjson(iter(lines), "logs")
+        by_path = {s.path: s for s in suggestions}
+
+        assert by_path["id"].document_count == 4
+        assert by_path["id"].total_documents == 4
+        assert by_path["id"].type_counts == {"integer": 3, "string": 1}
+        assert by_path["email"].null_rate == 0.5
+        assert by_path["email"].value == "a@example.com"
+        assert by_path["extra"].frequency == 0.25
+        assert by_path["extra"].unit == "records"
+
+        assert analyzer.skipped_lines == 1
+        assert list(analyzer.batch_errors) == ["line 5"]
+
+    def test_ndjson_array_properties_count_as_item_types(self):
+        """Test that array property types are normalized to their item type across records."""
+        lines = [json.dumps({"users": [{"manager": "ann"}]}), json.dumps({"users": [{"manager": None}]})]
+        suggestions = JSONAnalyzer().analyze_ndjson(iter(lines), "logs")
+        manager = next(s for s in suggestions if s.path == "users[*].manager")
+
+        assert manager.type_counts == {"string": 1, "null": 1}
+        assert manager.null_rate == 0.5
+
+    def test_analyze_ndjson_file(self, tmp_path):
+        """Test the JSON Lines file convenience function."""
+        jsonl_file = tmp_path / "export.jsonl"
+        jsonl_file.write_text("\n".join(json.dumps({"n": i}) for i in range(50)), encoding="utf-8")
+
+        suggestions = analyze_ndjson_file(jsonl_file, "export")
+
+        assert len(suggestions) == 1
+        assert suggestions[0].document_count == 50
+        assert suggestions[0].bender_expression == "export.n"
+
+    def test_analyze_ndjson_files_reports_file_and_line(self, tmp_path, monkeypatch):
+        """Test that files are opened one at a time and skipped lines name their file."""
+        first, second = tmp_path / "a.jsonl", tmp_path / "b.jsonl"
+        first.write_text('{"n": 1}\n{"n": 2}\n', encoding="utf-8")
+        second.write_text('{"n": 3}\nnot json\n', encoding="utf-8")
+
+        import builtins
+        real_open, open_files = builtins.open, []
+
+        def tracking_open(path, *args, **kwargs):
+            handle = real_open(path, *args, **kwargs)
+            if str(path).endswith(".jsonl"):
+                assert all(f.closed for f in open_files)
+                open_files.append(handle)
+            return handle
+        monkeypatch.setattr(builtins, "open", tracking_open)
+
+        analyzer = JSONAnalyzer()
+        suggestions = analyzer.analyze_ndjson_files([first, second], "export")
+        assert suggestions[0].document_count == 3
+        assert list(analyzer.batch_errors) == [f"{second}:2"]
+        assert len(open_files) == 2 and all(f.closed for f in open_files)
+
+
+class TestAnalysisCache:
+    """Test the on-disk JSON analysis cache."""
+
+    def test_repeat_analysis_is_served_from_cache(self, tmp_path):
+        """Test that a repeat analysis of an unchanged file hits the cache."""
+        json_file = tmp_path / "response.json"
+        json_file.write_text(json.dumps({"id": 1, "items": [{"name": "a"}]}), encoding="utf-8")
+        cache = AnalysisCache(tmp_path / "cache")
+
+        first = JSONAnalyzer(cache=cache).analyze_json_file(json_file, "api")
+        assert cache.stats()["entries"] == 1
+
+        analyzer = JSONAnalyzer(cache=cache)
+        analyzer._analyze_object = None  # any re-analysis would fail
+        second = analyzer.analyze_json_file(json_file, "api")
+
+        assert [s.path for s in second] == [s.path for s in first]
+        assert [s.description for s in second] == [s.description for s in first]
+
+    def test_cache_key_includes_source_name(self, tmp_path):
+        """Test that the same JSON under another source name is analyzed separately."""
+        cache = AnalysisCache(tmp_path / "cache")
+        JSONAnalyzer(cache=cache).analyze_json('{"id": 1}', "first")
+        suggestions = JSONAnalyzer(cache=cache).analyze_json('{"id": 1}', "second")
+
+        assert suggestions[0].bender_expression == "second.id"
+        assert cache.stats()["entries"] == 2
+
+    def test_lru_eviction_and_clear(self, tmp_path):
+        """Test that the cache stays within its size budget and can be cleared."""
+        cache = AnalysisCache(tmp_path / "cache", max_bytes=400)
+        for i in range(20):
+            cache.put(f"{i:064x}", [("path", "x" * 50, "string", f"src.{i}")])
+
+        stats = cache.stats()
+        assert stats["bytes"] <= 400
+        assert 0 < stats["entries"] < 20
+        assert cache.get(f"{19:064x}") is not None
+
+        assert cache.clear() == stats["entries"]
+        assert cache.stats()["entries"] == 0
+
+    def test_puts_within_budget_do_not_rescan(self, tmp_path):
+        """Test that the entry directory is only scanned again once the size estimate passes the budget."""
+        cache = AnalysisCache(tmp_path / "cache", max_bytes=10_000)
+        scans = []
+        scan = cache._scan
+        cache._scan = lambda: scans.append(1) or scan()
+        for i in range(40):
+            cache.put(f"{i:064x}", [("path", "x" * 50, "string", f"src.{i}")])
+
+        assert len(scans) < 5
+        assert cache.stats()["bytes"] <= 10_000
+
+    def test_concurrent_writers_of_one_key(self, tmp_path):
+        """Test that threads writing the same key do not share a temporary file."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        cache = AnalysisCache(tmp_path / "cache")
+        key = "ab" * 32
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda i: cache.put(key, ["x" * 1000, i]), range(64)))
+
+        assert not cache._read_only
+        assert cache.get(key)[0] == "x" * 1000
+        assert not list((tmp_path / "cache").rglob("*.tmp"))
+
+    def test_unwritable_cache_disables_caching(self, tmp_path):
+        """Test that a cache directory that cannot be created falls back to analyzing without a cache."""
+        json_file = tmp_path / "response.json"
+        json_file.write_text(json.dumps({"id": 1}), encoding="utf-8")
+        (tmp_path / "not_a_dir").write_text("")
+        cache = AnalysisCache(tmp_path / "not_a_dir" / "cache")
+
+        with pytest.warns(RuntimeWarning, match="cache disabled"):
+            suggestions = JSONAnalyzer(cache=cache).analyze_json_file(json_file, "api")
+        assert suggestions[0].bender_expression == "api.id"
+        assert JSONAnalyzer(cache=cache).analyze_json('{"id": 2}', "api")[0].bender_expression == "api.id"
+        assert cache.stats()["entries"] == 0
+
+
+class TestSuggestionIndex:
+    """Test the suggestion path search index."""
+
+    @staticmethod
+    def _suggestions(paths):
+        return [VariableSuggestion(path, None, "string", bender_expression=f"api.{path}")
+                for path in paths]
+
+    def test_split_path(self):
+        """Test splitting paths into segments."""
+        assert split_path("users[*].profile.email") == ["users", "[*]", "profile", "email"]
+
+    def test_prefix_search(self):
+        """Test segment-wise prefix matching."""
+        index = SuggestionIndex(self._suggestions(
+            ["users[*].email", "users[*].name", "user_count", "meta.users"]))
+
+        paths = [index.get(i).path for i in index.prefix("users[*].em")]
+        assert paths == ["users[*].email"]
+        assert len(index.prefix("user")) == 3
+        assert index.prefix("missing") == []
+
+    def test_substring_and_fuzzy_search(self):
+        """Test substring matching and typo-tolerant fallback."""
+        index = SuggestionIndex(self._suggestions(
+            ["ticket.assignee.email", "ticket.status", "ticket.created_by.email"]))
+
+        assert [index.get(i).path for i in index.substring("EMAIL")] == [
+            "ticket.assignee.email", "ticket.created_by.email"]
+        assert index.substring("nothing") == []
+
+        results = index.search("asignee")
+        assert index.get(results[0]).path == "ticket.assignee.email"
+
+    def test_incremental_add_replaces_existing(self):
+        """Test that re-adding a suggestion updates it in place."""
+        index = SuggestionIndex(self._suggestions(["id"]))
+        replacement = VariableSuggestion("id", 42, "integer", bender_expression="api.id")
+
+        assert index.add(replacement) == 0
+        assert len(index) == 1
+        assert index.get(0).value == 42
+        assert index.add(self._suggestions(["name"])[0]) == 1
+
+    def test_analyzer_pattern_lookup_uses_index(self):
+        """Test that pattern lookups follow re-analysis."""
+        analyzer = JSONAnalyzer()
+        analyzer.analyze_json('{"user": {"email": "a@b.c"}, "count": 1}', "api")
+        assert [s.path for s in analyzer.get_suggestions_by_pattern("mail")] == ["user.email"]
+
+        analyzer.analyze_json('{"count": 2}', "api")
+        assert analyzer.get_suggestions_by_pattern("mail") == []
+
+
+class TestYAMLExampleModes:
+    """Test the generation modes of the comprehensive YAML example."""
+
+    @staticmethod
+    def _analyzer():
+        analyzer = JSONAnalyzer()
+        analyzer.analyze_json(json.dumps({
+            "users": [{"id": 1, "email": "a@x.com", "name": "A"},
+                      {"id": 2, "email": "b@x.com", "name": "B"}],
+            "groups": [{"name": "admins"}]
+        }), "api")
+        return analyzer
+
+    def test_single_script_makes_one_pass_per_array(self):
+        """Test that single-script mode emits one step with one loop per array."""
+        analyzer = self._analyzer()
+        content = analyzer.generate_comprehensive_yaml_example("api", mode="single_script")
+        steps = yaml.safe_load(content)["steps"]
+
+        assert len(steps) == 1
+        code = steps[0]["script"]["code"]
+        assert code.count("for item in api.users:") == 1
+        assert "summary['users_name_list'].append(item['name'])" in code
+        assert "summary['groups_name_list'].append(item['name'])" in code
+
+    def test_map_mode_uses_output_mapper(self):
+        """Test that MAP mode emits Bender MAP() without script steps."""
+        analyzer = self._analyzer()
+        content = analyzer.generate_comprehensive_yaml_example("api", mode="map")
+        steps = yaml.safe_load(content)["steps"]
+
+        assert len(steps) == 1
+        mapper = steps[0]["return"]["output_mapper"]
+        assert mapper["email_list"] == {"MAP()": {"items": "api.users", "converter": "item.email"}}
+
+    def test_cost_estimates(self):
+        """Test runtime step and iteration estimates per mode."""
+        analyzer = self._analyzer()
+
+        per_property = analyzer.estimate_yaml_example_cost("per_property")
+        assert per_property["steps"] == 5
+        assert per_property["iterations"] == 3 * 2 + 1
+
+        single = analyzer.estimate_yaml_example_cost("single_script")
+        assert single["steps"] == 1
+        assert single["array_passes"] == 2
+        assert single["iterations"] == 2 + 1
+
+        assert analyzer.estimate_yaml_example_cost("map")["script_steps"] == 0
+
+        with pytest.raises(ValueError):
+            analyzer.estimate_yaml_example_cost("unknown")
+
+
+class TestPaginationDetection:
+    """Test pagination detection and page-fetch fragment generation."""
+
+    @staticmethod
+    def _analyze(data):
+        analyzer = JSONAnalyzer()
+        analyzer.analyze_json(json.dumps(data), "api")
+        return analyzer
+
+    def test_offset_pagination_with_total(self):
+        """Test that offset/limit with a total yields a parallel fetch."""
+        analyzer = self._analyze({"data": [{"id": 1}, {"id": 2}],
+                                  "paging": {"offset": 0, "limit": 100, "total_count": 250}})
+        info = analyzer.detect_pagination()
+
+        assert info.style == "offset"
+        assert info.items_path == "data"
+        assert info.page_size == 100
+        assert info.estimated_calls == 3
+
+        steps = yaml.safe_load(analyzer.generate_pagination_fragment("list_users"))["steps"]
+        assert steps[1]["script"]["input_args"]["total"] == "data.first_page.paging.total_count"
+        assert "parallel" in steps[2]
+
+    def test_offset_pagination_with_total_pages(self):
+        """Test that a page count with offset/limit yields the remaining offsets, not page numbers."""
+        analyzer = self._analyze({"items": [{"id": 1}], "offset": 0, "limit": 10, "total_pages": 5})
+        script = yaml.safe_load(analyzer.generate_pagination_fragment("list_users"))["steps"][1]["script"]
+        assert script["input_args"] == {"total_pages": "data.first_page.total_pages"}
+
+        namespace = {}
+        body = "".join(f"    {line}\n" for line in script["code"].splitlines())
+        exec(f"def remaining(total_pages):\n{body}", namespace)
+        assert namespace["remaining"](5) == [10, 20, 30, 40]
+
+    def test_cursor_pagination_is_bounded(self):
+        """Test that cursor pagination yields a bounded sequential loop."""
+        analyzer = self._analyze({"results": [{"id": 1}], "next_page_token": "abc"})
+        info = analyzer.detect_pagination()
+
+        assert info.style == "cursor"
+        assert info.cursor_path == "next_page_token"
+        assert info.estimated_calls is None
+
+        steps = yaml.safe_load(analyzer.generate_pagination_fragment("list_users", max_pages=4))["steps"]
+        assert len(steps) == 5
+        case = steps[1]["switch"]["cases"][0]
+        assert case["condition"] == "data.page_1.next_page_token != null"
+        assert case["steps"][0]["action"]["input_args"] == {"page_token": "data.page_1.next_page_token"}
+
+    def test_link_pagination_and_no_pagination(self):
+        """Test HAL-style next links and responses without pagination."""
+        info = self._analyze({"items": [1], "links": {"next": {"href": "https://x/items?page=2"}}}).detect_pagination()
+        assert info.style == "cursor"
+        assert info.cursor_is_url
+
+        assert self._analyze({"id": 1, "name": "x"}).detect_pagination() is None
+
+
+class TestPayloadProfile:
+    """Test payload-size profiling and usage cross-referencing."""
+
+    DATA = {
+        "users": [{"id": i, "email": f"u{i}@x.com", "bio": "x" * 400} for i in range(10)],
+        "meta": {"total": 10}
+    }
+
+    def test_path_sizes_match_compact_json(self):
+        """Test that the root size equals the compact serialized size."""
+        sizes = compute_path_sizes(self.DATA)
+
+        assert sizes[""] == len(json.dumps(self.DATA, separators=(',', ':')).encode("utf-8"))
+        assert sizes["users[*].bio"] == 10 * len('"bio":"' + "x" * 400 + '"')
+
+    def test_used_paths_from_references(self):
+        """Test collecting data.<output_key> references, including MAP() converters."""
+        action = CompoundAction(steps=[
+            ActionStep(action_name="get_users", output_key="resp",
+                       input_args={"first": "data.resp.users[0].id.$TRIM()", "other": "data.other.x"}),
+            ReturnStep(output_mapper={"emails": {"MAP()": {"items": "data.resp.users",
+                                                           "converter": "item.email"}}})
+        ])
+
+        assert collect_used_paths(action, "resp") == {"users[*].id", "users[*].email"}
+        assert "x" in collect_used_paths(action)
+
+    def test_unused_large_fields(self):
+        """Test that only the large, never referenced fields are reported."""
+        usage = {"steps": [{"return": {"output_mapper": {"n": "data.resp.meta.total",
+                                                         "ids": "data.resp.users[0].id"}}}]}
+        profile = JSONAnalyzer().profile_payload(json.dumps(self.DATA), usage, "resp")
+
+        unused = [entry.path for entry in profile.unused_large_fields(min_share=0.01)]
+        assert unused == ["users[*].bio", "users[*].email"]
+        assert "users[*].bio" in profile.format_report()
+
+    def test_profile_without_usage(self):
+        """Test that usage flags are only computed with a Compound Action."""
+        profile = JSONAnalyzer().profile_payload(self.DATA)
+
+        assert profile.largest(1)[0].path == "users"
+        assert profile.unused_large_fields() == []
+
 
 class TestRealWorldExamples:
     """Test with real-world JSON examples."""
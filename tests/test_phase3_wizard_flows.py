@@ -10,6 +10,8 @@ from unittest.mock import patch, MagicMock, call
 from pathlib import Path
 import tempfile
 
+from click.testing import CliRunner
+
 from src.moveworks_wizard.wizard.cli import CompoundActionWizard
 from src.moveworks_wizard.models.base import CompoundAction
 
@@ -181,3 +183,66 @@ class TestWizardUserExperience:
         assert callable(wizard._create_action_step)
         assert callable(wizard._create_script_step)
         assert callable(wizard._create_switch_step)
+
+
+class TestWizardLoopWarnings:
+    """Test connector load warnings when adding for loops."""
+
+    @patch('click.echo')
+    @patch('click.confirm', side_effect=[False] * 8)
+    @patch('click.prompt', side_effect=["users", "user", "i", "tickets",
+                                        1, "mw.create_ticket", "ticket",
+                                        1, "mw.create_ticket", "follow_up",
+                                        6, 800])
+    def test_for_step_warns_about_rate_limited_connector(self, mock_prompt, mock_confirm, mock_echo):
+        """Test that every action of a loop body counts towards the load of its connector."""
+        wizard = CompoundActionWizard()
+        step = wizard._create_step('for')
+
+        assert step.get_step_type() == "for"
+        assert step.to_yaml_dict()["for"]["in"] == "users"
+        assert len(step.steps) == 2
+        output = [str(c.args[0]) for c in mock_echo.call_args_list if c.args]
+        assert any("~1,600 calls to itsm, a connector limited to 10 rps" in line for line in output)
+        assert any("mw.create_ticket is not safe to retry" in line for line in output)
+        assert any(line.startswith("Performance: typical latency 800 ms") for line in output)
+
+
+class TestWizardStepMenu:
+    """Test the numbering of the step type menu."""
+
+    @pytest.mark.parametrize("choice, step_type", [
+        ("1", "action"), ("2", "script"), ("3", "switch"), ("4", "return"),
+        ("5", "raise"), ("6", "done"), ("7", "for"),
+    ])
+    def test_menu_numbers(self, choice, step_type):
+        """Test that options 1-6 keep their numbers and for loops are option 7."""
+        with CliRunner().isolation(input=f"{choice}\n"):
+            assert CompoundActionWizard()._prompt_step_type() == step_type
+
+    def test_out_of_range_choice_is_asked_again(self):
+        """Test that a mistyped number is rejected instead of defaulting to an action step."""
+        with CliRunner().isolation(input="9\n6\n") as streams:
+            assert CompoundActionWizard()._prompt_step_type() == "done"
+        assert b"9 is not in the range 1<=x<=7" in streams[0].getvalue()
+
+    def test_old_numbers_add_a_return_step_and_finish(self):
+        """Test that a script entering 4 then 6 still adds a Return step and finishes."""
+        with CliRunner().isolation(input="4\nn\n6\n"):
+            steps = CompoundActionWizard()._collect_steps()
+        assert [step.get_step_type() for step in steps] == ["return"]
+
+
+class TestWizardAIStart:
+    """Test the AI-assisted start of the wizard."""
+
+    @patch('click.echo')
+    @patch('click.prompt', side_effect=["Onboard a new employee and grant them access", 0])
+    def test_ai_suggestions_are_listed(self, mock_prompt, mock_echo):
+        """Test that describing a workflow lists suggestions before falling back to scratch."""
+        wizard = CompoundActionWizard()
+        with patch.object(wizard, '_start_from_scratch', return_value="scratch") as scratch:
+            assert wizard._start_with_ai_suggestions() == "scratch"
+        scratch.assert_called_once()
+        output = [str(c.args[0]) for c in mock_echo.call_args_list if c.args]
+        assert any(line.startswith("\n💡 Found") for line in output)
@@ -9,11 +9,15 @@ This module contains comprehensive tests for Phase 4 features including:
 - GUI components (basic tests)
 """
 
+import subprocess
+import sys
+from pathlib import Path
+
 import pytest
 from unittest.mock import patch, MagicMock
 
 from src.moveworks_wizard.catalog.builtin_actions import builtin_catalog, BuiltinAction
-from src.moveworks_wizard.templates.template_library import template_library, CompoundActionTemplate
+from src.moveworks_wizard.templates.template_library import template_library, CompoundActionTemplate, TemplateLibrary
 from src.moveworks_wizard.ai.action_suggester import action_suggester, ActionSuggestion, SuggestionType
 from src.moveworks_wizard.bender.bender_assistant import bender_assistant, BenderFunction, BenderExpression
 
@@ -118,6 +122,34 @@ class TestTemplateLibrary:
         approval_results = template_library.search_templates("approval")
         assert len(approval_results) >= 2, "Should find approval templates"
 
+    def test_templates_are_built_on_request(self):
+        """Test that listing and searching build no models and that built models are cached."""
+        library = TemplateLibrary()
+        library.get_all_categories()
+        library.search_templates("approval")
+        assert not any(template.is_built for template in library.get_all_templates())
+
+        template = library.get_template("manager_approval")
+        compound_action = template.compound_action
+        assert template.is_built and template.compound_action is compound_action
+        assert [t.name for t in library.get_all_templates() if t.is_built] == [template.name]
+
+    def test_template_metadata_matches_models(self):
+        """Test that the declared input arguments match the built Compound Actions."""
+        for template in TemplateLibrary().get_all_templates():
+            assert template.input_args == list(template.compound_action.input_args or {}), template.name
+
+    def test_importing_builds_no_templates(self):
+        """Test that importing the package builds none of the template models."""
+        code = ("import src.moveworks_wizard; from src.moveworks_wizard.templates.template_library import template_library; "
+                "assert not any(t.is_built for t in template_library.get_all_templates())")
+        subprocess.run([sys.executable, "-c", code], check=True, cwd=Path(__file__).parent.parent)
+
+    def test_template_needs_model_or_factory(self):
+        """Test that a template without a Compound Action or factory is rejected."""
+        with pytest.raises(ValueError):
+            CompoundActionTemplate("Empty", "No model", "Testing", "Never")
+
 
 class TestAIActionSuggester:
     """Test the AI-powered action suggestion system."""